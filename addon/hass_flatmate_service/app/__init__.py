@@ -1 +1,6 @@
 """hass-flatmate service package."""
+
+import time
+
+# Taken before any framework import so the startup report covers them.
+IMPORT_STARTED = time.perf_counter()
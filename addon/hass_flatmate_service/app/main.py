@@ -2,17 +2,32 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import AsyncIterator, Callable, Iterator
 from contextlib import asynccontextmanager
 from datetime import datetime
-import json
-
-from fastapi import Depends, FastAPI, Header, HTTPException, Query, Response, status
-from fastapi.responses import HTMLResponse, PlainTextResponse
-from sqlalchemy import delete, select
+from functools import cache
+import os
+from pathlib import Path
+import time
+from typing import TYPE_CHECKING
+import zlib
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
+import orjson
+from pydantic import ValidationError
+from sqlalchemy import delete
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 
-from . import db
-from .db import Base, get_session
+from . import IMPORT_STARTED, db
+from .db import get_session
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, request_metrics
+from .migrations import run_migrations
+from .responses import CompressionMiddleware, FastJSONResponse, StaticAsset, gzip_stream
 from .models import (
     ActivityEvent,
     CleaningAssignment,
@@ -23,6 +38,9 @@ from .models import (
     ShoppingItem,
 )
 from .schemas import (
+    BackupRestoreRequest,
+    BatchRequest,
+    BatchResponse,
     BuyStatsResponse,
     CleaningCurrentResponse,
     CleaningMarkDoneRequest,
@@ -32,6 +50,7 @@ from .schemas import (
     CleaningNotificationDueResponse,
     CleaningScheduleResponse,
     CleaningSwapRequest,
+    DigestCompareRequest,
     ManualImportRequest,
     ManualImportResponse,
     FavoritesResponse,
@@ -48,42 +67,84 @@ from .schemas import (
     SnapshotImportRequest,
     SnapshotImportResponse,
 )
-from .services import cleaning, importer, shopping, snapshot
-from .services.activity import list_events
-from .services.members import sync_members
+from .server import log_server_profile, server_profile
+from .services import batch, cleaning, shopping, snapshot_binary, versioning
+from .services.activity import list_events, list_events_async
+from .services.members import (
+    MemberSyncResult,
+    list_members_async,
+    mark_member_directory_stale,
+    member_directory,
+    sync_members,
+)
 from .settings import settings
+from .startup import FirstRequestTimer, startup_timings
+from .tenants import TenantMiddleware, evict_idle_tenants, tenant_pool
+from .writer import writer
+
+if TYPE_CHECKING:
+    from .services.snapshot import SnapshotImporter
 
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
+    started = time.perf_counter()
     db.configure_engine()
     db.ensure_db_dir()
     assert db.engine is not None
-    Base.metadata.create_all(bind=db.engine)
-
-    from sqlalchemy import inspect as sa_inspect, text
-    inspector = sa_inspect(db.engine)
-    columns = {c["name"] for c in inspector.get_columns("cleaning_assignments")}
-    if "notified_slots" not in columns:
-        with db.engine.begin() as conn:
-            conn.execute(text(
-                "ALTER TABLE cleaning_assignments ADD COLUMN notified_slots JSON DEFAULT NULL"
-            ))
-
-    member_columns = {c["name"] for c in inspector.get_columns("members")}
-    with db.engine.begin() as conn:
-        if "notify_services" not in member_columns:
-            conn.execute(text("ALTER TABLE members ADD COLUMN notify_services JSON DEFAULT '[]'"))
-        if "device_trackers" not in member_columns:
-            conn.execute(text("ALTER TABLE members ADD COLUMN device_trackers JSON DEFAULT '[]'"))
+    run_migrations(db.engine)
+    startup_timings.ready(migrations_seconds=time.perf_counter() - started)
+    log_server_profile()
+    idle_eviction = None
+    if tenant_pool.enabled:
+        # Fail at startup on a broken tenants file rather than on the first request.
+        tenant_pool.tenants()
+        idle_eviction = asyncio.create_task(evict_idle_tenants())
 
     yield
 
+    if idle_eviction is not None:
+        idle_eviction.cancel()
+    await run_in_threadpool(writer.stop)
+    tenant_pool.close_all()
+    await db.dispose_async_engine()
+    db.optimize()
+
+
+_IMPORT_RECORDS_PER_BATCH = 5000
 
-app = FastAPI(title="hass-flatmate-service", version="0.1.45", lifespan=lifespan)
+app = FastAPI(
+    title="hass-flatmate-service",
+    version="0.1.45",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_min_bytes)
+if settings.metrics_enabled:
+    # Added last so it wraps compression and measures the bytes actually sent.
+    app.add_middleware(MetricsMiddleware)
+# Outside the metrics middleware so requests are recorded in their tenant's metrics.
+app.add_middleware(TenantMiddleware)
+app.add_middleware(FirstRequestTimer)
+
+
+@app.exception_handler(OperationalError)
+async def database_locked_handler(_request: Request, exc: OperationalError) -> Response:
+    # Lock timeouts are transient contention, not server bugs: answer 503 so
+    # clients can retry and load tests can count them separately.
+    if not db.is_lock_error(exc):
+        raise exc
+    return FastJSONResponse(
+        {"detail": "Database is locked, retry shortly"},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "1"},
+    )
 
 
 def require_token(x_flatmate_token: str | None = Header(default=None)) -> None:
+    if db.current_tenant() is not None:
+        # TenantMiddleware already matched the token to a tenant.
+        return
     if x_flatmate_token != settings.api_token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
 
@@ -93,434 +154,67 @@ def health() -> dict:
     return {"ok": True}
 
 
-@app.get("/", response_class=HTMLResponse)
-def ingress_migration_ui() -> str:
-    ui_html = """<!doctype html>
-<html lang="en">
-  <head>
-    <meta charset="utf-8" />
-    <meta name="viewport" content="width=device-width,initial-scale=1" />
-    <title>Hass Flatmate Migration</title>
-    <style>
-      :root {
-        color-scheme: light dark;
-        --bg: #0f172a;
-        --bg-card: #111827;
-        --fg: #e5e7eb;
-        --muted: #93c5fd;
-        --accent: #22c55e;
-        --danger: #f87171;
-      }
-
-      body {
-        margin: 0;
-        padding: 20px;
-        font-family: ui-sans-serif, system-ui, -apple-system, Segoe UI, Roboto, sans-serif;
-        background: radial-gradient(circle at top, #1e293b 0%, var(--bg) 55%);
-        color: var(--fg);
-      }
-
-      .wrap {
-        max-width: 980px;
-        margin: 0 auto;
-      }
-
-      .card {
-        background: color-mix(in srgb, var(--bg-card) 90%, black);
-        border: 1px solid #334155;
-        border-radius: 12px;
-        padding: 16px;
-        margin-bottom: 16px;
-      }
-
-      h1 {
-        margin: 0 0 8px;
-        font-size: 24px;
-      }
-
-      p {
-        margin: 6px 0;
-      }
-
-      .muted {
-        color: var(--muted);
-      }
-
-      .row {
-        display: flex;
-        flex-wrap: wrap;
-        gap: 10px;
-        align-items: center;
-      }
-
-      input[type="password"],
-      input[type="text"],
-      textarea,
-      select {
-        width: 100%;
-        box-sizing: border-box;
-        border: 1px solid #475569;
-        background: #0b1220;
-        color: var(--fg);
-        border-radius: 8px;
-        padding: 10px 12px;
-        font: inherit;
-      }
-
-      textarea {
-        min-height: 320px;
-        font-family: ui-monospace, SFMono-Regular, Menlo, Consolas, monospace;
-        line-height: 1.35;
-      }
-
-      .token {
-        flex: 1;
-        min-width: 260px;
-      }
-
-      button {
-        border: 1px solid #475569;
-        background: #1f2937;
-        color: var(--fg);
-        border-radius: 8px;
-        padding: 10px 14px;
-        cursor: pointer;
-        font: inherit;
-      }
-
-      button.primary {
-        background: #14532d;
-        border-color: #166534;
-      }
-
-      button.warn {
-        background: #7f1d1d;
-        border-color: #991b1b;
-      }
-
-      button:disabled {
-        opacity: 0.5;
-        cursor: not-allowed;
-      }
-
-      .status {
-        margin-top: 10px;
-        min-height: 22px;
-      }
-
-      .status.ok {
-        color: var(--accent);
-      }
-
-      .status.err {
-        color: var(--danger);
-      }
-
-      .label {
-        font-size: 13px;
-        color: #cbd5e1;
-      }
-
-      .grow {
-        flex: 1;
-      }
-
-      .table-wrap {
-        overflow-x: auto;
-      }
-
-      table {
-        width: 100%;
-        border-collapse: collapse;
-      }
-
-      th,
-      td {
-        text-align: left;
-        vertical-align: top;
-        border-bottom: 1px solid #334155;
-        padding: 10px 8px;
-        font-size: 14px;
-      }
-
-      th {
-        color: #cbd5e1;
-        font-weight: 600;
-      }
-
-      .chips {
-        display: flex;
-        flex-wrap: wrap;
-        gap: 6px;
-      }
-
-      .chip {
-        border: 1px solid #475569;
-        background: #0b1220;
-        border-radius: 999px;
-        padding: 2px 8px;
-        font-size: 12px;
-      }
-    </style>
-  </head>
-  <body>
-    <div class="wrap">
-      <div class="card">
-        <h1>Hass Flatmate Snapshot Migration</h1>
-        <p class="muted">Export your real Home Assistant data and import it locally for testing edge cases.</p>
-        <p class="muted">Uses your configured add-on token automatically.</p>
-      </div>
-
-      <div class="card">
-        <div class="row">
-          <strong>Member Notification Mapping</strong>
-          <button id="load-members">Load members & devices</button>
-        </div>
-        <div class="muted" style="margin-top:8px">Uses Home Assistant person entities and phone trackers (not guessed device names).</div>
-        <div class="status" id="members-status"></div>
-        <div id="members-table" class="table-wrap" style="margin-top:10px"></div>
-      </div>
-
-      <div class="card">
-        <div class="row">
-          <button id="export">Export snapshot</button>
-          <button id="download">Download JSON</button>
-          <label class="grow"></label>
-        </div>
-        <div class="status" id="export-status"></div>
-      </div>
-
-      <div class="card">
-        <div class="row">
-          <input id="file" type="file" accept="application/json,.json" />
-          <button id="load-file">Load file into editor</button>
-        </div>
-        <div style="margin-top:10px" class="label">Snapshot JSON (editable)</div>
-        <textarea id="editor" placeholder='{"schema_version":1,"data":{...}}'></textarea>
-      </div>
-
-      <div class="card">
-        <div class="row">
-          <label><input id="replace" type="checkbox" checked /> Replace existing local data before import</label>
-        </div>
-        <div class="row" style="margin-top:10px">
-          <button id="import" class="primary">Import snapshot</button>
-          <button id="clear" class="warn">Clear editor</button>
-        </div>
-        <div class="status" id="import-status"></div>
-      </div>
-    </div>
-
-    <script>
-      const API_TOKEN = __API_TOKEN__;
-      const editor = document.getElementById("editor");
-      const replaceInput = document.getElementById("replace");
-      const exportStatus = document.getElementById("export-status");
-      const importStatus = document.getElementById("import-status");
-      const fileInput = document.getElementById("file");
-      const membersStatus = document.getElementById("members-status");
-      const membersTable = document.getElementById("members-table");
-
-      const setStatus = (target, message, ok) => {
-        target.textContent = message || "";
-        target.className = ok == null ? "status" : ok ? "status ok" : "status err";
-      };
-
-      const authHeaders = (includeJson) => {
-        const headers = {"x-flatmate-token": API_TOKEN};
-        if (includeJson) headers["content-type"] = "application/json";
-        return headers;
-      };
-
-      const parseError = async (response) => {
-        const text = await response.text();
-        if (!text) {
-          return response.status + " " + response.statusText;
-        }
-        try {
-          const payload = JSON.parse(text);
-          if (payload && typeof payload === "object") {
-            return payload.detail || payload.message || text;
-          }
-          return text;
-        } catch (_err) {
-          return text;
-        }
-      };
+@cache
+def _ingress_ui() -> StaticAsset:
+    return StaticAsset.load(Path(__file__).parent / "static" / "ingress.html", "text/html; charset=utf-8")
 
-      const escapeHtml = (value) => String(value ?? "")
-        .replaceAll("&", "&amp;")
-        .replaceAll("<", "&lt;")
-        .replaceAll(">", "&gt;");
 
-      const renderChips = (values) => {
-        if (!Array.isArray(values) || values.length === 0) {
-          return '<span class="muted">none</span>';
-        }
-        return '<div class="chips">' + values
-          .map((value) => '<span class="chip">' + escapeHtml(value) + '</span>')
-          .join("") + '</div>';
-      };
-
-      const loadMembers = async () => {
-        setStatus(membersStatus, "Loading members...", null);
-        try {
-          const response = await fetch("v1/members", {
-            method: "GET",
-            headers: authHeaders(false),
-          });
-          if (!response.ok) {
-            throw new Error(await parseError(response));
-          }
-          const rows = await response.json();
-          if (!Array.isArray(rows) || rows.length === 0) {
-            membersTable.innerHTML = '<p class="muted">No members synced yet.</p>';
-            setStatus(membersStatus, "No members found.", true);
-            return;
-          }
-          membersTable.innerHTML =
-            '<table>' +
-            '<thead><tr><th>Name</th><th>Person Entity</th><th>Device Trackers</th><th>Notify Services</th></tr></thead>' +
-            '<tbody>' + rows.map((row) =>
-              '<tr>' +
-              '<td>' + escapeHtml(row.display_name) + (row.active ? "" : ' <span class="muted">(inactive)</span>') + '</td>' +
-              '<td>' + escapeHtml(row.ha_person_entity_id || "none") + '</td>' +
-              '<td>' + renderChips(row.device_trackers) + '</td>' +
-              '<td>' + renderChips(row.notify_services) + '</td>' +
-              '</tr>'
-            ).join("") + '</tbody></table>';
-          setStatus(membersStatus, "Loaded " + rows.length + " member mapping(s).", true);
-        } catch (err) {
-          membersTable.innerHTML = "";
-          setStatus(membersStatus, "Failed to load members: " + (err?.message || String(err)), false);
-        }
-      };
-
-      document.getElementById("load-members").addEventListener("click", loadMembers);
-
-      document.getElementById("export").addEventListener("click", async () => {
-        setStatus(exportStatus, "Exporting snapshot...", null);
-        try {
-          const response = await fetch("v1/admin/export", {
-            method: "GET",
-            headers: authHeaders(false),
-          });
-          if (!response.ok) {
-            throw new Error(await parseError(response));
-          }
-          const payload = await response.json();
-          editor.value = JSON.stringify(payload, null, 2);
-          const generatedAt = payload?.generated_at || "unknown time";
-          setStatus(exportStatus, "Snapshot exported (" + generatedAt + ").", true);
-        } catch (err) {
-          setStatus(exportStatus, "Export failed: " + (err?.message || String(err)), false);
-        }
-      });
+def require_ingress(request: Request) -> None:
+    # The ingress page hands out the primary token. Without tenants every caller
+    # of the add-on port belongs to the primary household; with tenants only the
+    # Supervisor's ingress proxy, which authenticates Home Assistant users, may ask.
+    if not tenant_pool.enabled:
+        return
+    if request.client is None or request.client.host != settings.ingress_proxy_address:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only available through ingress")
 
-      document.getElementById("download").addEventListener("click", () => {
-        const text = editor.value.trim();
-        if (!text) {
-          setStatus(exportStatus, "Nothing to download. Export or paste snapshot JSON first.", false);
-          return;
-        }
-        const blob = new Blob([text], {type: "application/json"});
-        const url = URL.createObjectURL(blob);
-        const a = document.createElement("a");
-        const stamp = new Date().toISOString().replaceAll(":", "-");
-        a.href = url;
-        a.download = "hass-flatmate-snapshot-" + stamp + ".json";
-        document.body.appendChild(a);
-        a.click();
-        a.remove();
-        URL.revokeObjectURL(url);
-        setStatus(exportStatus, "Snapshot downloaded.", true);
-      });
-
-      document.getElementById("load-file").addEventListener("click", async () => {
-        const file = fileInput.files && fileInput.files[0];
-        if (!file) {
-          setStatus(importStatus, "Select a JSON file first.", false);
-          return;
-        }
-        try {
-          editor.value = await file.text();
-          setStatus(importStatus, "Loaded file into editor.", true);
-        } catch (err) {
-          setStatus(importStatus, "Failed to read file: " + (err?.message || String(err)), false);
-        }
-      });
 
-      document.getElementById("import").addEventListener("click", async () => {
-        const raw = editor.value.trim();
-        if (!raw) {
-          setStatus(importStatus, "Paste or load snapshot JSON before importing.", false);
-          return;
-        }
-        let snapshot;
-        try {
-          snapshot = JSON.parse(raw);
-        } catch (err) {
-          setStatus(importStatus, "Invalid JSON: " + (err?.message || String(err)), false);
-          return;
-        }
+@app.get("/", response_class=HTMLResponse, dependencies=[Depends(require_ingress)])
+def ingress_migration_ui(request: Request) -> Response:
+    return _ingress_ui().response(request.headers)
 
-        setStatus(importStatus, "Importing snapshot...", null);
-        try {
-          const response = await fetch("v1/admin/import", {
-            method: "POST",
-            headers: authHeaders(true),
-            body: JSON.stringify({
-              snapshot,
-              replace_existing: !!replaceInput.checked,
-            }),
-          });
-          if (!response.ok) {
-            throw new Error(await parseError(response));
-          }
-          const payload = await response.json();
-          setStatus(importStatus, "Import finished: " + JSON.stringify(payload.summary || {}), true);
-        } catch (err) {
-          setStatus(importStatus, "Import failed: " + (err?.message || String(err)), false);
-        }
-      });
 
-      document.getElementById("clear").addEventListener("click", () => {
-        editor.value = "";
-        setStatus(importStatus, "Editor cleared.", true);
-      });
+@app.get("/ui/config", dependencies=[Depends(require_ingress)])
+def ingress_ui_config() -> Response:
+    # Served apart from the cacheable page so the token is never stored by
+    # browsers or proxies.
+    return FastJSONResponse({"api_token": settings.api_token}, headers={"Cache-Control": "no-store"})
 
-      loadMembers();
-    </script>
-  </body>
-</html>
-"""
-    return ui_html.replace("__API_TOKEN__", json.dumps(settings.api_token))
+
+def _member_response(row) -> MemberResponse:
+    return MemberResponse(
+        id=row.id,
+        display_name=row.display_name,
+        ha_user_id=row.ha_user_id,
+        ha_person_entity_id=row.ha_person_entity_id,
+        notify_service=row.notify_service,
+        notify_services=list(row.notify_services or []),
+        device_trackers=list(row.device_trackers or []),
+        active=row.active,
+    )
 
 
 @app.get("/v1/members", response_model=list[MemberResponse], dependencies=[Depends(require_token)])
-def get_members(session: Session = Depends(get_session)) -> list[MemberResponse]:
-    rows = session.execute(select(Member).order_by(Member.display_name.asc())).scalars().all()
-    return [
-        MemberResponse(
-            id=row.id,
-            display_name=row.display_name,
-            ha_user_id=row.ha_user_id,
-            ha_person_entity_id=row.ha_person_entity_id,
-            notify_service=row.notify_service,
-            notify_services=list(row.notify_services or []),
-            device_trackers=list(row.device_trackers or []),
-            active=row.active,
-        )
-        for row in rows
-    ]
+async def get_members() -> list[MemberResponse]:
+    rows = await db.run_read(member_directory.all, list_members_async)
+    return [_member_response(row) for row in rows]
 
 
 @app.put("/v1/members/sync", response_model=MembersSyncResponse, dependencies=[Depends(require_token)])
-def put_members_sync(
-    payload: MembersSyncRequest,
-    session: Session = Depends(get_session),
-) -> MembersSyncResponse:
-    rows, deactivated_member_ids = sync_members(session, payload.members)
+async def put_members_sync(payload: MembersSyncRequest) -> MembersSyncResponse:
+    return await writer.run(lambda session: _sync_members(session, payload))
+
+
+def _sync_members(session: Session, payload: MembersSyncRequest) -> MembersSyncResponse:
+    result: MemberSyncResult | None = None
+    if member_directory.matches_sync_hash(session, payload.payload_hash):
+        rows = member_directory.all(session)
+    else:
+        result = sync_members(session, payload.members)
+        rows = result.members
+
+    # Reconciled on every sync, even an unchanged one; both are no-ops when
+    # the rotation and overrides already match the members.
     cleaning.sync_rotation_members(session)
     inactive_member_ids = {
         int(row.id)
@@ -532,27 +226,27 @@ def put_members_sync(
         inactive_member_ids=inactive_member_ids,
         actor_user_id=None,
     )
+    if result is None:
+        return MembersSyncResponse(
+            members=[_member_response(row) for row in rows],
+            notifications=notifications,
+            unchanged=True,
+        )
+
+    member_directory.remember_sync_hash(session, payload.payload_hash)
     return MembersSyncResponse(
-        members=[
-            MemberResponse(
-                id=row.id,
-                display_name=row.display_name,
-                ha_user_id=row.ha_user_id,
-                ha_person_entity_id=row.ha_person_entity_id,
-                notify_service=row.notify_service,
-                notify_services=list(row.notify_services or []),
-                device_trackers=list(row.device_trackers or []),
-                active=row.active,
-            )
-            for row in rows
-        ],
+        members=[_member_response(row) for row in rows],
         notifications=notifications,
+        unchanged=not result.changed,
+        inserted=result.inserted,
+        updated=result.updated,
+        deactivated=len(result.deactivated_member_ids),
     )
 
 
 @app.get("/v1/shopping/items", response_model=list[ShoppingItemResponse], dependencies=[Depends(require_token)])
-def get_shopping_items(session: Session = Depends(get_session)) -> list[ShoppingItemResponse]:
-    rows = shopping.list_items(session)
+async def get_shopping_items() -> list[ShoppingItemResponse]:
+    rows = await db.run_read(shopping.list_items, shopping.list_items_async)
     return [
         ShoppingItemResponse(
             id=row.id,
@@ -570,12 +264,9 @@ def get_shopping_items(session: Session = Depends(get_session)) -> list[Shopping
 
 
 @app.post("/v1/shopping/items", response_model=OperationResponse, dependencies=[Depends(require_token)])
-def post_shopping_items(
-    payload: ShoppingItemCreateRequest,
-    session: Session = Depends(get_session),
-) -> OperationResponse:
-    item = shopping.add_item(session, payload.name, payload.actor_user_id)
-    return OperationResponse(ok=True, id=item.id)
+async def post_shopping_items(payload: ShoppingItemCreateRequest) -> OperationResponse:
+    item_id = await writer.run(lambda session: shopping.add_item(session, payload.name, payload.actor_user_id).id)
+    return OperationResponse(ok=True, id=item_id)
 
 
 @app.post(
@@ -583,16 +274,14 @@ def post_shopping_items(
     response_model=OperationResponse,
     dependencies=[Depends(require_token)],
 )
-def post_shopping_complete(
-    item_id: int,
-    payload: ShoppingItemActionRequest,
-    session: Session = Depends(get_session),
-) -> OperationResponse:
+async def post_shopping_complete(item_id: int, payload: ShoppingItemActionRequest) -> OperationResponse:
     try:
-        item = shopping.complete_item(session, item_id, payload.actor_user_id)
+        completed_id = await writer.run(
+            lambda session: shopping.complete_item(session, item_id, payload.actor_user_id).id
+        )
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
-    return OperationResponse(ok=True, id=item.id)
+    return OperationResponse(ok=True, id=completed_id)
 
 
 @app.delete(
@@ -600,16 +289,12 @@ def post_shopping_complete(
     response_model=OperationResponse,
     dependencies=[Depends(require_token)],
 )
-def delete_shopping_item(
-    item_id: int,
-    payload: ShoppingItemActionRequest,
-    session: Session = Depends(get_session),
-) -> OperationResponse:
+async def delete_shopping_item(item_id: int, payload: ShoppingItemActionRequest) -> OperationResponse:
     try:
-        item = shopping.delete_item(session, item_id, payload.actor_user_id)
+        deleted_id = await writer.run(lambda session: shopping.delete_item(session, item_id, payload.actor_user_id).id)
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
-    return OperationResponse(ok=True, id=item.id)
+    return OperationResponse(ok=True, id=deleted_id)
 
 
 @app.get("/v1/shopping/recents", response_model=RecentsResponse, dependencies=[Depends(require_token)])
@@ -621,8 +306,8 @@ def get_shopping_recents(
 
 
 @app.get("/v1/shopping/favorites", response_model=FavoritesResponse, dependencies=[Depends(require_token)])
-def get_shopping_favorites(session: Session = Depends(get_session)) -> FavoritesResponse:
-    rows = shopping.list_favorites(session)
+async def get_shopping_favorites() -> FavoritesResponse:
+    rows = await db.run_read(shopping.list_favorites, shopping.list_favorites_async)
     return FavoritesResponse(
         favorites=[
             {
@@ -641,12 +326,11 @@ def get_shopping_favorites(session: Session = Depends(get_session)) -> Favorites
     response_model=OperationResponse,
     dependencies=[Depends(require_token)],
 )
-def post_shopping_favorite(
-    payload: ShoppingFavoriteCreateRequest,
-    session: Session = Depends(get_session),
-) -> OperationResponse:
-    favorite = shopping.add_favorite(session, payload.name, payload.actor_user_id)
-    return OperationResponse(ok=True, id=favorite.id)
+async def post_shopping_favorite(payload: ShoppingFavoriteCreateRequest) -> OperationResponse:
+    favorite_id = await writer.run(
+        lambda session: shopping.add_favorite(session, payload.name, payload.actor_user_id).id
+    )
+    return OperationResponse(ok=True, id=favorite_id)
 
 
 @app.delete(
@@ -654,13 +338,9 @@ def post_shopping_favorite(
     response_model=OperationResponse,
     dependencies=[Depends(require_token)],
 )
-def delete_shopping_favorite(
-    favorite_id: int,
-    payload: ShoppingItemActionRequest,
-    session: Session = Depends(get_session),
-) -> OperationResponse:
+async def delete_shopping_favorite(favorite_id: int, payload: ShoppingItemActionRequest) -> OperationResponse:
     try:
-        shopping.delete_favorite(session, favorite_id, payload.actor_user_id)
+        await writer.run(lambda session: shopping.delete_favorite(session, favorite_id, payload.actor_user_id))
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
     return OperationResponse(ok=True)
@@ -689,23 +369,25 @@ def get_buy_stats_svg(
 
 
 @app.get("/v1/activity", dependencies=[Depends(require_token)])
-def get_activity(
-    limit: int = Query(default=50, ge=1, le=500),
-    session: Session = Depends(get_session),
-) -> list[dict]:
-    rows = list_events(session, limit=limit)
-    return [
-        {
-            "id": row.id,
-            "domain": row.domain,
-            "action": row.action,
-            "actor_member_id": row.actor_member_id,
-            "actor_user_id_raw": row.actor_user_id_raw,
-            "payload_json": row.payload_json,
-            "created_at": row.created_at,
-        }
-        for row in rows
-    ]
+async def get_activity(limit: int = Query(default=50, ge=1, le=500)) -> Response:
+    rows = await db.run_read(
+        lambda session: list_events(session, limit=limit),
+        lambda session: list_events_async(session, limit=limit),
+    )
+    return FastJSONResponse(
+        [
+            {
+                "id": row.id,
+                "domain": row.domain,
+                "action": row.action,
+                "actor_member_id": row.actor_member_id,
+                "actor_user_id_raw": row.actor_user_id_raw,
+                "payload_json": row.payload_json,
+                "created_at": row.created_at,
+            }
+            for row in rows
+        ]
+    )
 
 
 @app.post(
@@ -719,18 +401,28 @@ def get_activity(
     dependencies=[Depends(require_token)],
     include_in_schema=False,
 )
-def post_import_manual(
+async def post_import_manual(
     payload: ManualImportRequest,
-    session: Session = Depends(get_session),
+    dry_run: bool = Query(default=False, description="Validate every row and report all errors without writing"),
 ) -> ManualImportResponse:
+    from .services import importer
+
+    rows = {
+        "rotation_rows": payload.rotation_rows,
+        "cleaning_history_rows": payload.cleaning_history_rows,
+        "shopping_history_rows": payload.shopping_history_rows,
+        "cleaning_override_rows": payload.cleaning_override_rows,
+    }
+    if dry_run:
+        try:
+            summary, errors = await run_in_threadpool(_validate_manual_import, rows)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+        return ManualImportResponse(ok=not errors, dry_run=True, errors=errors, summary=summary)
+
     try:
-        summary, notifications = importer.import_manual_data(
-            session,
-            rotation_rows=payload.rotation_rows,
-            cleaning_history_rows=payload.cleaning_history_rows,
-            shopping_history_rows=payload.shopping_history_rows,
-            cleaning_override_rows=payload.cleaning_override_rows,
-            actor_user_id=payload.actor_user_id,
+        summary, notifications = await writer.run(
+            lambda session: importer.import_manual_data(session, **rows, actor_user_id=payload.actor_user_id)
         )
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
@@ -738,8 +430,20 @@ def post_import_manual(
     return ManualImportResponse(ok=True, notifications=notifications, summary=summary)
 
 
+def _validate_manual_import(rows: dict) -> tuple[dict, list]:
+    from .services import importer
+
+    with db.new_session() as session:
+        return importer.validate_manual_data(session, **rows)
+
+
 @app.post("/v1/admin/reset", response_model=OperationResponse, dependencies=[Depends(require_token)])
-def post_admin_reset(session: Session = Depends(get_session)) -> OperationResponse:
+async def post_admin_reset() -> OperationResponse:
+    await writer.run(_reset_data)
+    return OperationResponse(ok=True)
+
+
+def _reset_data(session: Session) -> None:
     session.execute(delete(CleaningOverride))
     session.execute(delete(CleaningAssignment))
     session.execute(delete(ActivityEvent))
@@ -747,35 +451,251 @@ def post_admin_reset(session: Session = Depends(get_session)) -> OperationRespon
     session.execute(delete(ShoppingFavorite))
     session.execute(delete(RotationConfig))
     session.execute(delete(Member))
+    mark_member_directory_stale(session)
+    versioning.mark_data_reset(session)
     session.commit()
-    return OperationResponse(ok=True)
 
 
-@app.get("/v1/admin/export", response_model=SnapshotExportResponse, dependencies=[Depends(require_token)])
-def get_admin_export(session: Session = Depends(get_session)) -> SnapshotExportResponse:
-    payload = snapshot.export_snapshot(session)
-    return SnapshotExportResponse(**payload)
+@app.get("/v1/admin/diagnostics", dependencies=[Depends(require_token)])
+def get_admin_diagnostics() -> dict:
+    from .services.digest import table_digests
+
+    tenant = db.current_tenant()
+    diagnostics = {
+        "member_directory": member_directory.stats(),
+        "table_digests": table_digests.stats(),
+        "due_notifications": cleaning.due_window.stats(),
+        "startup": startup_timings.stats(),
+        "writer": writer.stats(),
+        "worker": {"pid": os.getpid(), "workers": settings.workers},
+        "server": server_profile().stats(),
+        "tenant": tenant.tenant_id if tenant is not None else None,
+        "slow_requests": request_metrics.slowest(),
+    }
+    if tenant is None:
+        # Only the primary household sees which other households are served.
+        diagnostics["tenant_pool"] = tenant_pool.stats()
+    return diagnostics
+
+
+@app.get("/v1/admin/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_token)])
+async def get_admin_metrics() -> PlainTextResponse:
+    return PlainTextResponse(request_metrics.render(), media_type=METRICS_CONTENT_TYPE)
 
 
-@app.post("/v1/admin/import", response_model=SnapshotImportResponse, dependencies=[Depends(require_token)])
-def post_admin_import(
-    payload: SnapshotImportRequest,
+@app.post("/v1/admin/backup", dependencies=[Depends(require_token)])
+def post_admin_backup(
+    vacuum: bool = Query(default=False),
+    compress: bool = Query(default=True),
+) -> dict:
+    from .services import backup
+
+    try:
+        return backup.create_backup(vacuum=vacuum, compress=compress)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@app.get("/v1/admin/backups", dependencies=[Depends(require_token)])
+def get_admin_backups() -> dict:
+    from .services import backup
+
+    return {"backups": backup.list_backups()}
+
+
+@app.post("/v1/admin/restore", dependencies=[Depends(require_token)])
+async def post_admin_restore(payload: BackupRestoreRequest) -> dict:
+    from .services import backup
+
+    loop = asyncio.get_running_loop()
+    try:
+        # As a writer job, no queued write runs while the database file is swapped.
+        return await writer.run(lambda _session: backup.restore_backup(payload.name, loop=loop))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@app.get("/v1/admin/digest", dependencies=[Depends(require_token)])
+def get_admin_digest(
+    table: str | None = Query(default=None),
+    bucket: int | None = Query(default=None, ge=0),
     session: Session = Depends(get_session),
-) -> SnapshotImportResponse:
+) -> Response:
+    from .services.digest import table_digests
+
+    try:
+        return FastJSONResponse(table_digests.digest(session, table=table, bucket=bucket))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@app.post("/v1/admin/digest/compare", dependencies=[Depends(require_token)])
+def post_admin_digest_compare(payload: DigestCompareRequest, session: Session = Depends(get_session)) -> dict:
+    from .services.digest import compare_digests, table_digests
+
+    right = payload.right if payload.right is not None else table_digests.digest(session)
+    try:
+        return compare_digests(payload.left, right)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@app.get("/v1/admin/export", response_model=SnapshotExportResponse, dependencies=[Depends(require_token)])
+def get_admin_export(
+    export_format: str = Query(default="json", alias="format", pattern="^(json|ndjson|binary)$"),
+    compress: bool = Query(default=False, alias="gzip"),
+    since: int | None = Query(default=None, ge=0),
+    session: Session = Depends(get_session),
+) -> Response:
+    from .services import snapshot
+
+    if since is not None:
+        version, _, _ = versioning.current_versions(session)
+        if since > version:
+            raise HTTPException(status_code=400, detail=f"since {since} is ahead of the current data version {version}")
+    if export_format == "json":
+        return FastJSONResponse(snapshot.export_snapshot(session, since=since))
+    if export_format == "binary":
+        filename = "hass-flatmate-snapshot-" + datetime.now().strftime("%Y%m%dT%H%M%S") + ".hfsnap"
+        return Response(
+            content=snapshot_binary.encode_snapshot(snapshot.export_snapshot(session, since=since)),
+            media_type=snapshot_binary.MEDIA_TYPE,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
+    def _stream_ndjson() -> Iterator[bytes]:
+        # The stream owns its session so it stays open until the last row is sent.
+        with db.new_session() as stream_session:
+            yield from snapshot.iter_snapshot_ndjson(stream_session, since=since)
+
+    filename = "hass-flatmate-snapshot-" + datetime.now().strftime("%Y%m%dT%H%M%S") + ".ndjson"
+    if compress:
+        return StreamingResponse(
+            gzip_stream(_stream_ndjson()),
+            media_type="application/gzip",
+            headers={"Content-Disposition": f'attachment; filename="{filename}.gz"'},
+        )
+    return StreamingResponse(
+        _stream_ndjson(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+async def _import_snapshot_dict(data: dict, *, replace_existing: bool, dry_run: bool) -> dict:
+    from .services import snapshot
+
+    def run(session: Session) -> dict:
+        return snapshot.import_snapshot(session, snapshot=data, replace_existing=replace_existing, dry_run=dry_run)
+
+    if dry_run:
+        return await run_in_threadpool(_in_new_session, run)
+    return await writer.run(run)
+
+
+def _in_new_session(run: Callable[[Session], dict]) -> dict:
+    with db.new_session() as session:
+        return run(session)
+
+
+async def _ndjson_lines(request: Request, *, gzipped: bool) -> AsyncIterator[bytes]:
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+    buffer = b""
+    async for chunk in request.stream():
+        if decoder is not None:
+            chunk = decoder.decompress(chunk)
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if decoder is not None:
+        buffer += decoder.flush()
+    if buffer.strip():
+        yield buffer
+
+
+def _feed_snapshot_records(importer: SnapshotImporter, records: list) -> None:
+    for record in records:
+        importer.add_record(record)
+
+
+async def _import_ndjson_snapshot(request: Request, *, replace_existing: bool, dry_run: bool) -> dict:
+    from .services.snapshot import SnapshotImporter
+
+    gzipped = (
+        request.headers.get("content-encoding", "").lower() == "gzip"
+        or request.headers.get("content-type", "").lower().startswith("application/gzip")
+    )
+    session = db.new_session()
     try:
-        summary = snapshot.import_snapshot(
+        importer = await run_in_threadpool(
+            SnapshotImporter,
             session,
-            snapshot=payload.snapshot,
-            replace_existing=payload.replace_existing,
+            replace_existing=replace_existing,
+            dry_run=dry_run,
         )
+        records: list = []
+        async for line in _ndjson_lines(request, gzipped=gzipped):
+            records.append(orjson.loads(line))
+            if len(records) >= _IMPORT_RECORDS_PER_BATCH:
+                await run_in_threadpool(_feed_snapshot_records, importer, records)
+                records = []
+        await run_in_threadpool(_feed_snapshot_records, importer, records)
+        return await run_in_threadpool(importer.finish)
+    except zlib.error as exc:
+        raise ValueError(f"snapshot body is not valid gzip: {exc}") from exc
+    finally:
+        await run_in_threadpool(session.close)
+
+
+@app.post(
+    "/v1/admin/import",
+    response_model=SnapshotImportResponse,
+    dependencies=[Depends(require_token)],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": SnapshotImportRequest.model_json_schema()},
+                "application/x-ndjson": {"schema": {"type": "string"}},
+                snapshot_binary.MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}},
+            },
+        }
+    },
+)
+async def post_admin_import(
+    request: Request,
+    import_format: str = Query(default="json", alias="format", pattern="^(json|ndjson|binary)$"),
+    replace_existing: bool = Query(default=True, description="Used for NDJSON and binary imports"),
+    dry_run: bool = Query(default=False, description="Validate every row and report all errors without writing"),
+) -> SnapshotImportResponse:
+    try:
+        if import_format == "ndjson":
+            summary = await _import_ndjson_snapshot(request, replace_existing=replace_existing, dry_run=dry_run)
+        elif import_format == "binary":
+            data = await run_in_threadpool(snapshot_binary.decode_snapshot, await request.body())
+            summary = await _import_snapshot_dict(data, replace_existing=replace_existing, dry_run=dry_run)
+        else:
+            try:
+                payload = SnapshotImportRequest.model_validate_json(await request.body())
+            except ValidationError as exc:
+                raise RequestValidationError(exc.errors(include_url=False)) from exc
+            summary = await _import_snapshot_dict(
+                payload.snapshot,
+                replace_existing=payload.replace_existing,
+                dry_run=dry_run,
+            )
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
-    return SnapshotImportResponse(ok=True, summary=summary)
+    errors = summary.pop("errors", [])
+    return SnapshotImportResponse(ok=not errors, dry_run=dry_run, errors=errors, summary=summary)
 
 
 @app.get("/v1/cleaning/current", response_model=CleaningCurrentResponse, dependencies=[Depends(require_token)])
-def get_cleaning_current(session: Session = Depends(get_session)) -> CleaningCurrentResponse:
-    return CleaningCurrentResponse(**cleaning.get_cleaning_current(session))
+async def get_cleaning_current() -> CleaningCurrentResponse:
+    # Creates the week's assignment and marks missed weeks, so it runs as a write.
+    return CleaningCurrentResponse(**await writer.run(cleaning.get_cleaning_current))
 
 
 @app.get(
@@ -783,17 +703,19 @@ def get_cleaning_current(session: Session = Depends(get_session)) -> CleaningCur
     response_model=CleaningScheduleResponse,
     dependencies=[Depends(require_token)],
 )
-def get_cleaning_schedule(
+async def get_cleaning_schedule(
     weeks_ahead: int = Query(default=12, ge=1, le=104),
     include_previous_weeks: int = Query(default=0, ge=0, le=8),
-    session: Session = Depends(get_session),
-) -> CleaningScheduleResponse:
-    rows = cleaning.get_schedule(
-        session,
-        weeks_ahead=weeks_ahead + include_previous_weeks,
-        from_week_start=cleaning.add_weeks(cleaning.week_start_for(cleaning.now_utc()), -include_previous_weeks),
+) -> Response:
+    from_week_start = cleaning.add_weeks(cleaning.week_start_for(cleaning.now_utc()), -include_previous_weeks)
+    rows = await writer.run(
+        lambda session: cleaning.get_schedule(
+            session,
+            weeks_ahead=weeks_ahead + include_previous_weeks,
+            from_week_start=from_week_start,
+        )
     )
-    return CleaningScheduleResponse(schedule=rows)
+    return FastJSONResponse({"schedule": rows})
 
 
 @app.post(
@@ -801,16 +723,15 @@ def get_cleaning_schedule(
     response_model=OperationResponse,
     dependencies=[Depends(require_token)],
 )
-def post_mark_done(
-    payload: CleaningMarkDoneRequest,
-    session: Session = Depends(get_session),
-) -> OperationResponse:
+async def post_mark_done(payload: CleaningMarkDoneRequest) -> OperationResponse:
     try:
-        notifications = cleaning.mark_cleaning_done(
-            session,
-            week_start=payload.week_start,
-            actor_user_id=payload.actor_user_id,
-            completed_by_member_id=payload.completed_by_member_id,
+        notifications = await writer.run(
+            lambda session: cleaning.mark_cleaning_done(
+                session,
+                week_start=payload.week_start,
+                actor_user_id=payload.actor_user_id,
+                completed_by_member_id=payload.completed_by_member_id,
+            )
         )
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
@@ -822,15 +743,14 @@ def post_mark_done(
     response_model=OperationResponse,
     dependencies=[Depends(require_token)],
 )
-def post_mark_undone(
-    payload: CleaningMarkUndoneRequest,
-    session: Session = Depends(get_session),
-) -> OperationResponse:
+async def post_mark_undone(payload: CleaningMarkUndoneRequest) -> OperationResponse:
     try:
-        notifications = cleaning.mark_cleaning_undone(
-            session,
-            week_start=payload.week_start,
-            actor_user_id=payload.actor_user_id,
+        notifications = await writer.run(
+            lambda session: cleaning.mark_cleaning_undone(
+                session,
+                week_start=payload.week_start,
+                actor_user_id=payload.actor_user_id,
+            )
         )
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
@@ -842,17 +762,16 @@ def post_mark_undone(
     response_model=OperationResponse,
     dependencies=[Depends(require_token)],
 )
-def post_mark_takeover_done(
-    payload: CleaningMarkTakeoverDoneRequest,
-    session: Session = Depends(get_session),
-) -> OperationResponse:
+async def post_mark_takeover_done(payload: CleaningMarkTakeoverDoneRequest) -> OperationResponse:
     try:
-        notifications = cleaning.mark_cleaning_takeover_done(
-            session,
-            week_start=payload.week_start,
-            original_assignee_member_id=payload.original_assignee_member_id,
-            cleaner_member_id=payload.cleaner_member_id,
-            actor_user_id=payload.actor_user_id,
+        notifications = await writer.run(
+            lambda session: cleaning.mark_cleaning_takeover_done(
+                session,
+                week_start=payload.week_start,
+                original_assignee_member_id=payload.original_assignee_member_id,
+                cleaner_member_id=payload.cleaner_member_id,
+                actor_user_id=payload.actor_user_id,
+            )
         )
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
@@ -864,11 +783,8 @@ def post_mark_takeover_done(
     response_model=OperationResponse,
     dependencies=[Depends(require_token)],
 )
-def post_swap_override(
-    payload: CleaningSwapRequest,
-    session: Session = Depends(get_session),
-) -> OperationResponse:
-    try:
+async def post_swap_override(payload: CleaningSwapRequest) -> OperationResponse:
+    def write(session: Session) -> tuple[int | None, list[dict]]:
         override, notifications = cleaning.upsert_manual_swap(
             session,
             week_start=payload.week_start,
@@ -878,9 +794,13 @@ def post_swap_override(
             actor_user_id=payload.actor_user_id,
             cancel=payload.cancel,
         )
+        return (override.id if override else None), notifications
+
+    try:
+        override_id, notifications = await writer.run(write)
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
-    return OperationResponse(ok=True, id=override.id if override else None, notifications=notifications)
+    return OperationResponse(ok=True, id=override_id, notifications=notifications)
 
 
 @app.get(
@@ -888,16 +808,15 @@ def post_swap_override(
     response_model=CleaningNotificationDueResponse,
     dependencies=[Depends(require_token)],
 )
-def get_due_notifications(
+async def get_due_notifications(
     at: str = Query(..., description="ISO datetime in HA timezone"),
-    session: Session = Depends(get_session),
 ) -> CleaningNotificationDueResponse:
     try:
         moment = datetime.fromisoformat(at)
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid datetime format") from exc
 
-    notifications = cleaning.due_notifications(session, at=moment)
+    notifications = await writer.run(lambda session: cleaning.due_notifications(session, at=moment))
     return CleaningNotificationDueResponse(notifications=notifications)
 
 
@@ -906,15 +825,22 @@ def get_due_notifications(
     response_model=OperationResponse,
     dependencies=[Depends(require_token)],
 )
-def post_cleaning_notification_dispatch(
-    payload: CleaningNotificationDispatchRequest,
-    session: Session = Depends(get_session),
-) -> OperationResponse:
+async def post_cleaning_notification_dispatch(payload: CleaningNotificationDispatchRequest) -> OperationResponse:
+    records = [record.model_dump() for record in payload.records]
     try:
-        cleaning.record_notification_dispatches(
-            session,
-            records=[record.model_dump() for record in payload.records],
-        )
+        await writer.run(lambda session: cleaning.record_notification_dispatches(session, records=records))
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
     return OperationResponse(ok=True)
+
+
+@app.post("/v1/batch", response_model=BatchResponse, dependencies=[Depends(require_token)])
+async def post_batch(payload: BatchRequest) -> BatchResponse:
+    try:
+        operations = batch.parse_operations(payload.operations)
+        result = await writer.run(lambda session: batch.run_batch(session, operations, atomic=payload.atomic))
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return BatchResponse(**result)
+
+startup_timings.imported(time.perf_counter() - IMPORT_STARTED)
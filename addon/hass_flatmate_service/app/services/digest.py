@@ -0,0 +1,315 @@
+"""Merkle-style content digests for comparing snapshots between instances.
+
+Each table's rows are hashed in primary-key order (using the same row shape as
+the snapshot export) and grouped into key-range buckets: integer ids into runs
+of ``BUCKET_SIZE``, cleaning weeks by calendar year. A bucket hash covers its
+row hashes, a table hash covers its bucket hashes and the root hash covers the
+tables, so two instances agree on a table iff its hash matches and differing
+data can be narrowed down to bucket key ranges and then to single rows.
+
+Bucket hashes are cached per database and recomputed incrementally: only
+buckets holding rows stamped after the cached data version, or keys deleted
+since then, are re-read.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date
+import hashlib
+import threading
+from typing import Any, cast
+
+import orjson
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..db import TenantLocal, begin_read_snapshot
+from ..models import DeletedRow, RotationConfig
+from .snapshot import EXPORT_TABLES, export_rotation, iter_export_rows
+from .versioning import current_versions, parse_row_key
+
+
+BUCKET_SIZE = 256
+DIGEST_ALGORITHM = "sha256"
+_ROTATION_TABLE = "rotation_config"
+_READ_BATCH_SIZE = 1000
+
+_TABLES: dict[str, tuple[type, tuple[str, ...], list[str]]] = {
+    name: (model, order_by, fields) for name, model, order_by, fields in EXPORT_TABLES
+}
+
+
+def _bucket_of(table: str, key: Any) -> int:
+    if table == "cleaning_assignments":
+        week_start = key if isinstance(key, date) else date.fromisoformat(str(key))
+        return week_start.year
+    return int(key) // BUCKET_SIZE
+
+
+def _bucket_bounds(table: str, bucket: int) -> tuple[Any, Any]:
+    if table == "cleaning_assignments":
+        return date(bucket, 1, 1), date(bucket, 12, 31)
+    return bucket * BUCKET_SIZE, (bucket + 1) * BUCKET_SIZE - 1
+
+
+def _key_column(table: str) -> str:
+    return "week_start" if table == "cleaning_assignments" else "id"
+
+
+def _row_hash(row: dict[str, Any]) -> bytes:
+    return hashlib.sha256(orjson.dumps(row, option=orjson.OPT_SORT_KEYS)).digest()
+
+
+@dataclass
+class _Bucket:
+    rows: int
+    hash: str
+    row_hashes: list[tuple[str, str]] = field(default_factory=list)
+
+
+def _hash_rows(table: str, rows: list[dict[str, Any]]) -> dict[int, _Bucket]:
+    key_column = _key_column(table)
+    grouped: dict[int, list[tuple[str, bytes]]] = {}
+    for row in rows:
+        key = row[key_column]
+        grouped.setdefault(_bucket_of(table, key), []).append((str(key), _row_hash(row)))
+    return {
+        bucket: _Bucket(
+            rows=len(entries),
+            hash=hashlib.sha256(b"".join(digest for _, digest in entries)).hexdigest(),
+            row_hashes=[(key, digest.hex()) for key, digest in entries],
+        )
+        for bucket, entries in grouped.items()
+    }
+
+
+def _read_rows(session: Session, table: str, bucket: int | None = None) -> list[dict[str, Any]]:
+    if table == _ROTATION_TABLE:
+        rotation = export_rotation(session)
+        return [rotation] if rotation is not None else []
+    model, order_by, fields = _TABLES[table]
+    where: tuple[Any, ...] = ()
+    if bucket is not None:
+        low, high = _bucket_bounds(table, bucket)
+        key = getattr(model, _key_column(table))
+        where = (key >= low, key <= high)
+    return list(iter_export_rows(session, model, order_by, fields, batch_size=_READ_BATCH_SIZE, where=where))
+
+
+def _table_names() -> list[str]:
+    return [_ROTATION_TABLE, *_TABLES]
+
+
+def _table_model(table: str) -> type:
+    return RotationConfig if table == _ROTATION_TABLE else _TABLES[table][0]
+
+
+def _combine(entries: list[tuple[str, str]]) -> str:
+    return hashlib.sha256("".join(f"{name}:{value}\n" for name, value in entries).encode()).hexdigest()
+
+
+class TableDigests:
+    """Cache of bucket hashes for the bound database, one per tenant."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._bind: Any = None
+        self._version: int | None = None
+        self._reset_version: int | None = None
+        self._buckets: dict[str, dict[int, _Bucket]] = {}
+        self.full_builds = 0
+        self.buckets_rehashed = 0
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._bind = None
+            self._version = None
+            self._buckets = {}
+
+    def stats(self) -> dict[str, int | bool]:
+        with self._lock:
+            return {
+                "loaded": self._version is not None,
+                "version": self._version or 0,
+                "full_builds": self.full_builds,
+                "buckets_rehashed": self.buckets_rehashed,
+            }
+
+    def _dirty_buckets(self, session: Session, since: int) -> dict[str, set[int]]:
+        dirty: dict[str, set[int]] = {}
+        for table in _table_names():
+            model = _table_model(table)
+            key = getattr(model, _key_column(table))
+            for (value,) in session.execute(select(key).where(model.updated_version > since)):
+                dirty.setdefault(table, set()).add(_bucket_of(table, value))
+        tombstones = session.execute(
+            select(DeletedRow.table_name, DeletedRow.row_key).where(DeletedRow.deleted_version > since)
+        )
+        for table, row_key in tombstones:
+            if table in _table_names():
+                dirty.setdefault(table, set()).add(_bucket_of(table, parse_row_key(table, row_key)))
+        return dirty
+
+    def _refresh(self, session: Session) -> tuple[int, dict[str, dict[int, _Bucket]]]:
+        # The version, the dirty keys and the rehashed rows must describe the
+        # same database state, or the cache is labelled with the wrong version.
+        begin_read_snapshot(session)
+        refreshed = self._read_buckets(session)
+        session.commit()
+        return refreshed
+
+    def _read_buckets(self, session: Session) -> tuple[int, dict[str, dict[int, _Bucket]]]:
+        version, reset_version, _ = current_versions(session)
+        bind = session.get_bind()
+        with self._lock:
+            cached = self._bind is bind and self._version is not None and self._reset_version == reset_version
+            cached_version = self._version
+            buckets = {table: dict(entries) for table, entries in self._buckets.items()} if cached else {}
+
+        if cached and cached_version == version:
+            return version, buckets
+
+        if cached and cached_version is not None and cached_version < version:
+            rehashed = 0
+            for table, dirty in self._dirty_buckets(session, cached_version).items():
+                table_buckets = buckets.setdefault(table, {})
+                for bucket in dirty:
+                    fresh = _hash_rows(table, _read_rows(session, table, bucket)).get(bucket)
+                    if fresh is None:
+                        table_buckets.pop(bucket, None)
+                    else:
+                        table_buckets[bucket] = fresh
+                    rehashed += 1
+            with self._lock:
+                self.buckets_rehashed += rehashed
+        else:
+            buckets = {table: _hash_rows(table, _read_rows(session, table)) for table in _table_names()}
+            with self._lock:
+                self.full_builds += 1
+
+        with self._lock:
+            self._bind = bind
+            self._version = version
+            self._reset_version = reset_version
+            self._buckets = buckets
+        return version, buckets
+
+    def digest(self, session: Session, *, table: str | None = None, bucket: int | None = None) -> dict[str, Any]:
+        """Return the root, table and bucket hashes of the current data.
+
+        With ``table`` only that table is listed; adding ``bucket`` also lists
+        the per-row hashes of that bucket for row-level comparison.
+        """
+
+        if table is not None and table not in _table_names():
+            raise ValueError(f"unknown digest table '{table}'")
+        if bucket is not None and table is None:
+            raise ValueError("bucket requires a table")
+
+        version, buckets = self._refresh(session)
+        tables: dict[str, Any] = {}
+        table_hashes: list[tuple[str, str]] = []
+        for name in _table_names():
+            table_buckets = buckets.get(name, {})
+            ordered = sorted(table_buckets.items())
+            table_hash = _combine([(str(index), entry.hash) for index, entry in ordered])
+            table_hashes.append((name, table_hash))
+            if table is not None and name != table:
+                continue
+            listed = []
+            for index, entry in ordered:
+                if bucket is not None and index != bucket:
+                    continue
+                low, high = _bucket_bounds(name, index)
+                item: dict[str, Any] = {
+                    "bucket": index,
+                    "start": low.isoformat() if isinstance(low, date) else low,
+                    "end": high.isoformat() if isinstance(high, date) else high,
+                    "rows": entry.rows,
+                    "hash": entry.hash,
+                }
+                if bucket is not None:
+                    item["row_hashes"] = {key: digest for key, digest in entry.row_hashes}
+                listed.append(item)
+            tables[name] = {
+                "hash": table_hash,
+                "rows": sum(entry.rows for entry in table_buckets.values()),
+                "buckets": listed,
+            }
+
+        return {
+            "algorithm": DIGEST_ALGORITHM,
+            "bucket_size": BUCKET_SIZE,
+            "version": version,
+            "root": _combine(table_hashes),
+            "tables": tables,
+        }
+
+
+table_digests = cast(TableDigests, TenantLocal(TableDigests))
+
+
+def _buckets_by_index(table: dict[str, Any]) -> dict[int, dict[str, Any]]:
+    return {int(entry["bucket"]): entry for entry in table.get("buckets") or []}
+
+
+def compare_digests(left: dict[str, Any], right: dict[str, Any]) -> dict[str, Any]:
+    """Compare two digests and list the tables, key ranges and rows that differ.
+
+    Row keys are reported when both sides include ``row_hashes`` for a bucket;
+    otherwise the bucket's key range is the smallest known difference.
+    """
+
+    for side, digest in (("left", left), ("right", right)):
+        if not isinstance(digest, dict) or not isinstance(digest.get("tables"), dict):
+            raise ValueError(f"{side} digest must be an object with 'tables'")
+    if left.get("algorithm") != right.get("algorithm") or left.get("bucket_size") != right.get("bucket_size"):
+        raise ValueError("digests use different algorithms or bucket sizes")
+
+    differences: dict[str, Any] = {}
+    for name in sorted(set(left["tables"]) | set(right["tables"])):
+        left_table = left["tables"].get(name)
+        right_table = right["tables"].get(name)
+        if left_table is None or right_table is None:
+            differences[name] = {"status": "missing_left" if left_table is None else "missing_right"}
+            continue
+        if left_table.get("hash") == right_table.get("hash"):
+            continue
+
+        left_buckets = _buckets_by_index(left_table)
+        right_buckets = _buckets_by_index(right_table)
+        ranges: list[dict[str, Any]] = []
+        for index in sorted(set(left_buckets) | set(right_buckets)):
+            left_bucket = left_buckets.get(index)
+            right_bucket = right_buckets.get(index)
+            if left_bucket is not None and right_bucket is not None and left_bucket["hash"] == right_bucket["hash"]:
+                continue
+            reference = left_bucket or right_bucket
+            entry: dict[str, Any] = {
+                "bucket": index,
+                "start": reference["start"],
+                "end": reference["end"],
+                "left_rows": left_bucket["rows"] if left_bucket else 0,
+                "right_rows": right_bucket["rows"] if right_bucket else 0,
+            }
+            # A bucket absent on one side has no rows there, so its keys are known too.
+            left_rows = left_bucket.get("row_hashes") if left_bucket else {}
+            right_rows = right_bucket.get("row_hashes") if right_bucket else {}
+            if left_rows is not None and right_rows is not None:
+                entry["keys"] = sorted(
+                    (key for key in set(left_rows) | set(right_rows) if left_rows.get(key) != right_rows.get(key)),
+                    key=lambda value: (len(value), value),
+                )
+            ranges.append(entry)
+        differences[name] = {
+            "status": "differs",
+            "left_rows": left_table.get("rows", 0),
+            "right_rows": right_table.get("rows", 0),
+            "ranges": ranges,
+        }
+
+    return {
+        "identical": left.get("root") == right.get("root") and not differences,
+        "tables": differences,
+    }
@@ -0,0 +1,277 @@
+"""Compact columnar encoding of snapshot payloads.
+
+Layout::
+
+    MAGIC | u32 header length | zlib(header JSON) | table blocks...
+
+The header records the snapshot schema version, the binary format version,
+the data version (plus ``since`` and the deleted keys of incremental exports)
+and, per table, the row count, column encodings, the compressed block length
+and a SHA-256 of the uncompressed block. Each block is a zlib-compressed JSON
+object of column arrays. Columns are encoded as:
+
+``plain``
+    values as-is (ints, strings, lists, objects, nulls).
+``dict``
+    low-cardinality strings (statuses, enum values, activity actions) as a
+    dictionary plus integer codes, ``-1`` for null.
+``date``
+    ISO dates as days since 1970-01-01.
+``datetime``
+    ISO datetimes as epoch microseconds plus a UTC offset (in seconds) per
+    value, ``null`` for naive timestamps.
+
+Encodings are chosen per column and only when every value re-serializes to
+exactly the original string, so decoding always reproduces the JSON snapshot.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+import hashlib
+import struct
+from typing import Any
+import zlib
+
+import orjson
+
+
+MAGIC = b"HFSNAPB\x00"
+FORMAT_VERSION = 1
+MEDIA_TYPE = "application/vnd.hass-flatmate.snapshot"
+
+_HEADER_LENGTH = struct.Struct(">I")
+_EPOCH_DATE = date(1970, 1, 1)
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ROTATION_TABLE = "rotation_config"
+_DICT_MAX_CARDINALITY = 1024
+
+
+def _encode_dates(values: list[Any]) -> list[int | None] | None:
+    encoded: list[int | None] = []
+    for value in values:
+        if value is None:
+            encoded.append(None)
+            continue
+        if not isinstance(value, str) or len(value) != 10:
+            return None
+        try:
+            parsed = date.fromisoformat(value)
+        except ValueError:
+            return None
+        # fromisoformat also accepts ISO week and compact forms ("2024-W01-1").
+        if parsed.isoformat() != value:
+            return None
+        encoded.append((parsed - _EPOCH_DATE).days)
+    return encoded
+
+
+def _encode_datetimes(values: list[Any]) -> dict[str, list[int | None]] | None:
+    micros: list[int | None] = []
+    offsets: list[int | None] = []
+    for value in values:
+        if value is None:
+            micros.append(None)
+            offsets.append(None)
+            continue
+        if not isinstance(value, str) or "T" not in value:
+            return None
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+        if parsed.isoformat() != value:
+            return None
+        offset = parsed.utcoffset()
+        aware = parsed if offset is not None else parsed.replace(tzinfo=timezone.utc)
+        delta = aware - _EPOCH
+        micros.append((delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds)
+        offsets.append(int(offset.total_seconds()) if offset is not None else None)
+    return {"epoch_us": micros, "offset_s": offsets}
+
+
+def _encode_dictionary(values: list[Any]) -> dict[str, list] | None:
+    dictionary: dict[str, int] = {}
+    codes: list[int] = []
+    for value in values:
+        if value is None:
+            codes.append(-1)
+            continue
+        if not isinstance(value, str):
+            return None
+        code = dictionary.setdefault(value, len(dictionary))
+        if len(dictionary) > _DICT_MAX_CARDINALITY:
+            return None
+        codes.append(code)
+    if len(dictionary) * 2 > max(len(values), 1):
+        return None
+    return {"dictionary": list(dictionary), "codes": codes}
+
+
+def _encode_column(values: list[Any]) -> tuple[str, Any]:
+    if any(value is not None for value in values):
+        dates = _encode_dates(values)
+        if dates is not None:
+            return "date", dates
+        datetimes = _encode_datetimes(values)
+        if datetimes is not None:
+            return "datetime", datetimes
+        dictionary = _encode_dictionary(values)
+        if dictionary is not None:
+            return "dict", dictionary
+    return "plain", values
+
+
+def _decode_column(encoding: str, payload: Any) -> list[Any]:
+    if encoding == "plain":
+        return list(payload)
+    if encoding == "date":
+        return [None if days is None else (_EPOCH_DATE + timedelta(days=days)).isoformat() for days in payload]
+    if encoding == "datetime":
+        decoded: list[Any] = []
+        for micros, offset in zip(payload["epoch_us"], payload["offset_s"]):
+            if micros is None:
+                decoded.append(None)
+                continue
+            moment = _EPOCH + timedelta(microseconds=micros)
+            if offset is None:
+                decoded.append(moment.replace(tzinfo=None).isoformat())
+            else:
+                decoded.append(moment.astimezone(timezone(timedelta(seconds=offset))).isoformat())
+        return decoded
+    if encoding == "dict":
+        dictionary = payload["dictionary"]
+        return [None if code < 0 else dictionary[code] for code in payload["codes"]]
+    raise ValueError(f"unsupported snapshot column encoding '{encoding}'")
+
+
+def _table_rows(data: dict[str, Any], table: str) -> list[dict[str, Any]]:
+    if table == _ROTATION_TABLE:
+        rotation = data.get(_ROTATION_TABLE)
+        return [rotation] if rotation is not None else []
+    return list(data.get(table) or [])
+
+
+def encode_snapshot(snapshot: dict[str, Any], *, compresslevel: int = 9) -> bytes:
+    """Encode an exported snapshot dict (see ``export_snapshot``) as binary."""
+
+    data = snapshot.get("data") or {}
+    header_tables: list[dict[str, Any]] = []
+    blocks: list[bytes] = []
+    for table in data:
+        rows = _table_rows(data, table)
+        columns: list[str] = []
+        for row in rows:
+            for column in row:
+                if column not in columns:
+                    columns.append(column)
+
+        encodings: dict[str, str] = {}
+        arrays: dict[str, Any] = {}
+        for column in columns:
+            encodings[column], arrays[column] = _encode_column([row.get(column) for row in rows])
+        # Record which columns each row actually had, so sparse rows round-trip.
+        missing = [
+            [index for index, column in enumerate(columns) if column not in row]
+            for row in rows
+        ]
+        block = orjson.dumps({"columns": arrays, "missing": missing if any(missing) else None})
+        compressed = zlib.compress(block, compresslevel)
+        blocks.append(compressed)
+        header_tables.append(
+            {
+                "name": table,
+                "rows": len(rows),
+                "columns": [{"name": column, "encoding": encodings[column]} for column in columns],
+                "length": len(compressed),
+                "sha256": hashlib.sha256(block).hexdigest(),
+            }
+        )
+
+    header = zlib.compress(
+        orjson.dumps(
+            {
+                "format_version": FORMAT_VERSION,
+                "schema_version": snapshot.get("schema_version"),
+                "generated_at": snapshot.get("generated_at"),
+                "version": snapshot.get("version"),
+                "since": snapshot.get("since"),
+                "deleted": snapshot.get("deleted"),
+                "summary": snapshot.get("summary") or {},
+                "tables": header_tables,
+            }
+        ),
+        compresslevel,
+    )
+    return MAGIC + _HEADER_LENGTH.pack(len(header)) + header + b"".join(blocks)
+
+
+def decode_snapshot(payload: bytes) -> dict[str, Any]:
+    """Decode a binary snapshot back into the JSON snapshot structure."""
+
+    if not payload.startswith(MAGIC):
+        raise ValueError("not a hass-flatmate binary snapshot")
+    offset = len(MAGIC)
+    try:
+        (header_length,) = _HEADER_LENGTH.unpack_from(payload, offset)
+        offset += _HEADER_LENGTH.size
+        header = orjson.loads(zlib.decompress(payload[offset : offset + header_length]))
+    except (struct.error, zlib.error, orjson.JSONDecodeError) as exc:
+        raise ValueError("binary snapshot header is corrupt") from exc
+    offset += header_length
+
+    if header.get("format_version") != FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported binary snapshot format_version '{header.get('format_version')}'. "
+            f"Supported version: {FORMAT_VERSION}"
+        )
+
+    data: dict[str, Any] = {}
+    for table in header.get("tables", []):
+        name = table["name"]
+        compressed = payload[offset : offset + table["length"]]
+        offset += table["length"]
+        try:
+            block = zlib.decompress(compressed)
+        except zlib.error as exc:
+            raise ValueError(f"binary snapshot table '{name}' is corrupt") from exc
+        if hashlib.sha256(block).hexdigest() != table["sha256"]:
+            raise ValueError(f"binary snapshot table '{name}' failed its checksum")
+
+        body = orjson.loads(block)
+        columns = [column["name"] for column in table["columns"]]
+        decoded = [
+            _decode_column(column["encoding"], body["columns"][column["name"]])
+            for column in table["columns"]
+        ]
+        missing = body.get("missing") or [[] for _ in range(table["rows"])]
+        rows: list[dict[str, Any]] = []
+        for index in range(table["rows"]):
+            skipped = set(missing[index])
+            rows.append(
+                {
+                    column: values[index]
+                    for position, (column, values) in enumerate(zip(columns, decoded))
+                    if position not in skipped
+                }
+            )
+
+        if name == _ROTATION_TABLE:
+            data[name] = rows[0] if rows else None
+        else:
+            data[name] = rows
+
+    if offset != len(payload):
+        raise ValueError("binary snapshot has trailing or missing bytes")
+
+    snapshot = {
+        "schema_version": header.get("schema_version"),
+        "generated_at": header.get("generated_at"),
+        "version": header.get("version"),
+        "since": header.get("since"),
+        "summary": header.get("summary") or {},
+        "data": data,
+    }
+    if header.get("deleted") is not None:
+        snapshot["deleted"] = header["deleted"]
+    return snapshot
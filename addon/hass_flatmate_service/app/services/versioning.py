@@ -0,0 +1,203 @@
+"""Data version stamping used by incremental snapshot exports.
+
+Every transaction that inserts, updates or deletes a tracked row allocates the
+next value of the single-row ``data_version`` counter once and stamps it onto
+the rows it touched (``updated_version``). Hard deletes leave a ``deleted_rows``
+tombstone. Allocation is an ``UPDATE`` so it takes SQLite's writer lock, and
+stamps therefore become visible in the same order they were allocated.
+
+``write_generation`` counts the committed transactions of this process that
+allocated a version, so in-process caches can detect any tracked write with
+no query. With several worker processes (``HASS_FLATMATE_WORKERS``) writes of
+the other workers never reach this process's hooks; ``cache_generation``
+then reads the shared counter instead, once per transaction.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+import threading
+from typing import Any
+
+from sqlalchemy import delete, event, insert, select, update
+from sqlalchemy.orm import Session
+
+from ..models import (
+    ActivityEvent,
+    CleaningAssignment,
+    CleaningOverride,
+    DataVersion,
+    DeletedRow,
+    Member,
+    RotationConfig,
+    ShoppingFavorite,
+    ShoppingItem,
+)
+from ..settings import settings
+
+
+_VERSION_KEY = "data_version"
+_SHARED_VERSION_KEY = "shared_data_version"
+
+_generation_lock = threading.Lock()
+_write_generation = 0
+
+TRACKED_MODELS: dict[type, str] = {
+    Member: "members",
+    RotationConfig: "rotation_config",
+    CleaningAssignment: "cleaning_assignments",
+    CleaningOverride: "cleaning_overrides",
+    ShoppingItem: "shopping_items",
+    ShoppingFavorite: "shopping_favorites",
+    ActivityEvent: "activity_events",
+}
+
+
+def row_key(instance: Any) -> str:
+    """Return the primary key of a tracked row as a string (ids and ISO week dates)."""
+
+    if isinstance(instance, CleaningAssignment):
+        return instance.week_start.isoformat()
+    return str(instance.id)
+
+
+def parse_row_key(table: str, key: Any) -> Any:
+    if table == "cleaning_assignments":
+        return date.fromisoformat(str(key))
+    return int(key)
+
+
+def allocate_version(session: Session) -> int:
+    """Return this transaction's data version, allocating it on first use."""
+
+    cached = session.info.get(_VERSION_KEY)
+    if cached is not None:
+        return cached
+
+    # Core statements on the session's connection: safe to run mid-flush.
+    connection = session.connection()
+    result = connection.execute(
+        update(DataVersion.__table__).where(DataVersion.id == 1).values(version=DataVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(DataVersion.__table__).values(id=1, version=1, reset_version=0))
+    version = int(connection.execute(select(DataVersion.version).where(DataVersion.id == 1)).scalar_one())
+    session.info[_VERSION_KEY] = version
+    return version
+
+
+def write_generation() -> int:
+    """Return the number of committed transactions in this process that wrote tracked rows."""
+
+    return _write_generation
+
+
+def shared_data_version(session: Session) -> int | None:
+    """Return the committed data version for caches shared with other workers.
+
+    With a single worker every write passes through this process's commit
+    hooks, so ``None`` is returned without a query. Otherwise the version is
+    read once per transaction and identifies the committed data this
+    transaction started from, whichever process wrote it.
+    """
+
+    if settings.workers <= 1:
+        return None
+    version = session.info.get(_SHARED_VERSION_KEY)
+    if version is None:
+        allocated = session.info.get(_VERSION_KEY)
+        # Allocation bumped the counter under the writer lock, so the data
+        # this transaction started from is exactly one version earlier.
+        version = allocated - 1 if allocated is not None else current_versions(session)[0]
+        session.info[_SHARED_VERSION_KEY] = version
+    return version
+
+
+def cache_generation(session: Session) -> int:
+    """Return a value that changes whenever any worker commits tracked rows."""
+
+    shared = shared_data_version(session)
+    return write_generation() if shared is None else shared
+
+
+def current_versions(session: Session) -> tuple[int, int, int | None]:
+    """Return ``(version, reset_version, source_version)`` as committed or seen by this transaction."""
+
+    row = session.execute(
+        select(DataVersion.version, DataVersion.reset_version, DataVersion.source_version).where(DataVersion.id == 1)
+    ).one_or_none()
+    if row is None:
+        return 0, 0, None
+    return int(row.version), int(row.reset_version), row.source_version
+
+
+def mark_data_reset(session: Session) -> int:
+    """Record that all data was wiped, invalidating deltas taken before it."""
+
+    version = allocate_version(session)
+    connection = session.connection()
+    connection.execute(update(DataVersion.__table__).where(DataVersion.id == 1).values(reset_version=version))
+    connection.execute(delete(DeletedRow.__table__))
+    return version
+
+
+def mark_data_restored(session: Session, previous_version: int) -> int:
+    """Record a restore, continuing versions above ``previous_version``.
+
+    The restored file carries the backup's older counter. Versions handed out
+    before the restore must stay below the new ``reset_version``, so deltas
+    requested against them fall back to a full export.
+    """
+
+    version = max(mark_data_reset(session), previous_version + 1)
+    session.connection().execute(
+        update(DataVersion.__table__).where(DataVersion.id == 1).values(version=version, reset_version=version)
+    )
+    session.info[_VERSION_KEY] = version
+    return version
+
+
+def set_source_version(session: Session, source_version: int | None) -> None:
+    allocate_version(session)
+    session.connection().execute(
+        update(DataVersion.__table__).where(DataVersion.id == 1).values(source_version=source_version)
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_tracked_rows(session: Session, _flush_context: Any, _instances: Any) -> None:
+    touched = [
+        instance
+        for instance in (*session.new, *session.dirty)
+        if type(instance) in TRACKED_MODELS and (instance in session.new or session.is_modified(instance))
+    ]
+    deleted = [instance for instance in session.deleted if type(instance) in TRACKED_MODELS]
+    if not touched and not deleted:
+        return
+
+    version = allocate_version(session)
+    for instance in touched:
+        instance.updated_version = version
+    for instance in deleted:
+        session.add(
+            DeletedRow(
+                table_name=TRACKED_MODELS[type(instance)],
+                row_key=row_key(instance),
+                deleted_version=version,
+            )
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def _forget_version_after_commit(session: Session) -> None:
+    global _write_generation
+    session.info.pop(_SHARED_VERSION_KEY, None)
+    if session.info.pop(_VERSION_KEY, None) is not None:
+        with _generation_lock:
+            _write_generation += 1
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_version_after_rollback(session: Session, _previous_transaction: Any) -> None:
+    session.info.pop(_VERSION_KEY, None)
+    session.info.pop(_SHARED_VERSION_KEY, None)
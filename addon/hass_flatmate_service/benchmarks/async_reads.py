@@ -0,0 +1,120 @@
+"""Compare hot read latency on the threadpool and async database paths.
+
+Run from ``addon/hass_flatmate_service`` (async mode needs ``aiosqlite``)::
+
+    python -m benchmarks.async_reads --clients 24 --burst 8 --rounds 20
+
+Each simulated Home Assistant instance fires a burst of parallel coordinator
+reads per round, so ``clients * burst`` requests are in flight at once. Both
+modes run against the same seeded database through an in-process ASGI
+transport, so the numbers isolate request scheduling from network overhead.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+from pathlib import Path
+import statistics
+import tempfile
+import time
+
+import httpx
+
+from .sqlite_profile import _HEADERS, _percentile
+
+_READ_PATHS = [
+    "/v1/members",
+    "/v1/shopping/items",
+    "/v1/shopping/favorites",
+    "/v1/activity?limit=200",
+]
+
+
+async def _seed(client: httpx.AsyncClient, *, items: int) -> None:
+    response = await client.put(
+        "/v1/members/sync",
+        headers=_HEADERS,
+        json={
+            "members": [
+                {"display_name": f"Member {index}", "ha_user_id": f"u{index}", "active": True}
+                for index in range(1, 5)
+            ]
+        },
+    )
+    response.raise_for_status()
+    for index in range(items):
+        response = await client.post(
+            "/v1/shopping/items",
+            headers=_HEADERS,
+            json={"name": f"item-{index}", "actor_user_id": f"u{index % 4 + 1}"},
+        )
+        response.raise_for_status()
+
+
+async def _run_mode(mode: str, *, seed: bool, clients: int, burst: int, rounds: int) -> dict:
+    os.environ["HASS_FLATMATE_ASYNC_DB"] = "1" if mode == "async" else "0"
+
+    from app.main import app
+
+    latencies: list[float] = []
+    errors = 0
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            if seed:
+                await _seed(client, items=200)
+
+            async def request(path: str) -> None:
+                nonlocal errors
+                started = time.perf_counter()
+                response = await client.get(path, headers=_HEADERS)
+                latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code >= 400:
+                    errors += 1
+
+            started = time.perf_counter()
+            for _ in range(rounds):
+                await asyncio.gather(
+                    *(
+                        request(_READ_PATHS[(client_index + call) % len(_READ_PATHS)])
+                        for client_index in range(clients)
+                        for call in range(burst)
+                    )
+                )
+            elapsed = time.perf_counter() - started
+
+    return {
+        "mode": mode,
+        "requests": len(latencies),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2) if latencies else 0.0,
+        "p99_ms": round(_percentile(latencies, 99), 2),
+        "errors": errors,
+    }
+
+
+async def _main(args: argparse.Namespace) -> list[dict]:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        os.environ["HASS_FLATMATE_DB_PATH"] = str(db_path)
+        os.environ["HASS_FLATMATE_API_TOKEN"] = _HEADERS["x-flatmate-token"]
+        return [
+            await _run_mode(mode, seed=index == 0, clients=args.clients, burst=args.burst, rounds=args.rounds)
+            for index, mode in enumerate(("threadpool", "async"))
+        ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=24)
+    parser.add_argument("--burst", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(_main(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
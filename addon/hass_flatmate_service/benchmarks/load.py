@@ -0,0 +1,478 @@
+"""Replay the Home Assistant traffic mix from several simulated instances.
+
+Run from ``addon/hass_flatmate_service`` against a running scratch service
+(the simulator adds and completes shopping items and marks cleaning weeks)::
+
+    python -m benchmarks.load --url http://127.0.0.1:8099 --token dev-token --instances 1,2,4,8
+
+or let it start ``run.py`` on a throwaway database seeded from
+``benchmarks.dataset``::
+
+    python -m benchmarks.load --serve --scale small --instances 1,4,16,32 --seconds 30 --speedup 10
+
+Each simulated instance sends what the integration sends: the coordinator's
+eight parallel GETs every scan interval, the due-notification poll at the top
+of every minute (all instances share the clock, so these polls arrive
+together), and card service calls at a Poisson rate. After each successful
+call the instance requests a coordinator refresh, debounced like Home
+Assistant's ``async_request_refresh``: the first refresh runs at once and any
+calls during the following cooldown collapse into one refresh at its end.
+``--speedup`` compresses the simulated clock, so one instance at
+``--speedup 10`` sends the traffic of ten.
+
+Each stage reports throughput, latency percentiles per traffic kind, how long
+whole coordinator refreshes took, late refreshes (longer than the scan
+interval), HTTP errors and SQLite lock errors. Lock errors are 503 responses
+counted by the client, plus the server's ``db_lock_errors_total`` when
+metrics are enabled. The scaling limit is the last stage before the first one
+that saw errors or a refresh p95 above ``--max-refresh-p95``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter
+from collections.abc import Coroutine, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+import json
+import os
+from pathlib import Path
+import random
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any
+
+import httpx
+
+from .dataset import add_scale_arguments, generate_snapshot, scale_from_args
+from .sqlite_profile import _percentile
+
+SERVICE_ROOT = Path(__file__).resolve().parent.parent
+
+# The coordinator's asyncio.gather (custom_components/hass_flatmate/coordinator.py).
+COORDINATOR_READS: tuple[tuple[str, dict[str, Any]], ...] = (
+    ("/v1/members", {}),
+    ("/v1/shopping/items", {}),
+    ("/v1/shopping/recents", {"limit": 20}),
+    ("/v1/shopping/favorites", {}),
+    ("/v1/stats/buys", {"window_days": 90}),
+    ("/v1/cleaning/current", {}),
+    ("/v1/cleaning/schedule", {"weeks_ahead": 24, "include_previous_weeks": 1}),
+    ("/v1/activity", {"limit": 200}),
+)
+# Card service calls and how often each one is picked.
+ACTIONS = {"add_item": 45, "complete_item": 35, "delete_item": 5, "toggle_cleaning": 15}
+KINDS = ("coordinator", "refresh", "poll", "action")
+
+_LOCK_ERROR = re.compile(r"database (table )?is locked", re.IGNORECASE)
+_LOCK_METRIC = re.compile(r"^hass_flatmate_db_lock_errors_total\{[^}]*\} (\S+)$", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class Traffic:
+    scan_interval: float = 30.0  # the integration's DEFAULT_SCAN_INTERVAL
+    poll_interval: float = 60.0
+    refresh_cooldown: float = 10.0  # Home Assistant's REQUEST_REFRESH_DEFAULT_COOLDOWN
+    actions_per_minute: float = 0.5
+    speedup: float = 1.0
+
+    def wall(self, simulated_seconds: float) -> float:
+        return simulated_seconds / self.speedup
+
+
+@dataclass
+class _Stage:
+    traffic: Traffic
+    seed: int = 1
+    started: float = field(default_factory=time.perf_counter)
+    epoch: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    latencies: dict[str, list[float]] = field(default_factory=lambda: {kind: [] for kind in KINDS})
+    refreshes: list[float] = field(default_factory=list)
+    late_refreshes: int = 0
+    statuses: Counter[str] = field(default_factory=Counter)
+    lock_errors: int = 0
+
+    def now(self) -> datetime:
+        """Simulated wall clock, running ``speedup`` times faster than real time."""
+
+        return self.epoch + timedelta(seconds=(time.perf_counter() - self.started) * self.traffic.speedup)
+
+    def record(self, kind: str, milliseconds: float, response: httpx.Response | None) -> None:
+        self.latencies[kind].append(milliseconds)
+        if response is None:
+            self.statuses["transport"] += 1
+            return
+        self.statuses[str(response.status_code)] += 1
+        if response.status_code == 503 and _LOCK_ERROR.search(response.text):
+            self.lock_errors += 1
+
+    def summary(self, instances: int) -> dict[str, Any]:
+        seconds = time.perf_counter() - self.started
+        requests = sum(self.statuses.values())
+        server_errors = sum(count for status, count in self.statuses.items() if status.startswith("5"))
+        return {
+            "instances": instances,
+            "effective_instances": round(instances * self.traffic.speedup, 2),
+            "seconds": round(seconds, 2),
+            "requests": requests,
+            "throughput_rps": round(requests / seconds, 2) if seconds else 0.0,
+            "latency_ms": {kind: _distribution(values) for kind, values in self.latencies.items()},
+            "refresh_ms": _distribution(self.refreshes),
+            "late_refreshes": self.late_refreshes,
+            "status": dict(sorted(self.statuses.items())),
+            "client_errors": sum(count for status, count in self.statuses.items() if status.startswith("4")),
+            "server_errors": server_errors - self.lock_errors,
+            "transport_errors": self.statuses.get("transport", 0),
+            "lock_errors": self.lock_errors,
+        }
+
+
+def _distribution(values: list[float]) -> dict[str, float]:
+    return {
+        "count": len(values),
+        "p50": round(statistics.median(values), 2) if values else 0.0,
+        "p95": round(_percentile(values, 95), 2),
+        "p99": round(_percentile(values, 99), 2),
+        "max": round(max(values, default=0.0), 2),
+    }
+
+
+class _Instance:
+    """One Home Assistant instance: coordinator, minute poll and card actions."""
+
+    def __init__(self, index: int, client: httpx.AsyncClient, stage: _Stage, users: list[str]) -> None:
+        self.index = index
+        self.client = client
+        self.stage = stage
+        self.traffic = stage.traffic
+        self.users = users
+        self.rng = random.Random(f"{stage.seed}-{index}")
+        self.open_items: list[int] = []
+        self.current_week: dict[str, Any] | None = None
+        self.added = 0
+        self._cooldown_until = 0.0
+        self._refresh_pending = False
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    def start(self) -> None:
+        for coroutine in (self._coordinator_loop(), self._poll_loop(), self._action_loop()):
+            self._spawn(coroutine)
+
+    async def stop(self) -> None:
+        while self._tasks:
+            tasks = list(self._tasks)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _spawn(self, coroutine: Coroutine[Any, Any, None]) -> None:
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _call(self, kind: str, method: str, path: str, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, **kwargs)
+        except httpx.HTTPError:
+            response = None
+        self.stage.record(kind, (time.perf_counter() - started) * 1000, response)
+        if response is None or response.status_code >= 400:
+            return None
+        return response.json()
+
+    async def _refresh(self, kind: str) -> None:
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(self._call(kind, "GET", path, params=params) for path, params in COORDINATOR_READS)
+        )
+        seconds = time.perf_counter() - started
+        self.stage.refreshes.append(seconds * 1000)
+        if seconds > self.traffic.wall(self.traffic.scan_interval):
+            self.stage.late_refreshes += 1
+
+        items, current = results[1], results[5]
+        if isinstance(items, list):
+            self.open_items = [item["id"] for item in items if item.get("status") == "open"]
+        if isinstance(current, dict):
+            self.current_week = current
+
+    def _request_refresh(self) -> None:
+        now = time.perf_counter()
+        if now >= self._cooldown_until:
+            self._cooldown_until = now + self.traffic.wall(self.traffic.refresh_cooldown)
+            self._spawn(self._refresh("refresh"))
+        elif not self._refresh_pending:
+            self._refresh_pending = True
+            self._spawn(self._refresh_after_cooldown())
+
+    async def _refresh_after_cooldown(self) -> None:
+        await asyncio.sleep(max(0.0, self._cooldown_until - time.perf_counter()))
+        self._refresh_pending = False
+        self._cooldown_until = time.perf_counter() + self.traffic.wall(self.traffic.refresh_cooldown)
+        await self._refresh("refresh")
+
+    async def _coordinator_loop(self) -> None:
+        # Instances are already running when the stage starts, so their
+        # refresh timers are spread over one scan interval.
+        await asyncio.sleep(self.rng.uniform(0, self.traffic.wall(self.traffic.scan_interval)))
+        while True:
+            await self._refresh("coordinator")
+            await asyncio.sleep(self.traffic.wall(self.traffic.scan_interval))
+
+    async def _poll_loop(self) -> None:
+        while True:
+            now = self.stage.now()
+            into_interval = now.timestamp() % self.traffic.poll_interval
+            await asyncio.sleep(self.traffic.wall(self.traffic.poll_interval - into_interval))
+            at = self.stage.now().replace(second=0, microsecond=0)
+            await self._call("poll", "GET", "/v1/cleaning/notifications/due", params={"at": at.isoformat()})
+
+    async def _action_loop(self) -> None:
+        if self.traffic.actions_per_minute <= 0:
+            return
+        while True:
+            await asyncio.sleep(self.traffic.wall(self.rng.expovariate(self.traffic.actions_per_minute / 60)))
+            if await self._act(self.rng.choices(list(ACTIONS), weights=list(ACTIONS.values()))[0]) is not None:
+                self._request_refresh()
+
+    async def _act(self, action: str) -> Any:
+        user = self.rng.choice(self.users)
+        if action in {"complete_item", "delete_item"} and self.open_items:
+            item_id = self.open_items.pop(self.rng.randrange(len(self.open_items)))
+            if action == "complete_item":
+                path = f"/v1/shopping/items/{item_id}/complete"
+                return await self._call("action", "POST", path, json={"actor_user_id": user})
+            path = f"/v1/shopping/items/{item_id}"
+            return await self._call("action", "DELETE", path, json={"actor_user_id": user})
+        if action == "toggle_cleaning" and self.current_week is not None:
+            done = self.current_week.get("status") == "done"
+            payload = {"week_start": self.current_week["week_start"], "actor_user_id": user}
+            result = await self._call("action", "POST", "/v1/cleaning/mark_undone" if done else "/v1/cleaning/mark_done", json=payload)
+            if result is not None:
+                self.current_week = {**self.current_week, "status": "pending" if done else "done"}
+            return result
+        self.added += 1
+        payload = {"name": f"Load item {self.index}-{self.added}", "actor_user_id": user}
+        return await self._call("action", "POST", "/v1/shopping/items", json=payload)
+
+
+async def _server_lock_errors(client: httpx.AsyncClient) -> int | None:
+    try:
+        response = await client.get("/v1/admin/metrics")
+    except httpx.HTTPError:
+        return None
+    if response.status_code != 200:
+        return None
+    return int(sum(float(value) for value in _LOCK_METRIC.findall(response.text)))
+
+
+async def _active_users(client: httpx.AsyncClient) -> list[str]:
+    response = await client.get("/v1/members")
+    response.raise_for_status()
+    users = [member["ha_user_id"] for member in response.json() if member.get("active") and member.get("ha_user_id")]
+    if users:
+        return users
+    members = [{"display_name": f"Load {index}", "ha_user_id": f"load-{index}", "active": True} for index in range(1, 5)]
+    (await client.put("/v1/members/sync", json={"members": members})).raise_for_status()
+    return [member["ha_user_id"] for member in members]
+
+
+def _client(url: str, token: str) -> httpx.AsyncClient:
+    # One connection pool per simulated instance, like separate HA processes.
+    return httpx.AsyncClient(
+        base_url=url,
+        headers={"x-flatmate-token": token, "Accept-Encoding": "gzip"},
+        timeout=15,
+    )
+
+
+async def run_stage(url: str, token: str, *, instances: int, seconds: float, traffic: Traffic, seed: int) -> dict[str, Any]:
+    async with _client(url, token) as admin:
+        users = await _active_users(admin)
+        locks_before = await _server_lock_errors(admin)
+
+        stage = _Stage(traffic, seed)
+        clients = [_client(url, token) for _ in range(instances)]
+        simulated = [_Instance(index, client, stage, users) for index, client in enumerate(clients)]
+        try:
+            for instance in simulated:
+                instance.start()
+            await asyncio.sleep(seconds)
+        finally:
+            await asyncio.gather(*(instance.stop() for instance in simulated))
+            await asyncio.gather(*(client.aclose() for client in clients))
+
+        report = stage.summary(instances)
+        locks_after = await _server_lock_errors(admin)
+        report["server_lock_errors"] = (
+            locks_after - locks_before if locks_before is not None and locks_after is not None else None
+        )
+        return report
+
+
+def _passed(stage: dict[str, Any], max_refresh_p95_ms: float) -> bool:
+    return (
+        stage["server_errors"] == 0
+        and stage["transport_errors"] == 0
+        and stage["lock_errors"] == 0
+        and not stage["server_lock_errors"]
+        and stage["refresh_ms"]["p95"] <= max_refresh_p95_ms
+    )
+
+
+def run(
+    url: str,
+    token: str,
+    *,
+    instances: list[int],
+    seconds: float,
+    traffic: Traffic,
+    max_refresh_p95_ms: float,
+    seed: int = 1,
+) -> dict[str, Any]:
+    stages = []
+    limit: dict[str, Any] | None = None
+    failed = False
+    for count in instances:
+        stage = asyncio.run(run_stage(url, token, instances=count, seconds=seconds, traffic=traffic, seed=seed))
+        stage["passed"] = _passed(stage, max_refresh_p95_ms)
+        failed = failed or not stage["passed"]
+        if not failed:
+            limit = stage
+        stages.append(stage)
+    return {
+        "url": url,
+        "traffic": asdict(traffic),
+        "max_refresh_p95_ms": max_refresh_p95_ms,
+        "stages": stages,
+        "limit_instances": limit["instances"] if limit else 0,
+        "limit_effective_instances": limit["effective_instances"] if limit else 0,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+@contextmanager
+def serve(args: argparse.Namespace) -> Iterator[tuple[str, str]]:
+    """Start ``run.py`` on a temporary database loaded with a synthetic household."""
+
+    token = "load-token"
+    with tempfile.TemporaryDirectory() as tmp, open(args.server_log or os.devnull, "wb") as log:
+        port = _free_port()
+        env = {
+            **os.environ,
+            "HASS_FLATMATE_DB_PATH": str(Path(tmp) / "load.db"),
+            "HASS_FLATMATE_BACKUP_DIR": str(Path(tmp) / "backups"),
+            "HASS_FLATMATE_API_TOKEN": token,
+            "HASS_FLATMATE_HOST": "127.0.0.1",
+            "HASS_FLATMATE_PORT": str(port),
+        }
+        process = subprocess.Popen(
+            [sys.executable, "run.py"], cwd=SERVICE_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT
+        )
+        url = f"http://127.0.0.1:{port}"
+        try:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    if httpx.get(f"{url}/health").status_code == 200:
+                        break
+                except httpx.HTTPError:
+                    pass
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise SystemExit("service did not start")
+                time.sleep(0.1)
+
+            snapshot = generate_snapshot(scale_from_args(args))
+            httpx.post(
+                f"{url}/v1/admin/import",
+                headers={"x-flatmate-token": token},
+                json={"snapshot": snapshot},
+                timeout=600,
+            ).raise_for_status()
+            yield url, token
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                # Requests still queued for a database connection hold up a graceful shutdown.
+                process.kill()
+                process.wait()
+
+
+def _table(report: dict[str, Any]) -> str:
+    lines = [
+        f"{'inst':>5} {'x1':>7} {'req/s':>8} {'refresh p50':>12} {'p95':>8} {'p99':>8} {'late':>5} "
+        f"{'action p95':>11} {'poll p95':>9} {'4xx':>5} {'5xx':>5} {'locks':>6}"
+    ]
+    for stage in report["stages"]:
+        refresh = stage["refresh_ms"]
+        locks = stage["lock_errors"] if stage["server_lock_errors"] is None else max(stage["lock_errors"], stage["server_lock_errors"])
+        lines.append(
+            f"{stage['instances']:>5} {stage['effective_instances']:>7} {stage['throughput_rps']:>8} "
+            f"{refresh['p50']:>12} {refresh['p95']:>8} {refresh['p99']:>8} {stage['late_refreshes']:>5} "
+            f"{stage['latency_ms']['action']['p95']:>11} {stage['latency_ms']['poll']['p95']:>9} "
+            f"{stage['client_errors']:>5} {stage['server_errors'] + stage['transport_errors']:>5} {locks:>6}"
+            + ("" if stage["passed"] else "  over limit")
+        )
+    lines.append(
+        f"scaling limit: {report['limit_instances']} simulated instances "
+        f"({report['limit_effective_instances']} at real-time traffic), "
+        f"refresh p95 budget {report['max_refresh_p95_ms']} ms"
+    )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="base URL of a running service")
+    target.add_argument("--serve", action="store_true", help="start run.py on a synthetic household")
+    parser.add_argument("--token", default=os.environ.get("HASS_FLATMATE_API_TOKEN", "dev-token"))
+    parser.add_argument("--server-log", type=Path, help="with --serve, write the service's output here")
+    add_scale_arguments(parser)
+    parser.add_argument("--instances", default="1,2,4,8", help="comma-separated instance counts, one stage each")
+    parser.add_argument("--seconds", type=float, default=60.0, help="wall-clock length of each stage")
+    parser.add_argument("--speedup", type=float, default=1.0, help="simulated seconds per real second")
+    parser.add_argument("--scan-interval", type=float, default=Traffic.scan_interval)
+    parser.add_argument("--actions-per-minute", type=float, default=Traffic.actions_per_minute)
+    parser.add_argument("--max-refresh-p95", type=float, default=1000.0, help="refresh p95 budget in ms")
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = parser.parse_args()
+
+    traffic = Traffic(
+        scan_interval=args.scan_interval,
+        actions_per_minute=args.actions_per_minute,
+        speedup=args.speedup,
+    )
+    options = {
+        "instances": [int(count) for count in args.instances.split(",")],
+        "seconds": args.seconds,
+        "traffic": traffic,
+        "max_refresh_p95_ms": args.max_refresh_p95,
+        "seed": args.seed if args.seed is not None else 1,
+    }
+    if args.serve:
+        with serve(args) as (url, token):
+            report = run(url, token, **options)
+    else:
+        report = run(args.url.rstrip("/"), args.token, **options)
+    print(json.dumps(report, indent=2) if args.json else _table(report))
+
+
+if __name__ == "__main__":
+    main()
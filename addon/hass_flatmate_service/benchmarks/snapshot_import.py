@@ -0,0 +1,101 @@
+"""Time snapshot imports of a large synthetic activity history.
+
+Run from ``addon/hass_flatmate_service``::
+
+    python -m benchmarks.snapshot_import --events 100000
+
+Builds a snapshot with the requested number of activity events, imports it
+once as JSON and once as gzipped NDJSON into a fresh database, and prints the
+wall time and the importer's progress summary for each.
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timedelta, timezone
+import gzip
+import json
+import os
+from pathlib import Path
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+
+from .sqlite_profile import _HEADERS
+
+
+def _snapshot(events: int) -> dict:
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return {
+        "schema_version": 1,
+        "data": {
+            "members": [
+                {"id": index, "display_name": f"Member {index}", "ha_user_id": f"u{index}"}
+                for index in range(1, 5)
+            ],
+            "activity_events": [
+                {
+                    "id": index,
+                    "domain": "shopping",
+                    "action": "shopping_item_added",
+                    "actor_member_id": index % 4 + 1,
+                    "actor_user_id_raw": f"u{index % 4 + 1}",
+                    "payload_json": {"item_id": index, "name": f"item-{index % 300}"},
+                    "created_at": (start + timedelta(minutes=index)).isoformat(),
+                }
+                for index in range(1, events + 1)
+            ],
+        },
+    }
+
+
+def _ndjson(snapshot: dict) -> bytes:
+    lines = [json.dumps({"type": "header", "schema_version": snapshot["schema_version"]})]
+    for table, rows in snapshot["data"].items():
+        lines.extend(json.dumps({"type": "row", "table": table, "row": row}) for row in rows)
+    return gzip.compress(("\n".join(lines) + "\n").encode())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=100_000)
+    args = parser.parse_args()
+
+    snapshot = _snapshot(args.events)
+    ndjson_body = _ndjson(snapshot)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["HASS_FLATMATE_DB_PATH"] = str(Path(tmp) / "bench.db")
+        os.environ["HASS_FLATMATE_API_TOKEN"] = _HEADERS["x-flatmate-token"]
+
+        from app.main import app
+
+        with TestClient(app) as client:
+            for label, request in (
+                ("json", lambda: client.post("/v1/admin/import", headers=_HEADERS, json={"snapshot": snapshot})),
+                (
+                    "ndjson+gzip",
+                    lambda: client.post(
+                        "/v1/admin/import?format=ndjson",
+                        headers={**_HEADERS, "content-type": "application/gzip"},
+                        content=ndjson_body,
+                    ),
+                ),
+            ):
+                started = time.perf_counter()
+                response = request()
+                response.raise_for_status()
+                results.append(
+                    {
+                        "format": label,
+                        "events": args.events,
+                        "wall_seconds": round(time.perf_counter() - started, 2),
+                        "progress": response.json()["summary"]["progress"],
+                    }
+                )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
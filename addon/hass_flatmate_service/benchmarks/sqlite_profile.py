@@ -0,0 +1,143 @@
+"""Compare read/write concurrency of the legacy and tuned SQLite profiles.
+
+Run from ``addon/hass_flatmate_service``::
+
+    python -m benchmarks.sqlite_profile --readers 8 --writers 2 --seconds 5
+
+Each profile gets a fresh database. Reader threads poll the coordinator read
+endpoints while writer threads add and complete shopping items, mirroring a
+card action landing during a coordinator refresh.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+import statistics
+import tempfile
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+_READ_PATHS = [
+    "/v1/members",
+    "/v1/shopping/items",
+    "/v1/cleaning/current",
+    "/v1/cleaning/schedule?weeks_ahead=24&include_previous_weeks=1",
+    "/v1/activity?limit=200",
+]
+_HEADERS = {"x-flatmate-token": "bench-token"}
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _run_profile(profile: str, *, readers: int, writers: int, seconds: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        os.environ["HASS_FLATMATE_DB_PATH"] = str(db_path)
+        os.environ["HASS_FLATMATE_API_TOKEN"] = _HEADERS["x-flatmate-token"]
+        os.environ["HASS_FLATMATE_SQLITE_PROFILE"] = profile
+
+        from app.main import app
+
+        with TestClient(app, raise_server_exceptions=False) as client:
+            client.put(
+                "/v1/members/sync",
+                headers=_HEADERS,
+                json={
+                    "members": [
+                        {"display_name": f"Member {index}", "ha_user_id": f"u{index}", "active": True}
+                        for index in range(1, 5)
+                    ]
+                },
+            ).raise_for_status()
+
+            deadline = time.perf_counter() + seconds
+            lock = threading.Lock()
+            read_latencies: list[float] = []
+            write_latencies: list[float] = []
+            errors: dict[str, int] = {}
+
+            def record(bucket: list[float], started: float, status_code: int, label: str) -> None:
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    bucket.append(elapsed)
+                    if status_code >= 400:
+                        errors[label] = errors.get(label, 0) + 1
+
+            def reader(offset: int) -> None:
+                index = offset
+                while time.perf_counter() < deadline:
+                    path = _READ_PATHS[index % len(_READ_PATHS)]
+                    started = time.perf_counter()
+                    response = client.get(path, headers=_HEADERS)
+                    record(read_latencies, started, response.status_code, f"GET {path}")
+                    index += 1
+
+            def writer(offset: int) -> None:
+                counter = 0
+                while time.perf_counter() < deadline:
+                    counter += 1
+                    started = time.perf_counter()
+                    response = client.post(
+                        "/v1/shopping/items",
+                        headers=_HEADERS,
+                        json={"name": f"item-{offset}-{counter}", "actor_user_id": "u1"},
+                    )
+                    record(write_latencies, started, response.status_code, "POST /v1/shopping/items")
+                    if response.status_code < 400:
+                        item_id = response.json()["id"]
+                        started = time.perf_counter()
+                        response = client.post(
+                            f"/v1/shopping/items/{item_id}/complete",
+                            headers=_HEADERS,
+                            json={"actor_user_id": "u1"},
+                        )
+                        record(write_latencies, started, response.status_code, "POST complete")
+
+            threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+            threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+    return {
+        "profile": profile,
+        "reads": len(read_latencies),
+        "writes": len(write_latencies),
+        "reads_per_second": round(len(read_latencies) / seconds, 1),
+        "writes_per_second": round(len(write_latencies) / seconds, 1),
+        "read_p50_ms": round(statistics.median(read_latencies), 2) if read_latencies else 0.0,
+        "read_p99_ms": round(_percentile(read_latencies, 99), 2),
+        "write_p50_ms": round(statistics.median(write_latencies), 2) if write_latencies else 0.0,
+        "write_p99_ms": round(_percentile(write_latencies, 99), 2),
+        "errors": errors,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    results = [
+        _run_profile(profile, readers=args.readers, writers=args.writers, seconds=args.seconds)
+        for profile in ("legacy", "performance")
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,11 @@
-"""Run hass-flatmate service with uvicorn."""
+"""Run hass-flatmate service with uvicorn.
+
+``HASS_FLATMATE_WORKERS`` (default 1) starts that many worker processes on
+the same port and database. Each worker has its own caches, writer thread,
+tenant pool and metrics; caches stay coherent through the shared data version
+(see ``app.services.versioning``). Event loop, HTTP parser, keep-alive and
+connection limits come from the server profile in ``app.server``.
+"""
 
 from __future__ import annotations
 
@@ -6,8 +13,35 @@ import os
 
 import uvicorn
 
+from app.server import log_config, server_profile
+from app.settings import settings
+
+
+def _prepare_database() -> None:
+    # Create and migrate the schema once, so workers do not race to switch a
+    # new file to WAL or to apply migrations.
+    from app import db
+    from app.migrations import run_migrations
+
+    db.configure_engine()
+    db.ensure_db_dir()
+    assert db.engine is not None
+    run_migrations(db.engine)
+    db.engine.dispose()
+
 
 if __name__ == "__main__":
     host = os.environ.get("HASS_FLATMATE_HOST", "0.0.0.0")
     port = int(os.environ.get("HASS_FLATMATE_PORT", "8099"))
-    uvicorn.run("app.main:app", host=host, port=port, reload=False)
+    workers = settings.workers
+    if workers > 1:
+        _prepare_database()
+    uvicorn.run(
+        "app.main:app",
+        host=host,
+        port=port,
+        reload=False,
+        workers=workers,
+        log_config=log_config(),
+        **server_profile().uvicorn_options(),
+    )
@@ -0,0 +1,169 @@
+"""Online backup and restore API tests."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+import sqlite3
+import time
+
+import pytest
+
+
+def _add_item(client, headers, name: str) -> None:
+    response = client.post("/v1/shopping/items", headers=headers, json={"name": name, "actor_user_id": "u1"})
+    assert response.status_code == 200
+
+
+def test_backup_writes_compressed_consistent_copy(client, auth_headers, tmp_path) -> None:
+    _add_item(client, auth_headers, "Milk")
+
+    response = client.post("/v1/admin/backup?vacuum=true", headers=auth_headers)
+    assert response.status_code == 200
+    report = response.json()
+    assert report["compressed"] is True
+    assert report["vacuumed"] is True
+    assert report["name"].endswith(".db.gz")
+    assert report["steps"] >= 1
+    assert report["bytes"] < report["uncompressed_bytes"]
+
+    backup_path = tmp_path / "backups" / report["name"]
+    restored = tmp_path / "copy.db"
+    restored.write_bytes(gzip.decompress(backup_path.read_bytes()))
+    connection = sqlite3.connect(restored)
+    try:
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+        assert connection.execute("SELECT name FROM shopping_items").fetchall() == [("Milk",)]
+    finally:
+        connection.close()
+
+    listed = client.get("/v1/admin/backups", headers=auth_headers).json()["backups"]
+    assert [entry["name"] for entry in listed] == [report["name"]]
+
+
+def test_backup_rotation_keeps_most_recent(client, auth_headers, monkeypatch) -> None:
+    monkeypatch.setenv("HASS_FLATMATE_BACKUP_KEEP", "2")
+    names = [client.post("/v1/admin/backup?compress=false", headers=auth_headers).json()["name"] for _ in range(3)]
+
+    listed = client.get("/v1/admin/backups", headers=auth_headers).json()["backups"]
+    assert [entry["name"] for entry in listed] == [names[2], names[1]]
+
+
+def test_restore_swaps_database_atomically(client, auth_headers) -> None:
+    _add_item(client, auth_headers, "Before backup")
+    name = client.post("/v1/admin/backup", headers=auth_headers).json()["name"]
+    _add_item(client, auth_headers, "After backup")
+
+    response = client.post("/v1/admin/restore", headers=auth_headers, json={"name": name})
+    assert response.status_code == 200
+    assert response.json()["restored"] == name
+
+    items = client.get("/v1/shopping/items", headers=auth_headers).json()
+    assert [item["name"] for item in items] == ["Before backup"]
+    _add_item(client, auth_headers, "After restore")
+    assert len(client.get("/v1/shopping/items", headers=auth_headers).json()) == 2
+
+
+def test_restore_waits_for_in_flight_connections(client, auth_headers) -> None:
+    from sqlalchemy import text
+
+    from app import db
+
+    _add_item(client, auth_headers, "Before backup")
+    name = client.post("/v1/admin/backup", headers=auth_headers).json()["name"]
+    _add_item(client, auth_headers, "After backup")
+    completed = client.get("/v1/admin/diagnostics", headers=auth_headers).json()["writer"]["completed"]
+
+    with db.new_session() as in_flight:
+        in_flight.execute(text("SELECT 1"))
+        refused = client.post("/v1/admin/restore", headers=auth_headers, json={"name": name})
+    assert refused.status_code == 400
+    assert "in use by in-flight requests" in refused.json()["detail"]
+    assert len(client.get("/v1/shopping/items", headers=auth_headers).json()) == 2
+
+    restored = client.post("/v1/admin/restore", headers=auth_headers, json={"name": name})
+    assert restored.status_code == 200
+    assert client.get("/v1/admin/diagnostics", headers=auth_headers).json()["writer"]["completed"] >= completed + 1
+    assert [item["name"] for item in client.get("/v1/shopping/items", headers=auth_headers).json()] == [
+        "Before backup"
+    ]
+
+
+def test_requests_during_the_swap_wait_for_the_restored_database(client, auth_headers, monkeypatch) -> None:
+    from app.services import backup
+
+    _add_item(client, auth_headers, "Before backup")
+    name = client.post("/v1/admin/backup", headers=auth_headers).json()["name"]
+    _add_item(client, auth_headers, "After backup")
+
+    run_migrations = backup.run_migrations
+    waiting = []
+
+    def migrate_while_a_request_arrives(engine):
+        waiting.append(pool.submit(client.get, "/v1/shopping/items", headers=auth_headers))
+        time.sleep(0.2)
+        assert not waiting[0].done()
+        return run_migrations(engine)
+
+    monkeypatch.setattr(backup, "run_migrations", migrate_while_a_request_arrives)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        assert client.post("/v1/admin/restore", headers=auth_headers, json={"name": name}).status_code == 200
+        items = waiting[0].result(timeout=5).json()
+    assert [item["name"] for item in items] == ["Before backup"]
+
+
+@pytest.fixture
+def async_db(monkeypatch) -> None:
+    pytest.importorskip("aiosqlite")
+    monkeypatch.setenv("HASS_FLATMATE_ASYNC_DB", "1")
+
+
+def test_restore_disposes_the_old_async_engine(async_db, client, auth_headers) -> None:
+    from app import db
+
+    _add_item(client, auth_headers, "Before backup")
+    name = client.post("/v1/admin/backup", headers=auth_headers).json()["name"]
+    _add_item(client, auth_headers, "After backup")
+    assert len(client.get("/v1/shopping/items", headers=auth_headers).json()) == 2
+    old_engine = db.async_engine
+    assert old_engine is not None and old_engine.sync_engine.pool.checkedin() == 1
+
+    assert client.post("/v1/admin/restore", headers=auth_headers, json={"name": name}).status_code == 200
+
+    assert db.async_engine is not old_engine
+    assert old_engine.sync_engine.pool.checkedin() == 0
+    assert [item["name"] for item in client.get("/v1/shopping/items", headers=auth_headers).json()] == [
+        "Before backup"
+    ]
+
+
+def test_delta_taken_before_a_restore_falls_back_to_full_export(client, auth_headers) -> None:
+    _add_item(client, auth_headers, "In backup")
+    name = client.post("/v1/admin/backup", headers=auth_headers).json()["name"]
+    for index in range(3):
+        _add_item(client, auth_headers, f"Rolled back {index}")
+    since = client.get("/v1/admin/export", headers=auth_headers).json()["version"]
+
+    assert client.post("/v1/admin/restore", headers=auth_headers, json={"name": name}).status_code == 200
+    _add_item(client, auth_headers, "After restore")
+
+    delta = client.get(f"/v1/admin/export?since={since}", headers=auth_headers).json()
+    assert delta["since"] is None
+    assert delta["version"] > since
+    assert sorted(row["name"] for row in delta["data"]["shopping_items"]) == ["After restore", "In backup"]
+
+
+def test_restore_rejects_unknown_or_corrupt_backups(client, auth_headers, tmp_path) -> None:
+    traversal = client.post("/v1/admin/restore", headers=auth_headers, json={"name": "../test.db"})
+    assert traversal.status_code == 400
+
+    backups = tmp_path / "backups"
+    backups.mkdir(exist_ok=True)
+    corrupt = backups / "hass_flatmate-20260101T000000000000.db.gz"
+    corrupt.write_bytes(gzip.compress(b"not a database" * 100))
+    response = client.post("/v1/admin/restore", headers=auth_headers, json={"name": corrupt.name})
+    assert response.status_code == 400
+    assert "not a valid SQLite database" in response.json()["detail"]
+    assert not (tmp_path / ".test.db.restore").exists()
+
+    _add_item(client, auth_headers, "Still writable")
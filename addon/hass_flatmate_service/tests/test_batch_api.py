@@ -0,0 +1,120 @@
+"""Batch API behavior tests."""
+
+from __future__ import annotations
+
+
+_MEMBERS = {
+    "members": [
+        {"display_name": "Alex", "ha_user_id": "u1", "notify_service": "notify.mobile_app_alex", "active": True},
+        {"display_name": "Sam", "ha_user_id": "u2", "notify_service": "notify.mobile_app_sam", "active": True},
+    ]
+}
+
+
+def _setup(client, headers) -> tuple[int, str]:
+    assert client.put("/v1/members/sync", headers=headers, json=_MEMBERS).status_code == 200
+    item_id = client.post("/v1/shopping/items", headers=headers, json={"name": "Rice", "actor_user_id": "u1"}).json()["id"]
+    week_start = client.get("/v1/cleaning/current", headers=headers).json()["week_start"]
+    return item_id, week_start
+
+
+def _items(client, headers) -> dict[str, str]:
+    return {item["name"]: item["status"] for item in client.get("/v1/shopping/items", headers=headers).json()}
+
+
+def test_atomic_batch_applies_all_operations_in_one_commit(client, auth_headers, query_budget) -> None:
+    item_id, week_start = _setup(client, auth_headers)
+
+    operations = [
+        {"op": "complete_shopping_item", "data": {"item_id": item_id, "actor_user_id": "u2"}},
+        {"op": "add_shopping_item", "data": {"name": "Milk", "actor_user_id": "u2"}},
+        {"op": "mark_cleaning_done", "data": {"week_start": week_start, "actor_user_id": "u2"}},
+    ]
+    with query_budget(queries=60, commits=1) as counter:
+        response = client.post("/v1/batch", headers=auth_headers, json={"operations": operations})
+
+    assert counter.commits == 1
+    assert response.status_code == 200
+    body = response.json()
+    assert body["ok"] is True
+    assert body["atomic"] is True
+    assert [result["op"] for result in body["results"]] == [operation["op"] for operation in operations]
+    assert body["results"][0]["id"] == item_id
+    assert body["results"][1]["id"] is not None
+    assert all(notification["week_start"] == week_start for notification in body["notifications"])
+
+    assert _items(client, auth_headers) == {"Rice": "completed", "Milk": "open"}
+    assert client.get("/v1/cleaning/current", headers=auth_headers).json()["status"] == "done"
+
+
+def test_atomic_batch_failure_applies_nothing(client, auth_headers) -> None:
+    item_id, _week_start = _setup(client, auth_headers)
+
+    response = client.post(
+        "/v1/batch",
+        headers=auth_headers,
+        json={
+            "operations": [
+                {"op": "complete_shopping_item", "data": {"item_id": item_id}},
+                {"op": "add_shopping_item", "data": {"name": "Milk"}},
+                {"op": "delete_shopping_item", "data": {"item_id": 9999}},
+            ]
+        },
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("operations[2] (delete_shopping_item):")
+    assert _items(client, auth_headers) == {"Rice": "open"}
+
+
+def test_non_atomic_batch_reports_each_operation(client, auth_headers) -> None:
+    item_id, _week_start = _setup(client, auth_headers)
+
+    response = client.post(
+        "/v1/batch",
+        headers=auth_headers,
+        json={
+            "atomic": False,
+            "operations": [
+                {"op": "complete_shopping_item", "data": {"item_id": item_id}},
+                {"op": "complete_shopping_item", "data": {"item_id": 9999}},
+                {"op": "add_shopping_item", "data": {"name": "Milk"}},
+            ],
+        },
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["ok"] is False
+    assert [result["ok"] for result in body["results"]] == [True, False, True]
+    assert body["results"][1]["error"]
+    assert _items(client, auth_headers) == {"Rice": "completed", "Milk": "open"}
+
+
+def test_batch_rejects_invalid_operations_before_running_any(client, auth_headers) -> None:
+    item_id, _week_start = _setup(client, auth_headers)
+
+    unknown = client.post(
+        "/v1/batch",
+        headers=auth_headers,
+        json={"operations": [{"op": "complete_shopping_item", "data": {"item_id": item_id}}, {"op": "reset"}]},
+    )
+    assert unknown.status_code == 400
+    assert unknown.json()["detail"] == "operations[1]: unknown operation 'reset'"
+
+    invalid = client.post(
+        "/v1/batch",
+        headers=auth_headers,
+        json={
+            "atomic": False,
+            "operations": [
+                {"op": "complete_shopping_item", "data": {"item_id": item_id}},
+                {"op": "mark_cleaning_done", "data": {}},
+            ],
+        },
+    )
+    assert invalid.status_code == 400
+    assert "operations[1] (mark_cleaning_done): week_start" in invalid.json()["detail"]
+
+    assert client.post("/v1/batch", headers=auth_headers, json={"operations": []}).status_code == 422
+    assert _items(client, auth_headers) == {"Rice": "open"}
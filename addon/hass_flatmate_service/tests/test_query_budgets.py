@@ -0,0 +1,338 @@
+"""SQL statement and commit budgets for every API endpoint.
+
+Each endpoint runs once against a seeded dataset large enough that a
+per-row query loop (N+1) would exceed its budget. Budgets are upper bounds:
+lower them when an endpoint gets cheaper, and only raise one together with
+the change that needs the extra statements.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import pytest
+from fastapi.routing import APIRoute
+
+
+_MEMBER_COUNT = 6
+_ITEM_COUNT = 30
+_FAVORITE_COUNT = 8
+_SCHEDULE_WEEKS = 12
+
+
+@dataclass(frozen=True)
+class Seed:
+    week_start: date
+    item_ids: list[int]
+    favorite_ids: list[int]
+
+
+@dataclass(frozen=True)
+class Case:
+    method: str
+    route: str
+    queries: int
+    commits: int
+    # Runs outside the budget and returns the request to measure.
+    prepare: Callable[..., Callable[[], object]]
+
+
+def _ok(response) -> None:
+    assert response.status_code == 200, response.text
+
+
+def _seed(client, headers) -> Seed:
+    members = [
+        {
+            "display_name": f"Member {index}",
+            "ha_user_id": f"u{index}",
+            "notify_service": f"notify.mobile_app_member_{index}",
+            "active": True,
+        }
+        for index in range(1, _MEMBER_COUNT + 1)
+    ]
+    _ok(client.put("/v1/members/sync", headers=headers, json={"members": members}))
+
+    item_ids = []
+    for index in range(_ITEM_COUNT):
+        response = client.post(
+            "/v1/shopping/items",
+            headers=headers,
+            json={"name": f"Item {index % 12}", "actor_user_id": f"u{index % _MEMBER_COUNT + 1}"},
+        )
+        _ok(response)
+        item_ids.append(response.json()["id"])
+    for index, item_id in enumerate(item_ids[::2]):
+        _ok(
+            client.post(
+                f"/v1/shopping/items/{item_id}/complete",
+                headers=headers,
+                json={"actor_user_id": f"u{index % _MEMBER_COUNT + 1}"},
+            )
+        )
+
+    favorite_ids = []
+    for index in range(_FAVORITE_COUNT):
+        response = client.post("/v1/shopping/favorites", headers=headers, json={"name": f"Favorite {index}"})
+        _ok(response)
+        favorite_ids.append(response.json()["id"])
+
+    current = client.get("/v1/cleaning/current", headers=headers)
+    _ok(current)
+    week_start = date.fromisoformat(current.json()["week_start"])
+    _ok(client.get(f"/v1/cleaning/schedule?weeks_ahead={_SCHEDULE_WEEKS}&include_previous_weeks=4", headers=headers))
+    _ok(
+        client.post(
+            "/v1/cleaning/overrides/swap",
+            headers=headers,
+            json={
+                "week_start": (week_start + timedelta(weeks=2)).isoformat(),
+                "member_a_id": 1,
+                "member_b_id": 2,
+                "actor_user_id": "u1",
+            },
+        )
+    )
+    for weeks_back in range(1, 4):
+        past = (week_start - timedelta(weeks=weeks_back)).isoformat()
+        _ok(client.post("/v1/cleaning/mark_done", headers=headers, json={"week_start": past, "actor_user_id": "u3"}))
+    return Seed(week_start=week_start, item_ids=item_ids, favorite_ids=favorite_ids)
+
+
+def _get(url: str) -> Callable[..., Callable[[], object]]:
+    return lambda client, headers, _seed: lambda: client.get(url, headers=headers)
+
+
+def _post(url: str, body: Callable[[Seed], dict] | None = None) -> Callable[..., Callable[[], object]]:
+    return lambda client, headers, seed: lambda: client.post(
+        url.format(seed=seed), headers=headers, json=body(seed) if body else None
+    )
+
+
+def _delete(url: str) -> Callable[..., Callable[[], object]]:
+    return lambda client, headers, seed: lambda: client.request(
+        "DELETE", url.format(seed=seed), headers=headers, json={"actor_user_id": "u1"}
+    )
+
+
+def _prepare_restore(client, headers, _seed):
+    response = client.post("/v1/admin/backup", headers=headers)
+    _ok(response)
+    name = response.json()["name"]
+    return lambda: client.post("/v1/admin/restore", headers=headers, json={"name": name})
+
+
+def _prepare_digest_compare(client, headers, _seed):
+    digest = client.get("/v1/admin/digest", headers=headers).json()
+    return lambda: client.post("/v1/admin/digest/compare", headers=headers, json={"left": digest})
+
+
+def _prepare_snapshot_import(client, headers, _seed):
+    exported = client.get("/v1/admin/export", headers=headers).json()
+    return lambda: client.post("/v1/admin/import", headers=headers, json={"snapshot": exported})
+
+
+def _prepare_mark_undone(client, headers, seed):
+    week = (seed.week_start - timedelta(weeks=1)).isoformat()
+    return lambda: client.post("/v1/cleaning/mark_undone", headers=headers, json={"week_start": week, "actor_user_id": "u3"})
+
+
+def _week(offset: int) -> Callable[[Seed], str]:
+    return lambda seed: (seed.week_start + timedelta(weeks=offset)).isoformat()
+
+
+def _manual_import(seed: Seed) -> dict:
+    names = [f"Member {index}" for index in range(1, _MEMBER_COUNT + 1)]
+    wednesday = seed.week_start + timedelta(days=2)
+    return {
+        "rotation_rows": ";".join(
+            f"{(wednesday + timedelta(weeks=index)).isoformat()},{name}" for index, name in enumerate(names)
+        ),
+        "cleaning_history_rows": ";".join(
+            f"{(wednesday - timedelta(weeks=index)).isoformat()},{names[index % len(names)]},done"
+            for index in range(4, 16)
+        ),
+        "shopping_history_rows": ";".join(
+            f"{(seed.week_start - timedelta(days=index)).isoformat()},Bulk {index},{names[index % len(names)]}"
+            for index in range(1, 21)
+        ),
+        "actor_user_id": "u1",
+    }
+
+
+CASES = [
+    Case("GET", "/health", 0, 0, _get("/health")),
+    Case("GET", "/", 0, 0, _get("/")),
+    Case("GET", "/ui/config", 0, 0, _get("/ui/config")),
+    Case("GET", "/v1/members", 1, 0, _get("/v1/members")),
+    Case(
+        "PUT",
+        "/v1/members/sync",
+        52,
+        5,
+        lambda client, headers, _seed: lambda: client.put(
+            "/v1/members/sync",
+            headers=headers,
+            json={
+                "members": [
+                    {"display_name": f"Member {index}", "ha_user_id": f"u{index}", "active": index != 2}
+                    for index in range(1, _MEMBER_COUNT + 2)
+                ]
+            },
+        ),
+    ),
+    Case("GET", "/v1/shopping/items", 1, 0, _get("/v1/shopping/items")),
+    Case("POST", "/v1/shopping/items", 5, 1, _post("/v1/shopping/items", lambda _seed: {"name": "Eggs", "actor_user_id": "u1"})),
+    Case(
+        "POST",
+        "/v1/shopping/items/{item_id}/complete",
+        6,
+        1,
+        _post("/v1/shopping/items/{seed.item_ids[1]}/complete", lambda _seed: {"actor_user_id": "u2"}),
+    ),
+    Case("DELETE", "/v1/shopping/items/{item_id}", 6, 1, _delete("/v1/shopping/items/{seed.item_ids[3]}")),
+    Case("GET", "/v1/shopping/recents", 3, 0, _get("/v1/shopping/recents?limit=200")),
+    Case("GET", "/v1/shopping/favorites", 1, 0, _get("/v1/shopping/favorites")),
+    Case("POST", "/v1/shopping/favorites", 5, 1, _post("/v1/shopping/favorites", lambda _seed: {"name": "Tea", "actor_user_id": "u1"})),
+    Case("DELETE", "/v1/shopping/favorites/{favorite_id}", 4, 1, _delete("/v1/shopping/favorites/{seed.favorite_ids[0]}")),
+    Case("GET", "/v1/stats/buys", 1, 0, _get("/v1/stats/buys")),
+    Case("GET", "/v1/stats/buys.svg", 1, 0, _get("/v1/stats/buys.svg")),
+    Case("GET", "/v1/activity", 1, 0, _get("/v1/activity?limit=500")),
+    Case("POST", "/v1/import/manual", 31, 1, _post("/v1/import/manual", _manual_import)),
+    Case("POST", "/v1/import/flatastic", 2, 0, _post("/v1/import/flatastic?dry_run=true", _manual_import)),
+    Case("POST", "/v1/admin/reset", 11, 1, _post("/v1/admin/reset")),
+    Case("GET", "/v1/admin/diagnostics", 0, 0, _get("/v1/admin/diagnostics")),
+    Case("GET", "/v1/admin/metrics", 0, 0, _get("/v1/admin/metrics")),
+    Case("POST", "/v1/admin/backup", 0, 0, _post("/v1/admin/backup")),
+    Case("GET", "/v1/admin/backups", 0, 0, _get("/v1/admin/backups")),
+    Case("POST", "/v1/admin/restore", 9, 1, _prepare_restore),
+    Case("GET", "/v1/admin/digest", 9, 1, _get("/v1/admin/digest")),
+    Case("POST", "/v1/admin/digest/compare", 2, 1, _prepare_digest_compare),
+    Case("GET", "/v1/admin/export", 9, 0, _get("/v1/admin/export")),
+    Case("POST", "/v1/admin/import", 31, 1, _prepare_snapshot_import),
+    Case("GET", "/v1/cleaning/current", 15, 4, _get("/v1/cleaning/current")),
+    Case("GET", "/v1/cleaning/schedule", 7, 1, _get("/v1/cleaning/schedule?weeks_ahead=52&include_previous_weeks=8")),
+    Case(
+        "POST",
+        "/v1/cleaning/mark_done",
+        10,
+        2,
+        _post("/v1/cleaning/mark_done", lambda seed: {"week_start": _week(0)(seed), "actor_user_id": "u1"}),
+    ),
+    Case("POST", "/v1/cleaning/mark_undone", 14, 3, _prepare_mark_undone),
+    Case(
+        "POST",
+        "/v1/cleaning/mark_takeover_done",
+        47,
+        11,
+        _post(
+            "/v1/cleaning/mark_takeover_done",
+            lambda seed: {
+                "week_start": _week(0)(seed),
+                "original_assignee_member_id": 1,
+                "cleaner_member_id": 3,
+                "actor_user_id": "u3",
+            },
+        ),
+    ),
+    Case(
+        "POST",
+        "/v1/cleaning/overrides/swap",
+        41,
+        9,
+        _post(
+            "/v1/cleaning/overrides/swap",
+            lambda seed: {"week_start": _week(4)(seed), "member_a_id": 3, "member_b_id": 4, "actor_user_id": "u3"},
+        ),
+    ),
+    Case(
+        "GET",
+        "/v1/cleaning/notifications/due",
+        14,
+        3,
+        lambda client, headers, seed: lambda: client.get(
+            "/v1/cleaning/notifications/due",
+            headers=headers,
+            params={"at": f"{(seed.week_start + timedelta(days=6)).isoformat()}T18:00:00"},
+        ),
+    ),
+    Case(
+        "POST",
+        "/v1/cleaning/notifications/dispatch",
+        10,
+        1,
+        _post(
+            "/v1/cleaning/notifications/dispatch",
+            lambda seed: {
+                "records": [
+                    {
+                        "week_start": _week(0)(seed),
+                        "member_id": member_id,
+                        "notification_kind": "reminder",
+                        "notification_slot": "sunday_evening",
+                        "status": "sent",
+                    }
+                    for member_id in range(1, _MEMBER_COUNT + 1)
+                ]
+            },
+        ),
+    ),
+    Case(
+        "POST",
+        "/v1/batch",
+        16,
+        1,
+        _post(
+            "/v1/batch",
+            lambda seed: {
+                "operations": [
+                    {"op": "complete_shopping_item", "data": {"item_id": seed.item_ids[1], "actor_user_id": "u2"}},
+                    {"op": "complete_shopping_item", "data": {"item_id": seed.item_ids[3], "actor_user_id": "u2"}},
+                    {"op": "add_shopping_item", "data": {"name": "Eggs", "actor_user_id": "u2"}},
+                    {"op": "mark_cleaning_done", "data": {"week_start": _week(0)(seed), "actor_user_id": "u1"}},
+                ]
+            },
+        ),
+    ),
+]
+
+
+def test_every_endpoint_declares_a_budget() -> None:
+    from app.main import app
+
+    routes = {
+        (method, route.path)
+        for route in app.routes
+        if isinstance(route, APIRoute)
+        for method in route.methods
+    }
+    declared = {(case.method, case.route) for case in CASES}
+    assert routes - declared == set(), "add a Case with a query budget for new endpoints"
+    assert declared - routes == set()
+
+
+@pytest.mark.parametrize("case", CASES, ids=lambda case: f"{case.method} {case.route}")
+def test_endpoint_stays_within_query_budget(client, auth_headers, query_budget, case: Case) -> None:
+    seed = _seed(client, auth_headers)
+    request = case.prepare(client, auth_headers, seed)
+
+    with query_budget(queries=case.queries, commits=case.commits, label=f"{case.method} {case.route}"):
+        response = request()
+    _ok(response)
+
+
+def test_budget_failure_groups_repeated_statement_shapes(client, auth_headers, query_budget) -> None:
+    _seed(client, auth_headers)
+
+    with pytest.raises(pytest.fail.Exception) as excinfo:
+        with query_budget(queries=3, label="schedule loop"):
+            for weeks_ahead in range(1, _MEMBER_COUNT + 1):
+                client.get(f"/v1/cleaning/schedule?weeks_ahead={weeks_ahead}", headers=auth_headers)
+
+    report = str(excinfo.value)
+    assert report.startswith("schedule loop: query budget exceeded (allowed 3 statements, 0 commits)")
+    assert f"statements, {_MEMBER_COUNT} commits" in report
+    assert "repeated statement shapes (possible N+1):" in report
+    assert f"{_MEMBER_COUNT:>4}x SELECT rotation_config." in report
@@ -3,6 +3,10 @@
 from __future__ import annotations
 
 from datetime import date
+import gzip
+import json
+import sqlite3
+import zlib
 
 
 def _sync_members(client, headers) -> None:
@@ -28,6 +32,26 @@ def test_snapshot_migration_ui_is_available(client) -> None:
     assert 'fetch("v1/members"' in response.text
     assert 'fetch("v1/admin/export"' in response.text
     assert 'fetch("v1/admin/import"' in response.text
+    assert 'fetch("v1/admin/export?format=ndjson&gzip=true"' in response.text
+    assert 'fetch("ui/config"' in response.text
+    assert "test-token" not in response.text
+
+
+def test_migration_ui_is_a_cacheable_asset_with_token_from_config(client) -> None:
+    page = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert page.status_code == 200
+    assert page.headers["content-encoding"] == "gzip"
+    assert page.headers["cache-control"] == "no-cache"
+    etag = page.headers["etag"]
+
+    revalidated = client.get("/", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+
+    config = client.get("/ui/config")
+    assert config.status_code == 200
+    assert config.headers["cache-control"] == "no-store"
+    assert config.json() == {"api_token": "test-token"}
 
 
 def test_snapshot_export_import_roundtrip(client, auth_headers) -> None:
@@ -190,3 +214,418 @@ def test_member_device_mappings_are_persisted_and_roundtrip(client, auth_headers
         "device_tracker.alex_phone",
         "device_tracker.alex_tablet",
     ]
+
+
+def test_snapshot_ndjson_export_matches_json_export(client, auth_headers) -> None:
+    _sync_members(client, auth_headers)
+    assert client.get("/v1/cleaning/current", headers=auth_headers).status_code == 200
+    for index in range(5):
+        response = client.post(
+            "/v1/shopping/items",
+            headers=auth_headers,
+            json={"name": f"Item {index}", "actor_user_id": "u1"},
+        )
+        assert response.status_code == 200
+
+    exported = client.get("/v1/admin/export", headers=auth_headers).json()
+
+    response = client.get("/v1/admin/export?format=ndjson", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+
+    assert records[0]["type"] == "header"
+    assert records[0]["schema_version"] == exported["schema_version"]
+    assert records[-1] == {"type": "summary", "summary": exported["summary"]}
+    rows_by_table: dict[str, list[dict]] = {}
+    for record in records[1:-1]:
+        assert record["type"] == "row"
+        rows_by_table.setdefault(record["table"], []).append(record["row"])
+    assert rows_by_table.pop("rotation_config") == [exported["data"]["rotation_config"]]
+    for table, rows in rows_by_table.items():
+        assert rows == exported["data"][table]
+
+    compressed = client.get("/v1/admin/export?format=ndjson&gzip=true", headers=auth_headers)
+    assert compressed.status_code == 200
+    assert compressed.headers["content-type"] == "application/gzip"
+    assert ".ndjson.gz" in compressed.headers["content-disposition"]
+    lines = gzip.decompress(compressed.content).decode().splitlines()
+    assert [json.loads(line) for line in lines][1:] == records[1:]
+
+
+def _seeded_export(client, headers) -> dict:
+    _sync_members(client, headers)
+    assert client.get("/v1/cleaning/current", headers=headers).status_code == 200
+    for index in range(3):
+        response = client.post(
+            "/v1/shopping/items",
+            headers=headers,
+            json={"name": f"Item {index}", "actor_user_id": "u2"},
+        )
+        assert response.status_code == 200
+    return client.get("/v1/admin/export", headers=headers).json()
+
+
+def test_snapshot_ndjson_import_roundtrip(client, auth_headers) -> None:
+    exported = _seeded_export(client, auth_headers)
+    stream = client.get("/v1/admin/export?format=ndjson&gzip=true", headers=auth_headers).content
+
+    assert client.post("/v1/admin/reset", headers=auth_headers).status_code == 200
+    response = client.post(
+        "/v1/admin/import?format=ndjson",
+        headers={**auth_headers, "content-type": "application/gzip"},
+        content=stream,
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["summary"]["summary"] == exported["summary"]
+    assert body["summary"]["progress"]["rows"] == sum(exported["summary"].values())
+
+    reimported = client.get("/v1/admin/export", headers=auth_headers).json()
+    assert reimported["data"] == exported["data"]
+    items = client.get("/v1/shopping/items", headers=auth_headers).json()
+    assert {row["added_by_member_id"] for row in items} == {2}
+
+
+def test_snapshot_ndjson_import_rejects_truncated_stream(client, auth_headers) -> None:
+    _seeded_export(client, auth_headers)
+    lines = client.get("/v1/admin/export?format=ndjson", headers=auth_headers).text.splitlines()
+    truncated = "\n".join(lines[:-3] + lines[-1:]) + "\n"
+
+    response = client.post(
+        "/v1/admin/import?format=ndjson",
+        headers={**auth_headers, "content-type": "application/x-ndjson"},
+        content=truncated,
+    )
+    assert response.status_code == 400
+    assert "incomplete" in response.json()["detail"]
+    # The failed import rolled back, so the previous data is untouched.
+    assert len(client.get("/v1/shopping/items", headers=auth_headers).json()) == 3
+
+
+def _commit_member_from_other_connection(tmp_path, name: str) -> None:
+    with sqlite3.connect(tmp_path / "test.db") as conn:
+        conn.execute("UPDATE data_version SET version = version + 1 WHERE id = 1")
+        conn.execute(
+            "INSERT INTO members (display_name, notify_services, device_trackers, active, created_at, updated_at, "
+            "updated_version) VALUES (?, '[]', '[]', 1, '2026-01-01 00:00:00', '2026-01-01 00:00:00', "
+            "(SELECT version FROM data_version))",
+            (name,),
+        )
+
+
+def test_snapshot_ndjson_stream_reads_one_database_state(client, auth_headers, tmp_path) -> None:
+    from app import db
+    from app.services import snapshot
+
+    _seeded_export(client, auth_headers)
+    with db.new_session() as session:
+        stream = snapshot.iter_snapshot_ndjson(session, batch_size=1)
+        header = json.loads(next(stream))
+        # Another connection commits a member before the members table is streamed.
+        _commit_member_from_other_connection(tmp_path, "Late")
+        records = [json.loads(line) for chunk in stream for line in chunk.splitlines()]
+
+    names = [record["row"]["display_name"] for record in records if record.get("table") == "members"]
+    assert names == ["Alex", "Sam", "Pat"]
+    assert records[-1]["summary"]["members"] == 3
+    assert client.get("/v1/admin/export", headers=auth_headers).json()["version"] == header["version"] + 1
+
+
+def test_snapshot_json_import_reports_batch_progress(client, auth_headers) -> None:
+    snapshot = {
+        "schema_version": 1,
+        "data": {
+            "members": [{"id": 1, "display_name": "Alex", "ha_user_id": "u1"}],
+            "activity_events": [
+                {
+                    "id": index,
+                    "domain": "shopping",
+                    "action": "shopping_item_added",
+                    "payload_json": {"name": f"Item {index}"},
+                    "created_at": "2026-01-01T10:00:00+00:00",
+                }
+                for index in range(1, 12001)
+            ],
+        },
+    }
+    response = client.post("/v1/admin/import", headers=auth_headers, json={"snapshot": snapshot})
+    assert response.status_code == 200
+    result = response.json()["summary"]
+    assert result["summary"]["activity_events"] == 12000
+    assert result["progress"]["batches"] == 4
+    members = client.get("/v1/members", headers=auth_headers).json()
+    assert [row["display_name"] for row in members] == ["Alex"]
+
+
+def test_snapshot_binary_export_roundtrips_json_snapshot(client, auth_headers) -> None:
+    from app.services import snapshot_binary
+
+    _seeded_export(client, auth_headers)
+    for index in range(40):
+        client.post("/v1/shopping/items", headers=auth_headers, json={"name": f"Extra {index}", "actor_user_id": "u1"})
+    exported = client.get("/v1/admin/export", headers=auth_headers).json()
+    response = client.get("/v1/admin/export?format=binary", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == snapshot_binary.MEDIA_TYPE
+    body = response.content
+    assert len(body) < len(json.dumps(exported))
+
+    decoded = snapshot_binary.decode_snapshot(body)
+    assert decoded["schema_version"] == exported["schema_version"]
+    assert decoded["summary"] == exported["summary"]
+    assert decoded["data"] == exported["data"]
+
+    assert client.post("/v1/admin/reset", headers=auth_headers).status_code == 200
+    imported = client.post(
+        "/v1/admin/import?format=binary",
+        headers={**auth_headers, "content-type": snapshot_binary.MEDIA_TYPE},
+        content=body,
+    )
+    assert imported.status_code == 200
+    assert client.get("/v1/admin/export", headers=auth_headers).json()["data"] == exported["data"]
+
+
+def test_snapshot_binary_keeps_strings_that_only_parse_as_dates(client, auth_headers) -> None:
+    from app.services import snapshot_binary
+
+    _sync_members(client, auth_headers)
+    for name in ("2024-W01-1", "20240101"):
+        assert client.post("/v1/admin/reset", headers=auth_headers).status_code == 200
+        response = client.post("/v1/shopping/items", headers=auth_headers, json={"name": name, "actor_user_id": "u1"})
+        assert response.status_code == 200
+
+        exported = client.get("/v1/admin/export", headers=auth_headers).json()
+        decoded = snapshot_binary.decode_snapshot(snapshot_binary.encode_snapshot(exported))
+        assert [row["name"] for row in decoded["data"]["shopping_items"]] == [name]
+        assert decoded["data"] == exported["data"]
+
+
+def test_snapshot_binary_import_rejects_corrupted_table(client, auth_headers) -> None:
+    from app.services import snapshot_binary
+
+    body = snapshot_binary.encode_snapshot(_seeded_export(client, auth_headers))
+
+    # Swap the last table block for a valid zlib stream whose checksum does not match.
+    prefix = len(snapshot_binary.MAGIC)
+    header_length = int.from_bytes(body[prefix : prefix + 4], "big")
+    header = json.loads(zlib.decompress(body[prefix + 4 : prefix + 4 + header_length]))
+    blocks = body[prefix + 4 + header_length :]
+    kept_blocks = blocks[: len(blocks) - header["tables"][-1]["length"]]
+    tampered_block = zlib.compress(b'{"columns": {}, "missing": null}')
+    header["tables"][-1]["length"] = len(tampered_block)
+    tampered_header = zlib.compress(json.dumps(header).encode())
+    tampered = (
+        snapshot_binary.MAGIC
+        + len(tampered_header).to_bytes(4, "big")
+        + tampered_header
+        + kept_blocks
+        + tampered_block
+    )
+
+    response = client.post("/v1/admin/import?format=binary", headers=auth_headers, content=tampered)
+    assert response.status_code == 400
+    assert "checksum" in response.json()["detail"]
+    # The rejected import did not touch existing data.
+    assert len(client.get("/v1/shopping/items", headers=auth_headers).json()) == 3
+
+    garbage = client.post("/v1/admin/import?format=binary", headers=auth_headers, content=b"not a snapshot")
+    assert garbage.status_code == 400
+
+
+def test_snapshot_delta_export_applies_on_top_of_base(client, auth_headers) -> None:
+    base = _seeded_export(client, auth_headers)
+    assert base["since"] is None
+    item_id = base["data"]["shopping_items"][0]["id"]
+
+    complete = client.post(
+        f"/v1/shopping/items/{item_id}/complete",
+        headers=auth_headers,
+        json={"actor_user_id": "u1"},
+    )
+    assert complete.status_code == 200
+    added = client.post("/v1/shopping/items", headers=auth_headers, json={"name": "Delta", "actor_user_id": "u1"})
+    assert added.status_code == 200
+
+    delta = client.get(f"/v1/admin/export?since={base['version']}", headers=auth_headers).json()
+    assert delta["since"] == base["version"]
+    assert delta["version"] > base["version"]
+    assert delta["deleted"] == {}
+    assert delta["data"]["members"] == []
+    assert delta["data"]["rotation_config"] is None
+    assert sorted(item["name"] for item in delta["data"]["shopping_items"]) == ["Delta", "Item 0"]
+    assert len(delta["data"]["activity_events"]) == 2
+    expected = client.get("/v1/admin/export", headers=auth_headers).json()["data"]
+
+    restore_base = client.post("/v1/admin/import", headers=auth_headers, json={"snapshot": base})
+    assert restore_base.status_code == 200
+    apply_delta = client.post("/v1/admin/import", headers=auth_headers, json={"snapshot": delta})
+    assert apply_delta.status_code == 200
+    assert apply_delta.json()["summary"]["delta"]["since"] == base["version"]
+    assert client.get("/v1/admin/export", headers=auth_headers).json()["data"] == expected
+
+    # The instance now sits at the delta's version, so the same delta no longer applies.
+    reapply = client.post("/v1/admin/import", headers=auth_headers, json={"snapshot": delta})
+    assert reapply.status_code == 400
+    assert "last loaded from version" in reapply.json()["detail"]
+
+
+def test_snapshot_delta_import_removes_deleted_rows(client, auth_headers) -> None:
+    base = _seeded_export(client, auth_headers)
+    assert client.post("/v1/admin/import", headers=auth_headers, json={"snapshot": base}).status_code == 200
+    removed_id = base["data"]["shopping_items"][1]["id"]
+
+    lines = [
+        {"type": "header", "schema_version": 1, "version": base["version"] + 1, "since": base["version"]},
+        {"type": "deleted", "table": "shopping_items", "keys": [str(removed_id)]},
+    ]
+    response = client.post(
+        "/v1/admin/import?format=ndjson",
+        headers={**auth_headers, "content-type": "application/x-ndjson"},
+        content="\n".join(json.dumps(line) for line in lines).encode(),
+    )
+    assert response.status_code == 200
+    assert response.json()["summary"]["delta"]["deleted"] == {"shopping_items": 1}
+
+    items = client.get("/v1/admin/export", headers=auth_headers).json()["data"]["shopping_items"]
+    assert removed_id not in {item["id"] for item in items}
+    assert len(items) == len(base["data"]["shopping_items"]) - 1
+
+
+def test_snapshot_delta_export_falls_back_to_full_after_reset(client, auth_headers) -> None:
+    base = _seeded_export(client, auth_headers)
+    assert client.post("/v1/admin/reset", headers=auth_headers).status_code == 200
+    _sync_members(client, auth_headers)
+
+    export = client.get(f"/v1/admin/export?since={base['version']}", headers=auth_headers).json()
+    assert export["since"] is None
+    assert "deleted" not in export
+    assert len(export["data"]["members"]) == 3
+
+    ahead = client.get(f"/v1/admin/export?since={export['version'] + 1}", headers=auth_headers)
+    assert ahead.status_code == 400
+
+
+def test_digest_pinpoints_differing_ranges_and_rows(client, auth_headers) -> None:
+    _seeded_export(client, auth_headers)
+    builds = client.get("/v1/admin/diagnostics", headers=auth_headers).json()["table_digests"]["full_builds"]
+    before = client.get("/v1/admin/digest", headers=auth_headers).json()
+    assert client.get("/v1/admin/digest", headers=auth_headers).json() == before
+
+    items = client.get("/v1/shopping/items", headers=auth_headers).json()
+    changed = client.post(
+        f"/v1/shopping/items/{items[0]['id']}/complete",
+        headers=auth_headers,
+        json={"actor_user_id": "u1"},
+    )
+    assert changed.status_code == 200
+
+    after = client.get("/v1/admin/digest", headers=auth_headers).json()
+    assert after["root"] != before["root"]
+    assert after["tables"]["members"] == before["tables"]["members"]
+    diagnostics = client.get("/v1/admin/diagnostics", headers=auth_headers).json()["table_digests"]
+    assert diagnostics["full_builds"] == builds + 1
+    assert diagnostics["buckets_rehashed"] >= 1
+
+    comparison = client.post("/v1/admin/digest/compare", headers=auth_headers, json={"left": before}).json()
+    assert comparison["identical"] is False
+    assert set(comparison["tables"]) == {"activity_events", "shopping_items"}
+    (item_range,) = comparison["tables"]["shopping_items"]["ranges"]
+    assert item_range["start"] <= items[0]["id"] <= item_range["end"]
+
+    bucket = item_range["bucket"]
+    detail = client.get(f"/v1/admin/digest?table=shopping_items&bucket={bucket}", headers=auth_headers).json()
+    tampered = json.loads(json.dumps(detail))
+    row_hashes = tampered["tables"]["shopping_items"]["buckets"][0]["row_hashes"]
+    row_hashes[str(items[0]["id"])] = "0" * 64
+    tampered["tables"]["shopping_items"]["hash"] = "0" * 64
+    tampered["tables"]["shopping_items"]["buckets"][0]["hash"] = "0" * 64
+    rows_diff = client.post(
+        "/v1/admin/digest/compare",
+        headers=auth_headers,
+        json={"left": tampered, "right": detail},
+    ).json()
+    assert rows_diff["tables"]["shopping_items"]["ranges"][0]["keys"] == [str(items[0]["id"])]
+
+    assert client.post("/v1/admin/digest/compare", headers=auth_headers, json={"left": after}).json() == {
+        "identical": True,
+        "tables": {},
+    }
+
+
+def test_digest_reads_version_and_rows_from_one_database_state(
+    client, auth_headers, tmp_path, monkeypatch
+) -> None:
+    from app.services import digest
+
+    _seeded_export(client, auth_headers)
+    read_version = digest.current_versions
+
+    def version_then_concurrent_write(session):
+        versions = read_version(session)
+        _commit_member_from_other_connection(tmp_path, "Late")
+        return versions
+
+    monkeypatch.setattr(digest, "current_versions", version_then_concurrent_write)
+    first = client.get("/v1/admin/digest", headers=auth_headers).json()
+    monkeypatch.setattr(digest, "current_versions", read_version)
+
+    assert first["tables"]["members"]["rows"] == 3
+    second = client.get("/v1/admin/digest", headers=auth_headers).json()
+    assert second["version"] == first["version"] + 1
+    assert second["tables"]["members"]["rows"] == 4
+
+
+def test_snapshot_dry_run_reports_all_row_errors_without_writing(client, auth_headers) -> None:
+    exported = _seeded_export(client, auth_headers)
+    broken = json.loads(json.dumps(exported))
+    items = broken["data"]["shopping_items"]
+    items[0]["added_at"] = "yesterday"
+    items.append(dict(items[1]))
+    broken["data"]["activity_events"].append("not an object")
+
+    response = client.post("/v1/admin/import?dry_run=true", headers=auth_headers, json={"snapshot": broken})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["ok"] is False
+    assert body["dry_run"] is True
+    errors = {(error["section"], error["line"]): error["message"] for error in body["errors"]}
+    assert set(errors) == {
+        ("shopping_items", 1),
+        ("shopping_items", len(items)),
+        ("activity_events", len(broken["data"]["activity_events"])),
+    }
+    assert "repeats key" in errors[("shopping_items", len(items))]
+
+    merge = client.post(
+        "/v1/admin/import?dry_run=true",
+        headers=auth_headers,
+        json={"snapshot": exported, "replace_existing": False},
+    ).json()
+    assert merge["ok"] is False
+    assert all("conflicts with existing key" in error["message"] for error in merge["errors"])
+
+    clean = client.post("/v1/admin/import?dry_run=true", headers=auth_headers, json={"snapshot": exported}).json()
+    assert clean["ok"] is True
+    assert clean["summary"]["summary"]["shopping_items"] == len(exported["data"]["shopping_items"])
+    assert client.get("/v1/admin/export", headers=auth_headers).json()["data"] == exported["data"]
+
+
+def test_snapshot_dry_run_reports_rows_with_missing_or_malformed_integers(client, auth_headers) -> None:
+    exported = _seeded_export(client, auth_headers)
+    broken = json.loads(json.dumps(exported))
+    week_start = broken["data"]["cleaning_assignments"][0]["week_start"]
+    override = {"id": 1, "week_start": week_start, "type": "manual_swap", "source": "manual", "status": "planned"}
+    broken["data"]["cleaning_overrides"] = [{**override, "member_to_id": 2}]
+    broken["data"]["shopping_items"][0]["added_by_member_id"] = ["1"]
+
+    response = client.post("/v1/admin/import?dry_run=true", headers=auth_headers, json={"snapshot": broken})
+    assert response.status_code == 200
+    errors = {(error["section"], error["line"]): error["message"] for error in response.json()["errors"]}
+    assert errors == {
+        ("cleaning_overrides", 1): "cleaning_overrides.member_from_id must be an integer",
+        ("shopping_items", 1): "shopping_items.added_by_member_id must be an integer",
+    }
+
+    imported = client.post("/v1/admin/import", headers=auth_headers, json={"snapshot": broken})
+    assert imported.status_code == 400
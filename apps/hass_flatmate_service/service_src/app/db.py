@@ -1,33 +1,289 @@
-"""Database engine and session management."""
+"""Database engine and session management.
+
+The primary database is configured from ``settings``. When several
+households share the process (see ``app.tenants``), a request authenticated
+with a tenant token runs inside ``use_tenant`` and sessions, the engine and
+every ``TenantLocal`` cache resolve to that tenant's own SQLite file.
+"""
 
 from __future__ import annotations
 
-from collections.abc import Generator
+import asyncio
+from collections.abc import Awaitable, Callable, Generator, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+import logging
 from pathlib import Path
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
 
-from sqlalchemy import create_engine
-from sqlalchemy.engine import Engine
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 from .settings import settings
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+
+_LOGGER = logging.getLogger(__name__)
 
 Base = declarative_base()
 
 engine: Engine | None = None
 SessionLocal: sessionmaker[Session] | None = None
 
+# Only populated when HASS_FLATMATE_ASYNC_DB is enabled; see configure_async_engine().
+async_engine: AsyncEngine | None = None
+AsyncSessionLocal: async_sessionmaker[AsyncSession] | None = None
+
+_T = TypeVar("_T")
+
+
+def _is_file_backed_sqlite(url: Any) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def sqlite_pragmas() -> list[str]:
+    """Return the per-connection pragmas for the configured SQLite storage profile."""
+
+    if not settings.sqlite_tuning_enabled:
+        return []
+    return [
+        f"PRAGMA journal_mode={settings.sqlite_journal_mode}",
+        f"PRAGMA synchronous={settings.sqlite_synchronous}",
+        f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}",
+        # Negative cache_size is interpreted by SQLite as KiB instead of pages.
+        f"PRAGMA cache_size=-{settings.sqlite_cache_size_kib}",
+        f"PRAGMA mmap_size={settings.sqlite_mmap_size_bytes}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+
+
+def _install_sqlite_pragmas(target: Engine, pragmas: list[str]) -> None:
+    @event.listens_for(target, "connect")
+    def _apply_pragmas(dbapi_connection: Any, _connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def create_sqlite_engine(db_url: str) -> Engine:
+    """Create a sync engine with the configured connection pragmas installed."""
+
+    created = create_engine(
+        db_url,
+        connect_args={
+            "check_same_thread": False,
+            "timeout": settings.sqlite_busy_timeout_ms / 1000,
+        },
+        future=True,
+    )
+    if _is_file_backed_sqlite(created.url):
+        pragmas = sqlite_pragmas()
+        if pragmas:
+            _install_sqlite_pragmas(created, pragmas)
+        _install_restore_gate(created)
+    return created
+
+
+def _sessionmaker(bind: Engine) -> sessionmaker[Session]:
+    return sessionmaker(bind=bind, autoflush=False, autocommit=False, future=True)
+
 
 def configure_engine(db_url: str | None = None) -> None:
     """Initialize SQLAlchemy engine/sessionmaker for the given database URL."""
 
     global engine, SessionLocal
-    engine = create_engine(
-        db_url or settings.db_url,
-        connect_args={"check_same_thread": False},
-        future=True,
+    engine = create_sqlite_engine(db_url or settings.db_url)
+    SessionLocal = _sessionmaker(engine)
+    configure_async_engine(db_url or settings.db_url)
+
+
+def configure_async_engine(db_url: str) -> None:
+    """Create the aiosqlite engine used by async read endpoints, when enabled.
+
+    The previous async engine (if any) is dropped without awaiting its disposal;
+    call ``dispose_async_engine`` from the event loop that used it first.
+    """
+
+    global async_engine, AsyncSessionLocal
+    async_engine = None
+    AsyncSessionLocal = None
+    if not settings.async_db_enabled:
+        return
+
+    try:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        import aiosqlite  # noqa: F401
+    except ImportError as exc:
+        raise RuntimeError(
+            "HASS_FLATMATE_ASYNC_DB requires the optional 'async' dependencies (aiosqlite)"
+        ) from exc
+
+    url = make_url(db_url)
+    if url.get_backend_name() != "sqlite":
+        raise RuntimeError("HASS_FLATMATE_ASYNC_DB is only supported for SQLite databases")
+    async_engine = create_async_engine(
+        url.set(drivername="sqlite+aiosqlite"),
+        connect_args={"timeout": settings.sqlite_busy_timeout_ms / 1000},
     )
-    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    if _is_file_backed_sqlite(async_engine.url):
+        pragmas = sqlite_pragmas()
+        if pragmas:
+            _install_sqlite_pragmas(async_engine.sync_engine, pragmas)
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+
+async def dispose_async_engine() -> None:
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+def dispose_async_engine_from_thread(loop: asyncio.AbstractEventLoop | None) -> None:
+    """Dispose the async engine from a worker thread, on the event loop that uses it."""
+
+    if async_engine is not None and loop is not None:
+        asyncio.run_coroutine_threadsafe(dispose_async_engine(), loop).result()
+
+
+async def run_read(
+    sync_read: Callable[[Session], _T],
+    async_read: Callable[[AsyncSession], Awaitable[_T]],
+) -> _T:
+    """Run a read-only query on the async engine when enabled, else in the threadpool.
+
+    Both callables must return fully loaded values; the session is closed before
+    the result is handed back to the endpoint.
+    """
+
+    # Tenant databases only have a sync engine. During a restore the sync path
+    # waits for the swap instead.
+    if AsyncSessionLocal is not None and _current_tenant.get() is None and _enter_async_read():
+        try:
+            async with AsyncSessionLocal() as session:
+                return await async_read(session)
+        finally:
+            _leave_async_read()
+    return await run_in_threadpool(_run_sync_read, sync_read)
+
+
+def _run_sync_read(sync_read: Callable[[Session], _T]) -> _T:
+    with new_session() as session:
+        return sync_read(session)
+
+
+def optimize(target: Engine | None = None) -> None:
+    """Let SQLite refresh query planner statistics; intended to run before closing."""
+
+    target = target or engine
+    if target is None or not settings.sqlite_tuning_enabled or not _is_file_backed_sqlite(target.url):
+        return
+    try:
+        with target.connect() as conn:
+            conn.execute(text("PRAGMA optimize"))
+    except SQLAlchemyError as exc:
+        _LOGGER.warning("PRAGMA optimize failed: %s", exc)
+
+
+def is_lock_error(exc: BaseException) -> bool:
+    """Return whether a database error means SQLite gave up waiting for a lock."""
+
+    message = str(getattr(exc, "orig", None) or exc).lower()
+    return "database is locked" in message or "database table is locked" in message
+
+
+def begin_read_snapshot(session: Session) -> None:
+    """Make the session's following reads see one consistent database state.
+
+    pysqlite only opens a transaction before data-changing statements, so
+    plain SELECTs each read whatever is committed when they run. An explicit
+    ``BEGIN`` pins SQLite's read snapshot at the next SELECT until the session
+    commits, rolls back or closes; in WAL mode writers are not blocked.
+    """
+
+    connection = session.connection()
+    if not connection.connection.dbapi_connection.in_transaction:
+        connection.exec_driver_sql("BEGIN")
+
+
+# Database files being swapped by a restore, and async reads of the primary
+# database in flight; see restore_gate().
+_restore_condition = threading.Condition()
+_restoring: set[str] = set()
+_async_reads = 0
+_restore_owner: ContextVar[bool] = ContextVar("hass_flatmate_restore_owner", default=False)
+
+
+def _restore_key(url: URL) -> str:
+    return str(url.database)
+
+
+def _install_restore_gate(target: Engine) -> None:
+    key = _restore_key(target.url)
+
+    @event.listens_for(target, "checkout")
+    def _wait_for_restore(_dbapi_connection: Any, _connection_record: Any, _connection_proxy: Any) -> None:
+        # Counted as checked out before this runs, so a restore that closes the
+        # gate afterwards still sees the connection as in use.
+        if key not in _restoring or _restore_owner.get():
+            return
+        with _restore_condition:
+            _restore_condition.wait_for(lambda: key not in _restoring)
+
+
+def _enter_async_read() -> bool:
+    global _async_reads
+    assert async_engine is not None
+    with _restore_condition:
+        if _restore_key(async_engine.url) in _restoring:
+            return False
+        _async_reads += 1
+        return True
+
+
+def _leave_async_read() -> None:
+    global _async_reads
+    with _restore_condition:
+        _async_reads -= 1
+
+
+def async_reads_in_flight() -> int:
+    """Async reads of the primary database that have started and not finished."""
+
+    with _restore_condition:
+        return _async_reads
+
+
+@contextmanager
+def restore_gate(target: Engine) -> Iterator[None]:
+    """Hold new connections to ``target``'s database file until the block exits.
+
+    Checkouts from any other context wait until the gate opens again; async
+    reads of the primary database take the sync path and wait there. The
+    block itself keeps connecting. Connections already checked out are not
+    affected, so callers check ``target.pool.checkedout()`` and
+    ``async_reads_in_flight()`` after entering.
+    """
+
+    key = _restore_key(target.url)
+    with _restore_condition:
+        _restoring.add(key)
+    token = _restore_owner.set(True)
+    try:
+        yield
+    finally:
+        _restore_owner.reset(token)
+        with _restore_condition:
+            _restoring.discard(key)
+            _restore_condition.notify_all()
 
 
 def ensure_db_dir() -> None:
@@ -37,13 +293,96 @@ def ensure_db_dir() -> None:
     parent.mkdir(parents=True, exist_ok=True)
 
 
-def get_session() -> Generator[Session, None, None]:
-    """Yield a database session dependency."""
+class TenantDatabase:
+    """An open tenant database: its engine, sessions and per-tenant objects."""
+
+    def __init__(self, tenant_id: str, bind: Engine, kept: dict[Any, Any] | None = None) -> None:
+        self.tenant_id = tenant_id
+        self.engine = bind
+        self.session_factory = _sessionmaker(bind)
+        self.last_used = time.monotonic()
+        self.in_use = 0
+        self._lock = threading.Lock()
+        self._locals: dict[Any, Any] = {}
+        self._kept = kept if kept is not None else {}
+
+    def local(self, key: Any, factory: Callable[[], _T], *, keep: bool) -> _T:
+        with self._lock:
+            store = self._kept if keep else self._locals
+            value = store.get(key)
+            if value is None:
+                value = store[key] = factory()
+            return value
+
 
+_current_tenant: ContextVar[TenantDatabase | None] = ContextVar("hass_flatmate_tenant", default=None)
+
+
+def current_tenant() -> TenantDatabase | None:
+    """The tenant database of the current request, or ``None`` for the primary one."""
+
+    return _current_tenant.get()
+
+
+@contextmanager
+def use_tenant(database: TenantDatabase) -> Iterator[TenantDatabase]:
+    token = _current_tenant.set(database)
+    try:
+        yield database
+    finally:
+        _current_tenant.reset(token)
+
+
+def current_engine() -> Engine:
+    tenant = _current_tenant.get()
+    if tenant is not None:
+        return tenant.engine
+    if engine is None:
+        configure_engine()
+    assert engine is not None
+    return engine
+
+
+def new_session() -> Session:
+    """Open a session on the current request's database."""
+
+    tenant = _current_tenant.get()
+    if tenant is not None:
+        return tenant.session_factory()
     if SessionLocal is None:
         configure_engine()
     assert SessionLocal is not None
-    session = SessionLocal()
+    return SessionLocal()
+
+
+class TenantLocal(Generic[_T]):
+    """A process-wide object with a separate instance per tenant database.
+
+    Attribute access is forwarded to the instance of the tenant bound by
+    ``use_tenant``, or to the primary instance outside tenant requests. With
+    ``keep=True`` a tenant's instance survives its engine being evicted from
+    the pool (metrics); otherwise it is dropped with the engine (caches).
+    """
+
+    def __init__(self, factory: Callable[[], _T], *, keep: bool = False) -> None:
+        self._factory = factory
+        self._keep = keep
+        self._primary = factory()
+
+    def resolve(self) -> _T:
+        tenant = _current_tenant.get()
+        if tenant is None:
+            return self._primary
+        return tenant.local(self, self._factory, keep=self._keep)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.resolve(), name)
+
+
+def get_session() -> Generator[Session, None, None]:
+    """Yield a database session dependency."""
+
+    session = new_session()
     try:
         yield session
     finally:
@@ -0,0 +1,324 @@
+"""Per-request performance metrics in Prometheus text format.
+
+``MetricsMiddleware`` times every HTTP request by route template and records
+the response size and status. SQLAlchemy engine events attribute SQL
+statement counts, statement time, commits and SQLite lock timeouts to the request whose context
+issued them (threadpool endpoints inherit the request context). The most
+recent requests are kept in a bounded window from which the slowest are
+reported.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import heapq
+import threading
+import time
+from typing import Any, cast
+
+from anyio import to_thread
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .db import TenantLocal, is_lock_error
+from .settings import settings
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+UNMATCHED_ROUTE = "<unmatched>"
+
+_PREFIX = "hass_flatmate_"
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+_STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+_RECENT_WINDOW = 1000
+_STARTED_KEY = "hass_flatmate_statement_started"
+
+
+@dataclass
+class _RequestStats:
+    statements: int = 0
+    sql_seconds: float = 0.0
+    commits: int = 0
+    lock_errors: int = 0
+
+
+_current: ContextVar[_RequestStats | None] = ContextVar("hass_flatmate_request_stats", default=None)
+
+
+@dataclass
+class _Histogram:
+    buckets: tuple[float, ...]
+    counts: list[int] = field(default_factory=list)
+    total: float = 0.0
+    count: int = 0
+
+    def __post_init__(self) -> None:
+        self.counts = [0] * len(self.buckets)
+
+    def observe(self, value: float) -> None:
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+        self.total += value
+        self.count += 1
+
+
+@dataclass
+class _RouteMetrics:
+    latency: _Histogram = field(default_factory=lambda: _Histogram(_LATENCY_BUCKETS))
+    response_bytes: _Histogram = field(default_factory=lambda: _Histogram(_SIZE_BUCKETS))
+    statements: _Histogram = field(default_factory=lambda: _Histogram(_STATEMENT_BUCKETS))
+    sql_seconds: float = 0.0
+    commits: int = 0
+    lock_errors: int = 0
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: Any) -> str:
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class RequestMetrics:
+    """Request and SQL metrics of one tenant, plus process-wide threadpool gauges."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._routes: dict[tuple[str, str], _RouteMetrics] = {}
+        self._requests: dict[tuple[str, str, int], int] = {}
+        self._recent: deque[dict[str, Any]] = deque(maxlen=_RECENT_WINDOW)
+        self._in_progress = 0
+        self._threadpool_waiting_max = 0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes = {}
+            self._requests = {}
+            self._recent.clear()
+            self._threadpool_waiting_max = 0
+
+    def _started(self) -> None:
+        waiting = to_thread.current_default_thread_limiter().statistics().tasks_waiting
+        with self._lock:
+            self._in_progress += 1
+            self._threadpool_waiting_max = max(self._threadpool_waiting_max, waiting)
+
+    def _finished(
+        self,
+        *,
+        method: str,
+        route: str,
+        path: str,
+        status: int,
+        seconds: float,
+        response_bytes: int,
+        stats: _RequestStats,
+    ) -> None:
+        with self._lock:
+            self._in_progress -= 1
+            route_metrics = self._routes.setdefault((method, route), _RouteMetrics())
+            route_metrics.latency.observe(seconds)
+            route_metrics.response_bytes.observe(response_bytes)
+            route_metrics.statements.observe(stats.statements)
+            route_metrics.sql_seconds += stats.sql_seconds
+            route_metrics.commits += stats.commits
+            route_metrics.lock_errors += stats.lock_errors
+            key = (method, route, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            self._recent.append(
+                {
+                    "method": method,
+                    "route": route,
+                    "path": path,
+                    "status": status,
+                    "duration_ms": round(seconds * 1000, 3),
+                    "sql_statements": stats.statements,
+                    "sql_ms": round(stats.sql_seconds * 1000, 3),
+                    "commits": stats.commits,
+                    "response_bytes": response_bytes,
+                    "finished_at": datetime.now(timezone.utc).isoformat(),
+                }
+            )
+
+    def slowest(self, limit: int | None = None) -> list[dict[str, Any]]:
+        """Return the slowest of the most recent requests, slowest first."""
+
+        with self._lock:
+            recent = list(self._recent)
+        return heapq.nlargest(limit or settings.metrics_slow_requests, recent, key=lambda entry: entry["duration_ms"])
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format.
+
+        Reads the threadpool limiter, so it must be called from the event loop.
+        """
+
+        limiter = to_thread.current_default_thread_limiter()
+        limiter_stats = limiter.statistics()
+        with self._lock:
+            routes = sorted(self._routes.items())
+            requests = sorted(self._requests.items())
+            in_progress = self._in_progress
+            waiting_max = self._threadpool_waiting_max
+        slowest = self.slowest()
+
+        lines: list[str] = []
+
+        def header(name: str, kind: str, description: str) -> str:
+            lines.append(f"# HELP {_PREFIX}{name} {description}")
+            lines.append(f"# TYPE {_PREFIX}{name} {kind}")
+            return _PREFIX + name
+
+        def histogram(name: str, description: str, attribute: str) -> None:
+            metric = header(name, "histogram", description)
+            for (method, route), route_metrics in routes:
+                values: _Histogram = getattr(route_metrics, attribute)
+                for bound, count in zip(values.buckets, values.counts):
+                    lines.append(f"{metric}_bucket{_labels(method=method, route=route, le=_number(bound))} {count}")
+                lines.append(f"{metric}_bucket{_labels(method=method, route=route, le='+Inf')} {values.count}")
+                lines.append(f"{metric}_sum{_labels(method=method, route=route)} {_number(values.total)}")
+                lines.append(f"{metric}_count{_labels(method=method, route=route)} {values.count}")
+
+        metric = header("http_requests_total", "counter", "HTTP requests by route template and status.")
+        for (method, route, status), count in requests:
+            lines.append(f"{metric}{_labels(method=method, route=route, status=status)} {count}")
+        metric = header("http_requests_in_progress", "gauge", "HTTP requests currently being handled.")
+        lines.append(f"{metric} {in_progress}")
+        histogram("http_request_duration_seconds", "HTTP request latency until the response is complete.", "latency")
+        histogram("http_response_size_bytes", "HTTP response body size as sent (after compression).", "response_bytes")
+        histogram("db_statements_per_request", "SQL statements executed per HTTP request.", "statements")
+
+        metric = header("db_statements_total", "counter", "SQL statements executed while handling requests.")
+        for (method, route), route_metrics in routes:
+            lines.append(f"{metric}{_labels(method=method, route=route)} {int(route_metrics.statements.total)}")
+        metric = header("db_statement_seconds_total", "counter", "Time spent executing SQL statements.")
+        for (method, route), route_metrics in routes:
+            lines.append(f"{metric}{_labels(method=method, route=route)} {_number(route_metrics.sql_seconds)}")
+        metric = header("db_commits_total", "counter", "Database commits issued while handling requests.")
+        for (method, route), route_metrics in routes:
+            lines.append(f"{metric}{_labels(method=method, route=route)} {route_metrics.commits}")
+        metric = header("db_lock_errors_total", "counter", "SQL statements that timed out waiting for the SQLite lock.")
+        for (method, route), route_metrics in routes:
+            lines.append(f"{metric}{_labels(method=method, route=route)} {route_metrics.lock_errors}")
+
+        metric = header("threadpool_threads_busy", "gauge", "Worker threads running sync endpoints and reads.")
+        lines.append(f"{metric} {limiter_stats.borrowed_tokens}")
+        metric = header("threadpool_threads_limit", "gauge", "Size of the worker thread pool.")
+        lines.append(f"{metric} {_number(limiter_stats.total_tokens)}")
+        metric = header("threadpool_queue_depth", "gauge", "Tasks waiting for a worker thread.")
+        lines.append(f"{metric} {limiter_stats.tasks_waiting}")
+        metric = header("threadpool_queue_depth_max", "gauge", "Most tasks seen waiting for a thread at request start.")
+        lines.append(f"{metric} {waiting_max}")
+
+        metric = header(
+            "slow_request_duration_seconds",
+            "gauge",
+            f"Slowest of the last {_RECENT_WINDOW} requests, ranked from 1.",
+        )
+        for rank, entry in enumerate(slowest, start=1):
+            labels = _labels(
+                rank=rank,
+                method=entry["method"],
+                route=entry["route"],
+                path=entry["path"],
+                status=entry["status"],
+                sql_statements=entry["sql_statements"],
+            )
+            lines.append(f"{metric}{labels} {_number(entry['duration_ms'] / 1000)}")
+
+        return "\n".join(lines) + "\n"
+
+
+# Kept per tenant across engine evictions, so each household's token scrapes its own series.
+request_metrics = cast(RequestMetrics, TenantLocal(RequestMetrics, keep=True))
+
+
+class MetricsMiddleware:
+    """Record latency, response size and SQL work of every HTTP request."""
+
+    def __init__(self, app: ASGIApp, metrics: RequestMetrics = request_metrics) -> None:
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = _RequestStats()
+        token = _current.set(stats)
+        status = 500
+        response_bytes = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        self.metrics._started()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            seconds = time.perf_counter() - started
+            _current.reset(token)
+            route = scope.get("route")
+            self.metrics._finished(
+                method=scope["method"],
+                route=getattr(route, "path", None) or UNMATCHED_ROUTE,
+                path=scope["path"],
+                status=status,
+                seconds=seconds,
+                response_bytes=response_bytes,
+                stats=stats,
+            )
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn: Any, *_args: Any) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault(_STARTED_KEY, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn: Any, *_args: Any) -> None:
+    stats = _current.get()
+    started = conn.info.get(_STARTED_KEY)
+    if stats is None or not started:
+        return
+    stats.statements += 1
+    stats.sql_seconds += time.perf_counter() - started.pop()
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context: Any) -> None:
+    stats = _current.get()
+    connection = exception_context.connection
+    started = connection.info.get(_STARTED_KEY) if connection is not None else None
+    if stats is None or not started:
+        return
+    stats.statements += 1
+    stats.sql_seconds += time.perf_counter() - started.pop()
+    if is_lock_error(exception_context.original_exception):
+        stats.lock_errors += 1
+
+
+@event.listens_for(Engine, "commit")
+def _commit(_conn: Any) -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.commits += 1
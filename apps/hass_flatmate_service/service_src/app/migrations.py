@@ -0,0 +1,179 @@
+"""Versioned schema migrations applied at service startup.
+
+Each migration runs at most once per database. Pending steps are applied in
+order inside a single ``BEGIN IMMEDIATE`` transaction, so a failed step leaves
+the schema untouched and concurrent starters serialize on SQLite's writer lock.
+When the database is already current, startup costs a single version query.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+import logging
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, func, inspect as sa_inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+
+from .db import Base
+from .services.time_utils import now_utc
+
+
+_LOGGER = logging.getLogger(__name__)
+
+_metadata = MetaData()
+
+schema_version_table = Table(
+    "schema_version",
+    _metadata,
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("name", String(128), nullable=False),
+    Column("applied_at", String(64), nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[Connection], None]
+
+
+def _baseline_schema(conn: Connection) -> None:
+    """Create all tables and add columns that pre-versioned databases may lack."""
+
+    # Imported for its side effect of registering every model on Base.metadata.
+    from . import models  # noqa: F401
+
+    Base.metadata.create_all(bind=conn)
+
+    inspector = sa_inspect(conn)
+    assignment_columns = {c["name"] for c in inspector.get_columns("cleaning_assignments")}
+    if "notified_slots" not in assignment_columns:
+        conn.execute(text("ALTER TABLE cleaning_assignments ADD COLUMN notified_slots JSON DEFAULT NULL"))
+
+    member_columns = {c["name"] for c in inspector.get_columns("members")}
+    if "notify_services" not in member_columns:
+        conn.execute(text("ALTER TABLE members ADD COLUMN notify_services JSON DEFAULT '[]'"))
+    if "device_trackers" not in member_columns:
+        conn.execute(text("ALTER TABLE members ADD COLUMN device_trackers JSON DEFAULT '[]'"))
+
+
+# Secondary indexes added by migration 2. Bulk snapshot imports drop and
+# rebuild these around the load, so keep the definitions in one place.
+HOT_PATH_INDEXES: dict[str, str] = {
+    "ix_activity_events_created_at": (
+        "CREATE INDEX IF NOT EXISTS ix_activity_events_created_at ON activity_events (created_at)"
+    ),
+    "ix_activity_events_domain_action": (
+        "CREATE INDEX IF NOT EXISTS ix_activity_events_domain_action ON activity_events (domain, action, created_at)"
+    ),
+    "ix_shopping_items_status_added_at": (
+        "CREATE INDEX IF NOT EXISTS ix_shopping_items_status_added_at ON shopping_items (status, added_at)"
+    ),
+    "ix_shopping_items_status_completed_at": (
+        "CREATE INDEX IF NOT EXISTS ix_shopping_items_status_completed_at ON shopping_items (status, completed_at)"
+    ),
+    "ix_cleaning_overrides_source_event_id": (
+        "CREATE INDEX IF NOT EXISTS ix_cleaning_overrides_source_event_id ON cleaning_overrides (source_event_id)"
+    ),
+    "ix_cleaning_assignments_status_week": (
+        "CREATE INDEX IF NOT EXISTS ix_cleaning_assignments_status_week ON cleaning_assignments (status, week_start)"
+    ),
+}
+
+
+def _hot_path_indexes(conn: Connection) -> None:
+    """Index the columns used by activity, shopping and cleaning list queries."""
+
+    for statement in HOT_PATH_INDEXES.values():
+        conn.execute(text(statement))
+
+
+_VERSIONED_TABLES = (
+    "members",
+    "rotation_config",
+    "cleaning_assignments",
+    "cleaning_overrides",
+    "shopping_items",
+    "shopping_favorites",
+    "activity_events",
+)
+
+
+def _data_versions(conn: Connection) -> None:
+    """Add ``updated_version`` stamps, the version counter and delete tombstones.
+
+    Existing rows are stamped with version 1, which is also recorded as the
+    reset version, so deltas can only start from an export taken afterwards.
+    """
+
+    from . import models
+
+    Base.metadata.create_all(bind=conn, tables=[models.DataVersion.__table__, models.DeletedRow.__table__])
+
+    inspector = sa_inspect(conn)
+    for table in _VERSIONED_TABLES:
+        columns = {c["name"] for c in inspector.get_columns(table)}
+        if "updated_version" not in columns:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN updated_version INTEGER NOT NULL DEFAULT 0"))
+        conn.execute(
+            text(f"CREATE INDEX IF NOT EXISTS ix_{table}_updated_version ON {table} (updated_version)")
+        )
+        conn.execute(text(f"UPDATE {table} SET updated_version = 1 WHERE updated_version = 0"))
+    conn.execute(
+        text("INSERT OR IGNORE INTO data_version (id, version, reset_version) VALUES (1, 1, 1)")
+    )
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "baseline_schema", _baseline_schema),
+    Migration(2, "hot_path_indexes", _hot_path_indexes),
+    Migration(3, "data_versions", _data_versions),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(conn: Connection) -> int:
+    try:
+        value = conn.execute(select(func.max(schema_version_table.c.version))).scalar()
+    except OperationalError:
+        return 0
+    return int(value or 0)
+
+
+def run_migrations(engine: Engine) -> list[int]:
+    """Apply pending migrations and return the versions that were applied."""
+
+    with engine.connect() as conn:
+        if current_version(conn) >= LATEST_VERSION:
+            return []
+
+    applied: list[int] = []
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            _metadata.create_all(bind=conn)
+            version = current_version(conn)
+            for migration in MIGRATIONS:
+                if migration.version <= version:
+                    continue
+                migration.apply(conn)
+                conn.execute(
+                    schema_version_table.insert().values(
+                        version=migration.version,
+                        name=migration.name,
+                        applied_at=now_utc().isoformat(),
+                    )
+                )
+                applied.append(migration.version)
+        except BaseException:
+            conn.exec_driver_sql("ROLLBACK")
+            raise
+        conn.exec_driver_sql("COMMIT")
+
+    if applied:
+        _LOGGER.info("Applied schema migrations: %s", applied)
+    return applied
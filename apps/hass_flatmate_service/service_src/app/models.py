@@ -67,6 +67,7 @@ class Member(Base):
     active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now, onupdate=utc_now, nullable=False)
+    updated_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
 
 
 class ShoppingItem(Base):
@@ -87,6 +88,7 @@ class ShoppingItem(Base):
     deleted_by_member_id: Mapped[int | None] = mapped_column(ForeignKey("members.id"), nullable=True)
     deleted_by_user_id_raw: Mapped[str | None] = mapped_column(String(128), nullable=True)
     deleted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
 
 
 class ShoppingFavorite(Base):
@@ -98,6 +100,7 @@ class ShoppingFavorite(Base):
     created_by_member_id: Mapped[int | None] = mapped_column(ForeignKey("members.id"), nullable=True)
     created_by_user_id_raw: Mapped[str | None] = mapped_column(String(128), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now, nullable=False)
+    updated_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
 
 
 class ActivityEvent(Base):
@@ -110,6 +113,7 @@ class ActivityEvent(Base):
     actor_user_id_raw: Mapped[str | None] = mapped_column(String(128), nullable=True)
     payload_json: Mapped[dict] = mapped_column(JSON, default=dict, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now, nullable=False)
+    updated_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
 
 
 class RotationConfig(Base):
@@ -119,6 +123,7 @@ class RotationConfig(Base):
     ordered_member_ids_json: Mapped[list[int]] = mapped_column(JSON, default=list, nullable=False)
     anchor_week_start: Mapped[date | None] = mapped_column(Date, nullable=True)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now, onupdate=utc_now, nullable=False)
+    updated_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
 
 
 class CleaningAssignment(Base):
@@ -135,6 +140,7 @@ class CleaningAssignment(Base):
     completion_mode: Mapped[str | None] = mapped_column(String(32), nullable=True)
     completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     notified_slots: Mapped[dict | None] = mapped_column(JSON, default=dict, nullable=True)
+    updated_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
 
 
 class CleaningOverride(Base):
@@ -156,3 +162,28 @@ class CleaningOverride(Base):
     created_by_member_id: Mapped[int | None] = mapped_column(ForeignKey("members.id"), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now, onupdate=utc_now, nullable=False)
+    updated_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
+
+class DataVersion(Base):
+    """Single-row counter stamped onto every row a transaction inserts or updates."""
+
+    __tablename__ = "data_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False, default=1)
+    version: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Version of the last full wipe (admin reset or replacing import); older deltas are invalid.
+    reset_version: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Data version of the source instance the last imported snapshot or delta was taken at.
+    source_version: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+
+class DeletedRow(Base):
+    """Tombstone for a hard-deleted row, so incremental exports can replay the delete."""
+
+    __tablename__ = "deleted_rows"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    table_name: Mapped[str] = mapped_column(String(64), nullable=False)
+    row_key: Mapped[str] = mapped_column(String(64), nullable=False)
+    deleted_version: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
@@ -0,0 +1,154 @@
+"""JSON response rendering and negotiated response compression."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+import gzip
+import hashlib
+from pathlib import Path
+from typing import Any
+import zlib
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+import orjson
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import Receive, Scope, Send
+
+try:
+    import brotli
+    from starlette.middleware.gzip import IdentityResponder
+except ImportError:  # brotli is optional; older Starlette lacks pluggable responders.
+    brotli = None
+    IdentityResponder = None
+
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _orjson_default(value: Any) -> Any:
+    return jsonable_encoder(value)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson.
+
+    Endpoints may return one directly with plain dicts/lists built from trusted
+    service data; FastAPI then skips response-model validation and
+    ``jsonable_encoder``, while dates, datetimes and enums are still encoded
+    natively by orjson.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_orjson_default, option=_ORJSON_OPTIONS)
+
+
+def gzip_stream(chunks: Iterable[bytes], *, compresslevel: int = 6) -> Iterator[bytes]:
+    """Gzip an iterable of byte chunks on the fly into a single gzip member."""
+
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    accepted: set[str] = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = params.strip().lower()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding)
+    return accepted
+
+
+if brotli is not None and IdentityResponder is not None:
+
+    class BrotliResponder(IdentityResponder):
+        content_encoding = "br"
+
+        def __init__(self, *args: Any, quality: int, **kwargs: Any) -> None:
+            super().__init__(*args, **kwargs)
+            self._compressor = brotli.Compressor(quality=quality)
+
+        async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+            compressed = self._compressor.process(body)
+            if more_body:
+                return compressed + self._compressor.flush()
+            return compressed + self._compressor.finish()
+
+else:
+    BrotliResponder = None
+
+
+@dataclass(frozen=True)
+class StaticAsset:
+    """A file read and pre-compressed once, then served by content hash.
+
+    Responses carry an ``ETag`` with ``Cache-Control: no-cache``, so clients
+    revalidate with a 304 and pick up a new asset right after an add-on update.
+    Pre-encoded bodies pass through ``CompressionMiddleware`` untouched.
+    """
+
+    media_type: str
+    body: bytes
+    encoded: dict[str, bytes]
+    etag: str
+
+    @classmethod
+    def load(cls, path: Path, media_type: str) -> StaticAsset:
+        body = path.read_bytes()
+        encoded = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            encoded["br"] = brotli.compress(body, quality=11)
+        return cls(
+            media_type=media_type,
+            body=body,
+            encoded=encoded,
+            etag=f'"{hashlib.sha256(body).hexdigest()[:20]}"',
+        )
+
+    def response(self, headers: Headers) -> Response:
+        response_headers = {"ETag": self.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if self.etag in headers.get("If-None-Match", ""):
+            return Response(status_code=304, headers=response_headers)
+        accepted = _accepted_encodings(headers.get("Accept-Encoding", ""))
+        for coding in ("br", "gzip"):
+            if coding in accepted and coding in self.encoded:
+                response_headers["Content-Encoding"] = coding
+                return Response(self.encoded[coding], media_type=self.media_type, headers=response_headers)
+        return Response(self.body, media_type=self.media_type, headers=response_headers)
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """Compress responses above ``minimum_size`` with brotli or gzip.
+
+    Brotli is preferred when the client accepts it and the optional ``brotli``
+    package is installed; otherwise Starlette's gzip handling applies.
+    Responses that already carry a ``Content-Encoding`` are passed through.
+    """
+
+    def __init__(self, app: Any, minimum_size: int = 1024, compresslevel: int = 6, brotli_quality: int = 5) -> None:
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and BrotliResponder is not None:
+            accepted = _accepted_encodings(Headers(scope=scope).get("Accept-Encoding", ""))
+            if "br" in accepted:
+                responder = BrotliResponder(self.app, self.minimum_size, quality=self.brotli_quality)
+                await responder(scope, receive, send)
+                return
+        await super().__call__(scope, receive, send)
@@ -20,6 +20,7 @@ class MemberSyncItem(BaseModel):
 
 class MembersSyncRequest(BaseModel):
     members: list[MemberSyncItem]
+    payload_hash: str | None = None
 
 
 class MemberResponse(BaseModel):
@@ -134,12 +135,24 @@ class NotificationItem(BaseModel):
 class MembersSyncResponse(BaseModel):
     members: list[MemberResponse]
     notifications: list[NotificationItem] = Field(default_factory=list)
+    unchanged: bool = False
+    inserted: int = 0
+    updated: int = 0
+    deactivated: int = 0
+
+
+class ImportValidationError(BaseModel):
+    message: str
+    section: str | None = None
+    line: int | None = None
 
 
 class ManualImportResponse(BaseModel):
     ok: bool = True
+    dry_run: bool = False
     notifications: list[NotificationItem] = Field(default_factory=list)
     summary: dict[str, Any] = Field(default_factory=dict)
+    errors: list[ImportValidationError] = Field(default_factory=list)
 
 
 # Backward-compat aliases for older references.
@@ -200,6 +213,30 @@ class OperationResponse(BaseModel):
     notifications: list[NotificationItem] = Field(default_factory=list)
 
 
+class BatchOperation(BaseModel):
+    op: str
+    data: dict[str, Any] = Field(default_factory=dict)
+
+
+class BatchRequest(BaseModel):
+    operations: list[BatchOperation] = Field(min_length=1, max_length=100)
+    atomic: bool = True
+
+
+class BatchOperationResult(BaseModel):
+    op: str
+    ok: bool = True
+    id: int | None = None
+    error: str | None = None
+
+
+class BatchResponse(BaseModel):
+    ok: bool = True
+    atomic: bool = True
+    results: list[BatchOperationResult]
+    notifications: list[NotificationItem] = Field(default_factory=list)
+
+
 class RecentsResponse(BaseModel):
     recents: list[str]
 
@@ -211,8 +248,11 @@ class FavoritesResponse(BaseModel):
 class SnapshotExportResponse(BaseModel):
     schema_version: int
     generated_at: datetime
+    version: int | None = None
+    since: int | None = None
     summary: dict[str, int] = Field(default_factory=dict)
     data: dict[str, Any] = Field(default_factory=dict)
+    deleted: dict[str, list[str]] | None = None
 
 
 class SnapshotImportRequest(BaseModel):
@@ -221,6 +261,17 @@ class SnapshotImportRequest(BaseModel):
     actor_user_id: str | None = None
 
 
+class BackupRestoreRequest(BaseModel):
+    name: str = Field(min_length=1)
+
+
+class DigestCompareRequest(BaseModel):
+    left: dict[str, Any]
+    right: dict[str, Any] | None = None
+
+
 class SnapshotImportResponse(BaseModel):
     ok: bool = True
+    dry_run: bool = False
     summary: dict[str, Any] = Field(default_factory=dict)
+    errors: list[ImportValidationError] = Field(default_factory=list)
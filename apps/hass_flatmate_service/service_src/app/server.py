@@ -0,0 +1,104 @@
+"""Uvicorn options used by ``run.py``.
+
+The performance profile (default) picks uvloop and the httptools parser when
+they are installed (the ``server`` extra, included in the add-on image) and
+falls back to asyncio and h11 otherwise. It keeps idle connections open for
+``HASS_FLATMATE_SERVER_KEEP_ALIVE_SECONDS``, longer than the 15 s keep-alive
+of Home Assistant's shared ``aiohttp`` session, so the client always closes
+first and never reuses a connection the server is just closing. It also caps
+concurrent connections and tasks per worker, answering ``503`` beyond the
+cap instead of queueing without bound, and shortens the listen backlog.
+
+``HASS_FLATMATE_SERVER_PROFILE=legacy`` starts uvicorn with its defaults.
+The lifespan logs the effective profile, including the event loop actually
+running, and diagnostics report it under ``server``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+from dataclasses import asdict, dataclass
+import importlib.util
+import logging
+from typing import Any
+
+from uvicorn.config import LOGGING_CONFIG
+
+from .settings import settings
+
+
+_LOGGER = logging.getLogger(__name__)
+
+# Event loop class serving requests, recorded by log_server_profile().
+_running_loop: str | None = None
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+@dataclass(frozen=True)
+class ServerProfile:
+    name: str
+    loop: str
+    http: str
+    timeout_keep_alive: int
+    limit_concurrency: int | None
+    backlog: int
+
+    def uvicorn_options(self) -> dict[str, Any]:
+        return {
+            "loop": self.loop,
+            "http": self.http,
+            "timeout_keep_alive": self.timeout_keep_alive,
+            "limit_concurrency": self.limit_concurrency,
+            "backlog": self.backlog,
+        }
+
+    def stats(self) -> dict[str, Any]:
+        return {**asdict(self), "running_loop": _running_loop}
+
+
+def server_profile() -> ServerProfile:
+    if not settings.server_tuning_enabled:
+        # uvicorn.Config defaults.
+        return ServerProfile(
+            name="legacy", loop="auto", http="auto", timeout_keep_alive=5, limit_concurrency=None, backlog=2048
+        )
+    return ServerProfile(
+        name="performance",
+        loop="uvloop" if _installed("uvloop") else "asyncio",
+        http="httptools" if _installed("httptools") else "h11",
+        timeout_keep_alive=settings.server_keep_alive_seconds,
+        limit_concurrency=settings.server_limit_concurrency or None,
+        backlog=settings.server_backlog,
+    )
+
+
+def log_config() -> dict[str, Any]:
+    """uvicorn's logging config, extended so the service's own loggers reach the same output."""
+
+    config = copy.deepcopy(LOGGING_CONFIG)
+    config["loggers"]["app"] = {"handlers": ["default"], "level": "INFO", "propagate": False}
+    return config
+
+
+def log_server_profile() -> None:
+    """Record and log the profile from inside the served event loop."""
+
+    global _running_loop
+    running = type(asyncio.get_running_loop())
+    _running_loop = f"{running.__module__}.{running.__qualname__}"
+    stats = server_profile().stats()
+    _LOGGER.info(
+        "Server profile %s: loop %s (%s), http %s, keep-alive %ss, concurrency limit %s, backlog %s, workers %s",
+        stats["name"],
+        stats["loop"],
+        stats["running_loop"],
+        stats["http"],
+        stats["timeout_keep_alive"],
+        stats["limit_concurrency"] or "none",
+        stats["backlog"],
+        settings.workers,
+    )
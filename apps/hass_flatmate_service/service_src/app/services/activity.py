@@ -3,11 +3,16 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import TYPE_CHECKING
 
-from sqlalchemy import select
+from sqlalchemy import Select, insert, select
 from sqlalchemy.orm import Session
 
 from ..models import ActivityEvent
+from .versioning import allocate_version
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
 
 
 def log_event(
@@ -34,7 +39,41 @@ def log_event(
     return event
 
 
+def log_events(session: Session, events: list[dict]) -> None:
+    """Insert many activity events with one ``executemany``.
+
+    Each dict takes the keyword arguments of ``log_event``. Rows are written
+    through Core without creating ORM objects, so they are stamped with this
+    transaction's data version here.
+    """
+
+    if not events:
+        return
+    version = allocate_version(session)
+    session.execute(
+        insert(ActivityEvent),
+        [
+            {
+                "domain": event["domain"],
+                "action": event["action"],
+                "actor_member_id": event["actor_member_id"],
+                "actor_user_id_raw": event["actor_user_id_raw"],
+                "payload_json": event["payload"],
+                "created_at": event["created_at"],
+                "updated_version": version,
+            }
+            for event in events
+        ],
+    )
+
+
+def _list_events_query(limit: int) -> Select:
+    return select(ActivityEvent).order_by(ActivityEvent.created_at.desc()).limit(limit)
+
+
 def list_events(session: Session, limit: int = 50) -> list[ActivityEvent]:
-    return session.execute(
-        select(ActivityEvent).order_by(ActivityEvent.created_at.desc()).limit(limit)
-    ).scalars().all()
+    return session.execute(_list_events_query(limit)).scalars().all()
+
+
+async def list_events_async(session: AsyncSession, limit: int = 50) -> list[ActivityEvent]:
+    return (await session.execute(_list_events_query(limit))).scalars().all()
@@ -0,0 +1,277 @@
+"""Online SQLite backups and atomic restores.
+
+Backups copy the live database with SQLite's online backup API in steps of a
+few pages on a dedicated read-only connection, so writers are only blocked
+for the duration of a single step. The copy can be compacted with ``VACUUM``
+and gzip-compressed before it is atomically renamed into the backup
+directory; older backups beyond the configured count are removed.
+
+A restore decompresses and checks a backup next to the live database, then
+swaps it in with ``os.replace`` after closing all pooled connections, brings
+the schema up to date and records a data reset for incremental exports. It
+runs as a writer job, so queued writes wait for it, and it is refused while
+in-flight requests hold connections: those would keep writing to the
+replaced file and their commits would be lost. Requests arriving during the
+swap wait at connection checkout (``db.restore_gate``) until the restored
+file is migrated.
+
+Both act on the current request's database; a tenant's backups are kept in
+``tenants/<id>`` below the backup directory.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+import gzip
+import os
+from pathlib import Path
+import re
+import shutil
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from .. import db
+from ..migrations import current_version, run_migrations
+from ..settings import settings
+from .cleaning import due_window
+from .digest import table_digests
+from .members import member_directory
+from .versioning import current_versions, mark_data_restored
+
+
+BACKUP_PREFIX = "hass_flatmate-"
+_BACKUP_NAME = re.compile(r"^hass_flatmate-\d{8}T\d{12}\.db(\.gz)?$")
+_PAGES_PER_STEP = 256
+_STEP_SLEEP_SECONDS = 0.002
+_COPY_CHUNK_BYTES = 1024 * 1024
+
+# Backups and restores of the same database must not interleave.
+_lock = threading.Lock()
+
+
+def _live_db_path() -> Path:
+    engine = db.current_engine()
+    database = engine.url.database
+    if engine.url.get_backend_name() != "sqlite" or not database or database == ":memory:":
+        raise ValueError("backups require a file-backed SQLite database")
+    return Path(database)
+
+
+def _backup_dir() -> Path:
+    tenant = db.current_tenant()
+    if tenant is None:
+        return settings.backup_dir
+    return settings.backup_dir / "tenants" / tenant.tenant_id
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+def _gzip_file(source: Path, target: Path) -> None:
+    with source.open("rb") as raw, gzip.open(target, "wb", compresslevel=6) as compressed:
+        shutil.copyfileobj(raw, compressed, _COPY_CHUNK_BYTES)
+
+
+def _backup_files(directory: Path) -> list[Path]:
+    if not directory.is_dir():
+        return []
+    return sorted(path for path in directory.iterdir() if _BACKUP_NAME.match(path.name))
+
+
+def list_backups() -> list[dict[str, Any]]:
+    return [
+        {
+            "name": path.name,
+            "bytes": path.stat().st_size,
+            "compressed": path.suffix == ".gz",
+            "created_at": datetime.fromtimestamp(path.stat().st_mtime, tz=timezone.utc).isoformat(),
+        }
+        for path in reversed(_backup_files(_backup_dir()))
+    ]
+
+
+def _rotate(directory: Path, keep: int) -> list[str]:
+    removed: list[str] = []
+    for path in _backup_files(directory)[:-keep]:
+        path.unlink(missing_ok=True)
+        removed.append(path.name)
+    return removed
+
+
+def create_backup(*, vacuum: bool = False, compress: bool = True) -> dict[str, Any]:
+    """Write a consistent copy of the live database into the backup directory."""
+
+    source_path = _live_db_path()
+    directory = _backup_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+
+    with _lock:
+        started = time.perf_counter()
+        name = BACKUP_PREFIX + datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f") + ".db"
+        partial = directory / f".{name}.partial"
+        steps = 0
+
+        def _progress(_status: int, _remaining: int, _total: int) -> None:
+            nonlocal steps
+            steps += 1
+
+        timings: dict[str, float] = {}
+        try:
+            source = sqlite3.connect(
+                f"file:{source_path}?mode=ro",
+                uri=True,
+                timeout=settings.sqlite_busy_timeout_ms / 1000,
+            )
+            target = sqlite3.connect(partial)
+            try:
+                source.backup(target, pages=_PAGES_PER_STEP, progress=_progress, sleep=_STEP_SLEEP_SECONDS)
+                timings["backup_ms"] = _elapsed_ms(started)
+                # The copy must be self-contained: no WAL sidecar files next to it.
+                target.execute("PRAGMA journal_mode=DELETE")
+                if vacuum:
+                    vacuum_started = time.perf_counter()
+                    target.execute("VACUUM")
+                    timings["vacuum_ms"] = _elapsed_ms(vacuum_started)
+                page_count = target.execute("PRAGMA page_count").fetchone()[0]
+            finally:
+                target.close()
+                source.close()
+
+            uncompressed_bytes = partial.stat().st_size
+            final = directory / name
+            if compress:
+                compress_started = time.perf_counter()
+                compressed_partial = directory / f".{name}.gz.partial"
+                _gzip_file(partial, compressed_partial)
+                partial.unlink()
+                partial = compressed_partial
+                final = directory / f"{name}.gz"
+                timings["compress_ms"] = _elapsed_ms(compress_started)
+            os.replace(partial, final)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+
+        removed = _rotate(directory, settings.backup_keep)
+        return {
+            "name": final.name,
+            "path": str(final),
+            "bytes": final.stat().st_size,
+            "uncompressed_bytes": uncompressed_bytes,
+            "source_bytes": source_path.stat().st_size,
+            "pages": page_count,
+            "steps": steps,
+            "vacuumed": vacuum,
+            "compressed": compress,
+            "elapsed_ms": _elapsed_ms(started),
+            **timings,
+            "removed": removed,
+        }
+
+
+def _check_database(path: Path) -> None:
+    try:
+        connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            (result,) = connection.execute("PRAGMA quick_check").fetchone()
+        finally:
+            connection.close()
+    except sqlite3.DatabaseError as exc:
+        raise ValueError("backup is not a valid SQLite database") from exc
+    if result != "ok":
+        raise ValueError(f"backup failed its integrity check: {result}")
+
+
+def _require_idle_connections(engine: Any) -> None:
+    in_use = engine.pool.checkedout()
+    if db.current_tenant() is None:
+        in_use += db.async_reads_in_flight()
+    if in_use:
+        raise ValueError(
+            f"{in_use} database connection(s) are in use by in-flight requests; retry the restore when they finish"
+        )
+
+
+def restore_backup(name: str, *, loop: asyncio.AbstractEventLoop | None = None) -> dict[str, Any]:
+    """Replace the live database with a backup from the backup directory.
+
+    ``loop`` is the event loop serving async reads, used to dispose the old
+    async engine before the swap.
+    """
+
+    if settings.workers > 1:
+        # Other workers would keep serving the replaced file through their open connections.
+        raise ValueError("restoring a backup requires HASS_FLATMATE_WORKERS=1")
+    if not _BACKUP_NAME.match(name):
+        raise ValueError(f"'{name}' is not a backup file name")
+    backup_path = _backup_dir() / name
+    if not backup_path.is_file():
+        raise ValueError(f"backup '{name}' does not exist")
+    live_path = _live_db_path()
+
+    with _lock:
+        started = time.perf_counter()
+        # Stage next to the live database so the final rename stays on one filesystem.
+        staged = live_path.with_name(f".{live_path.name}.restore")
+        engine = db.current_engine()
+        primary = db.current_tenant() is None
+        try:
+            if name.endswith(".gz"):
+                try:
+                    with gzip.open(backup_path, "rb") as compressed, staged.open("wb") as raw:
+                        shutil.copyfileobj(compressed, raw, _COPY_CHUNK_BYTES)
+                except (OSError, EOFError) as exc:
+                    raise ValueError(f"backup '{name}' could not be decompressed") from exc
+            else:
+                shutil.copyfile(backup_path, staged)
+            _check_database(staged)
+        except BaseException:
+            staged.unlink(missing_ok=True)
+            raise
+
+        # Requests arriving from here on wait for the restored database.
+        with db.restore_gate(engine):
+            try:
+                _require_idle_connections(engine)
+                with db.new_session() as session:
+                    previous_version = current_versions(session)[0]
+                url = engine.url.render_as_string(hide_password=False)
+                with engine.connect() as conn:
+                    conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+                engine.dispose()
+                if primary:
+                    db.dispose_async_engine_from_thread(loop)
+                for suffix in ("-wal", "-shm"):
+                    live_path.with_name(live_path.name + suffix).unlink(missing_ok=True)
+                os.replace(staged, live_path)
+                engine.dispose()
+            except BaseException:
+                staged.unlink(missing_ok=True)
+                raise
+
+            if primary:
+                db.configure_engine(url)
+            # A tenant engine was disposed above and reconnects to the restored file.
+            engine = db.current_engine()
+            applied = run_migrations(engine)
+            with engine.connect() as conn:
+                schema_version = current_version(conn)
+            # Incremental exports taken before the restore no longer describe this data.
+            with db.new_session() as session:
+                mark_data_restored(session, previous_version)
+                session.commit()
+            member_directory.invalidate()
+            table_digests.invalidate()
+            due_window.invalidate()
+
+        return {
+            "restored": name,
+            "bytes": live_path.stat().st_size,
+            "schema_version": schema_version,
+            "migrations_applied": applied,
+            "elapsed_ms": _elapsed_ms(started),
+        }
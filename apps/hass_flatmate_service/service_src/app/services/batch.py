@@ -0,0 +1,202 @@
+"""Several card actions applied in one request (``POST /v1/batch``).
+
+Each operation names a card action (the integration's service names without
+the ``hass_flatmate_`` prefix) and carries the body its REST endpoint
+accepts, plus the path id (``item_id``/``favorite_id``) where the endpoint
+has one. All operations are validated before the first one runs.
+
+Atomic batches (the default) run in one transaction on a session whose
+``commit()`` only flushes: the service functions keep their own commits, the
+batch commits once at the end, and commit hooks (data version, cache
+invalidation) fire once. A failing operation leaves nothing applied.
+Non-atomic batches commit every operation on its own, roll back a failing one
+and carry on with the rest.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.orm import Session
+
+from ..schemas import (
+    BatchOperation,
+    CleaningMarkDoneRequest,
+    CleaningMarkTakeoverDoneRequest,
+    CleaningMarkUndoneRequest,
+    CleaningSwapRequest,
+    ShoppingFavoriteCreateRequest,
+    ShoppingItemActionRequest,
+    ShoppingItemCreateRequest,
+)
+from . import cleaning, shopping
+
+
+class ShoppingItemOperation(ShoppingItemActionRequest):
+    item_id: int
+
+
+class ShoppingFavoriteOperation(ShoppingItemActionRequest):
+    favorite_id: int
+
+
+_Outcome = tuple[int | None, list[dict]]
+
+
+def _add_shopping_item(session: Session, data: ShoppingItemCreateRequest) -> _Outcome:
+    return shopping.add_item(session, data.name, data.actor_user_id).id, []
+
+
+def _complete_shopping_item(session: Session, data: ShoppingItemOperation) -> _Outcome:
+    return shopping.complete_item(session, data.item_id, data.actor_user_id).id, []
+
+
+def _delete_shopping_item(session: Session, data: ShoppingItemOperation) -> _Outcome:
+    return shopping.delete_item(session, data.item_id, data.actor_user_id).id, []
+
+
+def _add_favorite_item(session: Session, data: ShoppingFavoriteCreateRequest) -> _Outcome:
+    return shopping.add_favorite(session, data.name, data.actor_user_id).id, []
+
+
+def _delete_favorite_item(session: Session, data: ShoppingFavoriteOperation) -> _Outcome:
+    shopping.delete_favorite(session, data.favorite_id, data.actor_user_id)
+    return None, []
+
+
+def _mark_cleaning_done(session: Session, data: CleaningMarkDoneRequest) -> _Outcome:
+    return None, cleaning.mark_cleaning_done(
+        session,
+        week_start=data.week_start,
+        actor_user_id=data.actor_user_id,
+        completed_by_member_id=data.completed_by_member_id,
+    )
+
+
+def _mark_cleaning_undone(session: Session, data: CleaningMarkUndoneRequest) -> _Outcome:
+    return None, cleaning.mark_cleaning_undone(session, week_start=data.week_start, actor_user_id=data.actor_user_id)
+
+
+def _mark_cleaning_takeover_done(session: Session, data: CleaningMarkTakeoverDoneRequest) -> _Outcome:
+    return None, cleaning.mark_cleaning_takeover_done(
+        session,
+        week_start=data.week_start,
+        original_assignee_member_id=data.original_assignee_member_id,
+        cleaner_member_id=data.cleaner_member_id,
+        actor_user_id=data.actor_user_id,
+    )
+
+
+def _swap_cleaning_week(session: Session, data: CleaningSwapRequest) -> _Outcome:
+    override, notifications = cleaning.upsert_manual_swap(
+        session,
+        week_start=data.week_start,
+        member_a_id=data.member_a_id,
+        member_b_id=data.member_b_id,
+        return_week_start=data.return_week_start,
+        actor_user_id=data.actor_user_id,
+        cancel=data.cancel,
+    )
+    return (override.id if override else None), notifications
+
+
+class _Handler(NamedTuple):
+    model: type[BaseModel]
+    run: Callable[[Session, Any], _Outcome]
+
+
+OPERATIONS: dict[str, _Handler] = {
+    "add_shopping_item": _Handler(ShoppingItemCreateRequest, _add_shopping_item),
+    "complete_shopping_item": _Handler(ShoppingItemOperation, _complete_shopping_item),
+    "delete_shopping_item": _Handler(ShoppingItemOperation, _delete_shopping_item),
+    "add_favorite_item": _Handler(ShoppingFavoriteCreateRequest, _add_favorite_item),
+    "delete_favorite_item": _Handler(ShoppingFavoriteOperation, _delete_favorite_item),
+    "mark_cleaning_done": _Handler(CleaningMarkDoneRequest, _mark_cleaning_done),
+    "mark_cleaning_undone": _Handler(CleaningMarkUndoneRequest, _mark_cleaning_undone),
+    "mark_cleaning_takeover_done": _Handler(CleaningMarkTakeoverDoneRequest, _mark_cleaning_takeover_done),
+    "swap_cleaning_week": _Handler(CleaningSwapRequest, _swap_cleaning_week),
+}
+
+
+class ParsedOperation(NamedTuple):
+    op: str
+    data: BaseModel
+
+
+def _describe(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'data'}: {error['msg']}" for error in exc.errors()
+    )
+
+
+def parse_operations(operations: list[BatchOperation]) -> list[ParsedOperation]:
+    """Validate every operation up front; raises ``ValueError`` naming the first bad one."""
+
+    parsed: list[ParsedOperation] = []
+    for index, operation in enumerate(operations):
+        handler = OPERATIONS.get(operation.op)
+        if handler is None:
+            raise ValueError(f"operations[{index}]: unknown operation '{operation.op}'")
+        try:
+            parsed.append(ParsedOperation(operation.op, handler.model.model_validate(operation.data)))
+        except ValidationError as exc:
+            raise ValueError(f"operations[{index}] ({operation.op}): {_describe(exc)}") from exc
+    return parsed
+
+
+class _DeferredCommitSession(Session):
+    """Session whose ``commit()`` only flushes, so several service calls share one transaction."""
+
+    def commit(self) -> None:
+        self.flush()
+
+    def rollback(self) -> None:
+        # Service functions only roll back after losing an insert race to another
+        # connection; the batch cannot resume after that, so it fails as a whole.
+        super().rollback()
+        raise ValueError("conflicted with a concurrent write")
+
+    def commit_batch(self) -> None:
+        super().commit()
+
+
+def run_batch(session: Session, operations: list[ParsedOperation], *, atomic: bool) -> dict[str, Any]:
+    """Apply ``operations`` in order and return per-operation results and all notifications."""
+
+    if atomic:
+        return _run_atomic(session, operations)
+
+    results: list[dict[str, Any]] = []
+    notifications: list[dict] = []
+    for operation in operations:
+        try:
+            row_id, emitted = OPERATIONS[operation.op].run(session, operation.data)
+        except ValueError as exc:
+            session.rollback()
+            results.append({"op": operation.op, "ok": False, "error": str(exc)})
+            continue
+        results.append({"op": operation.op, "ok": True, "id": row_id})
+        notifications.extend(emitted)
+    return {
+        "ok": all(result["ok"] for result in results),
+        "atomic": False,
+        "results": results,
+        "notifications": notifications,
+    }
+
+
+def _run_atomic(session: Session, operations: list[ParsedOperation]) -> dict[str, Any]:
+    results: list[dict[str, Any]] = []
+    notifications: list[dict] = []
+    with _DeferredCommitSession(bind=session.get_bind(), autoflush=False) as batch:
+        for index, operation in enumerate(operations):
+            try:
+                row_id, emitted = OPERATIONS[operation.op].run(batch, operation.data)
+            except ValueError as exc:
+                raise ValueError(f"operations[{index}] ({operation.op}): {exc}; no operation was applied") from exc
+            results.append({"op": operation.op, "ok": True, "id": row_id})
+            notifications.extend(emitted)
+        batch.commit_batch()
+    return {"ok": True, "atomic": True, "results": results, "notifications": notifications}
@@ -2,26 +2,32 @@
 
 from __future__ import annotations
 
-from datetime import date, datetime, timedelta
+from collections.abc import Callable, Iterable
+from datetime import date, datetime, time, timedelta
+import threading
+from typing import Any, TypeVar, cast
 
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from ..db import TenantLocal
 from ..models import (
     ActivityEvent,
     CleaningAssignment,
     CleaningAssignmentStatus,
     CleaningOverride,
-    Member,
     OverrideSource,
     OverrideStatus,
     OverrideType,
     RotationConfig,
 )
 from ..services.activity import log_event
-from ..services.members import get_active_members, get_member_by_id, resolve_actor_member
+from ..services.members import MemberRecord, get_active_members, get_member_by_id, resolve_actor_member
 from ..services.time_utils import add_weeks, monday_for, now_utc, week_start_for
+from ..services.versioning import cache_generation
+
+_T = TypeVar("_T")
 
 
 def _planned_override_for_week(session: Session, week_start: date) -> CleaningOverride | None:
@@ -88,7 +94,7 @@ def get_or_create_rotation_config(session: Session) -> RotationConfig:
     return config
 
 
-def sync_rotation_members(session: Session) -> RotationConfig:
+def _reconcile_rotation_members(session: Session) -> RotationConfig:
     config = get_or_create_rotation_config(session)
     active_members = get_active_members(session)
     active_ids = [m.id for m in active_members]
@@ -96,7 +102,6 @@ def sync_rotation_members(session: Session) -> RotationConfig:
     if not config.ordered_member_ids_json:
         config.ordered_member_ids_json = active_ids
         config.anchor_week_start = monday_for(now_utc().date())
-        session.commit()
         return config
 
     preserved = [member_id for member_id in config.ordered_member_ids_json if member_id in active_ids]
@@ -105,13 +110,16 @@ def sync_rotation_members(session: Session) -> RotationConfig:
 
     if config.anchor_week_start is None:
         config.anchor_week_start = monday_for(now_utc().date())
+    return config
 
+
+def sync_rotation_members(session: Session) -> RotationConfig:
+    config = _reconcile_rotation_members(session)
     session.commit()
     return config
 
 
-def baseline_assignee_member_id(session: Session, week_start: date) -> int | None:
-    config = sync_rotation_members(session)
+def _baseline_for_config(config: RotationConfig, week_start: date) -> int | None:
     ordered = config.ordered_member_ids_json
 
     if not ordered:
@@ -123,6 +131,10 @@ def baseline_assignee_member_id(session: Session, week_start: date) -> int | Non
     return ordered[idx]
 
 
+def baseline_assignee_member_id(session: Session, week_start: date) -> int | None:
+    return _baseline_for_config(sync_rotation_members(session), week_start)
+
+
 def _apply_override(assignee_member_id: int | None, override: CleaningOverride | None) -> int | None:
     if assignee_member_id is None or override is None:
         return assignee_member_id
@@ -167,6 +179,80 @@ def ensure_assignment(session: Session, week_start: date) -> CleaningAssignment:
     return assignment
 
 
+class AssignmentBatch:
+    """Upsert many cleaning assignments in one pass, e.g. for imports.
+
+    ``ensure`` follows ``ensure_assignment`` week by week, but the rotation is
+    reconciled once, the affected assignments and planned overrides are loaded
+    up front and new assignments are left to a single flush instead of a
+    commit per week.
+    """
+
+    _PRELOAD_CHUNK = 500
+
+    def __init__(self, session: Session) -> None:
+        self._session = session
+        self._config: RotationConfig | None = None
+        self._loaded: set[date] = set()
+        self._assignments: dict[date, CleaningAssignment] = {}
+        self._overrides: dict[date, CleaningOverride] = {}
+
+    def preload(self, weeks: Iterable[date]) -> None:
+        missing = sorted(set(weeks) - self._loaded)
+        for start in range(0, len(missing), self._PRELOAD_CHUNK):
+            chunk = missing[start : start + self._PRELOAD_CHUNK]
+            assignments = self._session.execute(
+                select(CleaningAssignment).where(CleaningAssignment.week_start.in_(chunk))
+            ).scalars()
+            for assignment in assignments:
+                self._assignments[assignment.week_start] = assignment
+            overrides = self._session.execute(
+                select(CleaningOverride)
+                .where(
+                    CleaningOverride.week_start.in_(chunk),
+                    CleaningOverride.status == OverrideStatus.PLANNED,
+                )
+                .order_by(CleaningOverride.created_at.asc())
+            ).scalars()
+            for override in overrides:
+                self._overrides.setdefault(override.week_start, override)
+            self._loaded.update(chunk)
+
+    def planned_override(self, week_start: date) -> CleaningOverride | None:
+        self.preload([week_start])
+        return self._overrides.get(week_start)
+
+    def add_planned_override(self, override: CleaningOverride) -> None:
+        self.preload([override.week_start])
+        self._session.add(override)
+        self._overrides.setdefault(override.week_start, override)
+
+    def baseline(self, week_start: date) -> int | None:
+        if self._config is None:
+            self._config = _reconcile_rotation_members(self._session)
+        return _baseline_for_config(self._config, week_start)
+
+    def effective(self, week_start: date) -> tuple[int | None, CleaningOverride | None]:
+        override = self.planned_override(week_start)
+        return _apply_override(self.baseline(week_start), override), override
+
+    def ensure(self, week_start: date) -> CleaningAssignment:
+        effective_id, _ = self.effective(week_start)
+
+        assignment = self._assignments.get(week_start)
+        if assignment is None:
+            assignment = CleaningAssignment(
+                week_start=week_start,
+                assignee_member_id=effective_id,
+                status=CleaningAssignmentStatus.PENDING,
+            )
+            self._session.add(assignment)
+            self._assignments[week_start] = assignment
+        elif assignment.status == CleaningAssignmentStatus.PENDING:
+            assignment.assignee_member_id = effective_id
+        return assignment
+
+
 def mark_past_pending_as_missed(session: Session, current_week_start: date) -> None:
     rows = session.execute(
         select(CleaningAssignment).where(
@@ -179,7 +265,7 @@ def mark_past_pending_as_missed(session: Session, current_week_start: date) -> N
 
 
 def _member_notification(
-    member: Member | None,
+    member: MemberRecord | None,
     title: str,
     message: str,
     *,
@@ -284,7 +370,7 @@ def _build_swap_notifications(
     ]
 
 
-def _require_active_member(session: Session, member_id: int, *, field_name: str) -> Member:
+def _require_active_member(session: Session, member_id: int, *, field_name: str) -> MemberRecord:
     member = get_member_by_id(session, member_id)
     if member is None:
         raise ValueError(f"{field_name} not found")
@@ -1107,7 +1193,31 @@ def mark_cleaning_takeover_done(
     return notifications
 
 
+_CONCURRENT_INSERT_RETRIES = 3
+
+
+def _retry_after_concurrent_insert(session: Session, build: Callable[[], _T]) -> _T:
+    """Run ``build`` again when a parallel request created the same assignments first.
+
+    The coordinator fetches the current week and the schedule in parallel and
+    both insert missing weeks; the request that loses the race re-reads them.
+    Overlapping week ranges of several parallel requests can make it lose
+    more than once, so it retries a few times.
+    """
+
+    for _attempt in range(_CONCURRENT_INSERT_RETRIES):
+        try:
+            return build()
+        except IntegrityError:
+            session.rollback()
+    return build()
+
+
 def get_cleaning_current(session: Session, at: datetime | None = None) -> dict:
+    return _retry_after_concurrent_insert(session, lambda: _build_cleaning_current(session, at))
+
+
+def _build_cleaning_current(session: Session, at: datetime | None) -> dict:
     now = at or now_utc()
     week_start = week_start_for(now)
     mark_past_pending_as_missed(session, week_start)
@@ -1146,15 +1256,21 @@ def _parse_source_week_start(payload: dict | None) -> date | None:
 
 
 def get_schedule(session: Session, *, weeks_ahead: int, from_week_start: date | None = None) -> list[dict]:
+    return _retry_after_concurrent_insert(session, lambda: _build_schedule(session, weeks_ahead, from_week_start))
+
+
+def _build_schedule(session: Session, weeks_ahead: int, from_week_start: date | None) -> list[dict]:
     start = from_week_start or week_start_for(now_utc())
     rows: list[dict] = []
     source_week_by_event_id: dict[int, date | None] = {}
-
-    for offset in range(max(weeks_ahead, 0)):
-        week = add_weeks(start, offset)
-        assignment = ensure_assignment(session, week)
-        baseline_id = baseline_assignee_member_id(session, week)
-        effective_id, override = effective_assignee_member_id(session, week)
+    weeks = [add_weeks(start, offset) for offset in range(max(weeks_ahead, 0))]
+    batch = AssignmentBatch(session)
+    batch.preload(weeks)
+
+    for week in weeks:
+        assignment = batch.ensure(week)
+        baseline_id = batch.baseline(week)
+        effective_id, override = batch.effective(week)
         source_week_start = None
         if override is not None and override.source_event_id is not None:
             event_id = int(override.source_event_id)
@@ -1183,14 +1299,111 @@ def get_schedule(session: Session, *, weeks_ahead: int, from_week_start: date |
     return rows
 
 
+# Notification slots of a week and the local (weekday, hour) from which each
+# is due. _build_due_notifications checks these, and the quiet window ends at
+# them, so a new slot only has to be added here.
+_DUE_SLOT_STARTS = {
+    "monday_11": (0, 11),
+    "sunday_11": (6, 11),
+    "sunday_18": (6, 18),
+    "sunday_21": (6, 21),
+}
+
+# Local times at which a due evaluation can start returning something new:
+# (days after Monday, hour). The following Monday starts a new week.
+_DUE_BOUNDARIES = (*sorted(set(_DUE_SLOT_STARTS.values())), (7, 0))
+
+
+def _slot_reached(at: datetime, slot: str) -> bool:
+    weekday, hour = _DUE_SLOT_STARTS[slot]
+    return at.weekday() == weekday and at.hour >= hour
+
+
+def _next_due_boundary(at: datetime) -> datetime:
+    monday = monday_for(at.date())
+    return min(
+        boundary
+        for days, hour in _DUE_BOUNDARIES
+        if (boundary := datetime.combine(monday + timedelta(days=days), time(hour), tzinfo=at.tzinfo)) > at
+    )
+
+
+class DueNotificationWindow:
+    """Per-database memo of a quiet stretch in which no notification is due.
+
+    An evaluation that found nothing due stays valid until the next slot
+    boundary as long as no transaction commits tracked rows
+    (``versioning.cache_generation``), so the per-minute polls inside that
+    stretch answer without evaluating the schedule. With several workers
+    that check is one read of the shared version counter.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._window: tuple[Any, int, datetime, datetime] | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._window = None
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "quiet_until": self._window[3].isoformat() if self._window else None,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def quiet(self, session: Session, at: datetime, generation: int) -> bool:
+        bind = session.get_bind()
+        with self._lock:
+            window = self._window
+            if (
+                window is not None
+                and window[0] is bind
+                and window[1] == generation
+                and window[2].utcoffset() == at.utcoffset()
+                and window[2] <= at < window[3]
+            ):
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def remember(self, session: Session, at: datetime, generation: int) -> None:
+        """Record that nothing was due at ``at`` given the writes seen up to ``generation``."""
+
+        window = (session.get_bind(), generation, at, _next_due_boundary(at))
+        with self._lock:
+            self._window = window
+
+
+due_window = cast(DueNotificationWindow, TenantLocal(DueNotificationWindow))
+
+
 def due_notifications(session: Session, at: datetime) -> list[dict]:
+    # Captured first: a write committed during the evaluation, including its
+    # own missed/assignment updates, leaves the remembered window stale.
+    generation = cache_generation(session)
+    if due_window.quiet(session, at, generation):
+        return []
+
+    notifications = _build_due_notifications(session, at)
+    if not notifications:
+        due_window.remember(session, at, generation)
+    return notifications
+
+
+def _build_due_notifications(session: Session, at: datetime) -> list[dict]:
     local_at = at
     week_start = monday_for(local_at.date())
     mark_past_pending_as_missed(session, week_start)
 
     notifications: list[dict] = []
 
-    def assignee_member_for_week(target_week: date) -> tuple[Member | None, CleaningAssignment]:
+    def assignee_member_for_week(target_week: date) -> tuple[MemberRecord | None, CleaningAssignment]:
         assignment = ensure_assignment(session, target_week)
         member = get_member_by_id(session, assignment.assignee_member_id) if assignment.assignee_member_id else None
         return member, assignment
@@ -1214,7 +1427,7 @@ def due_notifications(session: Session, at: datetime) -> list[dict]:
     sent = assignment.notified_slots or {}
 
     # Monday 11:00 — weekly assignment (catches up anytime Monday)
-    if local_at.weekday() == 0 and local_at.hour >= 11 and "monday_11" not in sent:
+    if _slot_reached(local_at, "monday_11") and "monday_11" not in sent:
         warning = ""
         if prev_assignment.status != CleaningAssignmentStatus.DONE:
             warning = " Warning: last week is still unconfirmed."
@@ -1224,23 +1437,26 @@ def due_notifications(session: Session, at: datetime) -> list[dict]:
                 week_start=week_start, notification_kind="weekly_assignment",
                 notification_slot="monday_11", source_action="cleaning_notifications_due"))
 
-    # Sunday reminders — only the latest applicable fires (elif chain)
-    if local_at.weekday() == 6 and assignment.status == CleaningAssignmentStatus.PENDING:
-        if local_at.hour >= 21 and "sunday_21" not in sent:
-            notifications.append(
-                _member_notification(member, "Weekly Cleaning Shift",
-                    "Final reminder: mark this week's cleaning as done in Home Assistant now "
-                    "so next week's reminder can be sent correctly.",
-                    week_start=week_start, notification_kind="weekly_reminder",
-                    notification_slot="sunday_21", source_action="cleaning_notifications_due"))
-        elif local_at.hour >= 18 and "sunday_18" not in sent:
-            notifications.append(
-                _member_notification(member, "Weekly Cleaning Shift",
-                    "Please mark this week's cleaning as done in Home Assistant after you finish. "
-                    "If it is not confirmed, the next person may miss a reminder.",
-                    week_start=week_start, notification_kind="weekly_reminder",
-                    notification_slot="sunday_18", source_action="cleaning_notifications_due"))
-        elif local_at.hour >= 11 and "sunday_11" not in sent:
+    # Sunday reminders — only the latest reached slot fires; once it was sent,
+    # earlier slots missed during an outage are not caught up afterwards.
+    if assignment.status == CleaningAssignmentStatus.PENDING:
+        if _slot_reached(local_at, "sunday_21"):
+            if "sunday_21" not in sent:
+                notifications.append(
+                    _member_notification(member, "Weekly Cleaning Shift",
+                        "Final reminder: mark this week's cleaning as done in Home Assistant now "
+                        "so next week's reminder can be sent correctly.",
+                        week_start=week_start, notification_kind="weekly_reminder",
+                        notification_slot="sunday_21", source_action="cleaning_notifications_due"))
+        elif _slot_reached(local_at, "sunday_18"):
+            if "sunday_18" not in sent:
+                notifications.append(
+                    _member_notification(member, "Weekly Cleaning Shift",
+                        "Please mark this week's cleaning as done in Home Assistant after you finish. "
+                        "If it is not confirmed, the next person may miss a reminder.",
+                        week_start=week_start, notification_kind="weekly_reminder",
+                        notification_slot="sunday_18", source_action="cleaning_notifications_due"))
+        elif _slot_reached(local_at, "sunday_11") and "sunday_11" not in sent:
             notifications.append(
                 _member_notification(member, "Weekly Cleaning Shift",
                     "Don't forget to mark your cleaning shift as done in Home Assistant today.",
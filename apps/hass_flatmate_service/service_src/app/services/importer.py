@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
 from datetime import date, datetime, time, timezone
-from typing import Any
+from typing import Any, TypeVar
 
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
 
 from ..models import (
@@ -15,16 +17,29 @@ from ..models import (
     OverrideSource,
     OverrideStatus,
     OverrideType,
+    RotationConfig,
     ShoppingItem,
     ShoppingStatus,
 )
-from ..services.activity import log_event
+from ..services.activity import log_event, log_events
 from ..services.cleaning import (
-    ensure_assignment,
+    AssignmentBatch,
     get_or_create_rotation_config,
 )
 from ..services.members import get_active_members
 from ..services.time_utils import monday_for, now_utc
+from ..services.versioning import allocate_version
+
+_CLEANING_STATUSES = {"done", "missed", "pending"}
+
+_ParsedRow = TypeVar("_ParsedRow")
+
+_SECTION_ORDER = {
+    "rotation_rows": 0,
+    "cleaning_history_rows": 1,
+    "shopping_history_rows": 2,
+    "cleaning_override_rows": 3,
+}
 
 
 def _normalize_member_name(value: str) -> str:
@@ -66,6 +81,195 @@ def _parse_date_or_datetime(token: str, *, line_no: int) -> tuple[date, datetime
         raise ValueError(f"Invalid date or datetime '{token}' at row {line_no}") from exc
 
 
+@dataclass(frozen=True)
+class _RotationRow:
+    line_no: int
+    week_start: date
+    member_name: str
+
+
+@dataclass(frozen=True)
+class _CleaningHistoryRow:
+    line_no: int
+    week_start: date
+    at: datetime
+    member_name: str
+    status: str
+    completed_by_name: str | None
+
+
+@dataclass(frozen=True)
+class _ShoppingHistoryRow:
+    line_no: int
+    at: datetime
+    item_name: str
+    buyer_name: str
+
+
+@dataclass(frozen=True)
+class _CleaningOverrideRow:
+    line_no: int
+    week_start: date
+    member_from_name: str
+    member_to_name: str
+    override_type: OverrideType
+
+
+def _parse_rows(
+    rows_text: str | None,
+    parse_row: Callable[[int, str], _ParsedRow],
+    *,
+    section: str,
+    errors: list[dict[str, Any]] | None,
+) -> list[_ParsedRow]:
+    """Parse every row of a section; collect errors instead of raising when given a list."""
+
+    parsed: list[_ParsedRow] = []
+    for line_no, row in _rows_from_text(rows_text):
+        try:
+            parsed.append(parse_row(line_no, row))
+        except ValueError as exc:
+            if errors is None:
+                raise
+            errors.append({"message": str(exc), "section": section, "line": line_no})
+    return parsed
+
+
+def _parse_rotation_row(line_no: int, row: str) -> _RotationRow:
+    columns = [part.strip() for part in row.split(",")]
+    if len(columns) < 2:
+        raise ValueError(
+            f"Rotation row {line_no} must contain at least 2 columns: "
+            "date,member_name"
+        )
+    parsed_date, _parsed_dt = _parse_date_or_datetime(columns[0], line_no=line_no)
+    return _RotationRow(line_no, monday_for(parsed_date), columns[1])
+
+
+def _parse_cleaning_history_row(line_no: int, row: str) -> _CleaningHistoryRow:
+    columns = [part.strip() for part in row.split(",")]
+    if len(columns) < 2:
+        raise ValueError(
+            f"Cleaning history row {line_no} must contain at least 2 columns: "
+            "date,member_name[,status][,completed_by_name]"
+        )
+
+    parsed_date, at_dt = _parse_date_or_datetime(columns[0], line_no=line_no)
+    status_value = columns[2].strip().lower() if len(columns) >= 3 and columns[2].strip() else "done"
+    if status_value not in _CLEANING_STATUSES:
+        raise ValueError(
+            f"Unsupported cleaning status '{status_value}' at row {line_no}. "
+            "Allowed values: done, missed, pending"
+        )
+    completed_by_name = None
+    if status_value == "done" and len(columns) >= 4 and columns[3].strip():
+        completed_by_name = columns[3]
+    return _CleaningHistoryRow(line_no, monday_for(parsed_date), at_dt, columns[1], status_value, completed_by_name)
+
+
+def _parse_shopping_history_row(line_no: int, row: str) -> _ShoppingHistoryRow:
+    columns = [part.strip() for part in row.split(",")]
+    if len(columns) < 3:
+        raise ValueError(
+            f"Shopping history row {line_no} must contain at least 3 columns: "
+            "date,item_name,buyer_name"
+        )
+
+    _parsed_date, at_dt = _parse_date_or_datetime(columns[0], line_no=line_no)
+    item_name = columns[1].strip()
+    if not item_name:
+        raise ValueError(f"Missing shopping item name at row {line_no}")
+    return _ShoppingHistoryRow(line_no, at_dt, item_name, columns[2])
+
+
+def _parse_override_type(token: str | None, *, line_no: int) -> OverrideType:
+    raw = (token or "").strip().lower()
+    if not raw or raw == "compensation":
+        return OverrideType.COMPENSATION
+    if raw in {"manual_swap", "swap"}:
+        return OverrideType.MANUAL_SWAP
+    raise ValueError(
+        f"Unsupported override type '{token}' at row {line_no}. "
+        "Allowed values: compensation, manual_swap"
+    )
+
+
+def _parse_cleaning_override_row(line_no: int, row: str) -> _CleaningOverrideRow:
+    columns = [part.strip() for part in row.split(",")]
+    if len(columns) < 3:
+        raise ValueError(
+            f"Cleaning override row {line_no} must contain at least 3 columns: "
+            "date,member_from_name,member_to_name[,override_type]"
+        )
+
+    parsed_date, _at_dt = _parse_date_or_datetime(columns[0], line_no=line_no)
+    override_type = _parse_override_type(columns[3] if len(columns) >= 4 else None, line_no=line_no)
+    return _CleaningOverrideRow(line_no, monday_for(parsed_date), columns[1], columns[2], override_type)
+
+
+@dataclass(frozen=True)
+class _ManualRows:
+    rotation: list[_RotationRow]
+    cleaning_history: list[_CleaningHistoryRow]
+    shopping_history: list[_ShoppingHistoryRow]
+    cleaning_overrides: list[_CleaningOverrideRow]
+
+    def member_names(self) -> list[str]:
+        names = [row.member_name for row in self.rotation]
+        for row in self.cleaning_history:
+            names.append(row.member_name)
+            if row.completed_by_name is not None:
+                names.append(row.completed_by_name)
+        names.extend(row.buyer_name for row in self.shopping_history)
+        for row in self.cleaning_overrides:
+            names.extend((row.member_from_name, row.member_to_name))
+        return names
+
+    def weeks(self) -> list[date]:
+        return (
+            [row.week_start for row in self.rotation]
+            + [row.week_start for row in self.cleaning_history]
+            + [row.week_start for row in self.cleaning_overrides]
+        )
+
+
+def _parse_manual_rows(
+    *,
+    rotation_rows: str | None,
+    cleaning_history_rows: str | None,
+    shopping_history_rows: str | None,
+    cleaning_override_rows: str | None,
+    errors: list[dict[str, Any]] | None = None,
+) -> _ManualRows:
+    if not any(
+        value and value.strip()
+        for value in [rotation_rows, cleaning_history_rows, shopping_history_rows, cleaning_override_rows]
+    ):
+        raise ValueError("At least one import field must be provided")
+
+    return _ManualRows(
+        rotation=_parse_rows(rotation_rows, _parse_rotation_row, section="rotation_rows", errors=errors),
+        cleaning_history=_parse_rows(
+            cleaning_history_rows,
+            _parse_cleaning_history_row,
+            section="cleaning_history_rows",
+            errors=errors,
+        ),
+        shopping_history=_parse_rows(
+            shopping_history_rows,
+            _parse_shopping_history_row,
+            section="shopping_history_rows",
+            errors=errors,
+        ),
+        cleaning_overrides=_parse_rows(
+            cleaning_override_rows,
+            _parse_cleaning_override_row,
+            section="cleaning_override_rows",
+            errors=errors,
+        ),
+    )
+
+
 def _member_index(session: Session) -> tuple[dict[str, int], list[int], dict[int, str]]:
     active_members = get_active_members(session)
     if not active_members:
@@ -91,77 +295,74 @@ def _member_index(session: Session) -> tuple[dict[str, int], list[int], dict[int
     return index, active_member_ids, id_to_name
 
 
-def _resolve_member_id(
+def _resolve_members(
     session: Session,
     name_index: dict[str, int],
     id_to_name: dict[int, str],
-    raw_name: str,
-    *,
-    line_no: int,
-) -> int:
-    key = _normalize_member_name(raw_name)
-    member_id = name_index.get(key)
-    if member_id is not None:
-        return member_id
-
-    # Auto-create inactive placeholder member for former flatmates
-    display_name = raw_name.strip()
-    member = Member(
-        display_name=display_name,
-        ha_user_id=None,
-        ha_person_entity_id=None,
-        notify_service=None,
-        active=False,
-    )
-    session.add(member)
+    raw_names: Iterable[str],
+) -> None:
+    """Add every referenced name to the index, creating placeholders in one flush."""
+
+    placeholders: dict[str, Member] = {}
+    for raw_name in raw_names:
+        key = _normalize_member_name(raw_name)
+        if key in name_index or key in placeholders:
+            continue
+        # Auto-create inactive placeholder member for former flatmates
+        placeholders[key] = Member(
+            display_name=raw_name.strip(),
+            ha_user_id=None,
+            ha_person_entity_id=None,
+            notify_service=None,
+            active=False,
+        )
+    if not placeholders:
+        return
+
+    session.add_all(placeholders.values())
     session.flush()
-    name_index[key] = member.id
-    id_to_name[member.id] = display_name
-    return member.id
+    for key, member in placeholders.items():
+        name_index[key] = member.id
+        id_to_name[member.id] = member.display_name
 
 
-def _apply_rotation_rows(
-    session: Session,
-    *,
-    rows_text: str | None,
-    name_index: dict[str, int],
-    id_to_name: dict[int, str],
-    active_member_ids: list[int],
-) -> tuple[date | None, list[int], int]:
-    rows = _rows_from_text(rows_text)
-    if not rows:
-        return None, [], 0
+def _member_id(name_index: dict[str, int], raw_name: str) -> int:
+    return name_index[_normalize_member_name(raw_name)]
 
-    assignment_by_week: dict[date, int] = {}
-    for line_no, row in rows:
-        columns = [part.strip() for part in row.split(",")]
-        if len(columns) < 2:
-            raise ValueError(
-                f"Rotation row {line_no} must contain at least 2 columns: "
-                "date,member_name"
-            )
-        parsed_date, _parsed_dt = _parse_date_or_datetime(columns[0], line_no=line_no)
-        week_start = monday_for(parsed_date)
-        member_id = _resolve_member_id(session, name_index, id_to_name, columns[1], line_no=line_no)
 
-        existing = assignment_by_week.get(week_start)
+def _rotation_weeks(
+    rows: list[_RotationRow],
+    name_index: dict[str, int],
+    errors: list[dict[str, Any]] | None = None,
+) -> dict[date, int]:
+    assignment_by_week: dict[date, int] = {}
+    for row in rows:
+        member_id = _member_id(name_index, row.member_name)
+        existing = assignment_by_week.get(row.week_start)
         if existing is not None and existing != member_id:
-            raise ValueError(
-                f"Conflicting rotation members for week {week_start.isoformat()} at row {line_no}"
-            )
-        assignment_by_week[week_start] = member_id
+            message = f"Conflicting rotation members for week {row.week_start.isoformat()} at row {row.line_no}"
+            if errors is None:
+                raise ValueError(message)
+            errors.append({"message": message, "section": "rotation_rows", "line": row.line_no})
+            continue
+        assignment_by_week[row.week_start] = member_id
+    return assignment_by_week
 
-    sorted_weeks = sorted(assignment_by_week.keys())
+
+def _rotation_order(
+    assignment_by_week: dict[date, int],
+    configured_order: list[int],
+    active_member_ids: list[int],
+) -> list[int]:
     imported_order: list[int] = []
-    for week_start in sorted_weeks:
+    for week_start in sorted(assignment_by_week):
         member_id = assignment_by_week[week_start]
         if member_id not in imported_order:
             imported_order.append(member_id)
 
-    config = get_or_create_rotation_config(session)
     existing_order = [
         member_id
-        for member_id in (config.ordered_member_ids_json or [])
+        for member_id in configured_order
         if member_id in active_member_ids and member_id not in imported_order
     ]
     trailing = [
@@ -169,13 +370,31 @@ def _apply_rotation_rows(
         for member_id in active_member_ids
         if member_id not in imported_order and member_id not in existing_order
     ]
-    final_order = imported_order + existing_order + trailing
+    return imported_order + existing_order + trailing
+
+
+def _apply_rotation_rows(
+    session: Session,
+    *,
+    rows: list[_RotationRow],
+    name_index: dict[str, int],
+    active_member_ids: list[int],
+    assignments: AssignmentBatch,
+) -> tuple[date | None, list[int], int]:
+    if not rows:
+        return None, [], 0
+
+    assignment_by_week = _rotation_weeks(rows, name_index)
+    sorted_weeks = sorted(assignment_by_week.keys())
+
+    config = get_or_create_rotation_config(session)
+    final_order = _rotation_order(assignment_by_week, config.ordered_member_ids_json or [], active_member_ids)
 
     config.ordered_member_ids_json = final_order
     config.anchor_week_start = sorted_weeks[0]
 
     for week_start in sorted_weeks:
-        ensure_assignment(session, week_start)
+        assignments.ensure(week_start)
 
     return sorted_weeks[0], final_order, len(sorted_weeks)
 
@@ -183,38 +402,20 @@ def _apply_rotation_rows(
 def _apply_cleaning_history_rows(
     session: Session,
     *,
-    rows_text: str | None,
+    rows: list[_CleaningHistoryRow],
     name_index: dict[str, int],
-    id_to_name: dict[int, str],
     actor_user_id: str | None,
+    assignments: AssignmentBatch,
 ) -> tuple[int, int]:
-    rows = _rows_from_text(rows_text)
-    if not rows:
-        return 0, 0
-
-    imported_rows = 0
-    imported_done_events = 0
-
-    for line_no, row in rows:
-        columns = [part.strip() for part in row.split(",")]
-        if len(columns) < 2:
-            raise ValueError(
-                f"Cleaning history row {line_no} must contain at least 2 columns: "
-                "date,member_name[,status][,completed_by_name]"
-            )
-
-        parsed_date, at_dt = _parse_date_or_datetime(columns[0], line_no=line_no)
-        week_start = monday_for(parsed_date)
-        member_id = _resolve_member_id(session, name_index, id_to_name, columns[1], line_no=line_no)
-        status_value = columns[2].strip().lower() if len(columns) >= 3 and columns[2].strip() else "done"
+    events: list[dict[str, Any]] = []
+    for row in rows:
+        member_id = _member_id(name_index, row.member_name)
+        assignment = assignments.ensure(row.week_start)
 
-        assignment = ensure_assignment(session, week_start)
-        imported_rows += 1
-
-        if status_value == "done":
+        if row.status == "done":
             completed_by_member_id = member_id
-            if len(columns) >= 4 and columns[3].strip():
-                completed_by_member_id = _resolve_member_id(session, name_index, id_to_name, columns[3], line_no=line_no)
+            if row.completed_by_name is not None:
+                completed_by_member_id = _member_id(name_index, row.completed_by_name)
 
             completion_mode = (
                 "own" if assignment.assignee_member_id == completed_by_member_id else "takeover"
@@ -222,10 +423,10 @@ def _apply_cleaning_history_rows(
             assignment.status = CleaningAssignmentStatus.DONE
             assignment.completed_by_member_id = completed_by_member_id
             assignment.completion_mode = completion_mode
-            assignment.completed_at = at_dt
+            assignment.completed_at = row.at
 
             payload: dict[str, Any] = {
-                "week_start": week_start.isoformat(),
+                "week_start": row.week_start.isoformat(),
                 "completed_by_member_id": completed_by_member_id,
                 "completion_mode": completion_mode,
                 "imported": True,
@@ -236,158 +437,124 @@ def _apply_cleaning_history_rows(
                 payload["cleaner_member_id"] = completed_by_member_id
                 payload["original_assignee_member_id"] = assignment.assignee_member_id
 
-            log_event(
-                session,
-                domain="cleaning",
-                action=action,
-                actor_member_id=completed_by_member_id,
-                actor_user_id_raw=actor_user_id,
-                payload=payload,
-                created_at=at_dt,
+            events.append(
+                {
+                    "domain": "cleaning",
+                    "action": action,
+                    "actor_member_id": completed_by_member_id,
+                    "actor_user_id_raw": actor_user_id,
+                    "payload": payload,
+                    "created_at": row.at,
+                }
             )
-            imported_done_events += 1
-            continue
-
-        if status_value == "missed":
-            assignment.status = CleaningAssignmentStatus.MISSED
-            assignment.completed_by_member_id = None
-            assignment.completion_mode = None
-            assignment.completed_at = None
-            continue
-
-        if status_value == "pending":
-            assignment.status = CleaningAssignmentStatus.PENDING
-            assignment.completed_by_member_id = None
-            assignment.completion_mode = None
-            assignment.completed_at = None
             continue
 
-        raise ValueError(
-            f"Unsupported cleaning status '{status_value}' at row {line_no}. "
-            "Allowed values: done, missed, pending"
+        assignment.status = (
+            CleaningAssignmentStatus.MISSED if row.status == "missed" else CleaningAssignmentStatus.PENDING
         )
+        assignment.completed_by_member_id = None
+        assignment.completion_mode = None
+        assignment.completed_at = None
 
-    return imported_rows, imported_done_events
+    log_events(session, events)
+    return len(rows), len(events)
 
 
 def _apply_shopping_history_rows(
     session: Session,
     *,
-    rows_text: str | None,
+    rows: list[_ShoppingHistoryRow],
     name_index: dict[str, int],
-    id_to_name: dict[int, str],
     actor_user_id: str | None,
 ) -> int:
-    rows = _rows_from_text(rows_text)
     if not rows:
         return 0
 
-    imported_rows = 0
+    buyer_ids = [_member_id(name_index, row.buyer_name) for row in rows]
+    version = allocate_version(session)
+    item_ids = session.execute(
+        insert(ShoppingItem).returning(ShoppingItem.id, sort_by_parameter_order=True),
+        [
+            {
+                "name": row.item_name,
+                "status": ShoppingStatus.COMPLETED,
+                "added_by_member_id": buyer_id,
+                "added_by_user_id_raw": None,
+                "added_at": row.at,
+                "completed_by_member_id": buyer_id,
+                "completed_by_user_id_raw": None,
+                "completed_at": row.at,
+                "deleted_by_member_id": None,
+                "deleted_by_user_id_raw": None,
+                "deleted_at": None,
+                "updated_version": version,
+            }
+            for row, buyer_id in zip(rows, buyer_ids)
+        ],
+    ).scalars().all()
 
-    for line_no, row in rows:
-        columns = [part.strip() for part in row.split(",")]
-        if len(columns) < 3:
-            raise ValueError(
-                f"Shopping history row {line_no} must contain at least 3 columns: "
-                "date,item_name,buyer_name"
-            )
+    log_events(
+        session,
+        [
+            {
+                "domain": "shopping",
+                "action": "shopping_item_completed",
+                "actor_member_id": buyer_id,
+                "actor_user_id_raw": actor_user_id,
+                "payload": {"item_id": item_id, "name": row.item_name, "imported": True},
+                "created_at": row.at,
+            }
+            for row, buyer_id, item_id in zip(rows, buyer_ids, item_ids)
+        ],
+    )
+    return len(rows)
 
-        _parsed_date, at_dt = _parse_date_or_datetime(columns[0], line_no=line_no)
-        item_name = columns[1].strip()
-        if not item_name:
-            raise ValueError(f"Missing shopping item name at row {line_no}")
-        buyer_member_id = _resolve_member_id(session, name_index, id_to_name, columns[2], line_no=line_no)
-
-        item = ShoppingItem(
-            name=item_name,
-            status=ShoppingStatus.COMPLETED,
-            added_by_member_id=buyer_member_id,
-            added_by_user_id_raw=None,
-            added_at=at_dt,
-            completed_by_member_id=buyer_member_id,
-            completed_by_user_id_raw=None,
-            completed_at=at_dt,
-            deleted_by_member_id=None,
-            deleted_by_user_id_raw=None,
-            deleted_at=None,
-        )
-        session.add(item)
-        session.flush()
 
-        log_event(
-            session,
-            domain="shopping",
-            action="shopping_item_completed",
-            actor_member_id=buyer_member_id,
-            actor_user_id_raw=actor_user_id,
-            payload={"item_id": item.id, "name": item.name, "imported": True},
-            created_at=at_dt,
+def _override_row_error(
+    row: _CleaningOverrideRow,
+    *,
+    member_from_id: int,
+    member_to_id: int,
+    week_has_planned_override: bool,
+) -> str | None:
+    if member_from_id == member_to_id:
+        return f"Cleaning override row {row.line_no} must use two different members."
+    if week_has_planned_override:
+        return (
+            f"Week {row.week_start.isoformat()} already has a planned override. "
+            "Cancel existing override first or choose another week."
         )
-        imported_rows += 1
-
-    return imported_rows
-
-
-def _parse_override_type(token: str | None, *, line_no: int) -> OverrideType:
-    raw = (token or "").strip().lower()
-    if not raw or raw == "compensation":
-        return OverrideType.COMPENSATION
-    if raw in {"manual_swap", "swap"}:
-        return OverrideType.MANUAL_SWAP
-    raise ValueError(
-        f"Unsupported override type '{token}' at row {line_no}. "
-        "Allowed values: compensation, manual_swap"
-    )
+    return None
 
 
 def _apply_cleaning_override_rows(
     session: Session,
     *,
-    rows_text: str | None,
+    rows: list[_CleaningOverrideRow],
     name_index: dict[str, int],
-    id_to_name: dict[int, str],
     actor_user_id: str | None,
+    assignments: AssignmentBatch,
 ) -> tuple[int, int]:
-    rows = _rows_from_text(rows_text)
     if not rows:
         return 0, 0
 
-    imported_rows = 0
     imported_overrides: list[CleaningOverride] = []
-    for line_no, row in rows:
-        columns = [part.strip() for part in row.split(",")]
-        if len(columns) < 3:
-            raise ValueError(
-                f"Cleaning override row {line_no} must contain at least 3 columns: "
-                "date,member_from_name,member_to_name[,override_type]"
-            )
-
-        parsed_date, _at_dt = _parse_date_or_datetime(columns[0], line_no=line_no)
-        week_start = monday_for(parsed_date)
-        member_from_id = _resolve_member_id(session, name_index, id_to_name, columns[1], line_no=line_no)
-        member_to_id = _resolve_member_id(session, name_index, id_to_name, columns[2], line_no=line_no)
-        override_type = _parse_override_type(columns[3] if len(columns) >= 4 else None, line_no=line_no)
+    for row in rows:
+        member_from_id = _member_id(name_index, row.member_from_name)
+        member_to_id = _member_id(name_index, row.member_to_name)
 
-        if member_from_id == member_to_id:
-            raise ValueError(
-                f"Cleaning override row {line_no} must use two different members."
-            )
-
-        existing_planned = session.execute(
-            select(CleaningOverride).where(
-                CleaningOverride.week_start == week_start,
-                CleaningOverride.status == OverrideStatus.PLANNED,
-            )
-        ).scalar_one_or_none()
-        if existing_planned is not None:
-            raise ValueError(
-                f"Week {week_start.isoformat()} already has a planned override. "
-                "Cancel existing override first or choose another week."
-            )
+        error = _override_row_error(
+            row,
+            member_from_id=member_from_id,
+            member_to_id=member_to_id,
+            week_has_planned_override=assignments.planned_override(row.week_start) is not None,
+        )
+        if error is not None:
+            raise ValueError(error)
 
         override = CleaningOverride(
-            week_start=week_start,
-            type=override_type,
+            week_start=row.week_start,
+            type=row.override_type,
             source=OverrideSource.MANUAL,
             source_event_id=None,
             member_from_id=member_from_id,
@@ -395,10 +562,9 @@ def _apply_cleaning_override_rows(
             status=OverrideStatus.PLANNED,
             created_by_member_id=None,
         )
-        session.add(override)
+        assignments.add_planned_override(override)
         imported_overrides.append(override)
-        ensure_assignment(session, week_start)
-        imported_rows += 1
+        assignments.ensure(row.week_start)
 
     linked_pairs = _link_imported_manual_swap_pairs(
         session,
@@ -406,22 +572,18 @@ def _apply_cleaning_override_rows(
         actor_user_id=actor_user_id,
     )
 
-    return imported_rows, linked_pairs
+    return len(rows), linked_pairs
 
 
-def _link_imported_manual_swap_pairs(
-    session: Session,
-    *,
-    imported_overrides: list[CleaningOverride],
-    actor_user_id: str | None,
-) -> int:
-    if not imported_overrides:
-        return 0
+def _pair_manual_swaps(
+    overrides: list[CleaningOverride],
+) -> list[tuple[CleaningOverride, CleaningOverride]]:
+    """Match imported manual swaps with the later compensation that returns the week."""
 
     manual_swaps = sorted(
         [
             override
-            for override in imported_overrides
+            for override in overrides
             if override.type == OverrideType.MANUAL_SWAP
             and override.source == OverrideSource.MANUAL
             and override.source_event_id is None
@@ -429,10 +591,10 @@ def _link_imported_manual_swap_pairs(
         key=lambda override: override.week_start,
     )
     if not manual_swaps:
-        return 0
+        return []
 
     compensation_by_pair: dict[tuple[int, int], list[CleaningOverride]] = {}
-    for override in imported_overrides:
+    for override in overrides:
         if override.type != OverrideType.COMPENSATION:
             continue
         if override.source != OverrideSource.MANUAL:
@@ -445,7 +607,7 @@ def _link_imported_manual_swap_pairs(
     for rows in compensation_by_pair.values():
         rows.sort(key=lambda override: override.week_start)
 
-    linked_pairs = 0
+    pairs: list[tuple[CleaningOverride, CleaningOverride]] = []
     for swap_override in manual_swaps:
         compensation_key = (swap_override.member_to_id, swap_override.member_from_id)
         candidates = compensation_by_pair.get(compensation_key, [])
@@ -464,6 +626,20 @@ def _link_imported_manual_swap_pairs(
         if match_override is None:
             continue
 
+        candidates.pop(match_index)
+        pairs.append((swap_override, match_override))
+
+    return pairs
+
+
+def _link_imported_manual_swap_pairs(
+    session: Session,
+    *,
+    imported_overrides: list[CleaningOverride],
+    actor_user_id: str | None,
+) -> int:
+    pairs = _pair_manual_swaps(imported_overrides)
+    for swap_override, match_override in pairs:
         imported_event_at = datetime.combine(swap_override.week_start, time(hour=12, tzinfo=timezone.utc))
         swap_event = log_event(
             session,
@@ -483,10 +659,8 @@ def _link_imported_manual_swap_pairs(
 
         swap_override.source_event_id = swap_event.id
         match_override.source_event_id = swap_event.id
-        candidates.pop(match_index)
-        linked_pairs += 1
 
-    return linked_pairs
+    return len(pairs)
 
 
 def import_manual_data(
@@ -498,41 +672,53 @@ def import_manual_data(
     cleaning_override_rows: str | None,
     actor_user_id: str | None,
 ) -> tuple[dict[str, Any], list[dict]]:
-    if not any(
-        value and value.strip()
-        for value in [rotation_rows, cleaning_history_rows, shopping_history_rows, cleaning_override_rows]
-    ):
-        raise ValueError("At least one import field must be provided")
+    """Apply a manual migration in one transaction.
+
+    All rows are parsed and validated before anything is written. Member names
+    are resolved once (creating inactive placeholders in a single flush),
+    cleaning assignments go through one ``AssignmentBatch`` and shopping items
+    and activity events are inserted with ``executemany``.
+    """
+
+    rows = _parse_manual_rows(
+        rotation_rows=rotation_rows,
+        cleaning_history_rows=cleaning_history_rows,
+        shopping_history_rows=shopping_history_rows,
+        cleaning_override_rows=cleaning_override_rows,
+    )
 
     name_index, active_member_ids, id_to_name = _member_index(session)
+    _resolve_members(session, name_index, id_to_name, rows.member_names())
+
+    assignments = AssignmentBatch(session)
+    assignments.preload(rows.weeks())
 
     anchor_week_start, order_member_ids, rotation_weeks_imported = _apply_rotation_rows(
         session,
-        rows_text=rotation_rows,
+        rows=rows.rotation,
         name_index=name_index,
-        id_to_name=id_to_name,
         active_member_ids=active_member_ids,
+        assignments=assignments,
     )
     cleaning_rows_imported, cleaning_done_events_imported = _apply_cleaning_history_rows(
         session,
-        rows_text=cleaning_history_rows,
+        rows=rows.cleaning_history,
         name_index=name_index,
-        id_to_name=id_to_name,
         actor_user_id=actor_user_id,
+        assignments=assignments,
     )
     shopping_rows_imported = _apply_shopping_history_rows(
         session,
-        rows_text=shopping_history_rows,
+        rows=rows.shopping_history,
         name_index=name_index,
-        id_to_name=id_to_name,
         actor_user_id=actor_user_id,
     )
     cleaning_override_rows_imported, cleaning_override_swap_pairs_linked = _apply_cleaning_override_rows(
         session,
-        rows_text=cleaning_override_rows,
+        rows=rows.cleaning_overrides,
         name_index=name_index,
-        id_to_name=id_to_name,
         actor_user_id=actor_user_id,
+        assignments=assignments,
     )
 
     summary = {
@@ -561,6 +747,100 @@ def import_manual_data(
     return summary, []
 
 
+def validate_manual_data(
+    session: Session,
+    *,
+    rotation_rows: str | None,
+    cleaning_history_rows: str | None,
+    shopping_history_rows: str | None,
+    cleaning_override_rows: str | None,
+) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """Dry-run a manual import: return the projected summary and every error.
+
+    Nothing is written. Rows are checked against an in-memory member index,
+    where unknown names get provisional negative ids, and against the stored
+    rotation and planned overrides.
+    """
+
+    errors: list[dict[str, Any]] = []
+    rows = _parse_manual_rows(
+        rotation_rows=rotation_rows,
+        cleaning_history_rows=cleaning_history_rows,
+        shopping_history_rows=shopping_history_rows,
+        cleaning_override_rows=cleaning_override_rows,
+        errors=errors,
+    )
+
+    try:
+        name_index, active_member_ids, id_to_name = _member_index(session)
+    except ValueError as exc:
+        errors.append({"message": str(exc), "section": None, "line": None})
+        name_index, active_member_ids, id_to_name = {}, [], {}
+
+    new_placeholders: list[str] = []
+    for raw_name in rows.member_names():
+        key = _normalize_member_name(raw_name)
+        if key not in name_index:
+            name_index[key] = -(len(new_placeholders) + 1)
+            id_to_name[name_index[key]] = raw_name.strip()
+            new_placeholders.append(raw_name.strip())
+
+    assignment_by_week = _rotation_weeks(rows.rotation, name_index, errors)
+    order_member_ids: list[int] = []
+    if assignment_by_week:
+        config = session.get(RotationConfig, 1)
+        configured_order = list(config.ordered_member_ids_json or []) if config is not None else []
+        order_member_ids = _rotation_order(assignment_by_week, configured_order, active_member_ids)
+
+    # Read-only: the batch only loads planned overrides here, it never adds any.
+    assignments = AssignmentBatch(session)
+    assignments.preload(row.week_start for row in rows.cleaning_overrides)
+    planned_weeks: set[date] = set()
+    projected_overrides: list[CleaningOverride] = []
+    for row in rows.cleaning_overrides:
+        member_from_id = _member_id(name_index, row.member_from_name)
+        member_to_id = _member_id(name_index, row.member_to_name)
+        error = _override_row_error(
+            row,
+            member_from_id=member_from_id,
+            member_to_id=member_to_id,
+            week_has_planned_override=(
+                row.week_start in planned_weeks or assignments.planned_override(row.week_start) is not None
+            ),
+        )
+        if error is not None:
+            errors.append({"message": error, "section": "cleaning_override_rows", "line": row.line_no})
+            continue
+        planned_weeks.add(row.week_start)
+        projected_overrides.append(
+            CleaningOverride(
+                week_start=row.week_start,
+                type=row.override_type,
+                source=OverrideSource.MANUAL,
+                source_event_id=None,
+                member_from_id=member_from_id,
+                member_to_id=member_to_id,
+                status=OverrideStatus.PLANNED,
+            )
+        )
+
+    anchor_week_start = min(assignment_by_week) if assignment_by_week else None
+    summary = {
+        "rotation_weeks_imported": len(assignment_by_week),
+        "rotation_anchor_week_start": anchor_week_start.isoformat() if anchor_week_start else None,
+        "rotation_order_member_ids": order_member_ids,
+        "rotation_order_names": [id_to_name.get(member_id, str(member_id)) for member_id in order_member_ids],
+        "cleaning_history_rows_imported": len(rows.cleaning_history),
+        "cleaning_done_events_imported": sum(1 for row in rows.cleaning_history if row.status == "done"),
+        "shopping_history_rows_imported": len(rows.shopping_history),
+        "cleaning_override_rows_imported": len(rows.cleaning_overrides),
+        "cleaning_override_swap_pairs_linked": len(_pair_manual_swaps(projected_overrides)),
+        "new_placeholder_members": new_placeholders,
+    }
+    errors.sort(key=lambda error: (_SECTION_ORDER.get(error["section"], -1), error["line"] or 0))
+    return summary, errors
+
+
 def import_flatastic_data(
     session: Session,
     *,
@@ -2,15 +2,249 @@
 
 from __future__ import annotations
 
-from sqlalchemy import select
+from dataclasses import dataclass, field
+import threading
+from typing import TYPE_CHECKING, Any, cast
+
+from sqlalchemy import event, select
 from sqlalchemy.orm import Session
 
+from ..db import TenantLocal
 from ..models import Member
 from ..schemas import MemberSyncItem
+from .versioning import shared_data_version
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+_DIRECTORY_STALE_KEY = "member_directory_stale"
+
+
+@dataclass(frozen=True)
+class MemberRecord:
+    """Immutable read-only view of a member row used by hot lookup paths."""
+
+    id: int
+    display_name: str
+    ha_user_id: str | None
+    ha_person_entity_id: str | None
+    notify_service: str | None
+    notify_services: tuple[str, ...]
+    device_trackers: tuple[str, ...]
+    active: bool
+
+    @classmethod
+    def from_model(cls, member: Member) -> MemberRecord:
+        return cls(
+            id=int(member.id),
+            display_name=member.display_name,
+            ha_user_id=member.ha_user_id,
+            ha_person_entity_id=member.ha_person_entity_id,
+            notify_service=member.notify_service,
+            notify_services=tuple(member.notify_services or []),
+            device_trackers=tuple(member.device_trackers or []),
+            active=bool(member.active),
+        )
+
+
+class MemberDirectory:
+    """Member cache of one database, keyed by member id and HA user id.
+
+    The directory is loaded lazily from the database and only rebuilt after a
+    commit that touched member rows, so actor resolution and notification
+    builders avoid one query per lookup. With several workers it is also
+    rebuilt once the shared data version moved, since other processes'
+    commits do not reach this process's hooks.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._bind: Any = None
+        self._shared_version: int | None = None
+        self._by_id: dict[int, MemberRecord] | None = None
+        self._by_user_id: dict[str, MemberRecord] = {}
+        self._active: tuple[MemberRecord, ...] = ()
+        self._last_sync_hash: str | None = None
+        self.hits = 0
+        self.misses = 0
+        self.rebuilds = 0
+        self.invalidations = 0
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._by_id = None
+            self._by_user_id = {}
+            self._active = ()
+            self._last_sync_hash = None
+            self.invalidations += 1
+
+    def stats(self) -> dict[str, int | bool]:
+        with self._lock:
+            return {
+                "loaded": self._by_id is not None,
+                "members": len(self._by_id or {}),
+                "active_members": len(self._active),
+                "hits": self.hits,
+                "misses": self.misses,
+                "rebuilds": self.rebuilds,
+                "invalidations": self.invalidations,
+            }
+
+    def _usable(self, session: Session) -> bool:
+        # Uncommitted member writes in this session must be visible to its own
+        # lookups, so bypass the shared cache until the transaction ends.
+        if session.info.get(_DIRECTORY_STALE_KEY):
+            return False
+
+        bind = session.get_bind()
+        shared_version = shared_data_version(session)
+        with self._lock:
+            if self._by_id is not None and self._bind is bind and self._shared_version == shared_version:
+                return True
+            generation = self._generation
+
+        rows = session.execute(select(Member).order_by(Member.display_name.asc())).scalars().all()
+        records = [MemberRecord.from_model(row) for row in rows]
+
+        with self._lock:
+            if generation != self._generation:
+                return False
+            self._bind = bind
+            self._shared_version = shared_version
+            self._by_id = {record.id: record for record in records}
+            self._by_user_id = {record.ha_user_id: record for record in records if record.ha_user_id}
+            self._active = tuple(record for record in records if record.active)
+            # A remembered sync hash described the rows this rebuild replaces.
+            self._last_sync_hash = None
+            self.rebuilds += 1
+        return True
+
+    def by_id(self, session: Session, member_id: int) -> MemberRecord | None:
+        if self._usable(session):
+            record = (self._by_id or {}).get(member_id)
+            if record is not None:
+                self.hits += 1
+                return record
+
+        self.misses += 1
+        member = session.get(Member, member_id)
+        return MemberRecord.from_model(member) if member is not None else None
+
+    def by_ha_user_id(self, session: Session, ha_user_id: str) -> MemberRecord | None:
+        if self._usable(session):
+            record = self._by_user_id.get(ha_user_id)
+            if record is not None:
+                self.hits += 1
+                return record
+
+        self.misses += 1
+        member = session.execute(select(Member).where(Member.ha_user_id == ha_user_id)).scalar_one_or_none()
+        return MemberRecord.from_model(member) if member is not None else None
+
+    def all(self, session: Session) -> list[MemberRecord]:
+        if self._usable(session):
+            self.hits += 1
+            return list((self._by_id or {}).values())
+
+        self.misses += 1
+        rows = session.execute(select(Member).order_by(Member.display_name.asc())).scalars().all()
+        return [MemberRecord.from_model(row) for row in rows]
+
+    def remember_sync_hash(self, session: Session, payload_hash: str | None) -> None:
+        """Record the payload hash of a member sync that has been fully applied."""
 
+        if not payload_hash or not self._usable(session):
+            return
+        with self._lock:
+            if self._by_id is not None:
+                self._last_sync_hash = payload_hash
 
-def sync_members(session: Session, items: list[MemberSyncItem]) -> tuple[list[Member], list[int]]:
-    """Upsert members from Home Assistant mappings."""
+    def matches_sync_hash(self, session: Session, payload_hash: str | None) -> bool:
+        if not payload_hash or not self._usable(session):
+            return False
+        with self._lock:
+            return self._last_sync_hash == payload_hash
+
+    def active(self, session: Session) -> list[MemberRecord]:
+        if self._usable(session):
+            self.hits += 1
+            return list(self._active)
+
+        self.misses += 1
+        rows = session.execute(
+            select(Member).where(Member.active.is_(True)).order_by(Member.display_name.asc())
+        ).scalars().all()
+        return [MemberRecord.from_model(row) for row in rows]
+
+
+member_directory = cast(MemberDirectory, TenantLocal(MemberDirectory))
+
+
+def mark_member_directory_stale(session: Session) -> None:
+    """Flag that this session changed member rows outside of the ORM unit of work."""
+
+    session.info[_DIRECTORY_STALE_KEY] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _track_member_writes(session: Session, _flush_context: Any) -> None:
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, Member):
+            session.info[_DIRECTORY_STALE_KEY] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_member_commit(session: Session) -> None:
+    if session.info.pop(_DIRECTORY_STALE_KEY, False):
+        member_directory.invalidate()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _reset_after_member_rollback(session: Session, _previous_transaction: Any) -> None:
+    session.info.pop(_DIRECTORY_STALE_KEY, None)
+
+
+@dataclass
+class MemberSyncResult:
+    """Outcome of a diff-based member sync."""
+
+    members: list[Member]
+    inserted: int = 0
+    updated: int = 0
+    deactivated_member_ids: list[int] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.inserted or self.updated or self.deactivated_member_ids)
+
+
+def _member_sync_changes(member: Member, item: MemberSyncItem) -> dict[str, Any]:
+    desired = {
+        "display_name": item.display_name.strip(),
+        "ha_person_entity_id": item.ha_person_entity_id,
+        "notify_service": item.notify_service,
+        "notify_services": [str(value) for value in item.notify_services if str(value)],
+        "device_trackers": [str(value) for value in item.device_trackers if str(value)],
+        "active": item.active,
+    }
+    changes: dict[str, Any] = {}
+    for field_name, value in desired.items():
+        current = getattr(member, field_name)
+        if field_name in {"notify_services", "device_trackers"}:
+            current = list(current or [])
+        elif field_name == "active":
+            current = bool(current)
+        if current != value:
+            changes[field_name] = value
+    return changes
+
+
+def sync_members(session: Session, items: list[MemberSyncItem]) -> MemberSyncResult:
+    """Apply Home Assistant member mappings, only writing rows whose fields changed."""
 
     existing = {
         m.ha_user_id: m
@@ -19,10 +253,10 @@ def sync_members(session: Session, items: list[MemberSyncItem]) -> tuple[list[Me
 
     seen_user_ids: set[str] = set()
     deactivated_member_ids: set[int] = set()
+    inserted = 0
+    updated_member_ids: set[int] = set()
 
     for item in items:
-        notify_services = [str(value) for value in item.notify_services if str(value)]
-        device_trackers = [str(value) for value in item.device_trackers if str(value)]
         member = existing.get(item.ha_user_id) if item.ha_user_id else None
         if member is None:
             member = Member(
@@ -30,21 +264,20 @@ def sync_members(session: Session, items: list[MemberSyncItem]) -> tuple[list[Me
                 ha_user_id=item.ha_user_id,
                 ha_person_entity_id=item.ha_person_entity_id,
                 notify_service=item.notify_service,
-                notify_services=notify_services,
-                device_trackers=device_trackers,
+                notify_services=[str(value) for value in item.notify_services if str(value)],
+                device_trackers=[str(value) for value in item.device_trackers if str(value)],
                 active=item.active,
             )
             session.add(member)
+            inserted += 1
         else:
-            was_active = bool(member.active)
-            member.display_name = item.display_name.strip()
-            member.ha_person_entity_id = item.ha_person_entity_id
-            member.notify_service = item.notify_service
-            member.notify_services = notify_services
-            member.device_trackers = device_trackers
-            member.active = item.active
-            if was_active and not member.active:
-                deactivated_member_ids.add(member.id)
+            changes = _member_sync_changes(member, item)
+            if changes:
+                if changes.get("active") is False:
+                    deactivated_member_ids.add(member.id)
+                for field_name, value in changes.items():
+                    setattr(member, field_name, value)
+                updated_member_ids.add(member.id)
 
         if item.ha_user_id:
             seen_user_ids.add(item.ha_user_id)
@@ -55,25 +288,34 @@ def sync_members(session: Session, items: list[MemberSyncItem]) -> tuple[list[Me
                 member.active = False
                 deactivated_member_ids.add(member.id)
 
-    session.commit()
+    if inserted or updated_member_ids or deactivated_member_ids:
+        session.commit()
 
     rows = session.execute(select(Member).order_by(Member.display_name.asc())).scalars().all()
-    return rows, sorted(deactivated_member_ids)
+    return MemberSyncResult(
+        members=rows,
+        inserted=inserted,
+        updated=len(updated_member_ids - deactivated_member_ids),
+        deactivated_member_ids=sorted(deactivated_member_ids),
+    )
 
 
-def resolve_actor_member(session: Session, actor_user_id: str | None) -> Member | None:
+def resolve_actor_member(session: Session, actor_user_id: str | None) -> MemberRecord | None:
     """Resolve actor user id to a member; unknown users return None."""
 
     if not actor_user_id:
         return None
-    return session.execute(select(Member).where(Member.ha_user_id == actor_user_id)).scalar_one_or_none()
+    return member_directory.by_ha_user_id(session, actor_user_id)
+
+
+def get_active_members(session: Session) -> list[MemberRecord]:
+    return member_directory.active(session)
 
 
-def get_active_members(session: Session) -> list[Member]:
-    return session.execute(
-        select(Member).where(Member.active.is_(True)).order_by(Member.display_name.asc())
-    ).scalars().all()
+def get_member_by_id(session: Session, member_id: int) -> MemberRecord | None:
+    return member_directory.by_id(session, member_id)
 
 
-def get_member_by_id(session: Session, member_id: int) -> Member | None:
-    return session.get(Member, member_id)
+async def list_members_async(session: AsyncSession) -> list[MemberRecord]:
+    rows = (await session.execute(select(Member).order_by(Member.display_name.asc()))).scalars().all()
+    return [MemberRecord.from_model(row) for row in rows]
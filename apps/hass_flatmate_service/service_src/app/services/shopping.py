@@ -5,8 +5,9 @@ from __future__ import annotations
 import hashlib
 import html
 from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING
 
-from sqlalchemy import case, desc, func, select
+from sqlalchemy import Select, case, desc, func, select
 from sqlalchemy.orm import Session
 
 from ..models import Member, ShoppingFavorite, ShoppingItem, ShoppingStatus
@@ -14,14 +15,23 @@ from ..services.activity import log_event
 from ..services.members import get_active_members, resolve_actor_member
 from ..services.time_utils import now_utc
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def _list_items_query() -> Select:
+    return select(ShoppingItem).order_by(
+        case((ShoppingItem.status == ShoppingStatus.OPEN, 0), else_=1),
+        ShoppingItem.added_at.desc(),
+    )
+
 
 def list_items(session: Session) -> list[ShoppingItem]:
-    return session.execute(
-        select(ShoppingItem).order_by(
-            case((ShoppingItem.status == ShoppingStatus.OPEN, 0), else_=1),
-            ShoppingItem.added_at.desc(),
-        )
-    ).scalars().all()
+    return session.execute(_list_items_query()).scalars().all()
+
+
+async def list_items_async(session: AsyncSession) -> list[ShoppingItem]:
+    return (await session.execute(_list_items_query())).scalars().all()
 
 
 def add_item(session: Session, name: str, actor_user_id: str | None) -> ShoppingItem:
@@ -140,12 +150,20 @@ def delete_favorite(session: Session, favorite_id: int, actor_user_id: str | Non
     session.commit()
 
 
-def list_favorites(session: Session) -> list[ShoppingFavorite]:
-    return session.execute(
+def _list_favorites_query() -> Select:
+    return (
         select(ShoppingFavorite)
         .where(ShoppingFavorite.active.is_(True))
         .order_by(ShoppingFavorite.name.asc())
-    ).scalars().all()
+    )
+
+
+def list_favorites(session: Session) -> list[ShoppingFavorite]:
+    return session.execute(_list_favorites_query()).scalars().all()
+
+
+async def list_favorites_async(session: AsyncSession) -> list[ShoppingFavorite]:
+    return (await session.execute(_list_favorites_query())).scalars().all()
 
 
 def recent_item_names(session: Session, limit: int = 20) -> list[str]:
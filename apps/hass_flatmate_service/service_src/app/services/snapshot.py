@@ -2,10 +2,15 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable, Iterable, Iterator
 from datetime import date, datetime
+from enum import Enum
+import time
 from typing import Any
 
-from sqlalchemy import delete, select
+import orjson
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from ..models import (
@@ -13,6 +18,7 @@ from ..models import (
     CleaningAssignment,
     CleaningAssignmentStatus,
     CleaningOverride,
+    DeletedRow,
     Member,
     OverrideSource,
     OverrideStatus,
@@ -22,10 +28,23 @@ from ..models import (
     ShoppingItem,
     ShoppingStatus,
 )
+from ..db import begin_read_snapshot
+from ..migrations import HOT_PATH_INDEXES
+from ..services.members import mark_member_directory_stale
 from ..services.time_utils import now_utc
+from ..services.versioning import (
+    allocate_version,
+    current_versions,
+    mark_data_reset,
+    parse_row_key,
+    set_source_version,
+)
 
 
 _SNAPSHOT_SCHEMA_VERSION = 1
+_EXPORT_BATCH_SIZE = 1000
+_IMPORT_BATCH_SIZE = 5000
+_MAX_REPORTED_ERRORS = 1000
 
 
 def _parse_date(value: Any, *, field_name: str) -> date:
@@ -61,159 +80,275 @@ def _as_iso(value: Any) -> Any:
     return value
 
 
-def _export_rows(rows: list[Any], fields: list[str]) -> list[dict[str, Any]]:
-    payload: list[dict[str, Any]] = []
-    for row in rows:
-        payload.append(
-            {
-                field: _as_iso(getattr(row, field))
-                for field in fields
-            }
-        )
-    return payload
-
-
-def export_snapshot(session: Session) -> dict[str, Any]:
-    members = session.execute(select(Member).order_by(Member.id.asc())).scalars().all()
+EXPORT_TABLES: list[tuple[str, type, tuple[str, ...], list[str]]] = [
+    (
+        "members",
+        Member,
+        ("id",),
+        [
+            "id",
+            "display_name",
+            "ha_user_id",
+            "ha_person_entity_id",
+            "notify_service",
+            "notify_services",
+            "device_trackers",
+            "active",
+            "created_at",
+            "updated_at",
+        ],
+    ),
+    (
+        "cleaning_assignments",
+        CleaningAssignment,
+        ("week_start",),
+        [
+            "week_start",
+            "assignee_member_id",
+            "status",
+            "completed_by_member_id",
+            "completion_mode",
+            "completed_at",
+            "notified_slots",
+        ],
+    ),
+    (
+        "cleaning_overrides",
+        CleaningOverride,
+        ("week_start", "id"),
+        [
+            "id",
+            "week_start",
+            "type",
+            "source",
+            "source_event_id",
+            "member_from_id",
+            "member_to_id",
+            "status",
+            "created_by_member_id",
+            "created_at",
+            "updated_at",
+        ],
+    ),
+    (
+        "shopping_items",
+        ShoppingItem,
+        ("id",),
+        [
+            "id",
+            "name",
+            "status",
+            "added_by_member_id",
+            "added_by_user_id_raw",
+            "added_at",
+            "completed_by_member_id",
+            "completed_by_user_id_raw",
+            "completed_at",
+            "deleted_by_member_id",
+            "deleted_by_user_id_raw",
+            "deleted_at",
+        ],
+    ),
+    (
+        "shopping_favorites",
+        ShoppingFavorite,
+        ("id",),
+        [
+            "id",
+            "name",
+            "active",
+            "created_by_member_id",
+            "created_by_user_id_raw",
+            "created_at",
+        ],
+    ),
+    (
+        "activity_events",
+        ActivityEvent,
+        ("id",),
+        [
+            "id",
+            "domain",
+            "action",
+            "actor_member_id",
+            "actor_user_id_raw",
+            "payload_json",
+            "created_at",
+        ],
+    ),
+]
+
+
+def _export_value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    return _as_iso(value)
+
+
+def iter_export_rows(
+    session: Session,
+    model: type,
+    order_by: tuple[str, ...],
+    fields: list[str],
+    *,
+    batch_size: int,
+    since: int | None = None,
+    where: Iterable[Any] = (),
+) -> Iterator[dict[str, Any]]:
+    """Yield exported rows of one table, fetched in batches through a server-side cursor.
+
+    With ``since``, only rows stamped with a later ``updated_version`` are read;
+    ``where`` adds further filter criteria.
+    """
+
+    statement = select(*(getattr(model, field) for field in fields)).where(*where)
+    if since is not None:
+        statement = statement.where(model.updated_version > since)
+    statement = statement.order_by(*(getattr(model, column).asc() for column in order_by)).execution_options(
+        yield_per=batch_size
+    )
+    for row in session.execute(statement):
+        yield {field: _export_value(value) for field, value in zip(fields, row)}
+
+
+def export_rotation(session: Session, *, since: int | None = None) -> dict[str, Any] | None:
     rotation = session.get(RotationConfig, 1)
-    cleaning_assignments = session.execute(
-        select(CleaningAssignment).order_by(CleaningAssignment.week_start.asc())
-    ).scalars().all()
-    cleaning_overrides = session.execute(
-        select(CleaningOverride).order_by(CleaningOverride.week_start.asc(), CleaningOverride.id.asc())
-    ).scalars().all()
-    shopping_items = session.execute(select(ShoppingItem).order_by(ShoppingItem.id.asc())).scalars().all()
-    shopping_favorites = session.execute(select(ShoppingFavorite).order_by(ShoppingFavorite.id.asc())).scalars().all()
-    activity_events = session.execute(select(ActivityEvent).order_by(ActivityEvent.id.asc())).scalars().all()
-
-    data: dict[str, Any] = {
-        "members": _export_rows(
-            members,
-            [
-                "id",
-                "display_name",
-                "ha_user_id",
-                "ha_person_entity_id",
-                "notify_service",
-                "notify_services",
-                "device_trackers",
-                "active",
-                "created_at",
-                "updated_at",
-            ],
-        ),
-        "rotation_config": None,
-        "cleaning_assignments": _export_rows(
-            cleaning_assignments,
-            [
-                "week_start",
-                "assignee_member_id",
-                "status",
-                "completed_by_member_id",
-                "completion_mode",
-                "completed_at",
-                "notified_slots",
-            ],
-        ),
-        "cleaning_overrides": _export_rows(
-            cleaning_overrides,
-            [
-                "id",
-                "week_start",
-                "type",
-                "source",
-                "source_event_id",
-                "member_from_id",
-                "member_to_id",
-                "status",
-                "created_by_member_id",
-                "created_at",
-                "updated_at",
-            ],
-        ),
-        "shopping_items": _export_rows(
-            shopping_items,
-            [
-                "id",
-                "name",
-                "status",
-                "added_by_member_id",
-                "added_by_user_id_raw",
-                "added_at",
-                "completed_by_member_id",
-                "completed_by_user_id_raw",
-                "completed_at",
-                "deleted_by_member_id",
-                "deleted_by_user_id_raw",
-                "deleted_at",
-            ],
-        ),
-        "shopping_favorites": _export_rows(
-            shopping_favorites,
-            [
-                "id",
-                "name",
-                "active",
-                "created_by_member_id",
-                "created_by_user_id_raw",
-                "created_at",
-            ],
-        ),
-        "activity_events": _export_rows(
-            activity_events,
-            [
-                "id",
-                "domain",
-                "action",
-                "actor_member_id",
-                "actor_user_id_raw",
-                "payload_json",
-                "created_at",
-            ],
-        ),
+    if rotation is None or (since is not None and rotation.updated_version <= since):
+        return None
+    return {
+        "id": rotation.id,
+        "ordered_member_ids_json": list(rotation.ordered_member_ids_json or []),
+        "anchor_week_start": _as_iso(rotation.anchor_week_start),
+        "updated_at": _as_iso(rotation.updated_at),
     }
 
-    if rotation is not None:
-        data["rotation_config"] = {
-            "id": rotation.id,
-            "ordered_member_ids_json": list(rotation.ordered_member_ids_json or []),
-            "anchor_week_start": _as_iso(rotation.anchor_week_start),
-            "updated_at": _as_iso(rotation.updated_at),
-        }
 
-    summary = {
-        "members": len(data["members"]),
-        "cleaning_assignments": len(data["cleaning_assignments"]),
-        "cleaning_overrides": len(data["cleaning_overrides"]),
-        "shopping_items": len(data["shopping_items"]),
-        "shopping_favorites": len(data["shopping_favorites"]),
-        "activity_events": len(data["activity_events"]),
-    }
-    if data["rotation_config"] is not None:
-        summary["rotation_config"] = 1
-    else:
-        summary["rotation_config"] = 0
+def _resolve_since(session: Session, since: int | None) -> tuple[int, int | None]:
+    """Return ``(version, effective_since)`` for an export.
+
+    A ``since`` older than the last data reset cannot be expressed as a delta,
+    so the export falls back to a full snapshot (``effective_since`` is None).
+    """
+
+    version, reset_version, _ = current_versions(session)
+    if since is None:
+        return version, None
+    if since > version:
+        raise ValueError(f"since {since} is ahead of the current data version {version}")
+    if since < reset_version:
+        return version, None
+    return version, since
+
+
+def _deleted_keys(session: Session, since: int) -> dict[str, list[str]]:
+    deleted: dict[str, list[str]] = {}
+    rows = session.execute(
+        select(DeletedRow.table_name, DeletedRow.row_key)
+        .where(DeletedRow.deleted_version > since)
+        .order_by(DeletedRow.id.asc())
+    )
+    for table_name, key in rows:
+        keys = deleted.setdefault(table_name, [])
+        if key not in keys:
+            keys.append(key)
+    return deleted
+
+
+def export_snapshot(session: Session, *, since: int | None = None) -> dict[str, Any]:
+    """Export all data, or with ``since`` only rows changed after that data version.
+
+    Incremental exports carry ``since`` and a ``deleted`` map of primary keys
+    removed in the meantime; apply them on top of the base snapshot they
+    were taken against. The version and all tables are read in one read
+    transaction.
+    """
+
+    begin_read_snapshot(session)
+    version, since = _resolve_since(session, since)
+    data: dict[str, Any] = {"rotation_config": export_rotation(session, since=since)}
+    for name, model, order_by, fields in EXPORT_TABLES:
+        data[name] = list(
+            iter_export_rows(session, model, order_by, fields, batch_size=_EXPORT_BATCH_SIZE, since=since)
+        )
 
-    return {
+    summary = {name: len(data[name]) for name, *_ in EXPORT_TABLES}
+    summary["rotation_config"] = 1 if data["rotation_config"] is not None else 0
+
+    snapshot = {
         "schema_version": _SNAPSHOT_SCHEMA_VERSION,
         "generated_at": now_utc().isoformat(),
+        "version": version,
+        "since": since,
         "summary": summary,
         "data": data,
     }
+    if since is not None:
+        snapshot["deleted"] = _deleted_keys(session, since)
+    return snapshot
+
+
+def iter_snapshot_ndjson(
+    session: Session,
+    *,
+    since: int | None = None,
+    batch_size: int = _EXPORT_BATCH_SIZE,
+) -> Iterator[bytes]:
+    """Stream a snapshot as NDJSON, one table at a time.
+
+    The first line is a ``header`` record with the schema and data versions,
+    followed (for incremental exports) by one ``deleted`` record per table,
+    one ``row`` record per table row and a closing ``summary`` record. Rows
+    are read with ``yield_per`` and emitted in chunks of ``batch_size`` lines,
+    so memory stays flat regardless of history size. The version and every
+    table are read in one read transaction, held until the stream ends.
+    """
+
+    begin_read_snapshot(session)
+    version, since = _resolve_since(session, since)
+    yield orjson.dumps(
+        {
+            "type": "header",
+            "schema_version": _SNAPSHOT_SCHEMA_VERSION,
+            "generated_at": now_utc().isoformat(),
+            "version": version,
+            "since": since,
+        }
+    ) + b"\n"
 
+    if since is not None:
+        for table, keys in _deleted_keys(session, since).items():
+            yield orjson.dumps({"type": "deleted", "table": table, "keys": keys}) + b"\n"
 
-def _require_rows(data: dict[str, Any], key: str) -> list[dict[str, Any]]:
+    summary: dict[str, int] = {}
+    rotation = export_rotation(session, since=since)
+    summary["rotation_config"] = 0 if rotation is None else 1
+    if rotation is not None:
+        yield orjson.dumps({"type": "row", "table": "rotation_config", "row": rotation}) + b"\n"
+
+    for name, model, order_by, fields in EXPORT_TABLES:
+        count = 0
+        chunk: list[bytes] = []
+        for row in iter_export_rows(session, model, order_by, fields, batch_size=batch_size, since=since):
+            chunk.append(orjson.dumps({"type": "row", "table": name, "row": row}))
+            count += 1
+            if len(chunk) >= batch_size:
+                yield b"\n".join(chunk) + b"\n"
+                chunk = []
+        if chunk:
+            yield b"\n".join(chunk) + b"\n"
+        summary[name] = count
+
+    yield orjson.dumps({"type": "summary", "summary": summary}) + b"\n"
+
+
+def _require_rows(data: dict[str, Any], key: str) -> list[Any]:
+    # Rows themselves are checked by SnapshotImporter.add_row.
     rows = data.get(key, [])
     if rows is None:
         return []
     if not isinstance(rows, list):
         raise ValueError(f"snapshot data field '{key}' must be a list")
-    normalized: list[dict[str, Any]] = []
-    for index, row in enumerate(rows, start=1):
-        if not isinstance(row, dict):
-            raise ValueError(f"snapshot data field '{key}' row {index} must be an object")
-        normalized.append(row)
-    return normalized
+    return rows
 
 
 def _clear_all_data(session: Session) -> None:
@@ -224,6 +359,456 @@ def _clear_all_data(session: Session) -> None:
     session.execute(delete(ShoppingFavorite))
     session.execute(delete(RotationConfig))
     session.execute(delete(Member))
+    mark_member_directory_stale(session)
+    mark_data_reset(session)
+
+
+def _parse_int(value: Any, *, field_name: str) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"{field_name} must be an integer") from exc
+
+
+def _optional_int(row: dict[str, Any], key: str, *, field_name: str) -> int | None:
+    value = row.get(key)
+    return _parse_int(value, field_name=field_name) if value is not None else None
+
+
+def _optional_datetime(row: dict[str, Any], key: str, *, field_name: str) -> datetime | None:
+    value = row.get(key)
+    return _parse_datetime(value, field_name=field_name) if value is not None else None
+
+
+def _datetime_or(row: dict[str, Any], key: str, default: datetime, *, field_name: str) -> datetime:
+    value = row.get(key)
+    return _parse_datetime(value, field_name=field_name) if value else default
+
+
+def _member_values(row: dict[str, Any], now: datetime) -> dict[str, Any]:
+    member_id = row.get("id")
+    if member_id is None:
+        raise ValueError("snapshot members rows require an 'id'")
+    return {
+        "id": _parse_int(member_id, field_name="members.id"),
+        "display_name": str(row.get("display_name") or "").strip(),
+        "ha_user_id": row.get("ha_user_id"),
+        "ha_person_entity_id": row.get("ha_person_entity_id"),
+        "notify_service": row.get("notify_service"),
+        "notify_services": [str(value) for value in list(row.get("notify_services") or []) if str(value)],
+        "device_trackers": [str(value) for value in list(row.get("device_trackers") or []) if str(value)],
+        "active": bool(row.get("active", True)),
+        "created_at": _datetime_or(row, "created_at", now, field_name="members.created_at"),
+        "updated_at": _datetime_or(row, "updated_at", now, field_name="members.updated_at"),
+    }
+
+
+def _rotation_values(row: dict[str, Any], now: datetime) -> dict[str, Any]:
+    anchor_week_start = row.get("anchor_week_start")
+    return {
+        "id": _parse_int(row.get("id", 1), field_name="rotation_config.id"),
+        "ordered_member_ids_json": [
+            _parse_int(member_id, field_name="rotation_config.ordered_member_ids_json")
+            for member_id in list(row.get("ordered_member_ids_json") or [])
+        ],
+        "anchor_week_start": (
+            _parse_date(anchor_week_start, field_name="rotation_config.anchor_week_start")
+            if anchor_week_start is not None
+            else None
+        ),
+        "updated_at": _datetime_or(row, "updated_at", now, field_name="rotation_config.updated_at"),
+    }
+
+
+def _shopping_favorite_values(row: dict[str, Any], now: datetime) -> dict[str, Any]:
+    favorite_id = row.get("id")
+    if favorite_id is None:
+        raise ValueError("snapshot shopping_favorites rows require an 'id'")
+    return {
+        "id": _parse_int(favorite_id, field_name="shopping_favorites.id"),
+        "name": str(row.get("name") or "").strip(),
+        "active": bool(row.get("active", True)),
+        "created_by_member_id": _optional_int(
+            row, "created_by_member_id", field_name="shopping_favorites.created_by_member_id"
+        ),
+        "created_by_user_id_raw": row.get("created_by_user_id_raw"),
+        "created_at": _datetime_or(row, "created_at", now, field_name="shopping_favorites.created_at"),
+    }
+
+
+def _shopping_item_values(row: dict[str, Any], now: datetime) -> dict[str, Any]:
+    item_id = row.get("id")
+    if item_id is None:
+        raise ValueError("snapshot shopping_items rows require an 'id'")
+    return {
+        "id": _parse_int(item_id, field_name="shopping_items.id"),
+        "name": str(row.get("name") or "").strip(),
+        "status": ShoppingStatus(str(row.get("status"))),
+        "added_by_member_id": _optional_int(row, "added_by_member_id", field_name="shopping_items.added_by_member_id"),
+        "added_by_user_id_raw": row.get("added_by_user_id_raw"),
+        "added_at": _datetime_or(row, "added_at", now, field_name="shopping_items.added_at"),
+        "completed_by_member_id": _optional_int(
+            row, "completed_by_member_id", field_name="shopping_items.completed_by_member_id"
+        ),
+        "completed_by_user_id_raw": row.get("completed_by_user_id_raw"),
+        "completed_at": _optional_datetime(row, "completed_at", field_name="shopping_items.completed_at"),
+        "deleted_by_member_id": _optional_int(
+            row, "deleted_by_member_id", field_name="shopping_items.deleted_by_member_id"
+        ),
+        "deleted_by_user_id_raw": row.get("deleted_by_user_id_raw"),
+        "deleted_at": _optional_datetime(row, "deleted_at", field_name="shopping_items.deleted_at"),
+    }
+
+
+def _activity_event_values(row: dict[str, Any], now: datetime) -> dict[str, Any]:
+    event_id = row.get("id")
+    if event_id is None:
+        raise ValueError("snapshot activity_events rows require an 'id'")
+    payload_json = row.get("payload_json", {})
+    if not isinstance(payload_json, dict):
+        raise ValueError("snapshot activity_events payload_json must be an object")
+    return {
+        "id": _parse_int(event_id, field_name="activity_events.id"),
+        "domain": str(row.get("domain") or "").strip(),
+        "action": str(row.get("action") or "").strip(),
+        "actor_member_id": _optional_int(row, "actor_member_id", field_name="activity_events.actor_member_id"),
+        "actor_user_id_raw": row.get("actor_user_id_raw"),
+        "payload_json": payload_json,
+        "created_at": _datetime_or(row, "created_at", now, field_name="activity_events.created_at"),
+    }
+
+
+def _cleaning_override_values(row: dict[str, Any], now: datetime) -> dict[str, Any]:
+    override_id = row.get("id")
+    if override_id is None:
+        raise ValueError("snapshot cleaning_overrides rows require an 'id'")
+    return {
+        "id": _parse_int(override_id, field_name="cleaning_overrides.id"),
+        "week_start": _parse_date(row.get("week_start"), field_name="cleaning_overrides.week_start"),
+        "type": OverrideType(str(row.get("type"))),
+        "source": OverrideSource(str(row.get("source"))),
+        "source_event_id": _optional_int(row, "source_event_id", field_name="cleaning_overrides.source_event_id"),
+        "member_from_id": _parse_int(row.get("member_from_id"), field_name="cleaning_overrides.member_from_id"),
+        "member_to_id": _parse_int(row.get("member_to_id"), field_name="cleaning_overrides.member_to_id"),
+        "status": OverrideStatus(str(row.get("status"))),
+        "created_by_member_id": _optional_int(
+            row, "created_by_member_id", field_name="cleaning_overrides.created_by_member_id"
+        ),
+        "created_at": _datetime_or(row, "created_at", now, field_name="cleaning_overrides.created_at"),
+        "updated_at": _datetime_or(row, "updated_at", now, field_name="cleaning_overrides.updated_at"),
+    }
+
+
+def _cleaning_assignment_values(row: dict[str, Any], now: datetime) -> dict[str, Any]:
+    notified_slots = row.get("notified_slots")
+    return {
+        "week_start": _parse_date(row.get("week_start"), field_name="cleaning_assignments.week_start"),
+        "assignee_member_id": _optional_int(
+            row, "assignee_member_id", field_name="cleaning_assignments.assignee_member_id"
+        ),
+        "status": CleaningAssignmentStatus(str(row.get("status"))),
+        "completed_by_member_id": _optional_int(
+            row, "completed_by_member_id", field_name="cleaning_assignments.completed_by_member_id"
+        ),
+        "completion_mode": row.get("completion_mode"),
+        "completed_at": _optional_datetime(row, "completed_at", field_name="cleaning_assignments.completed_at"),
+        "notified_slots": notified_slots if isinstance(notified_slots, dict) else None,
+    }
+
+
+_IMPORT_TABLES: dict[str, tuple[type, Callable[[dict[str, Any], datetime], dict[str, Any]]]] = {
+    "members": (Member, _member_values),
+    "rotation_config": (RotationConfig, _rotation_values),
+    "shopping_favorites": (ShoppingFavorite, _shopping_favorite_values),
+    "shopping_items": (ShoppingItem, _shopping_item_values),
+    "activity_events": (ActivityEvent, _activity_event_values),
+    "cleaning_overrides": (CleaningOverride, _cleaning_override_values),
+    "cleaning_assignments": (CleaningAssignment, _cleaning_assignment_values),
+}
+
+
+def _check_schema_version(schema_version: Any) -> None:
+    if schema_version not in (None, _SNAPSHOT_SCHEMA_VERSION):
+        raise ValueError(
+            f"Unsupported snapshot schema_version '{schema_version}'. "
+            f"Supported version: {_SNAPSHOT_SCHEMA_VERSION}"
+        )
+
+
+class SnapshotImporter:
+    """Batched snapshot import using Core ``executemany`` inserts.
+
+    Rows are fed table by table (in any order), validated and converted in
+    batches of ``batch_size`` and inserted without building ORM objects. When
+    replacing existing data, the secondary hot-path indexes are dropped for the
+    duration of the load and rebuilt once in ``finish``. Nothing is committed
+    until ``finish``; closing the session without it rolls everything back.
+
+    An incremental snapshot (``since`` set, from the arguments or the NDJSON
+    header) is applied as a delta instead: existing data is kept, rows are
+    upserted by primary key and ``deleted`` keys are removed first. The delta
+    must have been taken against the snapshot this instance was last loaded
+    from, which is tracked as the data's source version.
+
+    With ``dry_run`` nothing is written: every row is converted and checked for
+    duplicate keys (and, when merging, for keys that already exist), and
+    ``finish`` reports all problems with their table and row number instead of
+    stopping at the first one.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        *,
+        replace_existing: bool,
+        since: int | None = None,
+        version: int | None = None,
+        batch_size: int = _IMPORT_BATCH_SIZE,
+        dry_run: bool = False,
+    ) -> None:
+        self._session = session
+        self._replace_existing = replace_existing
+        self._since = since
+        self._version = version
+        self._batch_size = batch_size
+        self._dry_run = dry_run
+        self._now = now_utc()
+        self._pending: dict[str, list[dict[str, Any]]] = {}
+        self._counts: dict[str, int] = {table: 0 for table in _IMPORT_TABLES}
+        self._deleted: dict[str, int] = {}
+        self._batches = 0
+        self._expected_summary: dict[str, int] | None = None
+        self._started = time.perf_counter()
+        self._deferred_indexes: list[str] = []
+        self._stamp: int | None = None
+        self._errors: list[dict[str, Any]] = []
+        self._errors_truncated = False
+        self._seen_keys: dict[str, set[Any]] = {}
+
+    def _fail(self, message: str, *, section: str | None = None, line: int | None = None) -> None:
+        """Raise a validation error, or record it when running dry."""
+
+        if not self._dry_run:
+            raise ValueError(message)
+        if len(self._errors) >= _MAX_REPORTED_ERRORS:
+            self._errors_truncated = True
+            return
+        self._errors.append({"message": message, "section": section, "line": line})
+
+    def _start(self) -> None:
+        """Prepare the database on first write, once the header is known."""
+
+        if self._stamp is not None:
+            return
+        if self._since is not None:
+            _, _, source_version = current_versions(self._session)
+            if source_version != self._since:
+                self._fail(
+                    f"delta snapshot starts at version {self._since} but this instance "
+                    f"was last loaded from version {source_version}"
+                )
+        elif self._replace_existing and not self._dry_run:
+            _clear_all_data(self._session)
+            for name in HOT_PATH_INDEXES:
+                self._session.execute(text(f"DROP INDEX IF EXISTS {name}"))
+                self._deferred_indexes.append(name)
+        self._stamp = 0 if self._dry_run else allocate_version(self._session)
+
+    @property
+    def is_delta(self) -> bool:
+        return self._since is not None
+
+    def add_row(self, table: str, row: Any) -> None:
+        if table not in _IMPORT_TABLES:
+            self._fail(f"snapshot contains unknown table '{table}'", section=table)
+            return
+        if not isinstance(row, dict):
+            self._fail(
+                f"snapshot data field '{table}' row {self._counts[table] + 1} must be an object",
+                section=table,
+                line=self._counts[table] + 1,
+            )
+            self._counts[table] += 1
+            return
+        self._start()
+        pending = self._pending.setdefault(table, [])
+        pending.append(row)
+        self._counts[table] += 1
+        if len(pending) >= self._batch_size:
+            self._flush(table)
+
+    def add_rows(self, table: str, rows: Iterable[Any]) -> None:
+        for row in rows:
+            self.add_row(table, row)
+
+    def delete_rows(self, table: str, keys: Any) -> None:
+        """Remove rows of a delta by primary key; must precede the delta's rows."""
+
+        if not self.is_delta:
+            self._fail("deleted rows are only allowed in incremental snapshots", section=table)
+            return
+        model_entry = _IMPORT_TABLES.get(table)
+        if model_entry is None:
+            self._fail(f"snapshot contains unknown table '{table}'", section=table)
+            return
+        if not isinstance(keys, list):
+            self._fail(f"snapshot deletions for '{table}' must be a list", section=table)
+            return
+        if any(self._counts.values()):
+            self._fail("snapshot deletions must come before rows", section=table)
+            return
+        self._start()
+        model = model_entry[0]
+        (key_column,) = model.__table__.primary_key.columns
+        try:
+            parsed = [parse_row_key(table, key) for key in keys]
+        except (TypeError, ValueError):
+            self._fail(f"snapshot deletions for '{table}' contain an invalid key", section=table)
+            return
+        self._deleted[table] = self._deleted.get(table, 0) + len(parsed)
+        if self._dry_run:
+            return
+        for start in range(0, len(parsed), self._batch_size):
+            batch = parsed[start : start + self._batch_size]
+            self._session.execute(delete(model.__table__).where(key_column.in_(batch)))
+        if model is Member:
+            mark_member_directory_stale(self._session)
+
+    def add_record(self, record: Any) -> None:
+        """Consume one NDJSON snapshot record (``header``, ``deleted``, ``row`` or ``summary``)."""
+
+        if not isinstance(record, dict):
+            raise ValueError("snapshot NDJSON lines must be objects")
+        record_type = record.get("type")
+        if record_type == "row":
+            self.add_row(str(record.get("table")), record.get("row"))
+        elif record_type == "deleted":
+            self.delete_rows(str(record.get("table")), record.get("keys"))
+        elif record_type == "header":
+            if self._stamp is not None:
+                raise ValueError("snapshot header must be the first record")
+            _check_schema_version(record.get("schema_version"))
+            self._since = _optional_version(record, "since")
+            self._version = _optional_version(record, "version")
+        elif record_type == "summary":
+            summary = record.get("summary")
+            if not isinstance(summary, dict):
+                raise ValueError("snapshot summary record must contain a 'summary' object")
+            self._expected_summary = {str(key): int(value) for key, value in summary.items()}
+        else:
+            raise ValueError(f"unsupported snapshot record type '{record_type}'")
+
+    def _flush(self, table: str) -> None:
+        rows = self._pending.pop(table, None)
+        if not rows:
+            return
+        model, convert = _IMPORT_TABLES[table]
+        if self._dry_run:
+            self._validate(table, model, convert, rows)
+            return
+        values = [{**convert(row, self._now), "updated_version": self._stamp} for row in rows]
+        statement = insert(model.__table__)
+        if self.is_delta:
+            statement = sqlite_insert(model.__table__)
+            statement = statement.on_conflict_do_update(
+                index_elements=[column.name for column in model.__table__.primary_key.columns],
+                set_={
+                    column.name: statement.excluded[column.name]
+                    for column in model.__table__.columns
+                    if not column.primary_key
+                },
+            )
+        self._session.execute(statement, values)
+        self._batches += 1
+        if model is Member:
+            mark_member_directory_stale(self._session)
+
+    def _validate(self, table: str, model: type, convert: Callable, rows: list[dict[str, Any]]) -> None:
+        """Dry-run counterpart of ``_flush``: convert rows and check their keys."""
+
+        (key_column,) = model.__table__.primary_key.columns
+        seen = self._seen_keys.setdefault(table, set())
+        first_row = self._counts[table] - len(rows) + 1
+        keys: dict[Any, int] = {}
+        for offset, row in enumerate(rows):
+            line = first_row + offset
+            try:
+                values = convert(row, self._now)
+            except ValueError as exc:
+                self._fail(str(exc), section=table, line=line)
+                continue
+            key = values.get(key_column.name)
+            if key is None:
+                continue
+            if key in seen:
+                self._fail(f"snapshot data field '{table}' row {line} repeats key {key}", section=table, line=line)
+                continue
+            seen.add(key)
+            keys[key] = line
+        self._batches += 1
+
+        # Merging inserts must not collide with rows that are already stored.
+        if keys and not self._replace_existing and not self.is_delta:
+            existing = self._session.execute(select(key_column).where(key_column.in_(list(keys)))).scalars()
+            for key in existing:
+                self._fail(
+                    f"snapshot data field '{table}' row {keys[key]} conflicts with existing key {key}",
+                    section=table,
+                    line=keys[key],
+                )
+
+    def finish(self) -> dict[str, Any]:
+        self._start()
+        for table in list(self._pending):
+            self._flush(table)
+        if self._expected_summary is not None:
+            for table, expected in self._expected_summary.items():
+                if table in self._counts and self._counts[table] != expected:
+                    self._fail(
+                        f"snapshot is incomplete: expected {expected} '{table}' rows, got {self._counts[table]}",
+                        section=table,
+                    )
+        if self._counts["rotation_config"] > 1:
+            self._fail("snapshot data field 'rotation_config' must be an object or null", section="rotation_config")
+        if self._dry_run:
+            return self._report()
+        for name in self._deferred_indexes:
+            self._session.execute(text(HOT_PATH_INDEXES[name]))
+        if self.is_delta or self._replace_existing:
+            set_source_version(self._session, self._version)
+        self._session.commit()
+        return self._report()
+
+    def _report(self) -> dict[str, Any]:
+        elapsed = time.perf_counter() - self._started
+        total_rows = sum(self._counts.values())
+        result: dict[str, Any] = {
+            "schema_version": _SNAPSHOT_SCHEMA_VERSION,
+            "replace_existing": self._replace_existing and not self.is_delta,
+            "summary": dict(self._counts),
+            "progress": {
+                "rows": total_rows,
+                "batches": self._batches,
+                "elapsed_ms": round(elapsed * 1000, 1),
+                "rows_per_second": round(total_rows / elapsed) if elapsed > 0 else total_rows,
+            },
+        }
+        if self.is_delta:
+            result["delta"] = {"since": self._since, "version": self._version, "deleted": dict(self._deleted)}
+        if self._dry_run:
+            result["dry_run"] = True
+            result["errors"] = list(self._errors)
+            result["errors_truncated"] = self._errors_truncated
+        return result
+
+
+def _optional_version(container: dict[str, Any], key: str) -> int | None:
+    value = container.get(key)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise ValueError(f"snapshot {key} must be a non-negative integer")
+    return value
 
 
 def import_snapshot(
@@ -231,257 +816,40 @@ def import_snapshot(
     *,
     snapshot: dict[str, Any],
     replace_existing: bool,
+    dry_run: bool = False,
 ) -> dict[str, Any]:
     if not isinstance(snapshot, dict):
         raise ValueError("snapshot must be an object")
 
-    schema_version = snapshot.get("schema_version")
-    if schema_version not in (None, _SNAPSHOT_SCHEMA_VERSION):
-        raise ValueError(
-            f"Unsupported snapshot schema_version '{schema_version}'. "
-            f"Supported version: {_SNAPSHOT_SCHEMA_VERSION}"
-        )
+    _check_schema_version(snapshot.get("schema_version"))
+    since = _optional_version(snapshot, "since")
+    version = _optional_version(snapshot, "version")
 
     data_raw = snapshot.get("data", snapshot)
     if not isinstance(data_raw, dict):
         raise ValueError("snapshot.data must be an object")
 
-    members_rows = _require_rows(data_raw, "members")
-    assignment_rows = _require_rows(data_raw, "cleaning_assignments")
-    override_rows = _require_rows(data_raw, "cleaning_overrides")
-    shopping_item_rows = _require_rows(data_raw, "shopping_items")
-    shopping_favorite_rows = _require_rows(data_raw, "shopping_favorites")
-    activity_rows = _require_rows(data_raw, "activity_events")
+    table_rows = {
+        table: _require_rows(data_raw, table) for table in _IMPORT_TABLES if table != "rotation_config"
+    }
     rotation_raw = data_raw.get("rotation_config")
-
     if rotation_raw is not None and not isinstance(rotation_raw, dict):
         raise ValueError("snapshot data field 'rotation_config' must be an object or null")
-
-    if replace_existing:
-        _clear_all_data(session)
-
-    for row in members_rows:
-        member_id = row.get("id")
-        if member_id is None:
-            raise ValueError("snapshot members rows require an 'id'")
-        session.add(
-            Member(
-                id=int(member_id),
-                display_name=str(row.get("display_name") or "").strip(),
-                ha_user_id=row.get("ha_user_id"),
-                ha_person_entity_id=row.get("ha_person_entity_id"),
-                notify_service=row.get("notify_service"),
-                notify_services=[str(value) for value in list(row.get("notify_services") or []) if str(value)],
-                device_trackers=[str(value) for value in list(row.get("device_trackers") or []) if str(value)],
-                active=bool(row.get("active", True)),
-                created_at=_parse_datetime(
-                    row.get("created_at") or now_utc().isoformat(),
-                    field_name="members.created_at",
-                ),
-                updated_at=_parse_datetime(
-                    row.get("updated_at") or now_utc().isoformat(),
-                    field_name="members.updated_at",
-                ),
-            )
-        )
-
+    deleted_raw = snapshot.get("deleted") or {}
+    if not isinstance(deleted_raw, dict):
+        raise ValueError("snapshot deleted must be an object")
+
+    importer = SnapshotImporter(
+        session,
+        replace_existing=replace_existing,
+        since=since,
+        version=version,
+        dry_run=dry_run,
+    )
+    for table, keys in deleted_raw.items():
+        importer.delete_rows(str(table), keys)
     if rotation_raw is not None:
-        anchor_week_start = rotation_raw.get("anchor_week_start")
-        session.add(
-            RotationConfig(
-                id=int(rotation_raw.get("id", 1)),
-                ordered_member_ids_json=[
-                    int(member_id)
-                    for member_id in list(rotation_raw.get("ordered_member_ids_json") or [])
-                ],
-                anchor_week_start=(
-                    _parse_date(anchor_week_start, field_name="rotation_config.anchor_week_start")
-                    if anchor_week_start is not None
-                    else None
-                ),
-                updated_at=_parse_datetime(
-                    rotation_raw.get("updated_at") or now_utc().isoformat(),
-                    field_name="rotation_config.updated_at",
-                ),
-            )
-        )
-
-    for row in shopping_favorite_rows:
-        favorite_id = row.get("id")
-        if favorite_id is None:
-            raise ValueError("snapshot shopping_favorites rows require an 'id'")
-        session.add(
-            ShoppingFavorite(
-                id=int(favorite_id),
-                name=str(row.get("name") or "").strip(),
-                active=bool(row.get("active", True)),
-                created_by_member_id=(
-                    int(row["created_by_member_id"])
-                    if row.get("created_by_member_id") is not None
-                    else None
-                ),
-                created_by_user_id_raw=row.get("created_by_user_id_raw"),
-                created_at=_parse_datetime(
-                    row.get("created_at") or now_utc().isoformat(),
-                    field_name="shopping_favorites.created_at",
-                ),
-            )
-        )
-
-    for row in shopping_item_rows:
-        item_id = row.get("id")
-        if item_id is None:
-            raise ValueError("snapshot shopping_items rows require an 'id'")
-        session.add(
-            ShoppingItem(
-                id=int(item_id),
-                name=str(row.get("name") or "").strip(),
-                status=ShoppingStatus(str(row.get("status"))),
-                added_by_member_id=(
-                    int(row["added_by_member_id"])
-                    if row.get("added_by_member_id") is not None
-                    else None
-                ),
-                added_by_user_id_raw=row.get("added_by_user_id_raw"),
-                added_at=_parse_datetime(
-                    row.get("added_at") or now_utc().isoformat(),
-                    field_name="shopping_items.added_at",
-                ),
-                completed_by_member_id=(
-                    int(row["completed_by_member_id"])
-                    if row.get("completed_by_member_id") is not None
-                    else None
-                ),
-                completed_by_user_id_raw=row.get("completed_by_user_id_raw"),
-                completed_at=(
-                    _parse_datetime(
-                        row.get("completed_at"),
-                        field_name="shopping_items.completed_at",
-                    )
-                    if row.get("completed_at") is not None
-                    else None
-                ),
-                deleted_by_member_id=(
-                    int(row["deleted_by_member_id"])
-                    if row.get("deleted_by_member_id") is not None
-                    else None
-                ),
-                deleted_by_user_id_raw=row.get("deleted_by_user_id_raw"),
-                deleted_at=(
-                    _parse_datetime(
-                        row.get("deleted_at"),
-                        field_name="shopping_items.deleted_at",
-                    )
-                    if row.get("deleted_at") is not None
-                    else None
-                ),
-            )
-        )
-
-    for row in activity_rows:
-        event_id = row.get("id")
-        if event_id is None:
-            raise ValueError("snapshot activity_events rows require an 'id'")
-        payload_json = row.get("payload_json", {})
-        if not isinstance(payload_json, dict):
-            raise ValueError("snapshot activity_events payload_json must be an object")
-        session.add(
-            ActivityEvent(
-                id=int(event_id),
-                domain=str(row.get("domain") or "").strip(),
-                action=str(row.get("action") or "").strip(),
-                actor_member_id=(
-                    int(row["actor_member_id"])
-                    if row.get("actor_member_id") is not None
-                    else None
-                ),
-                actor_user_id_raw=row.get("actor_user_id_raw"),
-                payload_json=payload_json,
-                created_at=_parse_datetime(
-                    row.get("created_at") or now_utc().isoformat(),
-                    field_name="activity_events.created_at",
-                ),
-            )
-        )
-
-    for row in override_rows:
-        override_id = row.get("id")
-        if override_id is None:
-            raise ValueError("snapshot cleaning_overrides rows require an 'id'")
-        session.add(
-            CleaningOverride(
-                id=int(override_id),
-                week_start=_parse_date(row.get("week_start"), field_name="cleaning_overrides.week_start"),
-                type=OverrideType(str(row.get("type"))),
-                source=OverrideSource(str(row.get("source"))),
-                source_event_id=(
-                    int(row["source_event_id"])
-                    if row.get("source_event_id") is not None
-                    else None
-                ),
-                member_from_id=int(row.get("member_from_id")),
-                member_to_id=int(row.get("member_to_id")),
-                status=OverrideStatus(str(row.get("status"))),
-                created_by_member_id=(
-                    int(row["created_by_member_id"])
-                    if row.get("created_by_member_id") is not None
-                    else None
-                ),
-                created_at=_parse_datetime(
-                    row.get("created_at") or now_utc().isoformat(),
-                    field_name="cleaning_overrides.created_at",
-                ),
-                updated_at=_parse_datetime(
-                    row.get("updated_at") or now_utc().isoformat(),
-                    field_name="cleaning_overrides.updated_at",
-                ),
-            )
-        )
-
-    for row in assignment_rows:
-        session.add(
-            CleaningAssignment(
-                week_start=_parse_date(row.get("week_start"), field_name="cleaning_assignments.week_start"),
-                assignee_member_id=(
-                    int(row["assignee_member_id"])
-                    if row.get("assignee_member_id") is not None
-                    else None
-                ),
-                status=CleaningAssignmentStatus(str(row.get("status"))),
-                completed_by_member_id=(
-                    int(row["completed_by_member_id"])
-                    if row.get("completed_by_member_id") is not None
-                    else None
-                ),
-                completion_mode=row.get("completion_mode"),
-                completed_at=(
-                    _parse_datetime(
-                        row.get("completed_at"),
-                        field_name="cleaning_assignments.completed_at",
-                    )
-                    if row.get("completed_at") is not None
-                    else None
-                ),
-                notified_slots=(
-                    row.get("notified_slots")
-                    if isinstance(row.get("notified_slots"), dict) or row.get("notified_slots") is None
-                    else None
-                ),
-            )
-        )
-
-    session.commit()
-
-    return {
-        "schema_version": _SNAPSHOT_SCHEMA_VERSION,
-        "replace_existing": replace_existing,
-        "summary": {
-            "members": len(members_rows),
-            "rotation_config": 1 if rotation_raw is not None else 0,
-            "cleaning_assignments": len(assignment_rows),
-            "cleaning_overrides": len(override_rows),
-            "shopping_items": len(shopping_item_rows),
-            "shopping_favorites": len(shopping_favorite_rows),
-            "activity_events": len(activity_rows),
-        },
-    }
+        importer.add_row("rotation_config", rotation_raw)
+    for table, rows in table_rows.items():
+        importer.add_rows(table, rows)
+    return importer.finish()
@@ -6,6 +6,10 @@ import os
 from pathlib import Path
 
 
+_SQLITE_JOURNAL_MODES = {"WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY"}
+_SQLITE_SYNCHRONOUS_LEVELS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+
 def _ha_config_mount_exists() -> bool:
     return Path("/config").exists()
 
@@ -16,6 +20,22 @@ def _default_db_path() -> Path:
     return Path("./data/hass_flatmate.db")
 
 
+def _int_env(name: str, default: int, *, minimum: int = 0) -> int:
+    raw = os.environ.get(name)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        value = int(raw.strip())
+    except ValueError:
+        return default
+    return max(value, minimum)
+
+
+def _choice_env(name: str, default: str, choices: set[str]) -> str:
+    raw = (os.environ.get(name) or "").strip().upper()
+    return raw if raw in choices else default
+
+
 class Settings:
     """Runtime settings for the service."""
 
@@ -34,5 +54,140 @@ class Settings:
     def db_url(self) -> str:
         return f"sqlite:///{self.db_path}"
 
+    @property
+    def async_db_enabled(self) -> bool:
+        """Whether hot read endpoints use the asyncio engine (requires ``aiosqlite``)."""
+
+        return os.environ.get("HASS_FLATMATE_ASYNC_DB", "").strip().lower() in {"1", "true", "yes", "on"}
+
+    @property
+    def compression_min_bytes(self) -> int:
+        """Responses at least this large are gzip/brotli compressed when the client accepts it."""
+
+        return _int_env("HASS_FLATMATE_COMPRESSION_MIN_BYTES", 1024)
+
+    @property
+    def metrics_enabled(self) -> bool:
+        """Whether per-request latency and SQL metrics are recorded for ``/v1/admin/metrics``."""
+
+        return os.environ.get("HASS_FLATMATE_METRICS", "on").strip().lower() not in {"0", "false", "no", "off"}
+
+    @property
+    def metrics_slow_requests(self) -> int:
+        """Number of slowest recent requests listed by the metrics endpoint."""
+
+        return _int_env("HASS_FLATMATE_METRICS_SLOW_REQUESTS", 10, minimum=1)
+
+    @property
+    def backup_dir(self) -> Path:
+        """Directory for online backups; defaults to ``backups`` next to the database."""
+
+        configured = os.environ.get("HASS_FLATMATE_BACKUP_DIR")
+        if configured:
+            return Path(configured)
+        return self.db_path.parent / "backups"
+
+    @property
+    def backup_keep(self) -> int:
+        """Number of most recent backups kept when a new one is written."""
+
+        return _int_env("HASS_FLATMATE_BACKUP_KEEP", 7, minimum=1)
+
+    @property
+    def writer_enabled(self) -> bool:
+        """Whether write endpoints run on the single writer thread (see ``app.writer``)."""
+
+        return os.environ.get("HASS_FLATMATE_WRITER", "on").strip().lower() not in {"0", "false", "no", "off"}
+
+    @property
+    def workers(self) -> int:
+        """Number of uvicorn worker processes serving the same database (see ``run.py``)."""
+
+        return _int_env("HASS_FLATMATE_WORKERS", 1, minimum=1)
+
+    @property
+    def server_tuning_enabled(self) -> bool:
+        """Whether ``run.py`` starts uvicorn with the performance profile (see ``app.server``)."""
+
+        return os.environ.get("HASS_FLATMATE_SERVER_PROFILE", "performance").strip().lower() != "legacy"
+
+    @property
+    def server_keep_alive_seconds(self) -> int:
+        """Seconds an idle keep-alive connection stays open; above aiohttp's 15 s client default."""
+
+        return _int_env("HASS_FLATMATE_SERVER_KEEP_ALIVE_SECONDS", 20, minimum=1)
+
+    @property
+    def server_limit_concurrency(self) -> int:
+        """Open connections and tasks per worker before new requests get ``503``; 0 means no limit."""
+
+        return _int_env("HASS_FLATMATE_SERVER_LIMIT_CONCURRENCY", 256)
+
+    @property
+    def server_backlog(self) -> int:
+        """Pending connections the listening socket queues before refusing new ones."""
+
+        return _int_env("HASS_FLATMATE_SERVER_BACKLOG", 128, minimum=1)
+
+    @property
+    def tenants_file(self) -> Path | None:
+        """JSON file listing additional households served by this process, if any."""
+
+        configured = os.environ.get("HASS_FLATMATE_TENANTS_FILE", "").strip()
+        return Path(configured) if configured else None
+
+    @property
+    def ingress_proxy_address(self) -> str:
+        """Address the Supervisor's ingress proxy connects from."""
+
+        return os.environ.get("HASS_FLATMATE_INGRESS_PROXY", "172.30.32.2").strip()
+
+    @property
+    def tenant_dir(self) -> Path:
+        """Directory holding tenant databases that do not set their own ``db_path``."""
+
+        configured = os.environ.get("HASS_FLATMATE_TENANT_DIR")
+        if configured:
+            return Path(configured)
+        return self.db_path.parent / "tenants"
+
+    @property
+    def tenant_pool_size(self) -> int:
+        """Most tenant databases kept open at once; the least recently used idle one is closed first."""
+
+        return _int_env("HASS_FLATMATE_TENANT_POOL_SIZE", 8, minimum=1)
+
+    @property
+    def tenant_idle_seconds(self) -> int:
+        """Seconds after which an unused tenant database is closed."""
+
+        return _int_env("HASS_FLATMATE_TENANT_IDLE_SECONDS", 300, minimum=1)
+
+    @property
+    def sqlite_tuning_enabled(self) -> bool:
+        """Whether the SQLite performance profile (pragmas) is applied to new connections."""
+
+        return os.environ.get("HASS_FLATMATE_SQLITE_PROFILE", "performance").strip().lower() != "legacy"
+
+    @property
+    def sqlite_journal_mode(self) -> str:
+        return _choice_env("HASS_FLATMATE_SQLITE_JOURNAL_MODE", "WAL", _SQLITE_JOURNAL_MODES)
+
+    @property
+    def sqlite_synchronous(self) -> str:
+        return _choice_env("HASS_FLATMATE_SQLITE_SYNCHRONOUS", "NORMAL", _SQLITE_SYNCHRONOUS_LEVELS)
+
+    @property
+    def sqlite_busy_timeout_ms(self) -> int:
+        return _int_env("HASS_FLATMATE_SQLITE_BUSY_TIMEOUT_MS", 5000)
+
+    @property
+    def sqlite_cache_size_kib(self) -> int:
+        return _int_env("HASS_FLATMATE_SQLITE_CACHE_SIZE_KIB", 16384)
+
+    @property
+    def sqlite_mmap_size_bytes(self) -> int:
+        return _int_env("HASS_FLATMATE_SQLITE_MMAP_SIZE_BYTES", 64 * 1024 * 1024)
+
 
 settings = Settings()
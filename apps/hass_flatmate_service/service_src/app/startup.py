@@ -0,0 +1,116 @@
+"""Cold-start timings of the service process.
+
+``app.main`` records how long its imports took, the lifespan records the
+migration check and the moment the service became ready, and
+``FirstRequestTimer`` records the first HTTP request, which pays for lazily
+imported modules and cold SQLAlchemy/pydantic caches. On Linux the process
+age at readiness is read from ``/proc`` so interpreter and uvicorn start-up
+are included. The report is logged once ready and exposed under ``startup``
+in ``/v1/admin/diagnostics``.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def process_age_seconds() -> float | None:
+    """Seconds since this process was started, or ``None`` without ``/proc``."""
+
+    try:
+        stat = Path("/proc/self/stat").read_text()
+        uptime = float(Path("/proc/uptime").read_text().split()[0])
+    except (OSError, ValueError):
+        return None
+    # Field 22 (starttime, in clock ticks since boot); the command name in
+    # field 2 may contain spaces, so count from its closing parenthesis.
+    started_ticks = int(stat.rsplit(")", 1)[1].split()[19])
+    return max(0.0, uptime - started_ticks / os.sysconf("SC_CLK_TCK"))
+
+
+class StartupTimings:
+    """Durations of the start-up phases, each recorded once per process."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._ready_at: float | None = None
+        self.import_seconds: float | None = None
+        self.migrations_seconds: float | None = None
+        self.process_age_at_ready: float | None = None
+        self.first_request: dict[str, Any] | None = None
+
+    @property
+    def waiting_for_first_request(self) -> bool:
+        return self.first_request is None
+
+    def imported(self, seconds: float) -> None:
+        self.import_seconds = seconds
+
+    def ready(self, *, migrations_seconds: float) -> None:
+        with self._lock:
+            self._ready_at = time.perf_counter()
+            self.migrations_seconds = migrations_seconds
+            self.process_age_at_ready = process_age_seconds()
+        _LOGGER.info(
+            "Service ready: imports %.3fs, migration check %.3fs, process age %s",
+            self.import_seconds or 0.0,
+            migrations_seconds,
+            "unknown" if self.process_age_at_ready is None else f"{self.process_age_at_ready:.2f}s",
+        )
+
+    def first_request_finished(self, *, method: str, path: str, seconds: float) -> None:
+        with self._lock:
+            if self.first_request is not None:
+                return
+            idle = None if self._ready_at is None else time.perf_counter() - seconds - self._ready_at
+            self.first_request = {
+                "method": method,
+                "path": path,
+                "seconds": round(seconds, 4),
+                "after_ready_seconds": None if idle is None else round(max(0.0, idle), 4),
+            }
+        _LOGGER.info("First request %s %s took %.3fs", method, path, seconds)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "import_seconds": None if self.import_seconds is None else round(self.import_seconds, 4),
+                "migrations_seconds": None if self.migrations_seconds is None else round(self.migrations_seconds, 4),
+                "process_age_at_ready_seconds": (
+                    None if self.process_age_at_ready is None else round(self.process_age_at_ready, 2)
+                ),
+                "first_request": self.first_request,
+            }
+
+
+startup_timings = StartupTimings()
+
+
+class FirstRequestTimer:
+    """Time the first HTTP request; later requests only pay one attribute check."""
+
+    def __init__(self, app: ASGIApp, timings: StartupTimings = startup_timings) -> None:
+        self.app = app
+        self.timings = timings
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.timings.waiting_for_first_request:
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.timings.first_request_finished(
+                method=scope["method"], path=scope["path"], seconds=time.perf_counter() - started
+            )
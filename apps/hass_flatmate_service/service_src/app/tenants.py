@@ -0,0 +1,251 @@
+"""Several households served by one process, each with its own SQLite file.
+
+``HASS_FLATMATE_TENANTS_FILE`` lists the households besides the primary one::
+
+    {"tenants": [
+        {"id": "flat-b", "token": "token-b"},
+        {"id": "flat-c", "token": "token-c", "db_path": "/data/flat-c.db"}
+    ]}
+
+Requests with the primary ``api_token`` keep using the primary database.
+``TenantMiddleware`` maps any other listed token to its tenant, checks the
+tenant's database out of ``tenant_pool`` and runs the request inside
+``db.use_tenant``, so sessions, ``TenantLocal`` caches and request metrics
+are the tenant's own. Databases without a ``db_path`` live in
+``HASS_FLATMATE_TENANT_DIR/<id>.db`` and are created and migrated on first
+use.
+
+The pool keeps at most ``HASS_FLATMATE_TENANT_POOL_SIZE`` engines open in
+LRU order and closes engines idle for ``HASS_FLATMATE_TENANT_IDLE_SECONDS``,
+which bounds the connections, SQLite page caches and tenant caches held by
+the process. An engine serving a request is never closed; if every open
+engine is busy the pool grows past its size until requests finish. The
+tenants file is read once; restart the service after changing it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+import json
+import logging
+from pathlib import Path
+import re
+import threading
+import time
+from typing import Any
+
+from fastapi.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from . import db
+from .migrations import run_migrations
+from .settings import settings
+
+
+_LOGGER = logging.getLogger(__name__)
+
+_TENANT_ID = re.compile(r"^[a-z0-9][a-z0-9_-]{0,63}$")
+
+
+@dataclass(frozen=True)
+class Tenant:
+    id: str
+    token: str
+    db_path: Path
+
+    @property
+    def db_url(self) -> str:
+        return f"sqlite:///{self.db_path}"
+
+
+def load_tenants(path: Path) -> dict[str, Tenant]:
+    """Read and validate the tenants file, returning tenants by token."""
+
+    try:
+        raw = json.loads(path.read_text())
+    except (OSError, ValueError) as exc:
+        raise RuntimeError(f"could not read tenants file {path}: {exc}") from exc
+    entries = raw.get("tenants") if isinstance(raw, dict) else None
+    if not isinstance(entries, list):
+        raise RuntimeError(f"tenants file {path} must contain a 'tenants' list")
+
+    by_token: dict[str, Tenant] = {}
+    ids: set[str] = set()
+    for entry in entries:
+        tenant_id = entry.get("id") if isinstance(entry, dict) else None
+        token = entry.get("token") if isinstance(entry, dict) else None
+        if not isinstance(tenant_id, str) or not _TENANT_ID.match(tenant_id):
+            raise RuntimeError(f"invalid tenant id {tenant_id!r}: use lowercase letters, digits, '-' and '_'")
+        if not isinstance(token, str) or not token:
+            raise RuntimeError(f"tenant '{tenant_id}' needs a non-empty token")
+        if tenant_id in ids:
+            raise RuntimeError(f"duplicate tenant id '{tenant_id}'")
+        if token in by_token or token == settings.api_token:
+            raise RuntimeError(f"tenant '{tenant_id}' reuses a token of another household")
+        db_path = Path(entry["db_path"]) if entry.get("db_path") else settings.tenant_dir / f"{tenant_id}.db"
+        ids.add(tenant_id)
+        by_token[token] = Tenant(id=tenant_id, token=token, db_path=db_path)
+    return by_token
+
+
+def _close(database: db.TenantDatabase) -> None:
+    db.optimize(database.engine)
+    database.engine.dispose()
+
+
+class TenantPool:
+    """LRU pool of open tenant databases with idle eviction."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._tenants: dict[str, Tenant] | None = None
+        self._open: OrderedDict[str, db.TenantDatabase] = OrderedDict()
+        # Per-tenant objects that outlive an evicted engine (TenantLocal(keep=True)).
+        self._kept: dict[str, dict[Any, Any]] = {}
+        self.opened = 0
+        self.evicted = 0
+        self.idle_evicted = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.tenants_file is not None
+
+    def tenants(self) -> dict[str, Tenant]:
+        path = settings.tenants_file
+        if path is None:
+            return {}
+        with self._lock:
+            if self._tenants is None:
+                self._tenants = load_tenants(path)
+            return self._tenants
+
+    def tenant_for_token(self, token: str) -> Tenant | None:
+        return self.tenants().get(token)
+
+    def checkout(self, tenant: Tenant) -> db.TenantDatabase | None:
+        """Return the tenant's database if it is open, marking it in use."""
+
+        with self._lock:
+            database = self._open.get(tenant.id)
+            if database is not None:
+                self._open.move_to_end(tenant.id)
+                database.in_use += 1
+            return database
+
+    def open(self, tenant: Tenant) -> db.TenantDatabase:
+        """Open (creating and migrating if needed) and check out the tenant's database."""
+
+        database = self.checkout(tenant)
+        if database is not None:
+            return database
+
+        tenant.db_path.parent.mkdir(parents=True, exist_ok=True)
+        engine = db.create_sqlite_engine(tenant.db_url)
+        run_migrations(engine)
+        with self._lock:
+            existing = self._open.get(tenant.id)
+            if existing is None:
+                database = db.TenantDatabase(tenant.id, engine, self._kept.setdefault(tenant.id, {}))
+                self._open[tenant.id] = database
+                self.opened += 1
+            else:
+                database = existing
+                self._open.move_to_end(tenant.id)
+            database.in_use += 1
+            evicted = self._evict_locked(lambda candidate: len(self._open) > settings.tenant_pool_size)
+            self.evicted += len(evicted)
+        if existing is not None:
+            engine.dispose()
+        for closed in evicted:
+            _close(closed)
+        return database
+
+    def release(self, database: db.TenantDatabase) -> None:
+        with self._lock:
+            database.in_use -= 1
+            database.last_used = time.monotonic()
+
+    def _evict_locked(self, should_evict: Any) -> list[db.TenantDatabase]:
+        evicted = []
+        for tenant_id, candidate in list(self._open.items()):
+            if candidate.in_use == 0 and should_evict(candidate):
+                del self._open[tenant_id]
+                evicted.append(candidate)
+        return evicted
+
+    def evict_idle(self, now: float | None = None) -> list[str]:
+        """Close databases unused for the idle timeout and return their tenant ids."""
+
+        now = time.monotonic() if now is None else now
+        idle = settings.tenant_idle_seconds
+        with self._lock:
+            evicted = self._evict_locked(lambda candidate: now - candidate.last_used >= idle)
+            self.idle_evicted += len(evicted)
+        for closed in evicted:
+            _close(closed)
+        return [closed.tenant_id for closed in evicted]
+
+    def close_all(self) -> None:
+        """Close every tenant database and forget the tenants file until next use."""
+
+        with self._lock:
+            closing = list(self._open.values())
+            self._open.clear()
+            self._kept.clear()
+            self._tenants = None
+        for closed in closing:
+            _close(closed)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "tenants": len(self._tenants or {}),
+                "open": [{"id": tenant_id, "in_use": entry.in_use} for tenant_id, entry in self._open.items()],
+                "pool_size": settings.tenant_pool_size,
+                "opened": self.opened,
+                "evicted": self.evicted,
+                "idle_evicted": self.idle_evicted,
+            }
+
+
+tenant_pool = TenantPool()
+
+
+async def evict_idle_tenants(pool: TenantPool = tenant_pool) -> None:
+    """Close idle tenant databases periodically; runs for the lifetime of the app."""
+
+    while True:
+        await asyncio.sleep(min(60.0, settings.tenant_idle_seconds / 2))
+        closed = await run_in_threadpool(pool.evict_idle)
+        if closed:
+            _LOGGER.info("Closed idle tenant databases: %s", closed)
+
+
+class TenantMiddleware:
+    """Run requests carrying a tenant token against that tenant's database."""
+
+    def __init__(self, app: ASGIApp, pool: TenantPool = tenant_pool) -> None:
+        self.app = app
+        self.pool = pool
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.pool.enabled:
+            await self.app(scope, receive, send)
+            return
+        token = Headers(scope=scope).get("x-flatmate-token")
+        tenant = self.pool.tenant_for_token(token) if token and token != settings.api_token else None
+        if tenant is None:
+            # Primary household, or an unknown token that require_token rejects.
+            await self.app(scope, receive, send)
+            return
+
+        database = self.pool.checkout(tenant) or await run_in_threadpool(self.pool.open, tenant)
+        try:
+            with db.use_tenant(database):
+                await self.app(scope, receive, send)
+        finally:
+            self.pool.release(database)
@@ -0,0 +1,155 @@
+"""Single writer thread for the household write endpoints.
+
+Card actions, notification dispatch records, member syncs, imports, resets,
+restores and the cleaning reads that create assignments (current week,
+schedule, due notifications) are submitted to ``writer`` as
+``write(session) -> result`` callables. One dedicated thread
+runs them one after another, each in its own short session and transaction,
+and hands the result (or exception) back to the awaiting endpoint. Writes of
+this process therefore never contend with each other for SQLite's writer
+lock, and the threadpool stays free for reads while writes queue.
+
+Each write runs in a copy of the submitting request's context, so tenant
+selection and per-request SQL metrics carry over to the writer thread. A
+write that hits a lock timeout (held by another connection, e.g. a bulk
+import or a backup) is retried on the writer thread with a short backoff,
+unless it had already committed part of its work.
+
+NDJSON snapshot imports stay outside the writer: they keep one transaction
+open while the request body streams in, which would stall every other write
+for the length of the upload. They use their own connection and other
+writes wait for them through the lock retries above. Dry runs only read and
+also stay in the threadpool.
+
+``HASS_FLATMATE_WRITER=off`` runs writes directly in the threadpool as
+before.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import Future
+import contextvars
+import queue
+import threading
+import time
+from typing import Any, TypeVar
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from . import db
+from .settings import settings
+
+
+_T = TypeVar("_T")
+
+_LOCK_RETRIES = 3
+_RETRY_BACKOFF_SECONDS = 0.05
+_COMMITTED_KEY = "hass_flatmate_writer_committed"
+
+
+@event.listens_for(Session, "after_commit")
+def _note_commit(session: Session) -> None:
+    session.info[_COMMITTED_KEY] = True
+
+
+def _write_in_session(write: Callable[[Session], _T]) -> _T:
+    with db.new_session() as session:
+        return write(session)
+
+
+class Writer:
+    """Queue of write callables executed in order on one thread."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._queue: queue.SimpleQueue[Any] = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self.queued = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.retries = 0
+        self.wait_seconds_max = 0.0
+
+    async def run(self, write: Callable[[Session], _T]) -> _T:
+        """Run ``write`` on the writer thread and return its result."""
+
+        if not settings.writer_enabled:
+            return await run_in_threadpool(_write_in_session, write)
+        future: Future[_T] = Future()
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="hass-flatmate-writer", daemon=True)
+                self._thread.start()
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+            self._queue.put((contextvars.copy_context(), write, future, time.perf_counter()))
+        return await asyncio.wrap_future(future)
+
+    def stop(self) -> None:
+        """Finish the queued writes and stop the thread; the next write restarts it."""
+
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is not None:
+                self._queue.put(None)
+        if thread is not None:
+            thread.join()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": settings.writer_enabled,
+                "running": self._thread is not None,
+                "queued": self.queued,
+                "max_queued": self.max_queued,
+                "completed": self.completed,
+                "failed": self.failed,
+                "lock_retries": self.retries,
+                "max_wait_ms": round(self.wait_seconds_max * 1000, 3),
+            }
+
+    def _loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            context, write, future, queued_at = item
+            with self._lock:
+                self.queued -= 1
+                self.wait_seconds_max = max(self.wait_seconds_max, time.perf_counter() - queued_at)
+            # A cancelled request (client went away) drops writes that have not started.
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = context.run(self._execute, write)
+            except BaseException as exc:
+                with self._lock:
+                    self.failed += 1
+                future.set_exception(exc)
+            else:
+                with self._lock:
+                    self.completed += 1
+                future.set_result(result)
+
+    def _execute(self, write: Callable[[Session], _T]) -> _T:
+        attempt = 0
+        while True:
+            with db.new_session() as session:
+                try:
+                    return write(session)
+                except OperationalError as exc:
+                    if attempt >= _LOCK_RETRIES or not db.is_lock_error(exc) or session.info.get(_COMMITTED_KEY):
+                        raise
+            attempt += 1
+            with self._lock:
+                self.retries += 1
+            time.sleep(_RETRY_BACKOFF_SECONDS * attempt)
+
+
+writer = Writer()
@@ -0,0 +1 @@
+"""Performance benchmarks for the hass-flatmate service."""
@@ -0,0 +1,381 @@
+"""Generate a synthetic large household as an importable snapshot.
+
+Run from ``addon/hass_flatmate_service``::
+
+    python -m benchmarks.dataset --scale large --out household.json
+
+The household has run for ``years`` up to the current week: flatmates move
+out and are replaced every ``turnover_weeks``, every past week has a cleaning
+assignment (mostly done, some taken over, some missed) with its reminder
+slots, and up to ``swaps`` manual swaps come with their compensation weeks.
+The shopping list has ``items`` items, mostly completed, and activity events
+cover every recorded action, padded with notification dispatch records up
+to ``events``.
+Generation is deterministic for a given scale and current week.
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import asdict, dataclass, replace
+from datetime import date, datetime, time, timedelta, timezone
+import json
+from pathlib import Path
+import random
+from typing import Any
+
+
+@dataclass(frozen=True)
+class Scale:
+    years: int = 5
+    members: int = 6
+    turnover_weeks: int = 26
+    swaps: int = 120
+    items: int = 20_000
+    events: int = 60_000
+    favorites: int = 40
+    seed: int = 1
+
+
+SCALES = {
+    "small": Scale(years=1, members=4, swaps=10, items=1_000, events=3_000, favorites=10),
+    "medium": Scale(),
+    "large": Scale(years=10, members=8, swaps=250, items=60_000, events=200_000, favorites=80),
+}
+
+_GROCERIES = [
+    "Milk", "Oat milk", "Bread", "Butter", "Eggs", "Cheese", "Yoghurt", "Coffee", "Tea", "Sugar",
+    "Flour", "Rice", "Pasta", "Tomatoes", "Onions", "Garlic", "Potatoes", "Carrots", "Apples", "Bananas",
+    "Lemons", "Olive oil", "Salt", "Pepper", "Toilet paper", "Kitchen roll", "Dish soap", "Sponges",
+    "Laundry detergent", "Bin bags", "Hand soap", "Shampoo", "Toothpaste", "Aluminium foil", "Cling film",
+    "Baking paper", "Cereal", "Jam", "Honey", "Peanut butter", "Chickpeas", "Lentils", "Tinned tomatoes",
+    "Stock cubes", "Soy sauce", "Vinegar", "Mustard", "Ketchup", "Mayonnaise", "Frozen peas", "Ice cream",
+    "Beer", "Sparkling water", "Orange juice", "Batteries", "Light bulbs", "Descaler", "Glass cleaner",
+]
+_SLOTS = ("monday_11", "sunday_11", "sunday_18", "sunday_21")
+
+
+def _iso(moment: datetime | date | None) -> str | None:
+    return moment.isoformat() if moment is not None else None
+
+
+def _monday(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def _at(day: date, hour: int, minute: int = 0) -> datetime:
+    return datetime.combine(day, time(hour, minute), tzinfo=timezone.utc)
+
+
+class _Household:
+    def __init__(self, scale: Scale, current_week: date) -> None:
+        self.scale = scale
+        self.random = random.Random(scale.seed)
+        self.weeks = max(scale.years * 52, 1)
+        self.start = current_week - timedelta(weeks=self.weeks)
+        self.current_week = current_week
+        self.members: list[dict[str, Any]] = []
+        self.events: list[dict[str, Any]] = []
+        self.rosters: list[list[int]] = []
+
+    def member(self, joined: date) -> int:
+        member_id = len(self.members) + 1
+        self.members.append(
+            {
+                "id": member_id,
+                "display_name": f"Flatmate {member_id}",
+                "ha_user_id": f"user-{member_id}",
+                "ha_person_entity_id": f"person.flatmate_{member_id}",
+                "notify_service": f"notify.mobile_app_flatmate_{member_id}",
+                "notify_services": [f"notify.mobile_app_flatmate_{member_id}"],
+                "device_trackers": [f"device_tracker.flatmate_{member_id}_phone"],
+                "active": True,
+                "created_at": _iso(_at(joined, 9)),
+                "updated_at": _iso(_at(joined, 9)),
+            }
+        )
+        return member_id
+
+    def event(self, domain: str, action: str, actor: int | None, payload: dict, created_at: datetime) -> int:
+        self.events.append(
+            {
+                "domain": domain,
+                "action": action,
+                "actor_member_id": actor,
+                "actor_user_id_raw": f"user-{actor}" if actor else None,
+                "payload_json": payload,
+                "created_at": created_at,
+            }
+        )
+        return len(self.events)
+
+    def build_rosters(self) -> None:
+        roster = [self.member(self.start) for _ in range(self.scale.members)]
+        for index in range(self.weeks + 1):
+            week = self.start + timedelta(weeks=index)
+            if index and index % self.scale.turnover_weeks == 0:
+                leaving = roster.pop(self.random.randrange(len(roster)))
+                self.members[leaving - 1]["active"] = False
+                self.members[leaving - 1]["updated_at"] = _iso(_at(week, 9))
+                roster.append(self.member(week))
+            self.rosters.append(list(roster))
+
+    def assignee(self, index: int) -> int:
+        roster = self.rosters[min(index, len(self.rosters) - 1)]
+        return roster[index % len(roster)]
+
+    def cleaning(self) -> tuple[list[dict], list[dict]]:
+        assignments: dict[date, dict[str, Any]] = {}
+        for index in range(self.weeks):
+            week = self.start + timedelta(weeks=index)
+            assignee = self.assignee(index)
+            roll = self.random.random()
+            row: dict[str, Any] = {
+                "week_start": _iso(week),
+                "assignee_member_id": assignee,
+                "status": "missed" if roll < 0.08 else "done",
+                "completed_by_member_id": None,
+                "completion_mode": None,
+                "completed_at": None,
+                "notified_slots": {slot: _iso(_at(week + timedelta(days=offset), hour)) for slot, offset, hour in (
+                    ("monday_11", 0, 11), ("sunday_11", 6, 11), ("sunday_18", 6, 18)
+                ) if self.random.random() < 0.9},
+            }
+            if row["status"] == "done":
+                takeover = roll > 0.93
+                completed_by = assignee
+                if takeover:
+                    completed_by = self.random.choice([member for member in self.rosters[index] if member != assignee])
+                completed_at = _at(week + timedelta(days=self.random.randint(2, 6)), self.random.randint(9, 21))
+                row.update(
+                    completed_by_member_id=completed_by,
+                    completion_mode="takeover" if takeover else "own",
+                    completed_at=_iso(completed_at),
+                )
+                self.event(
+                    "cleaning",
+                    "cleaning_takeover_done" if takeover else "cleaning_done",
+                    completed_by,
+                    {
+                        "week_start": _iso(week),
+                        "completed_by_member_id": completed_by,
+                        "completion_mode": row["completion_mode"],
+                    },
+                    completed_at,
+                )
+            assignments[week] = row
+
+        overrides: list[dict[str, Any]] = []
+        # A week holds at most one override, so each swap needs a free week and a free return week.
+        occupied: set[int] = set()
+        candidates = list(range(self.weeks + 8))
+        self.random.shuffle(candidates)
+        for index in candidates:
+            if len(overrides) >= self.scale.swaps * 2:
+                break
+            free_returns = [offset for offset in range(index + 1, index + 5) if offset not in occupied]
+            if index in occupied or not free_returns:
+                continue
+            return_index = self.random.choice(free_returns)
+            occupied.update((index, return_index))
+            week = self.start + timedelta(weeks=index)
+            return_week = self.start + timedelta(weeks=return_index)
+            roster = self.rosters[min(index, len(self.rosters) - 1)]
+            member_from = self.assignee(index)
+            member_to = self.random.choice([member for member in roster if member != member_from])
+            created_at = _at(week - timedelta(days=self.random.randint(1, 10)), 19)
+            event_id = self.event(
+                "cleaning",
+                "cleaning_swap_created",
+                member_from,
+                {
+                    "week_start": _iso(week),
+                    "member_a_id": member_from,
+                    "member_b_id": member_to,
+                    "return_week_start": _iso(return_week),
+                },
+                created_at,
+            )
+            for override_week, override_type, source_from, source_to in (
+                (week, "manual_swap", member_from, member_to),
+                (return_week, "compensation", member_to, member_from),
+            ):
+                overrides.append(
+                    {
+                        "week_start": _iso(override_week),
+                        "type": override_type,
+                        "source": "manual",
+                        "source_event_id": event_id,
+                        "member_from_id": source_from,
+                        "member_to_id": source_to,
+                        "status": "planned" if override_week >= self.current_week else "applied",
+                        "created_by_member_id": member_from,
+                        "created_at": _iso(created_at),
+                        "updated_at": _iso(created_at),
+                    }
+                )
+                assignment = assignments.get(override_week)
+                if assignment is not None and assignment["assignee_member_id"] == source_from:
+                    assignment["assignee_member_id"] = source_to
+
+        overrides.sort(key=lambda row: row["week_start"])
+        for override_id, row in enumerate(overrides, start=1):
+            row["id"] = override_id
+        return list(assignments.values()), overrides
+
+    def shopping(self) -> tuple[list[dict], list[dict]]:
+        items: list[dict[str, Any]] = []
+        span = (self.current_week - self.start).total_seconds()
+        open_items = min(25, self.scale.items)
+        for index in range(self.scale.items):
+            # Open items are the most recent ones; older items are completed or deleted.
+            fraction = index / max(self.scale.items - 1, 1)
+            added_at = _at(self.start, 8) + timedelta(seconds=span * fraction)
+            week_index = min(int(fraction * self.weeks), self.weeks)
+            roster = self.rosters[week_index]
+            added_by = self.random.choice(roster)
+            name = self.random.choice(_GROCERIES)
+            item_id = index + 1
+            row: dict[str, Any] = {
+                "id": item_id,
+                "name": name,
+                "status": "open",
+                "added_by_member_id": added_by,
+                "added_by_user_id_raw": f"user-{added_by}",
+                "added_at": _iso(added_at),
+                "completed_by_member_id": None,
+                "completed_by_user_id_raw": None,
+                "completed_at": None,
+                "deleted_by_member_id": None,
+                "deleted_by_user_id_raw": None,
+                "deleted_at": None,
+            }
+            self.event("shopping", "shopping_item_added", added_by, {"item_id": item_id, "name": name}, added_at)
+            if index < self.scale.items - open_items:
+                actor = self.random.choice(roster)
+                closed_at = added_at + timedelta(hours=self.random.randint(1, 96))
+                if self.random.random() < 0.05:
+                    row.update(
+                        status="deleted",
+                        deleted_by_member_id=actor,
+                        deleted_by_user_id_raw=f"user-{actor}",
+                        deleted_at=_iso(closed_at),
+                    )
+                    action = "shopping_item_deleted"
+                else:
+                    row.update(
+                        status="completed",
+                        completed_by_member_id=actor,
+                        completed_by_user_id_raw=f"user-{actor}",
+                        completed_at=_iso(closed_at),
+                    )
+                    action = "shopping_item_completed"
+                self.event("shopping", action, actor, {"item_id": item_id, "name": name}, closed_at)
+            items.append(row)
+
+        favorites = [
+            {
+                "id": index + 1,
+                "name": name,
+                "active": True,
+                "created_by_member_id": self.rosters[0][index % len(self.rosters[0])],
+                "created_by_user_id_raw": None,
+                "created_at": _iso(_at(self.start, 10) + timedelta(days=index)),
+            }
+            for index, name in enumerate((_GROCERIES * (self.scale.favorites // len(_GROCERIES) + 1))[: self.scale.favorites])
+        ]
+        return items, favorites
+
+    def pad_notification_events(self) -> None:
+        index = 0
+        while len(self.events) < self.scale.events:
+            week_index = index % max(self.weeks, 1)
+            week = self.start + timedelta(weeks=week_index)
+            slot = _SLOTS[(index // max(self.weeks, 1)) % len(_SLOTS)]
+            member = self.assignee(week_index)
+            self.event(
+                "cleaning",
+                "cleaning_notification_dispatch",
+                None,
+                {
+                    "week_start": _iso(week),
+                    "member_id": member,
+                    "notify_service": f"notify.mobile_app_flatmate_{member}",
+                    "notification_kind": "weekly_reminder" if slot.startswith("sunday") else "weekly_assignment",
+                    "notification_slot": slot,
+                    "status": "sent",
+                },
+                _at(week + timedelta(days=6 if slot.startswith("sunday") else 0), int(slot.rsplit("_", 1)[1])),
+            )
+            index += 1
+
+
+def generate_snapshot(scale: Scale, *, current_week: date | None = None) -> dict[str, Any]:
+    """Return a snapshot (as accepted by ``POST /v1/admin/import``) for ``scale``."""
+
+    household = _Household(scale, _monday(current_week or datetime.now(timezone.utc).date()))
+    household.build_rosters()
+    assignments, overrides = household.cleaning()
+    items, favorites = household.shopping()
+    household.pad_notification_events()
+
+    # Events were generated per domain; renumber them in time order like the live service would.
+    ordered = sorted(range(len(household.events)), key=lambda index: household.events[index]["created_at"])
+    new_ids = {old + 1: new for new, old in enumerate(ordered, start=1)}
+    events = []
+    for new_id, old_index in enumerate(ordered, start=1):
+        event = household.events[old_index]
+        events.append({"id": new_id, **event, "created_at": _iso(event["created_at"])})
+    for row in overrides:
+        row["source_event_id"] = new_ids[row["source_event_id"]]
+
+    active = [member["id"] for member in household.members if member["active"]]
+    data = {
+        "rotation_config": {
+            "id": 1,
+            "ordered_member_ids_json": active,
+            "anchor_week_start": _iso(household.start),
+            "updated_at": _iso(_at(household.start, 9)),
+        },
+        "members": household.members,
+        "cleaning_assignments": assignments,
+        "cleaning_overrides": overrides,
+        "shopping_items": items,
+        "shopping_favorites": favorites,
+        "activity_events": events,
+    }
+    summary = {name: len(rows) for name, rows in data.items() if isinstance(rows, list)}
+    summary["rotation_config"] = 1
+    return {
+        "schema_version": 1,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "summary": summary,
+        "data": data,
+    }
+
+
+def scale_from_args(args: argparse.Namespace) -> Scale:
+    scale = SCALES[args.scale]
+    overrides = {name: getattr(args, name) for name in asdict(scale) if getattr(args, name, None) is not None}
+    return replace(scale, **overrides)
+
+
+def add_scale_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--scale", choices=sorted(SCALES), default="medium")
+    for name, value in asdict(Scale()).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name, type=type(value), default=None)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_scale_arguments(parser)
+    parser.add_argument("--out", type=Path, required=True)
+    args = parser.parse_args()
+
+    snapshot = generate_snapshot(scale_from_args(args))
+    args.out.write_text(json.dumps(snapshot))
+    print(json.dumps(snapshot["summary"], indent=2))
+
+
+if __name__ == "__main__":
+    main()
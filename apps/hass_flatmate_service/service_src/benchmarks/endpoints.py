@@ -0,0 +1,471 @@
+"""Benchmark every service endpoint against a synthetic large household.
+
+Run from ``addon/hass_flatmate_service``::
+
+    python -m benchmarks.endpoints --scale medium --iterations 30
+    python -m benchmarks.endpoints --scale medium --save-baseline
+    python -m benchmarks.endpoints --scale medium --compare benchmarks/baselines/0.1.45-medium.json
+
+The household from ``benchmarks.dataset`` is imported into a fresh database,
+then every route of the app is driven in-process through the ASGI app: reads
+first, then writes, then admin endpoints, with ``POST /v1/admin/reset`` last.
+Per route the report lists p50/p95/p99 latency, SQL statements per request
+and the process's peak RSS after the route ran.
+
+``--save-baseline`` stores the report as JSON (by default under
+``benchmarks/baselines/<version>-<scale>.json``); ``--compare`` checks a run
+against a stored report and exits non-zero when a route's p95 regressed by
+more than ``--threshold`` or it issues more statements than before.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta, timezone
+import json
+import os
+from pathlib import Path
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any
+
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .dataset import Scale, add_scale_arguments, generate_snapshot, scale_from_args
+from .sqlite_profile import _HEADERS, _percentile
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+_NOISE_FLOOR_MS = 1.0
+
+# A request factory gets the client, the benchmark context and the iteration
+# number; it may run unmeasured setup requests and returns the measured call.
+_Request = Callable[[TestClient, "_Context", int], Callable[[], Any]]
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    method: str
+    route: str
+    request: _Request
+    heavy: bool = False
+
+
+@dataclass
+class _Context:
+    week_start: date
+    active_members: list[dict[str, Any]]
+    snapshot: dict[str, Any]
+    backup_name: str | None = None
+    digest: dict[str, Any] | None = None
+
+
+class _StatementCounter:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, *_args: Any) -> None:
+        self.count += 1
+
+
+def _peak_rss_mib() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _get(url: str) -> _Request:
+    return lambda client, _context, _iteration: lambda: client.get(url, headers=_HEADERS)
+
+
+def _week(context: _Context, offset: int) -> str:
+    return (context.week_start + timedelta(weeks=offset)).isoformat()
+
+
+def _user(context: _Context, index: int) -> str:
+    return context.active_members[index % len(context.active_members)]["ha_user_id"]
+
+
+def _member_id(context: _Context, index: int) -> int:
+    return context.active_members[index % len(context.active_members)]["id"]
+
+
+def _new_item(client: TestClient, context: _Context, iteration: int) -> int:
+    response = client.post(
+        "/v1/shopping/items",
+        headers=_HEADERS,
+        json={"name": f"Bench item {iteration}", "actor_user_id": _user(context, iteration)},
+    )
+    response.raise_for_status()
+    return response.json()["id"]
+
+
+def _add_item(client: TestClient, context: _Context, iteration: int) -> Callable[[], Any]:
+    return lambda: client.post(
+        "/v1/shopping/items",
+        headers=_HEADERS,
+        json={"name": f"Bench item {iteration}", "actor_user_id": _user(context, iteration)},
+    )
+
+
+def _complete_item(client: TestClient, context: _Context, iteration: int) -> Callable[[], Any]:
+    item_id = _new_item(client, context, iteration)
+    return lambda: client.post(
+        f"/v1/shopping/items/{item_id}/complete", headers=_HEADERS, json={"actor_user_id": _user(context, 1)}
+    )
+
+
+def _delete_item(client: TestClient, context: _Context, iteration: int) -> Callable[[], Any]:
+    item_id = _new_item(client, context, iteration)
+    return lambda: client.request(
+        "DELETE", f"/v1/shopping/items/{item_id}", headers=_HEADERS, json={"actor_user_id": _user(context, 1)}
+    )
+
+
+def _add_favorite(client: TestClient, context: _Context, iteration: int) -> Callable[[], Any]:
+    return lambda: client.post(
+        "/v1/shopping/favorites",
+        headers=_HEADERS,
+        json={"name": f"Bench favorite {iteration}", "actor_user_id": _user(context, iteration)},
+    )
+
+
+def _delete_favorite(client: TestClient, context: _Context, iteration: int) -> Callable[[], Any]:
+    response = client.post("/v1/shopping/favorites", headers=_HEADERS, json={"name": f"Doomed {iteration}"})
+    response.raise_for_status()
+    favorite_id = response.json()["id"]
+    return lambda: client.request(
+        "DELETE", f"/v1/shopping/favorites/{favorite_id}", headers=_HEADERS, json={"actor_user_id": _user(context, 0)}
+    )
+
+
+def _sync_members(client: TestClient, context: _Context, iteration: int) -> Callable[[], Any]:
+    members = [
+        {
+            "display_name": member["display_name"],
+            "ha_user_id": member["ha_user_id"],
+            "ha_person_entity_id": member["ha_person_entity_id"],
+            # Alternate the notify target so every sync writes.
+            "notify_service": f"{member['notify_service']}{'' if iteration % 2 else '_tablet'}",
+            "active": True,
+        }
+        for member in context.active_members
+    ]
+    return lambda: client.put("/v1/members/sync", headers=_HEADERS, json={"members": members})
+
+
+def _mark_done(client: TestClient, context: _Context, iteration: int) -> Callable[[], Any]:
+    week = _week(context, 0)
+    client.post("/v1/cleaning/mark_undone", headers=_HEADERS, json={"week_start": week, "actor_user_id": _user(context, 0)})
+    return lambda: client.post(
+        "/v1/cleaning/mark_done", headers=_HEADERS, json={"week_start": week, "actor_user_id": _user(context, iteration)}
+    )
+
+
+def _mark_undone(client: TestClient, context: _Context, iteration: int) -> Callable[[], Any]:
+    week = _week(context, 0)
+    client.post("/v1/cleaning/mark_done", headers=_HEADERS, json={"week_start": week, "actor_user_id": _user(context, 0)})
+    return lambda: client.post(
+        "/v1/cleaning/mark_undone", headers=_HEADERS, json={"week_start": week, "actor_user_id": _user(context, iteration)}
+    )
+
+
+def _mark_takeover_done(client: TestClient, context: _Context, iteration: int) -> Callable[[], Any]:
+    week = _week(context, 0)
+    client.post("/v1/cleaning/mark_undone", headers=_HEADERS, json={"week_start": week, "actor_user_id": _user(context, 0)})
+    current = client.get("/v1/cleaning/current", headers=_HEADERS).json()
+    original = current["effective_assignee_member_id"]
+    cleaner = next(member["id"] for member in context.active_members if member["id"] != original)
+    return lambda: client.post(
+        "/v1/cleaning/mark_takeover_done",
+        headers=_HEADERS,
+        json={
+            "week_start": week,
+            "original_assignee_member_id": original,
+            "cleaner_member_id": cleaner,
+            "actor_user_id": _user(context, iteration),
+        },
+    )
+
+
+def _swap(client: TestClient, context: _Context, iteration: int) -> Callable[[], Any]:
+    # Weeks far enough ahead that the generated household has no plans there yet,
+    # spaced past a full rotation so each swap's automatic return week stays
+    # clear of the next swap.
+    stride = len(context.active_members) + 1
+    return lambda: client.post(
+        "/v1/cleaning/overrides/swap",
+        headers=_HEADERS,
+        json={
+            "week_start": _week(context, 20 + iteration * stride),
+            "member_a_id": _member_id(context, iteration),
+            "member_b_id": _member_id(context, iteration + 1),
+            "actor_user_id": _user(context, iteration),
+        },
+    )
+
+
+def _due_notifications(client: TestClient, context: _Context, iteration: int) -> Callable[[], Any]:
+    sunday = datetime.combine(context.week_start + timedelta(days=6), datetime.min.time())
+    at = sunday + timedelta(hours=11 + iteration % 11)
+    return lambda: client.get("/v1/cleaning/notifications/due", headers=_HEADERS, params={"at": at.isoformat()})
+
+
+def _dispatch(client: TestClient, context: _Context, iteration: int) -> Callable[[], Any]:
+    records = [
+        {
+            "week_start": _week(context, 0),
+            "member_id": member["id"],
+            "notify_service": member["notify_service"],
+            "notification_kind": "weekly_reminder",
+            "notification_slot": "sunday_11",
+            "status": "sent",
+            "dispatched_at": datetime.now(timezone.utc).isoformat(),
+        }
+        for member in context.active_members
+    ]
+    return lambda: client.post("/v1/cleaning/notifications/dispatch", headers=_HEADERS, json={"records": records})
+
+
+def _manual_import(path: str) -> _Request:
+    def request(client: TestClient, context: _Context, iteration: int) -> Callable[[], Any]:
+        names = [member["display_name"] for member in context.active_members]
+        rows = ";".join(
+            f"{(context.week_start - timedelta(days=day)).isoformat()},Imported {iteration}-{day},{names[day % len(names)]}"
+            for day in range(1, 51)
+        )
+        return lambda: client.post(
+            path, headers=_HEADERS, json={"shopping_history_rows": rows, "actor_user_id": _user(context, 0)}
+        )
+
+    return request
+
+
+def _backup(client: TestClient, _context: _Context, _iteration: int) -> Callable[[], Any]:
+    return lambda: client.post("/v1/admin/backup", headers=_HEADERS)
+
+
+def _restore(client: TestClient, context: _Context, _iteration: int) -> Callable[[], Any]:
+    if context.backup_name is None:
+        response = client.post("/v1/admin/backup", headers=_HEADERS)
+        response.raise_for_status()
+        context.backup_name = response.json()["name"]
+    name = context.backup_name
+    return lambda: client.post("/v1/admin/restore", headers=_HEADERS, json={"name": name})
+
+
+def _digest_compare(client: TestClient, context: _Context, _iteration: int) -> Callable[[], Any]:
+    if context.digest is None:
+        context.digest = client.get("/v1/admin/digest", headers=_HEADERS).json()
+    digest = context.digest
+    return lambda: client.post("/v1/admin/digest/compare", headers=_HEADERS, json={"left": digest})
+
+
+def _snapshot_import(client: TestClient, context: _Context, _iteration: int) -> Callable[[], Any]:
+    return lambda: client.post("/v1/admin/import", headers=_HEADERS, json={"snapshot": context.snapshot})
+
+
+def _reset(client: TestClient, _context: _Context, _iteration: int) -> Callable[[], Any]:
+    return lambda: client.post("/v1/admin/reset", headers=_HEADERS)
+
+
+ENDPOINTS = [
+    Endpoint("GET", "/health", _get("/health")),
+    Endpoint("GET", "/", _get("/")),
+    Endpoint("GET", "/v1/members", _get("/v1/members")),
+    Endpoint("GET", "/v1/shopping/items", _get("/v1/shopping/items")),
+    Endpoint("GET", "/v1/shopping/recents", _get("/v1/shopping/recents?limit=200")),
+    Endpoint("GET", "/v1/shopping/favorites", _get("/v1/shopping/favorites")),
+    Endpoint("GET", "/v1/stats/buys", _get("/v1/stats/buys?window_days=3650")),
+    Endpoint("GET", "/v1/stats/buys.svg", _get("/v1/stats/buys.svg?window_days=3650")),
+    Endpoint("GET", "/v1/activity", _get("/v1/activity?limit=500")),
+    Endpoint("GET", "/v1/cleaning/current", _get("/v1/cleaning/current")),
+    Endpoint("GET", "/v1/cleaning/schedule", _get("/v1/cleaning/schedule?weeks_ahead=104&include_previous_weeks=8")),
+    Endpoint("GET", "/v1/cleaning/notifications/due", _due_notifications),
+    Endpoint("PUT", "/v1/members/sync", _sync_members),
+    Endpoint("POST", "/v1/shopping/items", _add_item),
+    Endpoint("POST", "/v1/shopping/items/{item_id}/complete", _complete_item),
+    Endpoint("DELETE", "/v1/shopping/items/{item_id}", _delete_item),
+    Endpoint("POST", "/v1/shopping/favorites", _add_favorite),
+    Endpoint("DELETE", "/v1/shopping/favorites/{favorite_id}", _delete_favorite),
+    Endpoint("POST", "/v1/cleaning/mark_done", _mark_done),
+    Endpoint("POST", "/v1/cleaning/mark_undone", _mark_undone),
+    Endpoint("POST", "/v1/cleaning/mark_takeover_done", _mark_takeover_done),
+    Endpoint("POST", "/v1/cleaning/overrides/swap", _swap),
+    Endpoint("POST", "/v1/cleaning/notifications/dispatch", _dispatch),
+    Endpoint("POST", "/v1/import/manual", _manual_import("/v1/import/manual")),
+    Endpoint("POST", "/v1/import/flatastic", _manual_import("/v1/import/flatastic")),
+    Endpoint("GET", "/v1/admin/diagnostics", _get("/v1/admin/diagnostics")),
+    Endpoint("GET", "/v1/admin/metrics", _get("/v1/admin/metrics")),
+    Endpoint("GET", "/v1/admin/digest", _get("/v1/admin/digest"), heavy=True),
+    Endpoint("POST", "/v1/admin/digest/compare", _digest_compare, heavy=True),
+    Endpoint("GET", "/v1/admin/export", _get("/v1/admin/export"), heavy=True),
+    Endpoint("POST", "/v1/admin/backup", _backup, heavy=True),
+    Endpoint("GET", "/v1/admin/backups", _get("/v1/admin/backups")),
+    Endpoint("POST", "/v1/admin/restore", _restore, heavy=True),
+    Endpoint("POST", "/v1/admin/import", _snapshot_import, heavy=True),
+    Endpoint("POST", "/v1/admin/reset", _reset, heavy=True),
+]
+
+
+def _check_coverage(app: Any) -> None:
+    routes = {(method, route.path) for route in app.routes if isinstance(route, APIRoute) for method in route.methods}
+    missing = routes - {(endpoint.method, endpoint.route) for endpoint in ENDPOINTS}
+    if missing:
+        raise SystemExit(f"benchmark has no request for: {sorted(missing)}")
+
+
+def _summarize(latencies: list[float], statements: list[int], errors: int) -> dict[str, Any]:
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(statistics.median(latencies), 3) if latencies else 0.0,
+        "p95_ms": round(_percentile(latencies, 95), 3),
+        "p99_ms": round(_percentile(latencies, 99), 3),
+        "mean_ms": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+        "queries_per_request": round(statistics.fmean(statements), 2) if statements else 0.0,
+        "max_queries": max(statements, default=0),
+        "peak_rss_mib": _peak_rss_mib(),
+    }
+
+
+def run(scale: Scale, *, iterations: int, heavy_iterations: int, only: set[str] | None = None) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["HASS_FLATMATE_DB_PATH"] = str(Path(tmp) / "bench.db")
+        os.environ["HASS_FLATMATE_API_TOKEN"] = _HEADERS["x-flatmate-token"]
+
+        started = time.perf_counter()
+        snapshot = generate_snapshot(scale)
+        generate_seconds = time.perf_counter() - started
+
+        from app.main import app
+
+        _check_coverage(app)
+        counter = _StatementCounter()
+        event.listen(Engine, "before_cursor_execute", counter)
+        try:
+            with TestClient(app, raise_server_exceptions=False) as client:
+                started = time.perf_counter()
+                client.post("/v1/admin/import", headers=_HEADERS, json={"snapshot": snapshot}).raise_for_status()
+                load_seconds = time.perf_counter() - started
+
+                week_start = date.fromisoformat(client.get("/v1/cleaning/current", headers=_HEADERS).json()["week_start"])
+                active = [member for member in snapshot["data"]["members"] if member["active"]]
+                context = _Context(week_start=week_start, active_members=active, snapshot=snapshot)
+
+                results: dict[str, Any] = {}
+                for endpoint in ENDPOINTS:
+                    key = f"{endpoint.method} {endpoint.route}"
+                    if only and key not in only:
+                        continue
+                    latencies: list[float] = []
+                    statements: list[int] = []
+                    errors = 0
+                    for iteration in range(heavy_iterations if endpoint.heavy else iterations):
+                        call = endpoint.request(client, context, iteration)
+                        counter.count = 0
+                        request_started = time.perf_counter()
+                        response = call()
+                        latencies.append((time.perf_counter() - request_started) * 1000)
+                        statements.append(counter.count)
+                        if response.status_code >= 400:
+                            errors += 1
+                    results[key] = _summarize(latencies, statements, errors)
+        finally:
+            event.remove(Engine, "before_cursor_execute", counter)
+
+    return {
+        "service_version": app.version,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": asdict(scale),
+        "dataset": {
+            "rows": snapshot["summary"],
+            "generate_seconds": round(generate_seconds, 2),
+            "load_seconds": round(load_seconds, 2),
+        },
+        "iterations": {"default": iterations, "heavy": heavy_iterations},
+        "peak_rss_mib": _peak_rss_mib(),
+        "endpoints": results,
+    }
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any], *, threshold: float) -> list[str]:
+    """Return one line per route that got slower or issues more statements than the baseline."""
+
+    regressions = []
+    if report["scale"] != baseline.get("scale"):
+        regressions.append(f"scale differs from baseline: {baseline.get('scale')} -> {report['scale']}")
+    for key, current in report["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(key)
+        if previous is None:
+            continue
+        before, after = previous["p95_ms"], current["p95_ms"]
+        if after > before * threshold and after - before > _NOISE_FLOOR_MS:
+            regressions.append(f"{key}: p95 {before:.2f} ms -> {after:.2f} ms ({after / max(before, 1e-9):.2f}x)")
+        if current["max_queries"] > previous["max_queries"]:
+            regressions.append(f"{key}: statements {previous['max_queries']} -> {current['max_queries']}")
+        if current["errors"] > previous["errors"]:
+            regressions.append(f"{key}: errors {previous['errors']} -> {current['errors']}")
+    return regressions
+
+
+def _table(report: dict[str, Any]) -> str:
+    lines = [f"{'endpoint':<48} {'n':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8} {'rss MiB':>8}"]
+    for key, row in report["endpoints"].items():
+        lines.append(
+            f"{key:<48} {row['requests']:>4} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f}"
+            f" {row['queries_per_request']:>8.1f} {row['peak_rss_mib']:>8.1f}"
+            + (f"  {row['errors']} errors" if row["errors"] else "")
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_scale_arguments(parser)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--heavy-iterations", type=int, default=3)
+    parser.add_argument("--only", action="append", help="limit to 'METHOD /route' (repeatable)")
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    parser.add_argument("--save-baseline", nargs="?", const="", type=str, metavar="PATH")
+    parser.add_argument("--compare", type=Path, metavar="BASELINE")
+    parser.add_argument("--threshold", type=float, default=1.25, help="allowed p95 slowdown factor")
+    args = parser.parse_args()
+
+    scale = scale_from_args(args)
+    report = run(
+        scale,
+        iterations=args.iterations,
+        heavy_iterations=args.heavy_iterations,
+        only=set(args.only) if args.only else None,
+    )
+    print(json.dumps(report, indent=2) if args.json else _table(report))
+    print(f"dataset {report['dataset']}; peak RSS {report['peak_rss_mib']} MiB")
+
+    if args.save_baseline is not None:
+        path = Path(args.save_baseline) if args.save_baseline else BASELINE_DIR / f"{report['service_version']}-{args.scale}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"baseline written to {path}")
+
+    if args.compare is not None:
+        regressions = compare(report, json.loads(args.compare.read_text()), threshold=args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            raise SystemExit(1)
+        print(f"no regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""Drive the cleaning notification engine through a year on a virtual clock.
+
+Run from ``addon/hass_flatmate_service``::
+
+    python -m benchmarks.notifications --weeks 52
+    python -m benchmarks.notifications --weeks 52 --failure-rate 0.05 --outages-per-month 4 --seed 7
+
+A virtual clock advances minute by minute (``--step-minutes``) over a fresh
+database. Scripted mark_done, mark_undone, takeover and swap actions happen at
+seeded times. Every minute outside a simulated Home Assistant outage polls
+``due_notifications`` like the integration's time listener. Each returned
+notification is acknowledged through ``record_notification_dispatches``; a
+``--failure-rate`` share of them come back ``failed`` and must be delivered
+again later.
+
+In lockstep, an oracle that models the delivery rules independently of the
+engine predicts which slots are due at each minute:
+
+- ``monday_11`` from Monday 11:00 until sent;
+- on Sunday only the latest reached reminder (11:00, 18:00 or 21:00) while the
+  week is pending;
+- ``missed_notice`` in the following week for a missed week that had a
+  reminder.
+
+Any minute where the engine's due slots differ from the oracle's is a
+violation, which includes a second delivery of a slot that was already
+acknowledged. The run exits non-zero on violations and reports engine
+throughput as evaluations per second.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+import json
+import os
+from pathlib import Path
+import random
+import tempfile
+import time
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+_MINUTE = timedelta(minutes=1)
+_MEMBERS = ("Alex", "Sam", "Pat", "Robin")
+# (hour, slot) from latest to earliest; on Sunday only the latest reached one is due.
+_SUNDAY_REMINDERS = ((21, "sunday_21"), (18, "sunday_18"), (11, "sunday_11"))
+DEFAULT_START = datetime(2026, 1, 5, tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class Action:
+    at: datetime
+    kind: str  # "done", "undone", "takeover" or "swap"
+    week_start: date
+
+
+def _random_minute(rng: random.Random, start: datetime, end: datetime) -> datetime:
+    return start + _MINUTE * rng.randrange(int((end - start) / _MINUTE))
+
+
+def build_script(rng: random.Random, start: datetime, weeks: int) -> list[Action]:
+    """Seeded actions covering early, Sunday, taken-over, reopened and missed weeks."""
+
+    actions: list[Action] = []
+    for index in range(weeks):
+        monday = start + timedelta(weeks=index)
+        sunday = monday + timedelta(days=6)
+        week = monday.date()
+        outcome = rng.random()
+        if outcome < 0.35:
+            actions.append(Action(_random_minute(rng, monday, sunday), "done", week))
+        elif outcome < 0.60:
+            # Done on Sunday, after some of the reminders went out.
+            actions.append(Action(_random_minute(rng, sunday + timedelta(hours=8), sunday + timedelta(days=1)), "done", week))
+        elif outcome < 0.70:
+            actions.append(Action(_random_minute(rng, monday, sunday + timedelta(days=1)), "takeover", week))
+        elif outcome < 0.80:
+            done_at = _random_minute(rng, monday, sunday + timedelta(hours=10))
+            actions.append(Action(done_at, "done", week))
+            actions.append(Action(_random_minute(rng, done_at + _MINUTE, sunday + timedelta(hours=23)), "undone", week))
+        # Otherwise nobody confirms and the week is missed.
+        if index % 6 == 3 and index + 2 < weeks:
+            actions.append(Action(monday + timedelta(days=2, hours=10), "swap", (monday + timedelta(weeks=2)).date()))
+    return sorted(actions, key=lambda action: action.at)
+
+
+def build_outages(rng: random.Random, start: datetime, end: datetime, per_month: float) -> list[tuple[datetime, datetime]]:
+    """Seeded windows in which Home Assistant is down and nothing polls."""
+
+    count = round(per_month * (end - start).days / 30)
+    outages = []
+    for _ in range(count):
+        began = _random_minute(rng, start, end)
+        outages.append((began, began + _MINUTE * int(rng.uniform(5, 600))))
+    return sorted(outages)
+
+
+class _Oracle:
+    """Delivery rules restated independently of ``due_notifications``."""
+
+    def __init__(self) -> None:
+        self.done: dict[date, bool] = {}
+        self.delivered: set[tuple[date, str]] = set()
+
+    def due(self, now: datetime) -> set[tuple[date, str]]:
+        week = (now - timedelta(days=now.weekday())).date()
+        previous = week - timedelta(weeks=1)
+        due: set[tuple[date, str]] = set()
+        if now.weekday() == 0 and now.hour >= 11:
+            due.add((week, "monday_11"))
+        if now.weekday() == 6 and not self.done.get(week):
+            reached = next((slot for hour, slot in _SUNDAY_REMINDERS if now.hour >= hour), None)
+            if reached is not None:
+                due.add((week, reached))
+        if not self.done.get(previous) and any(key[0] == previous for key in self.delivered):
+            due.add((previous, "missed_notice"))
+        return due - self.delivered
+
+
+@contextmanager
+def virtual_clock(now: Callable[[], datetime]) -> Iterator[None]:
+    from app.services import cleaning
+
+    real = cleaning.now_utc
+    cleaning.now_utc = now
+    try:
+        yield
+    finally:
+        cleaning.now_utc = real
+
+
+def _setup_members(session: Session) -> None:
+    from app.schemas import MemberSyncItem
+    from app.services.members import member_directory, sync_members
+
+    sync_members(
+        session,
+        [
+            MemberSyncItem(display_name=name, ha_user_id=f"sim-{name.lower()}", notify_service=f"notify.{name.lower()}")
+            for name in _MEMBERS
+        ],
+    )
+    member_directory.invalidate()
+
+
+def _apply(session: Session, action: Action, rng: random.Random) -> bool:
+    from app.services import cleaning
+    from app.services.members import get_active_members
+
+    members = get_active_members(session)
+    assignee_id, _override = cleaning.effective_assignee_member_id(session, action.week_start)
+    assignee = next(member for member in members if member.id == assignee_id)
+    other = rng.choice([member for member in members if member.id != assignee_id])
+    try:
+        if action.kind == "done":
+            cleaning.mark_cleaning_done(session, week_start=action.week_start, actor_user_id=assignee.ha_user_id)
+        elif action.kind == "undone":
+            cleaning.mark_cleaning_undone(session, week_start=action.week_start, actor_user_id=assignee.ha_user_id)
+        elif action.kind == "takeover":
+            cleaning.mark_cleaning_takeover_done(
+                session,
+                week_start=action.week_start,
+                original_assignee_member_id=assignee.id,
+                cleaner_member_id=other.id,
+                actor_user_id=other.ha_user_id,
+            )
+        else:
+            cleaning.upsert_manual_swap(
+                session,
+                week_start=action.week_start,
+                member_a_id=assignee.id,
+                member_b_id=other.id,
+                return_week_start=None,
+                actor_user_id=assignee.ha_user_id,
+                cancel=False,
+            )
+    except ValueError:
+        return False
+    return True
+
+
+def simulate(
+    session_factory: Callable[[], Session],
+    *,
+    weeks: int = 52,
+    seed: int = 1,
+    start: datetime = DEFAULT_START,
+    step_minutes: int = 1,
+    failure_rate: float = 0.0,
+    outages_per_month: float = 0.0,
+) -> dict[str, Any]:
+    """Run the engine over ``weeks`` of virtual time and report violations and throughput."""
+
+    from app.services import cleaning
+
+    if step_minutes < 1 or 60 % step_minutes:
+        raise ValueError("step_minutes must divide an hour")
+
+    rng = random.Random(seed)
+    end = start + timedelta(weeks=weeks)
+    script = build_script(rng, start, weeks)
+    outages = build_outages(rng, start, end, outages_per_month)
+    oracle = _Oracle()
+    now = start
+    step = _MINUTE * step_minutes
+
+    deliveries: Counter[str] = Counter()
+    violations: list[dict[str, Any]] = []
+    applied = rejected = evaluations = notifications_seen = failed_acks = 0
+    next_action = next_outage = 0
+    engine_seconds = 0.0
+
+    with virtual_clock(lambda: now):
+        with session_factory() as session:
+            _setup_members(session)
+            # Anchors the rotation at the first simulated week.
+            cleaning.get_cleaning_current(session, at=start)
+
+        started = time.perf_counter()
+        while now < end:
+            while next_action < len(script) and script[next_action].at <= now:
+                action = script[next_action]
+                next_action += 1
+                with session_factory() as session:
+                    ok = _apply(session, action, rng)
+                applied += ok
+                rejected += not ok
+                if ok and action.kind in {"done", "takeover", "undone"}:
+                    oracle.done[action.week_start] = action.kind != "undone"
+
+            while next_outage < len(outages) and outages[next_outage][1] <= now:
+                next_outage += 1
+            if next_outage < len(outages) and outages[next_outage][0] <= now:
+                now += step
+                continue
+
+            expected = oracle.due(now)
+            evaluation_started = time.perf_counter()
+            with session_factory() as session:
+                notifications = cleaning.due_notifications(session, now)
+            engine_seconds += time.perf_counter() - evaluation_started
+            evaluations += 1
+            notifications_seen += len(notifications)
+
+            actual = Counter((item["week_start"], item["notification_slot"]) for item in notifications)
+            if set(actual) != expected or max(actual.values(), default=1) > 1:
+                violations.append(
+                    {
+                        "at": now.isoformat(),
+                        "expected": sorted(f"{week}:{slot}" for week, slot in expected),
+                        "actual": sorted(f"{week}:{slot}" for week, slot in actual.elements()),
+                    }
+                )
+
+            records = []
+            for item in notifications:
+                status = "failed" if rng.random() < failure_rate else "sent"
+                failed_acks += status == "failed"
+                records.append({**item, "status": status, "dispatched_at": now})
+                if status == "sent":
+                    oracle.delivered.add((item["week_start"], item["notification_slot"]))
+                    deliveries[item["notification_slot"]] += 1
+            if records:
+                with session_factory() as session:
+                    cleaning.record_notification_dispatches(session, records=records)
+
+            now += step
+        elapsed = time.perf_counter() - started
+
+    return {
+        "weeks": weeks,
+        "seed": seed,
+        "step_minutes": step_minutes,
+        "evaluations": evaluations,
+        "skipped_for_outages": int((end - start) / step) - evaluations,
+        "outages": len(outages),
+        "actions_applied": applied,
+        "actions_rejected": rejected,
+        "notifications": notifications_seen,
+        "failed_acks": failed_acks,
+        "deliveries": dict(sorted(deliveries.items())),
+        "violations": violations,
+        "exactly_once": not violations,
+        "elapsed_seconds": round(elapsed, 3),
+        "engine_seconds": round(engine_seconds, 3),
+        "evaluations_per_second": round(evaluations / engine_seconds, 1) if engine_seconds else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--weeks", type=int, default=52)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--step-minutes", type=int, default=1)
+    parser.add_argument("--failure-rate", type=float, default=0.02, help="share of dispatches acked as failed")
+    parser.add_argument("--outages-per-month", type=float, default=1.0)
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["HASS_FLATMATE_DB_PATH"] = str(Path(tmp) / "notifications.db")
+
+        from app import db
+        from app.migrations import run_migrations
+
+        db.configure_engine()
+        assert db.engine is not None and db.SessionLocal is not None
+        run_migrations(db.engine)
+        report = simulate(
+            db.SessionLocal,
+            weeks=args.weeks,
+            seed=args.seed,
+            step_minutes=args.step_minutes,
+            failure_rate=args.failure_rate,
+            outages_per_month=args.outages_per_month,
+        )
+        db.engine.dispose()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for violation in report["violations"][:20]:
+            print(f"VIOLATION at {violation['at']}: expected {violation['expected']}, got {violation['actual']}")
+        summary = {key: value for key, value in report.items() if key != "violations"}
+        print(json.dumps(summary, indent=2))
+    if report["violations"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Compare the performance server profile with uvicorn's defaults.
+
+Run from ``addon/hass_flatmate_service`` (install the ``server`` extra to
+include uvloop and httptools)::
+
+    python -m benchmarks.server_profile --scale small --seconds 20
+
+For each profile (``HASS_FLATMATE_SERVER_PROFILE``) ``run.py`` is started on
+a throwaway database seeded from ``benchmarks.dataset``. The closed-loop load
+of ``benchmarks.workers`` then measures throughput and latency on the
+coordinator endpoints. A keep-alive probe sends one request per client,
+stays idle for ``--idle-seconds`` (longer than uvicorn's 5 s default, shorter
+than Home Assistant's 15 s client keep-alive), sends another and counts the
+clients whose connection had been closed by the server in between.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+import statistics
+import time
+from typing import Any
+
+import httpx
+
+from .dataset import add_scale_arguments
+from .load import serve
+from .sqlite_profile import _percentile
+from .workers import _client_process
+
+PROFILES = ("legacy", "performance")
+
+
+def _client_port(response: httpx.Response) -> int | None:
+    stream = response.extensions.get("network_stream")
+    address = stream.get_extra_info("client_addr") if stream is not None else None
+    return address[1] if address else None
+
+
+async def _keep_alive_probe(url: str, token: str, *, clients: int, idle_seconds: float) -> dict[str, Any]:
+    async def probe() -> tuple[bool, float | None]:
+        # Keep idle connections as long as aiohttp's connector does (15 s).
+        limits = httpx.Limits(keepalive_expiry=15.0)
+        async with httpx.AsyncClient(
+            base_url=url, headers={"x-flatmate-token": token}, timeout=30, limits=limits
+        ) as client:
+            # Read the port while the connection is certainly still open.
+            first_port = _client_port(await client.get("/v1/members"))
+            await asyncio.sleep(idle_seconds)
+            started = time.perf_counter()
+            try:
+                second = await client.get("/v1/members")
+            except httpx.HTTPError:
+                return True, None
+            return first_port != _client_port(second), (time.perf_counter() - started) * 1000
+
+    results = await asyncio.gather(*(probe() for _ in range(clients)))
+    latencies = [latency for _, latency in results if latency is not None]
+    return {
+        "clients": clients,
+        "idle_seconds": idle_seconds,
+        "reconnected": sum(1 for reconnected, _ in results if reconnected),
+        "errors": sum(1 for _, latency in results if latency is None),
+        "after_idle_p50_ms": round(statistics.median(latencies), 2) if latencies else 0.0,
+    }
+
+
+def run_profile(args: argparse.Namespace, profile: str) -> dict[str, Any]:
+    os.environ["HASS_FLATMATE_SERVER_PROFILE"] = profile
+    with serve(args) as (url, token):
+        server = httpx.get(f"{url}/v1/admin/diagnostics", headers={"x-flatmate-token": token}).json()["server"]
+        per_process = max(1, args.concurrency // args.client_processes)
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.client_processes) as pool:
+            results = list(
+                pool.map(
+                    _client_process,
+                    *zip(*[
+                        (url, token, per_process, args.seconds, args.write_every, index)
+                        for index in range(args.client_processes)
+                    ]),
+                )
+            )
+        elapsed = time.perf_counter() - started
+        keep_alive = asyncio.run(
+            _keep_alive_probe(url, token, clients=args.probe_clients, idle_seconds=args.idle_seconds)
+        )
+
+    latencies = sorted(value for result in results for value in result["latencies"])
+    return {
+        "profile": profile,
+        "loop": server["running_loop"],
+        "http": server["http"],
+        "requests": len(latencies),
+        "errors": sum(result["errors"] for result in results),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2) if latencies else 0.0,
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "p99_ms": round(_percentile(latencies, 99), 2),
+        "keep_alive": keep_alive,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=32, help="requests kept in flight")
+    parser.add_argument("--client-processes", type=int, default=2, help="processes generating the load")
+    parser.add_argument("--seconds", type=float, default=20.0, help="wall-clock length of each load run")
+    parser.add_argument("--write-every", type=int, default=10, help="every n-th request is a write; 0 for reads only")
+    parser.add_argument("--probe-clients", type=int, default=8, help="clients in the keep-alive probe")
+    parser.add_argument("--idle-seconds", type=float, default=8.0, help="idle gap of the keep-alive probe")
+    parser.add_argument("--server-log", help="write the service's output here")
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+
+    report = {"cpu_count": os.cpu_count(), "profiles": [run_profile(args, profile) for profile in PROFILES]}
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(
+        f"{'profile':<12} {'loop':<40} {'http':<10} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'errors':>7} {'reconnects':>11}"
+    )
+    for entry in report["profiles"]:
+        probe = entry["keep_alive"]
+        print(
+            f"{entry['profile']:<12} {entry['loop']:<40} {entry['http']:<10} {entry['throughput_rps']:>8} "
+            f"{entry['p50_ms']:>8} {entry['p95_ms']:>8} {entry['p99_ms']:>8} {entry['errors']:>7} "
+            f"{probe['reconnected']:>5}/{probe['clients']:<5}"
+        )
+
+
+if __name__ == "__main__":
+    main()
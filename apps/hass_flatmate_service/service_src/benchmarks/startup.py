@@ -0,0 +1,124 @@
+"""Measure how fast the service becomes ready after a restart.
+
+Run from ``addon/hass_flatmate_service``::
+
+    python -m benchmarks.startup --restarts 10
+
+Starts ``run.py`` repeatedly on one throwaway database, like add-on restarts:
+the first start creates the schema, later ones only check the schema version.
+For each start it records the wall time until ``/health`` answers, the
+latency of the first authenticated request (``/v1/cleaning/current``, which
+pays for lazily imported modules), and the server's own ``startup`` report
+from ``/v1/admin/diagnostics``: import time, migration check and process age
+at readiness. Restarts after the first are summarised as median and p95.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any
+
+import httpx
+
+from .load import SERVICE_ROOT, _free_port
+from .sqlite_profile import _percentile
+
+_TOKEN = "startup-token"
+
+
+def start_once(db_path: Path, *, timeout: float = 60.0) -> dict[str, Any]:
+    """Start the service once, time readiness and the first request, then stop it."""
+
+    port = _free_port()
+    env = {
+        **os.environ,
+        "HASS_FLATMATE_DB_PATH": str(db_path),
+        "HASS_FLATMATE_API_TOKEN": _TOKEN,
+        "HASS_FLATMATE_HOST": "127.0.0.1",
+        "HASS_FLATMATE_PORT": str(port),
+    }
+    url = f"http://127.0.0.1:{port}"
+    headers = {"x-flatmate-token": _TOKEN}
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "run.py"], cwd=SERVICE_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        with httpx.Client(base_url=url, timeout=10) as client:
+            while True:
+                try:
+                    if client.get("/health").status_code == 200:
+                        break
+                except httpx.HTTPError:
+                    pass
+                if process.poll() is not None or time.perf_counter() - started > timeout:
+                    raise SystemExit("service did not start")
+                time.sleep(0.01)
+            ready = time.perf_counter() - started
+
+            request_started = time.perf_counter()
+            client.get("/v1/cleaning/current", headers=headers).raise_for_status()
+            first_request = time.perf_counter() - request_started
+            report = client.get("/v1/admin/diagnostics", headers=headers).json()["startup"]
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    return {
+        "ready_ms": round(ready * 1000, 1),
+        "first_request_ms": round(first_request * 1000, 1),
+        "import_ms": round((report["import_seconds"] or 0.0) * 1000, 1),
+        "migrations_ms": round((report["migrations_seconds"] or 0.0) * 1000, 1),
+        "process_age_at_ready_ms": (
+            None
+            if report["process_age_at_ready_seconds"] is None
+            else round(report["process_age_at_ready_seconds"] * 1000)
+        ),
+    }
+
+
+def run(restarts: int) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "startup.db"
+        runs = [start_once(db_path) for _ in range(restarts + 1)]
+
+    restarted = runs[1:]
+    summary: dict[str, Any] = {}
+    for key in ("ready_ms", "first_request_ms", "import_ms", "migrations_ms"):
+        values = sorted(entry[key] for entry in restarted)
+        summary[key] = {"p50": round(statistics.median(values), 1), "p95": round(_percentile(values, 95), 1)}
+    return {"first_start": runs[0], "restarts": len(restarted), "restart": summary, "runs": restarted}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--restarts", type=int, default=10, help="starts on the existing database")
+    parser.add_argument("--json", action="store_true", help="print every run as JSON")
+    args = parser.parse_args()
+    if args.restarts < 1:
+        parser.error("--restarts must be at least 1")
+
+    report = run(args.restarts)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"first start (creates schema): {json.dumps(report['first_start'])}")
+    print(f"{'restart phase':<20} {'p50 ms':>9} {'p95 ms':>9}")
+    for key, values in report["restart"].items():
+        print(f"{key:<20} {values['p50']:>9} {values['p95']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Measure how throughput scales with the number of worker processes.
+
+Run from ``addon/hass_flatmate_service``::
+
+    python -m benchmarks.workers --workers 1,2,4 --scale small --seconds 20
+
+For each worker count ``run.py`` is started with ``HASS_FLATMATE_WORKERS`` on
+a throwaway database seeded from ``benchmarks.dataset``. Client processes
+then keep ``--concurrency`` requests in flight in a closed loop: the
+coordinator's reads, with every ``--write-every``-th request adding or
+completing a shopping item. Each stage reports throughput, latency
+percentiles, errors and the speedup over the first stage. Scaling needs free
+cores for both the workers and the client processes; ``os.cpu_count()`` is
+printed so single-core results are not mistaken for a ceiling.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+import random
+import statistics
+import time
+from typing import Any
+
+import httpx
+
+from .dataset import add_scale_arguments
+from .load import COORDINATOR_READS, serve
+from .sqlite_profile import _percentile
+
+
+async def _client_loop(url: str, token: str, *, concurrency: int, seconds: float, write_every: int, seed: int) -> dict[str, Any]:
+    rng = random.Random(seed)
+    latencies: list[float] = []
+    errors = 0
+    open_items: list[int] = []
+    deadline = time.perf_counter() + seconds
+    counter = 0
+
+    async def request(client: httpx.AsyncClient) -> None:
+        nonlocal counter, errors
+        counter += 1
+        started = time.perf_counter()
+        try:
+            if write_every and counter % write_every == 0:
+                if open_items and rng.random() < 0.5:
+                    response = await client.post(f"/v1/shopping/items/{open_items.pop()}/complete", json={})
+                else:
+                    response = await client.post("/v1/shopping/items", json={"name": f"Worker item {counter}"})
+                    if response.status_code == 200:
+                        open_items.append(response.json()["id"])
+            else:
+                path, params = COORDINATOR_READS[counter % len(COORDINATOR_READS)]
+                response = await client.get(path, params=params)
+        except httpx.HTTPError:
+            errors += 1
+            return
+        latencies.append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            errors += 1
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        while time.perf_counter() < deadline:
+            await request(client)
+
+    # One connection per in-flight request, so the kernel spreads them over the workers.
+    clients = [
+        httpx.AsyncClient(base_url=url, headers={"x-flatmate-token": token}, timeout=30) for _ in range(concurrency)
+    ]
+    try:
+        await asyncio.gather(*(worker(client) for client in clients))
+    finally:
+        await asyncio.gather(*(client.aclose() for client in clients))
+    return {"latencies": latencies, "errors": errors}
+
+
+def _client_process(url: str, token: str, concurrency: int, seconds: float, write_every: int, seed: int) -> dict[str, Any]:
+    return asyncio.run(
+        _client_loop(url, token, concurrency=concurrency, seconds=seconds, write_every=write_every, seed=seed)
+    )
+
+
+def run_stage(args: argparse.Namespace, workers: int) -> dict[str, Any]:
+    os.environ["HASS_FLATMATE_WORKERS"] = str(workers)
+    with serve(args) as (url, token):
+        per_process = max(1, args.concurrency // args.client_processes)
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.client_processes) as pool:
+            results = list(
+                pool.map(
+                    _client_process,
+                    *zip(*[
+                        (url, token, per_process, args.seconds, args.write_every, index)
+                        for index in range(args.client_processes)
+                    ]),
+                )
+            )
+        elapsed = time.perf_counter() - started
+        pids = {
+            httpx.get(f"{url}/v1/admin/diagnostics", headers={"x-flatmate-token": token}).json()["worker"]["pid"]
+            for _ in range(workers * 4)
+        }
+
+    latencies = sorted(value for result in results for value in result["latencies"])
+    return {
+        "workers": workers,
+        "workers_seen": len(pids),
+        "requests": len(latencies),
+        "errors": sum(result["errors"] for result in results),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2) if latencies else 0.0,
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "p99_ms": round(_percentile(latencies, 99), 2),
+    }
+
+
+def run(args: argparse.Namespace, worker_counts: list[int]) -> dict[str, Any]:
+    stages = [run_stage(args, count) for count in worker_counts]
+    baseline = stages[0]["throughput_rps"] or 1.0
+    for stage in stages:
+        stage["speedup"] = round(stage["throughput_rps"] / baseline, 2)
+    return {"cpu_count": os.cpu_count(), "concurrency": args.concurrency, "stages": stages}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts, one stage each")
+    parser.add_argument("--concurrency", type=int, default=32, help="requests kept in flight")
+    parser.add_argument("--client-processes", type=int, default=2, help="processes generating the load")
+    parser.add_argument("--seconds", type=float, default=20.0, help="wall-clock length of each stage")
+    parser.add_argument("--write-every", type=int, default=10, help="every n-th request is a write; 0 for reads only")
+    parser.add_argument("--server-log", help="write the service's output here")
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+
+    report = run(args, [int(count) for count in args.workers.split(",")])
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"cpu_count={report['cpu_count']} concurrency={report['concurrency']}")
+    print(f"{'workers':>7} {'seen':>5} {'req/s':>9} {'speedup':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for stage in report["stages"]:
+        print(
+            f"{stage['workers']:>7} {stage['workers_seen']:>5} {stage['throughput_rps']:>9} {stage['speedup']:>8} "
+            f"{stage['p50_ms']:>8} {stage['p95_ms']:>8} {stage['p99_ms']:>8} {stage['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,18 @@
 
 from __future__ import annotations
 
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 import os
 from pathlib import Path
+import re
+from typing import Any
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
 
 @pytest.fixture
@@ -31,3 +38,82 @@ def client(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> TestClient:
 @pytest.fixture
 def auth_headers() -> dict[str, str]:
     return {"x-flatmate-token": "test-token"}
+
+
+_SHAPE_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SHAPE_LISTS = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_SHAPE_SPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a SQL statement so repeats with different parameters group together."""
+
+    shape = _SHAPE_LITERALS.sub("?", statement)
+    shape = _SHAPE_LISTS.sub("(?, ...)", shape)
+    return _SHAPE_SPACE.sub(" ", shape).strip()
+
+
+class QueryCounter:
+    """SQL statements and commits executed on any engine while active."""
+
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+        self.commits = 0
+
+    @property
+    def queries(self) -> int:
+        return len(self.statements)
+
+    def _on_execute(self, _conn: Any, _cursor: Any, statement: str, *_args: Any) -> None:
+        self.statements.append(statement)
+
+    def _on_commit(self, _conn: Any) -> None:
+        self.commits += 1
+
+    def repeated_shapes(self) -> list[tuple[int, str]]:
+        counts = Counter(statement_shape(statement) for statement in self.statements)
+        return [(count, shape) for shape, count in counts.most_common() if count > 1]
+
+    def report(self) -> str:
+        lines = [f"{self.queries} statements, {self.commits} commits"]
+        repeated = self.repeated_shapes()
+        if repeated:
+            lines.append("repeated statement shapes (possible N+1):")
+            lines.extend(f"  {count:>4}x {shape[:300]}" for count, shape in repeated)
+        lines.append("statements:")
+        lines.extend(f"  {index:>4}: {statement_shape(statement)[:300]}" for index, statement in enumerate(self.statements, 1))
+        return "\n".join(lines)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    counter = QueryCounter()
+    event.listen(Engine, "before_cursor_execute", counter._on_execute)
+    event.listen(Engine, "commit", counter._on_commit)
+    try:
+        yield counter
+    finally:
+        event.remove(Engine, "before_cursor_execute", counter._on_execute)
+        event.remove(Engine, "commit", counter._on_commit)
+
+
+@pytest.fixture
+def query_budget() -> Callable[..., Any]:
+    """Fail when the wrapped block exceeds a SQL statement or commit budget.
+
+    Usage: ``with query_budget(queries=5, commits=1): client.get(...)``. The
+    failure report groups repeated statement shapes to point at N+1 loops.
+    """
+
+    @contextmanager
+    def _budget(*, queries: int, commits: int = 0, label: str = "") -> Iterator[QueryCounter]:
+        with count_queries() as counter:
+            yield counter
+        if counter.queries > queries or counter.commits > commits:
+            prefix = f"{label}: " if label else ""
+            pytest.fail(
+                f"{prefix}query budget exceeded (allowed {queries} statements, {commits} commits)\n{counter.report()}",
+                pytrace=False,
+            )
+
+    return _budget
@@ -983,3 +983,122 @@ def test_missed_notice_not_sent_for_predeployment_assignments(client, auth_heade
     notifications = result.json()["notifications"]
     missed_notices = [n for n in notifications if n["notification_slot"] == "missed_notice"]
     assert missed_notices == []
+
+
+def test_schedule_survives_current_week_created_by_parallel_request(client, auth_headers, monkeypatch) -> None:
+    from app import db
+    from app.services import cleaning
+
+    _sync_members(client, auth_headers)
+    preload = cleaning.AssignmentBatch.preload
+    raced = []
+
+    def preload_then_race(self, weeks) -> None:
+        preload(self, weeks)
+        if not raced:
+            # The coordinator's parallel GET /v1/cleaning/current commits the
+            # current week after the schedule has seen it missing.
+            raced.append(True)
+            with db.SessionLocal() as other:
+                cleaning.get_cleaning_current(other)
+
+    monkeypatch.setattr(cleaning.AssignmentBatch, "preload", preload_then_race)
+    schedule = client.get("/v1/cleaning/schedule?weeks_ahead=3", headers=auth_headers)
+
+    assert raced
+    assert schedule.status_code == 200
+    assert len(schedule.json()["schedule"]) == 3
+
+
+def _ack(client, headers, notification: dict) -> None:
+    response = client.post(
+        "/v1/cleaning/notifications/dispatch",
+        headers=headers,
+        json={"records": [{**notification, "status": "sent"}]},
+    )
+    assert response.status_code == 200
+
+
+def _due_slots(client, headers, at: str) -> list[str]:
+    response = client.get("/v1/cleaning/notifications/due", headers=headers, params={"at": at})
+    assert response.status_code == 200
+    return [item["notification_slot"] for item in response.json()["notifications"]]
+
+
+def test_sunday_reminders_do_not_fall_back_after_later_slot(client, auth_headers) -> None:
+    _sync_members(client, auth_headers)
+    week_start = date.fromisoformat(client.get("/v1/cleaning/current", headers=auth_headers).json()["week_start"])
+    sunday = week_start + timedelta(days=6)
+
+    # Home Assistant was down all Sunday until 21:00.
+    due = client.get(
+        "/v1/cleaning/notifications/due", headers=auth_headers, params={"at": _iso_at(sunday, 21, 0)}
+    ).json()["notifications"]
+    assert [item["notification_slot"] for item in due] == ["sunday_21"]
+    _ack(client, auth_headers, due[0])
+
+    assert _due_slots(client, auth_headers, _iso_at(sunday, 21, 1)) == []
+    assert _due_slots(client, auth_headers, _iso_at(sunday, 23, 59)) == []
+
+
+def test_quiet_due_polls_skip_the_database_until_a_boundary_or_write(client, auth_headers, query_budget) -> None:
+    _sync_members(client, auth_headers)
+    week_start = date.fromisoformat(client.get("/v1/cleaning/current", headers=auth_headers).json()["week_start"])
+    tuesday = week_start + timedelta(days=1)
+
+    # The first polls create last week's assignment and then mark it missed;
+    # only a poll that writes nothing opens a quiet window.
+    for minute in range(3):
+        assert _due_slots(client, auth_headers, _iso_at(tuesday, 9, minute)) == []
+    with query_budget(queries=0, label="quiet poll"):
+        assert _due_slots(client, auth_headers, _iso_at(tuesday, 9, 3)) == []
+        assert _due_slots(client, auth_headers, _iso_at(week_start + timedelta(days=6), 10, 59)) == []
+
+    # Sunday 11:00 is a boundary, and any committed write ends the quiet window.
+    assert _due_slots(client, auth_headers, _iso_at(week_start + timedelta(days=6), 11, 0)) == ["sunday_11"]
+    assert _due_slots(client, auth_headers, _iso_at(tuesday, 9, 4)) == []
+    done = client.post(
+        "/v1/cleaning/mark_done",
+        headers=auth_headers,
+        json={"week_start": week_start.isoformat(), "actor_user_id": "u1"},
+    )
+    assert done.status_code == 200
+    with query_budget(queries=20, commits=3) as counter:
+        assert _due_slots(client, auth_headers, _iso_at(tuesday, 9, 5)) == []
+    assert counter.queries > 0
+
+
+def test_due_boundaries_cover_every_change_of_the_evaluation(client, auth_headers) -> None:
+    from app import db
+    from app.services import cleaning
+
+    _sync_members(client, auth_headers)
+    week_start = date.fromisoformat(client.get("/v1/cleaning/current", headers=auth_headers).json()["week_start"])
+    monday = datetime.combine(week_start, time())
+
+    # Evaluate the schedule (bypassing the quiet window) every half hour of the
+    # week: a slot may only become due at a boundary of the window. Slots that
+    # stop being due (Monday's at midnight) cannot hide behind a quiet window.
+    previous: list[str] | None = None
+    with db.new_session() as session:
+        for step in range(7 * 48 + 1):
+            at = monday + timedelta(minutes=30 * step)
+            slots = [item["notification_slot"] for item in cleaning._build_due_notifications(session, at)]
+            if previous is not None and set(slots) - set(previous):
+                assert ((at.date() - week_start).days, at.hour) in cleaning._DUE_BOUNDARIES, (at, previous, slots)
+                assert at.minute == 0
+            previous = slots
+
+    assert {start for start in cleaning._DUE_SLOT_STARTS.values()} <= set(cleaning._DUE_BOUNDARIES)
+
+
+def test_notification_simulation_delivers_each_slot_exactly_once(client) -> None:
+    from app import db
+    from benchmarks.notifications import simulate
+
+    report = simulate(db.SessionLocal, weeks=3, seed=3, failure_rate=0.2, outages_per_month=10)
+
+    assert report["violations"] == []
+    assert report["deliveries"]["monday_11"] == 3
+    assert report["failed_acks"] > 0
+    assert report["skipped_for_outages"] > 0
@@ -0,0 +1,64 @@
+"""SQLite storage profile tests."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from sqlalchemy import text
+
+from app import db
+
+
+def _pragma(name: str):
+    assert db.engine is not None
+    with db.engine.connect() as conn:
+        return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_performance_profile_applies_pragmas(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.delenv("HASS_FLATMATE_SQLITE_PROFILE", raising=False)
+    monkeypatch.setenv("HASS_FLATMATE_SQLITE_BUSY_TIMEOUT_MS", "2500")
+    db.configure_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+
+    assert str(_pragma("journal_mode")).lower() == "wal"
+    assert int(_pragma("synchronous")) == 1  # NORMAL
+    assert int(_pragma("busy_timeout")) == 2500
+    assert int(_pragma("cache_size")) == -16384
+
+    db.optimize()
+
+
+def test_legacy_profile_keeps_sqlite_defaults(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("HASS_FLATMATE_SQLITE_PROFILE", "legacy")
+    db.configure_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+
+    assert str(_pragma("journal_mode")).lower() == "delete"
+
+
+@pytest.fixture
+def async_db(monkeypatch) -> None:
+    pytest.importorskip("aiosqlite")
+    monkeypatch.setenv("HASS_FLATMATE_ASYNC_DB", "1")
+
+
+def test_async_mode_serves_hot_reads_from_async_engine(async_db, client, auth_headers) -> None:
+    assert db.async_engine is not None
+    assert db.async_engine.url.drivername == "sqlite+aiosqlite"
+
+    synced = client.put(
+        "/v1/members/sync",
+        headers=auth_headers,
+        json={"members": [{"display_name": "Alex", "ha_user_id": "u1", "active": True}]},
+    )
+    assert synced.status_code == 200
+    added = client.post("/v1/shopping/items", headers=auth_headers, json={"name": "Milk", "actor_user_id": "u1"})
+    assert added.status_code == 200
+
+    members = client.get("/v1/members", headers=auth_headers).json()
+    assert [row["display_name"] for row in members] == ["Alex"]
+    items = client.get("/v1/shopping/items", headers=auth_headers).json()
+    assert [(row["name"], row["added_by_member_id"]) for row in items] == [("Milk", members[0]["id"])]
+    activity = client.get("/v1/activity?limit=5", headers=auth_headers).json()
+    assert activity[0]["action"] == "shopping_item_added"
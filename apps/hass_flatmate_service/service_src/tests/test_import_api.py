@@ -359,3 +359,112 @@ def test_import_swap_pair_links_rows_and_cancel_reverts_both_weeks(client, auth_
     }
     assert row_map_after_cancel[week_start]["override_type"] is None
     assert row_map_after_cancel[week_after]["override_type"] is None
+
+
+def test_import_large_history_in_one_transaction(client, auth_headers) -> None:
+    _sync_members(client, auth_headers)
+    start = date(2021, 1, 4)
+    names = ["Alex", "Sam", "Pat", "Robin"]
+    cleaning_rows = "\n".join(
+        f"{(start + timedelta(weeks=index)).isoformat()},{names[index % 4]},done,{names[(index + 1) % 4]}"
+        for index in range(150)
+    )
+    shopping_rows = "\n".join(
+        f"{(start + timedelta(days=index)).isoformat()},Item {index % 40},{names[index % 4]}"
+        for index in range(1000)
+    )
+
+    response = client.post(
+        "/v1/import/manual",
+        headers=auth_headers,
+        json={"cleaning_history_rows": cleaning_rows, "shopping_history_rows": shopping_rows, "actor_user_id": "u1"},
+    )
+    assert response.status_code == 200
+    summary = response.json()["summary"]
+    assert summary["cleaning_history_rows_imported"] == 150
+    assert summary["cleaning_done_events_imported"] == 150
+    assert summary["shopping_history_rows_imported"] == 1000
+
+    snapshot = client.get("/v1/admin/export", headers=auth_headers).json()["data"]
+    robin = next(member for member in snapshot["members"] if member["display_name"] == "Robin")
+    assert robin["active"] is False
+    assert len(snapshot["shopping_items"]) == 1000
+    events = {event["payload_json"].get("item_id") for event in snapshot["activity_events"]}
+    assert {item["id"] for item in snapshot["shopping_items"]} <= events
+
+
+def test_import_validates_all_rows_before_writing(client, auth_headers) -> None:
+    _sync_members(client, auth_headers)
+    response = client.post(
+        "/v1/import/manual",
+        headers=auth_headers,
+        json={
+            "rotation_rows": "2024-01-01,Alex;2024-01-08,Newcomer",
+            "cleaning_history_rows": "2024-01-01,Alex,done;2024-01-08,Sam,skipped",
+            "actor_user_id": "u1",
+        },
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == (
+        "Unsupported cleaning status 'skipped' at row 2. Allowed values: done, missed, pending"
+    )
+
+    snapshot = client.get("/v1/admin/export", headers=auth_headers).json()
+    assert snapshot["summary"]["cleaning_assignments"] == 0
+    assert [member["display_name"] for member in snapshot["data"]["members"]] == ["Alex", "Sam", "Pat"]
+
+
+def test_import_dry_run_reports_all_errors_without_writing(client, auth_headers) -> None:
+    _sync_members(client, auth_headers)
+    payload = {
+        "rotation_rows": "2024-01-01,Alex;2024-01-02,Sam;2024-01-08,Newcomer",
+        "cleaning_history_rows": "2024-01-01,Alex,done;2024-01-08,Sam,skipped;not-a-date,Pat",
+        "shopping_history_rows": "2024-01-03,Milk,Alex;2024-01-04,,Sam",
+        "cleaning_override_rows": "2024-02-05,Alex,Alex;2024-02-12,Alex,Sam,swap;2024-02-19,Sam,Alex",
+        "actor_user_id": "u1",
+    }
+    response = client.post("/v1/import/manual?dry_run=true", headers=auth_headers, json=payload)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["ok"] is False
+    assert body["dry_run"] is True
+    assert [(error["section"], error["line"]) for error in body["errors"]] == [
+        ("rotation_rows", 2),
+        ("cleaning_history_rows", 2),
+        ("cleaning_history_rows", 3),
+        ("shopping_history_rows", 2),
+        ("cleaning_override_rows", 1),
+    ]
+    assert body["errors"][0]["message"] == "Conflicting rotation members for week 2024-01-01 at row 2"
+    summary = body["summary"]
+    assert summary["rotation_weeks_imported"] == 2
+    assert summary["rotation_order_names"][:2] == ["Alex", "Newcomer"]
+    assert summary["new_placeholder_members"] == ["Newcomer"]
+    assert summary["cleaning_done_events_imported"] == 1
+    assert summary["shopping_history_rows_imported"] == 1
+    assert summary["cleaning_override_swap_pairs_linked"] == 1
+
+    snapshot = client.get("/v1/admin/export", headers=auth_headers).json()["summary"]
+    assert snapshot["members"] == 3
+    assert snapshot["cleaning_assignments"] == 0
+    assert snapshot["cleaning_overrides"] == 0
+    assert snapshot["activity_events"] == 0
+
+
+def test_import_dry_run_projects_real_import_summary(client, auth_headers) -> None:
+    _sync_members(client, auth_headers)
+    payload = {
+        "rotation_rows": "2024-01-01,Alex;2024-01-08,Sam;2024-01-15,Pat",
+        "cleaning_history_rows": "2024-01-01,Alex,done;2024-01-08,Sam,missed",
+        "shopping_history_rows": "2024-01-03,Milk,Alex",
+        "actor_user_id": "u1",
+    }
+    dry_run = client.post("/v1/import/manual?dry_run=true", headers=auth_headers, json=payload).json()
+    assert dry_run["ok"] is True
+    assert dry_run["errors"] == []
+
+    applied = client.post("/v1/import/manual", headers=auth_headers, json=payload).json()
+    assert applied["dry_run"] is False
+    expected = dict(dry_run["summary"])
+    assert expected.pop("new_placeholder_members") == []
+    assert applied["summary"] == expected
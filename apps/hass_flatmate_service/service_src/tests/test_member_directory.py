@@ -0,0 +1,158 @@
+"""Member directory cache behavior tests."""
+
+from __future__ import annotations
+
+from datetime import date
+import json
+import sqlite3
+
+
+def _sync(client, headers, *, alex_name: str = "Alex") -> None:
+    response = client.put(
+        "/v1/members/sync",
+        headers=headers,
+        json={
+            "members": [
+                {"display_name": alex_name, "ha_user_id": "u1", "notify_service": "notify.alex", "active": True},
+                {"display_name": "Sam", "ha_user_id": "u2", "notify_service": "notify.sam", "active": True},
+            ]
+        },
+    )
+    assert response.status_code == 200
+
+
+def _directory_stats(client, headers) -> dict:
+    response = client.get("/v1/admin/diagnostics", headers=headers)
+    assert response.status_code == 200
+    return response.json()["member_directory"]
+
+
+def test_directory_serves_repeated_lookups_from_cache(client, auth_headers) -> None:
+    _sync(client, auth_headers)
+    assert client.get("/v1/cleaning/current", headers=auth_headers).status_code == 200
+    before = _directory_stats(client, auth_headers)
+
+    for _ in range(3):
+        response = client.post(
+            "/v1/shopping/items",
+            headers=auth_headers,
+            json={"name": "Milk", "actor_user_id": "u1"},
+        )
+        assert response.status_code == 200
+
+    after = _directory_stats(client, auth_headers)
+    assert after["loaded"] is True
+    assert after["members"] == 2
+    assert after["hits"] >= before["hits"] + 3
+    assert after["rebuilds"] == before["rebuilds"]
+
+
+def test_directory_is_rebuilt_after_member_sync(client, auth_headers) -> None:
+    _sync(client, auth_headers)
+    current = client.get("/v1/cleaning/current", headers=auth_headers).json()
+    week_start = date.fromisoformat(current["week_start"])
+    before = _directory_stats(client, auth_headers)
+
+    _sync(client, auth_headers, alex_name="Alexandra")
+    after_sync = _directory_stats(client, auth_headers)
+    assert after_sync["invalidations"] > before["invalidations"]
+
+    swap = client.post(
+        "/v1/cleaning/overrides/swap",
+        headers=auth_headers,
+        json={
+            "week_start": week_start.isoformat(),
+            "member_a_id": 1,
+            "member_b_id": 2,
+            "actor_user_id": "u1",
+            "cancel": False,
+        },
+    )
+    assert swap.status_code == 200
+    messages = [row["message"] for row in swap.json()["notifications"]]
+    assert any(message.startswith("Alexandra ") for message in messages)
+
+
+def test_directory_is_invalidated_by_admin_reset(client, auth_headers) -> None:
+    _sync(client, auth_headers)
+    assert client.get("/v1/cleaning/current", headers=auth_headers).status_code == 200
+    assert client.post("/v1/admin/reset", headers=auth_headers).status_code == 200
+
+    response = client.post(
+        "/v1/shopping/items",
+        headers=auth_headers,
+        json={"name": "Bread", "actor_user_id": "u1"},
+    )
+    assert response.status_code == 200
+    items = client.get("/v1/shopping/items", headers=auth_headers).json()
+    assert items[0]["added_by_member_id"] is None
+
+
+def _sync_payload(*, alex_name: str = "Alex", include_sam: bool = True, payload_hash: str | None = None) -> dict:
+    members = [{"display_name": alex_name, "ha_user_id": "u1", "notify_service": "notify.alex", "active": True}]
+    if include_sam:
+        members.append({"display_name": "Sam", "ha_user_id": "u2", "notify_service": "notify.sam", "active": True})
+    payload: dict = {"members": members}
+    if payload_hash is not None:
+        payload["payload_hash"] = payload_hash
+    return payload
+
+
+def test_member_sync_reports_field_level_diff_counts(client, auth_headers) -> None:
+    first = client.put("/v1/members/sync", headers=auth_headers, json=_sync_payload()).json()
+    assert first["inserted"] == 2
+    assert first["unchanged"] is False
+
+    stats_before = _directory_stats(client, auth_headers)
+    identical = client.put("/v1/members/sync", headers=auth_headers, json=_sync_payload()).json()
+    assert identical["unchanged"] is True
+    assert (identical["inserted"], identical["updated"], identical["deactivated"]) == (0, 0, 0)
+    assert [row["display_name"] for row in identical["members"]] == ["Alex", "Sam"]
+    assert _directory_stats(client, auth_headers)["invalidations"] == stats_before["invalidations"]
+
+    changed = client.put(
+        "/v1/members/sync",
+        headers=auth_headers,
+        json=_sync_payload(alex_name="Alexandra", include_sam=False),
+    ).json()
+    assert changed["unchanged"] is False
+    assert (changed["inserted"], changed["updated"], changed["deactivated"]) == (0, 1, 1)
+    by_name = {row["display_name"]: row for row in changed["members"]}
+    assert by_name["Sam"]["active"] is False
+
+
+def test_member_sync_short_circuits_on_matching_payload_hash(client, auth_headers) -> None:
+    first = client.put("/v1/members/sync", headers=auth_headers, json=_sync_payload(payload_hash="abc")).json()
+    assert first["inserted"] == 2
+
+    repeat = client.put("/v1/members/sync", headers=auth_headers, json=_sync_payload(payload_hash="abc")).json()
+    assert repeat["unchanged"] is True
+    assert len(repeat["members"]) == 2
+
+    # Member rows changed through another path, so the same hash must be applied again.
+    assert client.post("/v1/admin/reset", headers=auth_headers).status_code == 200
+    after_reset = client.put("/v1/members/sync", headers=auth_headers, json=_sync_payload(payload_hash="abc")).json()
+    assert after_reset["unchanged"] is False
+    assert after_reset["inserted"] == 2
+
+
+def test_unchanged_member_sync_still_reconciles_the_rotation(client, auth_headers, tmp_path) -> None:
+    first = client.put("/v1/members/sync", headers=auth_headers, json=_sync_payload(payload_hash="abc")).json()
+    member_ids = [row["id"] for row in first["members"]]
+
+    def rotation() -> list[int]:
+        connection = sqlite3.connect(tmp_path / "test.db")
+        try:
+            return json.loads(connection.execute("SELECT ordered_member_ids_json FROM rotation_config").fetchone()[0])
+        finally:
+            connection.close()
+
+    for payload in (_sync_payload(), _sync_payload(payload_hash="abc")):
+        connection = sqlite3.connect(tmp_path / "test.db")
+        with connection:
+            connection.execute("UPDATE rotation_config SET ordered_member_ids_json = '[]'")
+        connection.close()
+
+        synced = client.put("/v1/members/sync", headers=auth_headers, json=payload).json()
+        assert synced["unchanged"] is True
+        assert rotation() == member_ids
@@ -0,0 +1,117 @@
+"""Request metrics endpoint tests."""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _fresh_metrics() -> None:
+    from app.metrics import request_metrics
+
+    request_metrics.reset()
+
+
+def _sample(text: str, name: str, **labels: str) -> float:
+    for line in text.splitlines():
+        if line.startswith("#") or not line.startswith(name + "{"):
+            continue
+        found = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', line[len(name) :].rsplit(" ", 1)[0]))
+        if all(found.get(key) == value for key, value in labels.items()):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"no sample {name} {labels}")
+
+
+def test_metrics_record_latency_sql_and_commits_per_route(client, auth_headers) -> None:
+    for name in ("Milk", "Bread"):
+        assert client.post("/v1/shopping/items", headers=auth_headers, json={"name": name}).status_code == 200
+    item_id = client.get("/v1/shopping/items", headers=auth_headers).json()[0]["id"]
+    complete = client.post(f"/v1/shopping/items/{item_id}/complete", headers=auth_headers, json={})
+    assert complete.status_code == 200
+    assert client.get("/v1/nope", headers=auth_headers).status_code == 404
+
+    response = client.get("/v1/admin/metrics", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+
+    route = {"method": "POST", "route": "/v1/shopping/items"}
+    assert _sample(text, "hass_flatmate_http_requests_total", **route, status="200") == 2
+    assert _sample(text, "hass_flatmate_http_request_duration_seconds_count", **route) == 2
+    assert _sample(text, "hass_flatmate_http_request_duration_seconds_bucket", **route, le="+Inf") == 2
+    assert _sample(text, "hass_flatmate_db_statements_total", **route) >= 4
+    assert _sample(text, "hass_flatmate_db_statement_seconds_total", **route) > 0
+    assert _sample(text, "hass_flatmate_db_commits_total", **route) == 2
+    assert _sample(text, "hass_flatmate_http_response_size_bytes_sum", **route) > 0
+    assert _sample(
+        text, "hass_flatmate_http_requests_total", method="POST", route="/v1/shopping/items/{item_id}/complete"
+    ) == 1
+    assert _sample(text, "hass_flatmate_db_commits_total", method="GET", route="/v1/shopping/items") == 0
+    assert _sample(text, "hass_flatmate_http_requests_total", route="<unmatched>", status="404") == 1
+
+    assert "hass_flatmate_threadpool_threads_limit " in text
+    assert "hass_flatmate_threadpool_queue_depth " in text
+    assert _sample(text, "hass_flatmate_slow_request_duration_seconds", rank="1") > 0
+
+
+def test_slowest_requests_are_ranked_and_limited(client, auth_headers, monkeypatch) -> None:
+    monkeypatch.setenv("HASS_FLATMATE_METRICS_SLOW_REQUESTS", "3")
+    for _ in range(5):
+        client.get("/v1/members", headers=auth_headers)
+
+    slowest = client.get("/v1/admin/diagnostics", headers=auth_headers).json()["slow_requests"]
+    assert len(slowest) == 3
+    durations = [entry["duration_ms"] for entry in slowest]
+    assert durations == sorted(durations, reverse=True)
+    assert {entry["route"] for entry in slowest} == {"/v1/members"}
+    assert all("sql_statements" in entry and "response_bytes" in entry for entry in slowest)
+
+    text = client.get("/v1/admin/metrics", headers=auth_headers).text
+    assert text.count("hass_flatmate_slow_request_duration_seconds{") == 3
+
+
+def test_lock_timeouts_answer_503_and_are_counted(client, auth_headers, monkeypatch, tmp_path) -> None:
+    from app import db
+
+    monkeypatch.setenv("HASS_FLATMATE_SQLITE_BUSY_TIMEOUT_MS", "50")
+    db.configure_engine()
+    holder = sqlite3.connect(tmp_path / "test.db", isolation_level=None)
+    try:
+        holder.execute("BEGIN EXCLUSIVE")
+        response = client.post("/v1/shopping/items", headers=auth_headers, json={"name": "Milk"})
+    finally:
+        holder.close()
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert response.json()["detail"] == "Database is locked, retry shortly"
+
+    text = client.get("/v1/admin/metrics", headers=auth_headers).text
+    route = {"method": "POST", "route": "/v1/shopping/items"}
+    assert _sample(text, "hass_flatmate_db_lock_errors_total", **route) >= 1
+    assert _sample(text, "hass_flatmate_http_requests_total", **route, status="503") == 1
+    assert client.post("/v1/shopping/items", headers=auth_headers, json={"name": "Milk"}).status_code == 200
+
+
+def test_diagnostics_report_startup_timings(client, auth_headers) -> None:
+    assert client.get("/health").status_code == 200
+
+    startup = client.get("/v1/admin/diagnostics", headers=auth_headers).json()["startup"]
+
+    assert startup["import_seconds"] > 0
+    assert startup["migrations_seconds"] >= 0
+    # Recorded once per process, so an earlier test may have made the first request.
+    assert startup["first_request"]["path"].startswith("/")
+    assert startup["first_request"]["seconds"] > 0
+
+
+def test_diagnostics_report_the_server_profile(client, auth_headers) -> None:
+    server = client.get("/v1/admin/diagnostics", headers=auth_headers).json()["server"]
+
+    assert server["name"] == "performance"
+    assert server["timeout_keep_alive"] == 20
+    # Recorded by the lifespan from inside the event loop serving requests.
+    assert server["running_loop"]
@@ -0,0 +1,74 @@
+"""Schema migration runner tests."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, inspect as sa_inspect, text
+
+from app import migrations
+
+
+def _engine(tmp_path: Path, name: str = "migrate.db"):
+    return create_engine(f"sqlite:///{tmp_path / name}", future=True)
+
+
+def test_fresh_database_is_migrated_once(tmp_path: Path) -> None:
+    engine = _engine(tmp_path)
+
+    applied = migrations.run_migrations(engine)
+    assert applied == [migration.version for migration in migrations.MIGRATIONS]
+
+    inspector = sa_inspect(engine)
+    assert "members" in inspector.get_table_names()
+    index_names = {index["name"] for index in inspector.get_indexes("activity_events")}
+    assert "ix_activity_events_created_at" in index_names
+
+    assert migrations.run_migrations(engine) == []
+    with engine.connect() as conn:
+        assert migrations.current_version(conn) == migrations.LATEST_VERSION
+
+
+def test_pre_versioned_database_gets_missing_columns(tmp_path: Path) -> None:
+    engine = _engine(tmp_path)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE members (id INTEGER PRIMARY KEY, display_name VARCHAR(120) NOT NULL)"))
+        conn.execute(
+            text("CREATE TABLE cleaning_assignments (week_start DATE PRIMARY KEY, status VARCHAR(7) NOT NULL)")
+        )
+        conn.execute(text("INSERT INTO members (id, display_name) VALUES (1, 'Alex')"))
+
+    migrations.run_migrations(engine)
+
+    inspector = sa_inspect(engine)
+    member_columns = {column["name"] for column in inspector.get_columns("members")}
+    assert {"notify_services", "device_trackers"} <= member_columns
+    assignment_columns = {column["name"] for column in inspector.get_columns("cleaning_assignments")}
+    assert "notified_slots" in assignment_columns
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT display_name FROM members WHERE id = 1")).scalar() == "Alex"
+
+
+def test_failed_migration_rolls_back_every_step(tmp_path: Path, monkeypatch) -> None:
+    engine = _engine(tmp_path)
+
+    def _boom(conn) -> None:
+        conn.execute(text("CREATE TABLE half_done (id INTEGER PRIMARY KEY)"))
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(
+        migrations,
+        "MIGRATIONS",
+        [*migrations.MIGRATIONS, migrations.Migration(99, "broken", _boom)],
+    )
+    monkeypatch.setattr(migrations, "LATEST_VERSION", 99)
+
+    with pytest.raises(RuntimeError):
+        migrations.run_migrations(engine)
+
+    table_names = set(sa_inspect(engine).get_table_names())
+    assert "half_done" not in table_names
+    assert "members" not in table_names
+    with engine.connect() as conn:
+        assert migrations.current_version(conn) == 0
@@ -0,0 +1,66 @@
+"""Response serialization and compression tests."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+
+def _seed_activity(client, headers, count: int) -> None:
+    for index in range(count):
+        response = client.post("/v1/shopping/items", headers=headers, json={"name": f"Item {index}"})
+        assert response.status_code == 200
+
+
+def test_large_responses_are_gzip_compressed(client, auth_headers) -> None:
+    _seed_activity(client, auth_headers, 30)
+
+    response = client.get("/v1/activity?limit=200", headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in response.headers["vary"].lower()
+    rows = response.json()
+    assert len(rows) == 30
+    datetime.fromisoformat(rows[0]["created_at"])
+    assert isinstance(rows[0]["payload_json"], dict)
+
+
+def test_small_or_unaccepted_responses_are_not_compressed(client, auth_headers) -> None:
+    small = client.get("/v1/members", headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert small.status_code == 200
+    assert "content-encoding" not in small.headers
+
+    _seed_activity(client, auth_headers, 30)
+    identity = client.get("/v1/activity?limit=200", headers={**auth_headers, "Accept-Encoding": "identity"})
+    assert identity.status_code == 200
+    assert "content-encoding" not in identity.headers
+
+
+def test_trusted_payloads_keep_response_shape(client, auth_headers) -> None:
+    client.put(
+        "/v1/members/sync",
+        headers=auth_headers,
+        json={"members": [{"display_name": "Alex", "ha_user_id": "u1", "active": True}]},
+    )
+    schedule = client.get("/v1/cleaning/schedule?weeks_ahead=2", headers=auth_headers)
+    assert schedule.status_code == 200
+    row = schedule.json()["schedule"][0]
+    assert len(row["week_start"]) == 10
+    assert row["status"] == "pending"
+
+    export = client.get("/v1/admin/export", headers=auth_headers)
+    assert export.status_code == 200
+    payload = export.json()
+    assert payload["summary"]["members"] == 1
+    assert payload["data"]["members"][0]["display_name"] == "Alex"
+
+
+def test_brotli_is_preferred_when_accepted(client, auth_headers) -> None:
+    pytest.importorskip("brotli")
+    _seed_activity(client, auth_headers, 30)
+
+    response = client.get("/v1/activity?limit=200", headers={**auth_headers, "Accept-Encoding": "gzip, br"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "br"
+    assert len(response.json()) == 30
@@ -27,3 +27,61 @@ def test_db_path_defaults_to_local_data_when_not_in_ha(monkeypatch) -> None:
 
     settings = settings_module.Settings()
     assert settings.db_path == Path("./data/hass_flatmate.db")
+
+
+def test_sqlite_profile_defaults(monkeypatch) -> None:
+    for name in (
+        "HASS_FLATMATE_SQLITE_PROFILE",
+        "HASS_FLATMATE_SQLITE_JOURNAL_MODE",
+        "HASS_FLATMATE_SQLITE_SYNCHRONOUS",
+        "HASS_FLATMATE_SQLITE_BUSY_TIMEOUT_MS",
+    ):
+        monkeypatch.delenv(name, raising=False)
+
+    settings = settings_module.Settings()
+    assert settings.sqlite_tuning_enabled is True
+    assert settings.sqlite_journal_mode == "WAL"
+    assert settings.sqlite_synchronous == "NORMAL"
+    assert settings.sqlite_busy_timeout_ms == 5000
+
+
+def test_sqlite_profile_rejects_invalid_values(monkeypatch) -> None:
+    monkeypatch.setenv("HASS_FLATMATE_SQLITE_JOURNAL_MODE", "wal; DROP TABLE members")
+    monkeypatch.setenv("HASS_FLATMATE_SQLITE_SYNCHRONOUS", "full")
+    monkeypatch.setenv("HASS_FLATMATE_SQLITE_BUSY_TIMEOUT_MS", "not-a-number")
+
+    settings = settings_module.Settings()
+    assert settings.sqlite_journal_mode == "WAL"
+    assert settings.sqlite_synchronous == "FULL"
+    assert settings.sqlite_busy_timeout_ms == 5000
+
+
+def test_server_profile_defaults_and_legacy(monkeypatch) -> None:
+    import uvicorn
+
+    from app import server
+
+    for name in (
+        "HASS_FLATMATE_SERVER_PROFILE",
+        "HASS_FLATMATE_SERVER_KEEP_ALIVE_SECONDS",
+        "HASS_FLATMATE_SERVER_LIMIT_CONCURRENCY",
+        "HASS_FLATMATE_SERVER_BACKLOG",
+    ):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(server, "_installed", lambda module: True)
+
+    profile = server.server_profile()
+    assert (profile.name, profile.loop, profile.http) == ("performance", "uvloop", "httptools")
+    # Longer than the 15 s keep-alive of Home Assistant's aiohttp session.
+    assert profile.timeout_keep_alive == 20
+    assert (profile.limit_concurrency, profile.backlog) == (256, 128)
+
+    monkeypatch.setattr(server, "_installed", lambda module: False)
+    monkeypatch.setenv("HASS_FLATMATE_SERVER_LIMIT_CONCURRENCY", "0")
+    profile = server.server_profile()
+    assert (profile.loop, profile.http, profile.limit_concurrency) == ("asyncio", "h11", None)
+
+    monkeypatch.setenv("HASS_FLATMATE_SERVER_PROFILE", "legacy")
+    defaults = uvicorn.Config("app.main:app")
+    legacy = server.server_profile().uvicorn_options()
+    assert legacy == {name: getattr(defaults, name) for name in legacy}
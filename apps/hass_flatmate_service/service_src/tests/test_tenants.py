@@ -0,0 +1,114 @@
+"""Multi-household tenancy tests."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import re
+import time
+
+import pytest
+
+
+_TENANT_A = {"x-flatmate-token": "token-a"}
+_TENANT_B = {"x-flatmate-token": "token-b"}
+
+
+@pytest.fixture
+def tenants(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    tenants_file = tmp_path / "tenants.json"
+    tenants_file.write_text(
+        json.dumps({"tenants": [{"id": "flat-a", "token": "token-a"}, {"id": "flat-b", "token": "token-b"}]})
+    )
+    monkeypatch.setenv("HASS_FLATMATE_TENANTS_FILE", str(tenants_file))
+    monkeypatch.setenv("HASS_FLATMATE_TENANT_DIR", str(tmp_path / "tenants"))
+
+    from app.tenants import tenant_pool
+
+    yield tmp_path / "tenants"
+    tenant_pool.close_all()
+
+
+def _item_names(client, headers) -> list[str]:
+    response = client.get("/v1/shopping/items", headers=headers)
+    assert response.status_code == 200
+    return [item["name"] for item in response.json()]
+
+
+def _add_item(client, headers, name: str) -> None:
+    assert client.post("/v1/shopping/items", headers=headers, json={"name": name}).status_code == 200
+
+
+def test_tenant_tokens_use_their_own_databases(tenants, client, auth_headers) -> None:
+    _add_item(client, auth_headers, "Milk")
+    _add_item(client, _TENANT_A, "Bread")
+    _add_item(client, _TENANT_B, "Eggs")
+
+    assert _item_names(client, auth_headers) == ["Milk"]
+    assert _item_names(client, _TENANT_A) == ["Bread"]
+    assert _item_names(client, _TENANT_B) == ["Eggs"]
+    assert (tenants / "flat-a.db").is_file()
+    assert (tenants / "flat-b.db").is_file()
+
+    assert client.get("/v1/shopping/items", headers={"x-flatmate-token": "unknown"}).status_code == 401
+
+
+def test_tenants_cannot_read_the_primary_token_from_the_ingress_config(tenants, client) -> None:
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    assert client.get("/ui/config", headers=_TENANT_A).status_code == 403
+    assert client.get("/", headers=_TENANT_A).status_code == 403
+
+    with TestClient(app, client=("172.30.32.2", 50000)) as ingress:
+        config = ingress.get("/ui/config")
+    assert config.status_code == 200
+    assert config.json() == {"api_token": "test-token"}
+
+
+def test_pool_closes_least_recently_used_and_idle_tenants(tenants, client, auth_headers, monkeypatch) -> None:
+    from app.tenants import tenant_pool
+
+    monkeypatch.setenv("HASS_FLATMATE_TENANT_POOL_SIZE", "1")
+    _add_item(client, _TENANT_A, "Bread")
+    _add_item(client, _TENANT_B, "Eggs")
+
+    pool = client.get("/v1/admin/diagnostics", headers=auth_headers).json()["tenant_pool"]
+    assert [entry["id"] for entry in pool["open"]] == ["flat-b"]
+    assert pool["evicted"] == 1
+
+    # Reopening an evicted tenant finds its data again.
+    assert _item_names(client, _TENANT_A) == ["Bread"]
+    assert tenant_pool.evict_idle(now=time.monotonic() + 3600) == ["flat-a"]
+    assert tenant_pool.stats()["open"] == []
+
+
+def test_tenants_have_their_own_caches_and_metrics(tenants, client, auth_headers) -> None:
+    _add_item(client, _TENANT_A, "Bread")
+    _add_item(client, _TENANT_A, "Butter")
+    assert client.get("/v1/cleaning/current", headers=_TENANT_A).status_code == 200
+
+    diagnostics = client.get("/v1/admin/diagnostics", headers=_TENANT_A).json()
+    assert diagnostics["tenant"] == "flat-a"
+    assert "tenant_pool" not in diagnostics
+    assert client.get("/v1/admin/diagnostics", headers=_TENANT_B).json()["member_directory"]["rebuilds"] == 0
+
+    posts = re.compile(
+        r'^hass_flatmate_http_requests_total\{method="POST",route="/v1/shopping/items",status="200"\} (\d+)$', re.M
+    )
+    metrics_a = client.get("/v1/admin/metrics", headers=_TENANT_A).text
+    metrics_b = client.get("/v1/admin/metrics", headers=_TENANT_B).text
+    assert posts.search(metrics_a).group(1) == "2"
+    assert posts.search(metrics_b) is None
+
+
+def test_tenants_file_rejects_reused_tokens(tmp_path, monkeypatch) -> None:
+    from app.tenants import load_tenants
+
+    monkeypatch.setenv("HASS_FLATMATE_API_TOKEN", "primary")
+    tenants_file = tmp_path / "tenants.json"
+    tenants_file.write_text(json.dumps({"tenants": [{"id": "flat-a", "token": "primary"}]}))
+
+    with pytest.raises(RuntimeError, match="reuses a token"):
+        load_tenants(tenants_file)
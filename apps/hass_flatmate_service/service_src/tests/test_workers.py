@@ -0,0 +1,75 @@
+"""Cache coherence tests for several worker processes sharing one database."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+import sqlite3
+
+import pytest
+
+
+_MEMBERS = {
+    "members": [
+        {"display_name": "Alex", "ha_user_id": "u1", "active": True},
+        {"display_name": "Sam", "ha_user_id": "u2", "active": True},
+    ],
+    "payload_hash": "members-v1",
+}
+
+
+@pytest.fixture
+def workers(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("HASS_FLATMATE_WORKERS", "2")
+
+
+def _write_from_other_worker(tmp_path, statement: str) -> None:
+    """Commit a tracked write the way another worker process would, bypassing this one's hooks."""
+
+    with sqlite3.connect(tmp_path / "test.db") as conn:
+        conn.execute("UPDATE data_version SET version = version + 1 WHERE id = 1")
+        conn.execute(statement)
+
+
+def test_member_writes_of_other_workers_reach_the_directory(workers, client, auth_headers, tmp_path) -> None:
+    assert client.put("/v1/members/sync", headers=auth_headers, json=_MEMBERS).status_code == 200
+    assert client.put("/v1/members/sync", headers=auth_headers, json=_MEMBERS).json()["unchanged"] is True
+
+    _write_from_other_worker(
+        tmp_path,
+        "UPDATE members SET active = 0, updated_version = (SELECT version FROM data_version) WHERE ha_user_id = 'u2'",
+    )
+
+    # The remembered sync hash described the old rows, so the sync runs again.
+    synced = client.put("/v1/members/sync", headers=auth_headers, json=_MEMBERS).json()
+    assert synced["unchanged"] is False
+    assert synced["updated"] == 1
+    assert all(member["active"] for member in synced["members"])
+
+
+def test_quiet_due_window_checks_the_shared_version(workers, client, auth_headers, tmp_path, query_budget) -> None:
+    assert client.put("/v1/members/sync", headers=auth_headers, json=_MEMBERS).status_code == 200
+    week_start = date.fromisoformat(client.get("/v1/cleaning/current", headers=auth_headers).json()["week_start"])
+    tuesday = week_start + timedelta(days=1)
+
+    def poll(minute: int) -> list[dict]:
+        at = datetime.combine(tuesday, time(9, minute)).isoformat()
+        response = client.get("/v1/cleaning/notifications/due", headers=auth_headers, params={"at": at})
+        assert response.status_code == 200
+        return response.json()["notifications"]
+
+    for minute in range(3):
+        assert poll(minute) == []
+    with query_budget(queries=1, label="quiet poll with several workers"):
+        assert poll(3) == []
+
+    _write_from_other_worker(tmp_path, "UPDATE cleaning_assignments SET notified_slots = NULL")
+    with query_budget(queries=20, commits=3) as counter:
+        poll(4)
+    assert counter.queries > 1
+
+
+def test_restore_requires_a_single_worker(workers, client, auth_headers) -> None:
+    response = client.post("/v1/admin/restore", headers=auth_headers, json={"name": "anything.db"})
+
+    assert response.status_code == 400
+    assert "HASS_FLATMATE_WORKERS=1" in response.json()["detail"]
@@ -0,0 +1,90 @@
+"""Single-writer queue tests."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+import sqlite3
+import threading
+
+
+def _post_items(client, auth_headers, names: list[str]) -> list[int]:
+    def post(name: str) -> int:
+        response = client.post("/v1/shopping/items", headers=auth_headers, json={"name": name})
+        assert response.status_code == 200
+        return response.json()["id"]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        return list(pool.map(post, names))
+
+
+def test_concurrent_writes_are_serialized_and_counted(client, auth_headers) -> None:
+    before = client.get("/v1/admin/diagnostics", headers=auth_headers).json()["writer"]
+
+    ids = _post_items(client, auth_headers, [f"Item {index}" for index in range(24)])
+
+    assert len(set(ids)) == 24
+    assert len(client.get("/v1/shopping/items", headers=auth_headers).json()) == 24
+    writer = client.get("/v1/admin/diagnostics", headers=auth_headers).json()["writer"]
+    assert writer["enabled"] is True
+    assert writer["running"] is True
+    assert writer["queued"] == 0
+    assert writer["completed"] - before["completed"] == 24
+    assert writer["failed"] == before["failed"]
+
+
+def test_writer_surfaces_validation_errors(client, auth_headers) -> None:
+    response = client.post("/v1/shopping/items/999/complete", headers=auth_headers, json={})
+
+    assert response.status_code == 400
+    assert client.get("/v1/admin/diagnostics", headers=auth_headers).json()["writer"]["failed"] >= 1
+
+
+def test_writer_retries_writes_blocked_by_another_connection(client, auth_headers, monkeypatch, tmp_path) -> None:
+    from app import db
+
+    monkeypatch.setenv("HASS_FLATMATE_SQLITE_BUSY_TIMEOUT_MS", "50")
+    db.configure_engine()
+    retries_before = client.get("/v1/admin/diagnostics", headers=auth_headers).json()["writer"]["lock_retries"]
+    holder = sqlite3.connect(tmp_path / "test.db", isolation_level=None, check_same_thread=False)
+    holder.execute("BEGIN EXCLUSIVE")
+    release = threading.Timer(0.12, holder.close)
+    release.start()
+    try:
+        response = client.post("/v1/shopping/items", headers=auth_headers, json={"name": "Milk"})
+    finally:
+        release.join()
+
+    assert response.status_code == 200
+    writer = client.get("/v1/admin/diagnostics", headers=auth_headers).json()["writer"]
+    assert writer["lock_retries"] > retries_before
+
+
+def test_imports_resets_and_assignment_creating_reads_run_on_the_writer(client, auth_headers) -> None:
+    members = [{"display_name": "Alex", "ha_user_id": "u1", "notify_service": "notify.alex", "active": True}]
+    assert client.put("/v1/members/sync", headers=auth_headers, json={"members": members}).status_code == 200
+    snapshot = client.get("/v1/admin/export", headers=auth_headers).json()
+    before = client.get("/v1/admin/diagnostics", headers=auth_headers).json()["writer"]["completed"]
+
+    requests = [
+        ("GET", "/v1/cleaning/current", None),
+        ("GET", "/v1/cleaning/schedule", None),
+        ("GET", "/v1/cleaning/notifications/due?at=2026-03-02T11:00:00", None),
+        ("POST", "/v1/import/manual", {"shopping_history_rows": "2026-03-02,Milk,Alex"}),
+        ("POST", "/v1/admin/import", {"snapshot": snapshot}),
+        ("POST", "/v1/admin/reset", None),
+    ]
+    for method, path, body in requests:
+        assert client.request(method, path, headers=auth_headers, json=body).status_code == 200, path
+
+    writer = client.get("/v1/admin/diagnostics", headers=auth_headers).json()["writer"]
+    assert writer["completed"] - before == len(requests)
+
+
+def test_writer_can_be_disabled(client, auth_headers, monkeypatch) -> None:
+    monkeypatch.setenv("HASS_FLATMATE_WRITER", "off")
+
+    ids = _post_items(client, auth_headers, ["Milk", "Bread", "Eggs"])
+
+    assert len(set(ids)) == 3
+    writer = client.get("/v1/admin/diagnostics", headers=auth_headers).json()["writer"]
+    assert writer["enabled"] is False
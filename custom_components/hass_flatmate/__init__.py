@@ -17,7 +17,7 @@ import voluptuous as vol
 from homeassistant.components.http import StaticPathConfig
 from homeassistant.config_entries import ConfigEntry, ConfigEntryNotReady
 from homeassistant.const import CONF_API_TOKEN, CONF_TYPE, CONF_URL, EVENT_HOMEASSISTANT_STARTED
-from homeassistant.core import Event, HomeAssistant, ServiceCall, callback
+from homeassistant.core import Event, HomeAssistant, ServiceCall, SupportsResponse, callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
@@ -29,6 +29,7 @@ from homeassistant.util import dt as dt_util
 from .api import HassFlatmateApiClient, HassFlatmateApiError
 from .const import (
     ACTIVITY_CURSOR_KEY,
+    BATCH_OPERATIONS,
     CALENDAR_CURSOR_CLEANING_KEY,
     CALENDAR_CURSOR_SHOPPING_KEY,
     CONF_BASE_URL,
@@ -63,6 +64,7 @@ from .const import (
     PLATFORMS,
     SERVICE_ADD_FAVORITE_ITEM,
     SERVICE_ADD_SHOPPING_ITEM,
+    SERVICE_ATTR_ATOMIC,
     SERVICE_ATTR_CANCEL,
     SERVICE_ATTR_CLEANER_MEMBER_ID,
     SERVICE_ATTR_COMPLETED_BY_MEMBER_ID,
@@ -73,11 +75,13 @@ from .const import (
     SERVICE_ATTR_MEMBER_A_ID,
     SERVICE_ATTR_MEMBER_B_ID,
     SERVICE_ATTR_NAME,
+    SERVICE_ATTR_OPERATIONS,
     SERVICE_ATTR_ORIGINAL_ASSIGNEE_MEMBER_ID,
     SERVICE_ATTR_RETURN_WEEK_START,
     SERVICE_ATTR_ROTATION_ROWS,
     SERVICE_ATTR_SHOPPING_HISTORY_ROWS,
     SERVICE_ATTR_WEEK_START,
+    SERVICE_BATCH,
     SERVICE_COMPLETE_SHOPPING_ITEM,
     SERVICE_DELETE_FAVORITE_ITEM,
     SERVICE_DELETE_SHOPPING_ITEM,
@@ -714,6 +718,11 @@ async def _build_member_sync_payload(hass: HomeAssistant) -> list[dict[str, Any]
     return payload
 
 
+def _member_sync_payload_hash(payload: list[dict[str, Any]]) -> str:
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
 async def _dispatch_notifications(
     hass: HomeAssistant,
     runtime: HassFlatmateRuntime,
@@ -864,7 +873,8 @@ async def _dispatch_notifications(
 
 async def _sync_members_from_ha(runtime: HassFlatmateRuntime, hass: HomeAssistant) -> None:
     payload = await _build_member_sync_payload(hass)
-    response = await runtime.api.sync_members(payload)
+    # The backend skips the sync when the hash matches the last one it applied.
+    response = await runtime.api.sync_members(payload, payload_hash=_member_sync_payload_hash(payload))
     if not isinstance(response, dict):
         return
     notifications = response.get("notifications", [])
@@ -1008,6 +1018,25 @@ async def _register_services(hass: HomeAssistant) -> None:
         )
         _schedule_refresh_and_process_activity(hass, runtime)
 
+    async def batch(call: ServiceCall) -> dict[str, Any]:
+        runtime = _get_primary_runtime(hass)
+        operations = [
+            {"op": operation["op"], "data": {**operation["data"], "actor_user_id": call.context.user_id}}
+            for operation in call.data[SERVICE_ATTR_OPERATIONS]
+        ]
+        try:
+            response = await runtime.api.batch(operations=operations, atomic=call.data[SERVICE_ATTR_ATOMIC])
+        except HassFlatmateApiError as exc:
+            raise HomeAssistantError(str(exc)) from exc
+        await _dispatch_notifications(
+            hass,
+            runtime,
+            response.get("notifications", []),
+            default_category="cleaning",
+        )
+        _schedule_refresh_and_process_activity(hass, runtime)
+        return {"ok": response.get("ok", False), "results": response.get("results", [])}
+
     async def sync_members(_call: ServiceCall) -> None:
         runtime = _get_primary_runtime(hass)
         await _sync_members_from_ha(runtime, hass)
@@ -1105,6 +1134,28 @@ async def _register_services(hass: HomeAssistant) -> None:
             }
         ),
     )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BATCH,
+        batch,
+        schema=vol.Schema(
+            {
+                vol.Required(SERVICE_ATTR_OPERATIONS): vol.All(
+                    [
+                        vol.Schema(
+                            {
+                                vol.Required("op"): vol.In(BATCH_OPERATIONS),
+                                vol.Optional("data", default={}): dict,
+                            }
+                        )
+                    ],
+                    vol.Length(min=1, max=100),
+                ),
+                vol.Optional(SERVICE_ATTR_ATOMIC, default=True): cv.boolean,
+            }
+        ),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
     hass.services.async_register(DOMAIN, SERVICE_SYNC_MEMBERS, sync_members)
     hass.services.async_register(
         DOMAIN,
@@ -7,6 +7,15 @@ from typing import Any
 
 from aiohttp import ClientError, ClientSession
 
+try:
+    from aiohttp.compression_utils import HAS_BROTLI
+except ImportError:
+    HAS_BROTLI = False
+
+# Large reads (activity, schedule, export) are compressed by the service when
+# the client advertises support; aiohttp decodes the body transparently.
+_ACCEPT_ENCODING = "br, gzip" if HAS_BROTLI else "gzip"
+
 
 class HassFlatmateApiError(Exception):
     """Raised when hass-flatmate API communication fails."""
@@ -18,7 +27,7 @@ class HassFlatmateApiClient:
     def __init__(self, session: ClientSession, base_url: str, api_token: str) -> None:
         self._session = session
         self._base_url = base_url.rstrip("/")
-        self._headers = {"x-flatmate-token": api_token}
+        self._headers = {"x-flatmate-token": api_token, "Accept-Encoding": _ACCEPT_ENCODING}
 
     async def _request(
         self,
@@ -58,8 +67,17 @@ class HassFlatmateApiClient:
     async def get_members(self) -> list[dict[str, Any]]:
         return await self._request("GET", "/v1/members")
 
-    async def sync_members(self, members: list[dict[str, Any]]) -> dict[str, Any] | list[dict[str, Any]]:
-        return await self._request("PUT", "/v1/members/sync", json={"members": members})
+    async def sync_members(
+        self,
+        members: list[dict[str, Any]],
+        *,
+        payload_hash: str | None = None,
+    ) -> dict[str, Any] | list[dict[str, Any]]:
+        return await self._request(
+            "PUT",
+            "/v1/members/sync",
+            json={"members": members, "payload_hash": payload_hash},
+        )
 
     async def get_shopping_items(self) -> list[dict[str, Any]]:
         return await self._request("GET", "/v1/shopping/items")
@@ -249,6 +267,13 @@ class HassFlatmateApiClient:
             },
         )
 
+    async def batch(self, *, operations: list[dict[str, Any]], atomic: bool = True) -> dict[str, Any]:
+        return await self._request(
+            "POST",
+            "/v1/batch",
+            json={"operations": operations, "atomic": atomic},
+        )
+
     async def get_due_notifications(self, *, at: datetime) -> dict[str, Any]:
         return await self._request(
             "GET",
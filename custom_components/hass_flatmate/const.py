@@ -59,6 +59,7 @@ SERVICE_MARK_CLEANING_UNDONE = "hass_flatmate_mark_cleaning_undone"
 SERVICE_MARK_CLEANING_TAKEOVER_DONE = "hass_flatmate_mark_cleaning_takeover_done"
 SERVICE_SWAP_CLEANING_WEEK = "hass_flatmate_swap_cleaning_week"
 SERVICE_SYNC_MEMBERS = "hass_flatmate_sync_members"
+SERVICE_BATCH = "hass_flatmate_batch"
 SERVICE_IMPORT_MANUAL_DATA = "hass_flatmate_import_manual_data"
 # Backward-compat internal alias; user-facing service naming is manual/generic.
 SERVICE_IMPORT_FLATASTIC_DATA = SERVICE_IMPORT_MANUAL_DATA
@@ -78,6 +79,21 @@ SERVICE_ATTR_ROTATION_ROWS = "rotation_rows"
 SERVICE_ATTR_CLEANING_HISTORY_ROWS = "cleaning_history_rows"
 SERVICE_ATTR_SHOPPING_HISTORY_ROWS = "shopping_history_rows"
 SERVICE_ATTR_CLEANING_OVERRIDE_ROWS = "cleaning_override_rows"
+SERVICE_ATTR_OPERATIONS = "operations"
+SERVICE_ATTR_ATOMIC = "atomic"
+
+# Operations accepted by the batch service (and POST /v1/batch).
+BATCH_OPERATIONS = (
+    "add_shopping_item",
+    "complete_shopping_item",
+    "delete_shopping_item",
+    "add_favorite_item",
+    "delete_favorite_item",
+    "mark_cleaning_done",
+    "mark_cleaning_undone",
+    "mark_cleaning_takeover_done",
+    "swap_cleaning_week",
+)
 
 COORDINATOR_NAME = "hass_flatmate_coordinator"
 NOTIFICATION_DEDUPE_KEY = "last_notification_minute"
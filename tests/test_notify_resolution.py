@@ -57,7 +57,7 @@ _stub("homeassistant.const", parent="homeassistant",
       EVENT_HOMEASSISTANT_STARTED="ha_started", Platform=MagicMock())
 _stub("homeassistant.core", parent="homeassistant",
       Event=MagicMock, HomeAssistant=MagicMock, ServiceCall=MagicMock,
-      callback=lambda f: f)
+      SupportsResponse=MagicMock(), callback=lambda f: f)
 _stub("homeassistant.config_entries", parent="homeassistant",
       ConfigEntry=MagicMock,
       ConfigEntryNotReady=type("ConfigEntryNotReady", (Exception,), {}))
@@ -113,6 +113,7 @@ from custom_components.hass_flatmate import (  # noqa: E402
     _build_member_sync_payload,
     _dispatch_notifications,
     _resolve_member_notify_services,
+    _sync_members_from_ha,
 )
 
 # ---------------------------------------------------------------------------
@@ -432,6 +433,31 @@ class TestBuildMemberSyncPayload:
         assert result[0]["display_name"] == "Jo"
 
 
+# ---------------------------------------------------------------------------
+# Tests: _sync_members_from_ha (payload hash)
+# ---------------------------------------------------------------------------
+
+
+class TestSyncMembersFromHa:
+    def _hass(self) -> MockHass:
+        return MockHass(states=[], notify_services={}, users=[MockUser("Jo", "uid_jo")])
+
+    def test_sends_a_stable_payload_hash(self) -> None:
+        hass = self._hass()
+        runtime = make_runtime()
+        runtime.api.sync_members = AsyncMock(return_value={"members": [], "notifications": []})
+        loop = asyncio.get_event_loop()
+
+        loop.run_until_complete(_sync_members_from_ha(runtime, hass))
+        loop.run_until_complete(_sync_members_from_ha(runtime, hass))
+
+        # Skipping unchanged payloads is left to the backend.
+        assert runtime.api.sync_members.call_count == 2
+        first, second = (call[1]["payload_hash"] for call in runtime.api.sync_members.call_args_list)
+        assert isinstance(first, str) and len(first) == 64
+        assert first == second
+
+
 # ---------------------------------------------------------------------------
 # Tests: _dispatch_notifications (multi-device)
 # ---------------------------------------------------------------------------